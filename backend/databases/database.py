@@ -2,6 +2,7 @@ import os
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import pymysql
 
@@ -24,12 +25,46 @@ if DB_TYPE == "mysql":
     DATABASE_URL = f"mysql+pymysql://{quote_plus(DB_USER)}:{quote_plus(DB_PASSWORD)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 else:
     # SQLite configuration (default)
-    DATABASE_URL = "sqlite:///./viyanta_web.db"
+    DATABASE_URL = os.getenv("SQLITE_DATABASE_URL", "sqlite:///./viyanta_web.db")
 
-# Set echo=False to reduce logs
-engine = create_engine(DATABASE_URL, echo=False)
+# Same database through an asyncio driver, for the read-only dashboard routes
+ASYNC_DATABASE_URL = (
+    DATABASE_URL
+    .replace("mysql+pymysql://", "mysql+aiomysql://", 1)
+    .replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+
+# Connection pool (per process; hypercorn workers each get their own pool)
+#   DB_POOL_SIZE         persistent connections (default 5)
+#   DB_MAX_OVERFLOW      extra connections under burst load (default 10)
+#   DB_POOL_TIMEOUT      seconds to wait for a free connection (default 30)
+#   DB_POOL_RECYCLE      reconnect connections older than this, seconds
+#                        (default 1800, below MySQL's wait_timeout)
+#   DB_POOL_PRE_PING     "0" disables the liveness check on checkout
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") != "0",
+}
+
+engine_kwargs = {"echo": False}  # Set echo=False to reduce logs
+if ":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:":
+    # In-memory SQLite uses a single shared connection; no pool to size
+    engine_kwargs["pool_pre_ping"] = POOL_SETTINGS["pool_pre_ping"]
+else:
+    engine_kwargs.update(POOL_SETTINGS)
+
+engine = create_engine(DATABASE_URL, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Separate pool with the same settings; async handlers run on the event loop
+# instead of holding a threadpool worker for the length of the query
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_kwargs)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency for DB session
@@ -41,3 +76,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status(pool_engine=None):
+    """Current connection pool counters for /db-status"""
+    pool = (pool_engine or engine).pool
+    status = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            status[name] = counter()
+    status["settings"] = {
+        key: engine_kwargs[key] for key in POOL_SETTINGS if key in engine_kwargs
+    }
+    return status
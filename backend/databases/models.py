@@ -1,11 +1,16 @@
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, Integer, String, Text, DateTime, func
 from sqlalchemy import (
-    Column, Integer, BigInteger, Float, String, DateTime, DECIMAL, JSON, ForeignKey, Text, Boolean, Date
+    Column, Integer, BigInteger, Float, String, DateTime, DECIMAL, JSON, ForeignKey, Text, Boolean, Date,
+    UniqueConstraint
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from databases.database import Base
+from helpers.sort_keys import register_sort_key_listeners
+
+# BIGINT primary keys only auto-increment on SQLite when declared as INTEGER
+BigIntegerPK = BigInteger().with_variant(Integer, "sqlite")
 
 
 class Company(Base):
@@ -22,7 +27,7 @@ class Company(Base):
 class ReportsBase(Base):
     __abstract__ = True  # Do not create a table for this class
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
     company = Column(String(255), nullable=False)
     company_id = Column(Integer, ForeignKey("company.id"), nullable=False)
 
@@ -137,6 +142,10 @@ class EconomyMaster(Base):
     ReportedValue = Column(String(50), nullable=True)
     IsActive = Column(Boolean, default=True, nullable=False)
 
+    # Precomputed ordering for /unique-values (see helpers/sort_keys.py)
+    ProcessedFYYearSortKey = Column(Integer, nullable=True, index=True)
+    ReportedValueSortKey = Column(Float(precision=53), nullable=True, index=True)
+
 
 class User(Base):
     """
@@ -279,6 +288,10 @@ class IndustryMaster(Base):
     ReportedValue = Column(String(50), nullable=True)
     IsActive = Column(Boolean, default=True, nullable=False)
 
+    # Precomputed ordering for /unique-values (see helpers/sort_keys.py)
+    ProcessedFYYearSortKey = Column(Integer, nullable=True, index=True)
+    ReportedValueSortKey = Column(Float(precision=53), nullable=True, index=True)
+
 
 class PeriodMaster(Base):
     __tablename__ = "period_master"
@@ -350,6 +363,11 @@ class MonthlyPeriodMaster(Base):
 
 class IRDAIData(Base):
     __tablename__ = "irdai_monthly_data"
+    __table_args__ = (
+        # One row per sheet line; the Excel importer upserts on it
+        UniqueConstraint("report_month", "insurer_name", "category",
+                         name="uq_irdai_monthly_data_row"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
 
@@ -423,6 +441,96 @@ class IRDAIData(Base):
     quarter_period_ref = relationship("PeriodMaster")
 
 
+class IRDAIMonthlyRollup(Base):
+    """
+    Pre-summed irdai_monthly_data per (period, insurer_name, category).
+
+    One row set per report month ("MONTH"), per FY quarter to date ("Q") and
+    per FY to date ("FY"). period_start / period_end are the first and last
+    report_month loaded for that period, so a period can stand in for the raw
+    rows of any report_month range that contains it. Metric columns keep the
+    irdai_monthly_data names and hold SUM() over the period.
+    Rebuilt by services.irdai_rollup after every import.
+    """
+    __tablename__ = "irdai_monthly_rollup"
+    __table_args__ = (
+        UniqueConstraint("period_key", "insurer_name", "category",
+                         name="uq_irdai_rollup_period_row"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    period_type = Column(String(10), nullable=False)   # MONTH | Q | FY
+    period_key = Column(String(40), nullable=False, index=True)
+    fy_key = Column(String(10), nullable=False, index=True)  # e.g. 2024-25
+    q_key = Column(String(20), nullable=True)                 # e.g. 2024-25-Q1
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+
+    insurer_name = Column(String(255), nullable=False)
+    category = Column(String(255), nullable=False)
+
+    # --------------------
+    # First Year Premium
+    # --------------------
+    fyp_prev = Column(DECIMAL(20, 2))
+    fyp_current = Column(DECIMAL(20, 2))
+    fyp_growth = Column(DECIMAL(20, 2))
+    fyp_ytd_prev = Column(DECIMAL(20, 2))
+    fyp_ytd_current = Column(DECIMAL(20, 2))
+    fyp_growth_ytd = Column(DECIMAL(20, 2))
+    fyp_market_share = Column(DECIMAL(20, 2))
+
+    # --------------------
+    # No. of Policies
+    # --------------------
+    pol_prev = Column(DECIMAL(20, 2))
+    pol_current = Column(DECIMAL(20, 2))
+    pol_growth = Column(DECIMAL(20, 2))
+    pol_ytd_prev = Column(DECIMAL(20, 2))
+    pol_ytd_current = Column(DECIMAL(20, 2))
+    pol_growth_ytd = Column(DECIMAL(20, 2))
+    pol_market_share = Column(DECIMAL(20, 2))
+
+    # --------------------
+    # Lives Covered
+    # --------------------
+    lives_prev = Column(DECIMAL(20, 2))
+    lives_current = Column(DECIMAL(20, 2))
+    lives_growth = Column(DECIMAL(20, 2))
+    lives_ytd_prev = Column(DECIMAL(20, 2))
+    lives_ytd_current = Column(DECIMAL(20, 2))
+    lives_growth_ytd = Column(DECIMAL(20, 2))
+    lives_market_share = Column(DECIMAL(20, 2))
+
+    # --------------------
+    # Sum Assured
+    # --------------------
+    sa_prev = Column(DECIMAL(20, 2))
+    sa_current = Column(DECIMAL(20, 2))
+    sa_growth = Column(DECIMAL(20, 2))
+    sa_ytd_prev = Column(DECIMAL(20, 2))
+    sa_ytd_current = Column(DECIMAL(20, 2))
+    sa_growth_ytd = Column(DECIMAL(20, 2))
+    sa_market_share = Column(DECIMAL(20, 2))
+    # Raw irdai_monthly_data rows folded into this one
+    row_count = Column(Integer, nullable=False, default=0)
+
+
+class IRDAIMonthlyRollupPeriod(Base):
+    """Catalog of irdai_monthly_rollup periods (one row per period_key)"""
+    __tablename__ = "irdai_monthly_rollup_periods"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    period_key = Column(String(40), nullable=False, unique=True)
+    period_type = Column(String(10), nullable=False)
+    fy_key = Column(String(10), nullable=False, index=True)
+    q_key = Column(String(20), nullable=True)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+
+
 class Companies(Base):
     __tablename__ = "companies"
 
@@ -448,6 +556,10 @@ class CompanyMetrics(Base):
     Datachheck = Column(String(100), nullable=True)
     IsActive = Column(Boolean, default=True, nullable=False)
 
+    # Precomputed ordering for /unique-values (see helpers/sort_keys.py)
+    ProcessedFYYearSortKey = Column(Integer, nullable=True, index=True)
+    ReportedValueSortKey = Column(Float(precision=53), nullable=True, index=True)
+
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(),
                         onupdate=func.now())
@@ -456,7 +568,7 @@ class CompanyMetrics(Base):
 class ReportsL2Extracted(Base):
     __tablename__ = "reports_l2_extracted"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
 
     # Note: Foreign keys removed to avoid SQLAlchemy metadata resolution issues
     # with dynamically created models. Relationships are maintained at application level.
@@ -519,7 +631,7 @@ class DashboardChartConfig(Base):
 class ReportsL3Extracted(Base):
     __tablename__ = "reports_l3_extracted"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
 
     # Note: Foreign keys removed to avoid SQLAlchemy metadata resolution issues
     report_id = Column(BigInteger, nullable=False)
@@ -545,7 +657,7 @@ class ReportsL3Extracted(Base):
 class ReportsL1Extracted(Base):
     __tablename__ = "reports_l1_extracted"
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
 
     # Note: Foreign keys removed to avoid SQLAlchemy metadata resolution issues
     report_id = Column(BigInteger, nullable=False)
@@ -598,7 +710,7 @@ class MasterRow(Base):
     __tablename__ = "master_rows"
 
     master_row_id = Column(
-        BigInteger,
+        BigIntegerPK,
         primary_key=True,
         autoincrement=True
     )
@@ -628,7 +740,7 @@ class MasterRowL3(Base):
     __tablename__ = "master_rows_l3"
 
     master_row_id = Column(
-        BigInteger,
+        BigIntegerPK,
         primary_key=True,
         autoincrement=True
     )
@@ -657,7 +769,7 @@ class MasterRowL1(Base):
     __tablename__ = "master_rows_l1"
 
     master_row_id = Column(
-        BigInteger,
+        BigIntegerPK,
         primary_key=True,
         autoincrement=True
     )
@@ -712,7 +824,7 @@ class MasterMapping(Base):
     __tablename__ = "master_mapping"
 
     id = Column(
-        BigInteger,
+        BigIntegerPK,
         primary_key=True,
         autoincrement=True
     )
@@ -774,7 +886,7 @@ class MasterMappingL3(Base):
     __tablename__ = "master_mapping_l3"
 
     id = Column(
-        BigInteger,
+        BigIntegerPK,
         primary_key=True,
         autoincrement=True
     )
@@ -836,7 +948,7 @@ class MasterMappingL1(Base):
     __tablename__ = "master_mapping_l1"
 
     id = Column(
-        BigInteger,
+        BigIntegerPK,
         primary_key=True,
         autoincrement=True
     )
@@ -894,6 +1006,200 @@ class MasterMappingL1(Base):
     )
 
 
+# =================================================================
+# Dynamic extracted + master tables for the remaining L-forms
+# =================================================================
+# L-1, L-2 and L-3 have hand-written models above. Every other L-form gets
+# a reports_<key>_extracted table (L-2 style period columns) and its own
+# master_mapping_<key> / master_rows_<key> pair, so forms can be mapped
+# independently (and in parallel) without sharing cluster labels.
+
+class ExtractedRowsBase(Base):
+    __abstract__ = True
+
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+
+    report_id = Column(BigInteger, nullable=False)
+    company_id = Column(Integer, nullable=False)
+    row_index = Column(Integer)
+
+    particulars = Column(Text)
+    normalized_text = Column(String(512))
+
+    # Canonical master row id (master_rows_<key>.master_row_id)
+    master_row_id = Column(BigInteger)
+
+    schedule = Column(String(100))
+
+    for_current_period = Column(String(50))
+    upto_current_period = Column(String(50))
+    for_previous_period = Column(String(50))
+    upto_previous_period = Column(String(50))
+
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class MasterRowsBase(Base):
+    __abstract__ = True
+
+    master_row_id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    cluster_label = Column(Integer, unique=True, nullable=True)
+    master_name = Column(String(255), nullable=True)
+
+
+class MasterMappingBase(Base):
+    __abstract__ = True
+
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+    master_name = Column(String(255), nullable=False)
+    company_id = Column(Integer, nullable=False)
+    form_no = Column(String(20), nullable=False)
+    variant_text = Column(String(512), nullable=False)
+    normalized_text = Column(String(512), nullable=False)
+    cluster_label = Column(Integer, nullable=True)
+    similarity_score = Column(Float, nullable=True)
+    created_at = Column(DateTime, server_default=func.current_timestamp())
+    updated_at = Column(DateTime, server_default=func.current_timestamp())
+
+
+# Forms whose extracted/master models are defined explicitly above
+explicit_extracted_forms = {"l1", "l2", "l3"}
+
+MasterModels = {}
+
+for table in lform_tables:
+    if table in explicit_extracted_forms:
+        continue
+
+    class_key = table.upper()  # e.g., L6A, L25_I
+    ReportModels[f"reports_{table}_extracted"] = type(
+        f"Reports{class_key}Extracted",
+        (ExtractedRowsBase,),
+        {"__tablename__": f"reports_{table}_extracted"}
+    )
+    MasterModels[f"master_rows_{table}"] = type(
+        f"MasterRow{class_key}",
+        (MasterRowsBase,),
+        {"__tablename__": f"master_rows_{table}"}
+    )
+    MasterModels[f"master_mapping_{table}"] = type(
+        f"MasterMapping{class_key}",
+        (MasterMappingBase,),
+        {"__tablename__": f"master_mapping_{table}"}
+    )
+
+
+class MasterMappingWatermark(Base):
+    """Per-form high-water mark for incremental master mapping runs"""
+    __tablename__ = "master_mapping_watermarks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    form_no = Column(String(20), nullable=False, unique=True)
+
+    # Highest reports_l*_extracted.id already processed for this form
+    last_extracted_id = Column(BigInteger, nullable=False, default=0)
+
+    rows_processed = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp()
+    )
+
+
+class ReportRowCache(Base):
+    """
+    One row per data_rows entry of a reports_* table, filled at ingest.
+    Lets /api/lforms/data read a report's rows with an indexed range scan
+    instead of exploding the data_rows JSON on every request.
+    """
+    __tablename__ = "report_row_cache"
+    __table_args__ = (
+        UniqueConstraint("report_table", "report_id", "row_index",
+                         name="uq_report_row_cache_row"),
+    )
+
+    id = Column(BigIntegerPK, primary_key=True, autoincrement=True)
+
+    report_table = Column(String(100), nullable=False)
+    report_id = Column(BigInteger, nullable=False)
+    row_index = Column(Integer, nullable=False)
+
+    # The data_rows entry serialized as JSON text
+    row_json = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class PdfCatalog(Base):
+    """
+    One row per split PDF (pdf_splits/<company_slug>/<pdf_name>/).
+    Written at split time from metadata.json so /api/pdf-splitter listings
+    are indexed queries instead of directory walks; rebuilt from disk by
+    services.pdf_catalog.reconcile_catalog().
+    """
+    __tablename__ = "pdf_catalog"
+    __table_args__ = (
+        UniqueConstraint("company_slug", "pdf_name", name="uq_pdf_catalog_pdf"),
+        # Never reuse ids on SQLite either: services.pdf_catalog.catalog_generation relies on it
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    company_slug = Column(String(255), nullable=False)
+    company_name = Column(String(255))
+    pdf_name = Column(String(255), nullable=False)
+    original_filename = Column(String(500))
+    method = Column(String(50))
+    total_splits = Column(Integer, nullable=False, default=0)
+    splits_folder = Column(String(1000))
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class PdfSplitCatalog(Base):
+    """
+    One row per split file of a pdf_catalog PDF, in metadata.json order, with
+    the output of its latest extraction (extraction_source is gemini_verified,
+    corrected or extracted, NULL when never extracted).
+    """
+    __tablename__ = "pdf_split_catalog"
+    __table_args__ = (
+        UniqueConstraint("company_slug", "pdf_name", "split_filename",
+                         name="uq_pdf_split_catalog_split"),
+        # Never reuse ids on SQLite either: services.pdf_catalog.catalog_generation relies on it
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    company_slug = Column(String(255), nullable=False)
+    pdf_name = Column(String(255), nullable=False)
+    split_filename = Column(String(255), nullable=False)
+    split_order = Column(Integer, nullable=False, default=0)
+
+    split_path = Column(String(1000))
+    form_code = Column(String(100), index=True)
+    form_name = Column(String(500))
+    original_form_no = Column(String(500))
+    serial_no = Column(String(50))
+    start_page = Column(Integer)
+    end_page = Column(Integer)
+    # The metadata.json split_files entry, returned as-is by the listings
+    split_json = Column(Text, nullable=False)
+
+    extraction_source = Column(String(20))
+    extraction_path = Column(String(1000))
+    extraction_metadata_path = Column(String(1000))
+    extracted_at = Column(DateTime)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
 class MenuMaster(Base):
     __tablename__ = "menu_master"
 
@@ -1012,3 +1318,6 @@ class UserMaster(Base):
 
     def __repr__(self):
         return f"<UserMaster(UserID={self.UserID}, Email={self.UserLoginEmailName})>"
+
+
+register_sort_key_listeners(EconomyMaster, IndustryMaster, CompanyMetrics)
@@ -0,0 +1,69 @@
+"""
+Schema Migration
+Creates the tables of every model and adds columns create_all cannot add to
+existing tables (sort keys).
+
+Run once per deployment, before the workers start:
+
+    python scripts/migrate_schema.py
+
+main.py no longer does this on every worker boot; set
+DB_CREATE_SCHEMA_ON_STARTUP=1 to get the old behaviour (e.g. a throwaway
+SQLite database in development).
+"""
+from sqlalchemy.exc import OperationalError
+
+from databases.database import Base, engine as default_engine
+
+# MySQL 1684 (concurrent DDL) / 1050 (table exists): another process is
+# creating the same tables
+CONCURRENT_DDL_MARKERS = (
+    "1684",
+    "1050",
+    "concurrent ddl",
+    "was skipped since its definition is being modified",
+    "already exists",
+)
+
+
+def is_concurrent_ddl(error: Exception) -> bool:
+    error_str = str(error).lower()
+    return any(marker in error_str for marker in CONCURRENT_DDL_MARKERS)
+
+
+def ensure_schema(engine=None) -> bool:
+    """
+    Create missing tables and columns
+
+    Args:
+        engine: SQLAlchemy engine (defaults to the app engine)
+
+    Returns:
+        True if the schema is in place, False if another process was
+        creating it at the same time (it finishes the job)
+    """
+    engine = engine or default_engine
+
+    # Register every model on Base.metadata
+    import databases.models  # noqa: F401
+
+    try:
+        Base.metadata.create_all(bind=engine)
+    except (OperationalError, Exception) as e:
+        if not is_concurrent_ddl(e):
+            print(f"❌ Error creating tables: {e}")
+            raise
+        print(f"⚠️  Concurrent DDL operation detected (another process is migrating)")
+        print(f"   Error: {str(e)[:200]}...")
+        return False
+
+    # create_all does not add columns to existing tables
+    try:
+        from helpers.sort_keys import ensure_sort_key_columns
+        ensure_sort_key_columns(engine)
+    except Exception as e:
+        # Another process may be migrating; /unique-values falls back to Python sorting
+        print(f"⚠️  Sort key migration skipped: {e}")
+
+    print(f"✅ Schema ready: {len(Base.metadata.tables)} tables")
+    return True
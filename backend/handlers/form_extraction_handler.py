@@ -11,6 +11,7 @@ from services.template_resolver import TemplateResolver
 from services.extraction_orchestrator import ExtractionOrchestrator
 from services.database_storage_service import DatabaseStorageService
 from helpers.extraction_metadata import ExtractionMetadataHelper
+from services import pdf_catalog
 
 
 class FormExtractionHandler:
@@ -141,6 +142,9 @@ class FormExtractionHandler:
             self.metadata_helper.save_metadata(
                 metadata, extractions_dir, split_filename)
 
+            # Step 11: Point the split catalog at the new output
+            pdf_catalog.record_extraction(company_name, pdf_name, split_filename)
+
             print(f"\n{'='*80}")
             print(f"✅ FORM EXTRACTION COMPLETED SUCCESSFULLY")
             print(f"{'='*80}\n")
@@ -330,8 +334,9 @@ class FormExtractionHandler:
         """
         Auto-create master mappings for L-form data
 
-        This runs a lightweight, targeted version of the master mapping pipeline
-        specifically for the newly inserted data.
+        The newly inserted report_ids are queued for the background mapping
+        worker, which batches them per (form, company) into one targeted
+        mapping pass. Set MASTER_MAPPING_ASYNC=0 to map inline instead.
         """
         print(f"\n🗺️ Step 7: Creating master mappings...")
 
@@ -346,8 +351,6 @@ class FormExtractionHandler:
             return {'success': False, 'skipped': True, 'reason': 'storage_failed'}
 
         try:
-            from master_row_mapping_pipeline import MasterMappingPipeline
-
             # Get company_id and report_ids from storage result
             company_id = db_result.get('company_id')
             report_ids = db_result.get('report_ids', [])
@@ -360,48 +363,19 @@ class FormExtractionHandler:
             print(f"   Report IDs: {report_ids}")
             print(f"   Form Code: {form_code}")
 
-            # Initialize mapper (no config needed - uses existing database connection)
-            mapper = MasterMappingPipeline()
-
-            # Run targeted master mapping for these specific reports only
-            result = mapper.run_targeted_mapping(
-                company_id=company_id,
-                report_ids=report_ids,
-                form_code=form_code
+            from services.master_mapping_queue import (
+                mapping_queue, is_async_enabled, run_mapping_job
             )
 
-            if result['success']:
-                print(f"✅ Master mapping completed")
-                print(
-                    f"   Master rows created: {result.get('master_rows_created', 0)}")
-                print(f"   Rows mapped: {result.get('rows_mapped', 0)}")
-
-                # Auto-sync master_rows table
-                try:
-                    from services.master_rows_sync_service import MasterRowsSyncService
-
-                    print(f"\n🔄 Auto-syncing master_rows table...")
-                    sync_service = MasterRowsSyncService()
-                    sync_result = sync_service.sync_master_rows(
-                        form_no=form_code,
-                        company_id=company_id,
-                        verbose=False
-                    )
-
-                    if sync_result['success']:
-                        print(
-                            f"✅ Master rows synced: {sync_result['rows_synced']} clusters")
-                    else:
-                        print(
-                            f"⚠️ Master rows sync failed: {sync_result.get('error', 'Unknown')}")
-                except Exception as sync_error:
-                    print(f"⚠️ Master rows sync error: {sync_error}")
-                    # Don't fail if sync fails
-            else:
+            if is_async_enabled():
+                # Coalesced and run by the background mapping worker
+                result = mapping_queue.enqueue(form_code, company_id, report_ids)
                 print(
-                    f"⚠️ Master mapping failed: {result.get('error', 'Unknown error')}")
+                    f"📨 Master mapping queued (debounce {result['debounce_seconds']:.0f}s)")
+                return result
 
-            return result
+            # Run targeted master mapping for these specific reports only
+            return run_mapping_job(form_code, company_id, report_ids)
 
         except ImportError as e:
             print(f"⚠️ Master mapping pipeline not available: {e}")
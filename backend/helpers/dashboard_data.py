@@ -0,0 +1,151 @@
+"""
+Dashboard Data Helper
+Set-based lookup of the rows selected for a dashboard.
+
+The economy, industry and company-metrics dashboards store, per
+(data_type, description), the chosen master row ids as a JSON array in
+dashboard_selected_row_ids. A dashboard request returns, for each requested
+description, only the master rows whose id is in that description's
+selection (descriptions with no selection return nothing).
+
+This is done in one query that expands the JSON arrays in the database
+(JSON_TABLE on MySQL 8, json_each on SQLite) and joins the master table on
+its primary key. If the database cannot expand JSON, the selections are
+read in one query and matched against the master rows with an id IN (...)
+lookup and Python sets.
+"""
+import json
+import os
+from typing import Dict, List, Sequence, Set
+
+from sqlalchemy import bindparam, text
+
+from helpers.sort_keys import select_columns
+
+
+def _expanded_selection_sql(db_type: str) -> str:
+    """(description, rid) pairs from dashboard_selected_row_ids"""
+    if db_type == "mysql":
+        return """
+            SELECT DISTINCT s.description, j.rid
+            FROM dashboard_selected_row_ids s,
+                 JSON_TABLE(s.row_ids, '$[*]' COLUMNS (rid BIGINT PATH '$')) j
+            WHERE s.data_type IN :data_types
+              AND s.description IN :descriptions
+              AND j.rid IS NOT NULL
+        """
+    return """
+        SELECT DISTINCT s.description, CAST(j.value AS INTEGER) AS rid
+        FROM dashboard_selected_row_ids s, json_each(s.row_ids) j
+        WHERE s.data_type IN :data_types
+          AND s.description IN :descriptions
+          AND j.value IS NOT NULL
+    """
+
+
+def _load_selections(db, descriptions: Sequence[str], data_types: Sequence[str]) -> Dict[str, Set[int]]:
+    """{description: {row ids}} for all requested descriptions in one query"""
+    query = text("""
+        SELECT description, row_ids FROM dashboard_selected_row_ids
+        WHERE data_type IN :data_types AND description IN :descriptions
+    """).bindparams(
+        bindparam("data_types", expanding=True),
+        bindparam("descriptions", expanding=True),
+    )
+
+    selections: Dict[str, Set[int]] = {}
+    for description, raw in db.execute(query, {
+        "data_types": list(data_types), "descriptions": list(descriptions)
+    }):
+        row_ids = raw if isinstance(raw, list) else json.loads(raw or "[]")
+        selections.setdefault(description, set()).update(
+            int(rid) for rid in row_ids if rid is not None)
+    return selections
+
+
+def fetch_selected_dashboard_rows(
+    db,
+    table: str,
+    descriptions: Sequence[str],
+    data_types: Sequence[str],
+    order_by: str,
+    active_filter: str = "m.IsActive = 1",
+    label: str = "Dashboard"
+) -> List[Dict]:
+    """
+    Rows of `table` selected for the given descriptions
+
+    Args:
+        db: Database session
+        table: Master table (economy_master, industry_master, company_metrics)
+        descriptions: Descriptions requested by the dashboard
+        data_types: dashboard_selected_row_ids.data_type values to read
+        order_by: ORDER BY clause over alias `m`
+        active_filter: Extra condition on `m` for active rows
+        label: Prefix for the summary log line
+
+    Returns:
+        List of row dicts (the columns of `table` except its sort keys),
+        ordered by `order_by`
+    """
+    descriptions = [d for d in dict.fromkeys(descriptions) if d is not None]
+    if not descriptions:
+        return []
+
+    db_type = os.getenv("DB_TYPE", "sqlite")
+    select_list = select_columns(table, "m")
+    params = {"data_types": list(data_types), "descriptions": descriptions}
+
+    try:
+        query = text(f"""
+            SELECT {select_list}
+            FROM ({_expanded_selection_sql(db_type)}) sel
+            JOIN {table} m
+              ON m.id = sel.rid
+             AND m.Description = sel.description
+            WHERE {active_filter}
+            ORDER BY {order_by}
+        """).bindparams(
+            bindparam("data_types", expanding=True),
+            bindparam("descriptions", expanding=True),
+        )
+        result = db.execute(query, params)
+        columns = list(result.keys())
+        rows = [dict(zip(columns, row)) for row in result.fetchall()]
+
+    except Exception as e:
+        # JSON expansion unsupported (e.g. MySQL < 8) or selections table missing
+        db.rollback()
+        print(f"⚠️ {label}: JSON join unavailable ({e}); using id lookup")
+        try:
+            selections = _load_selections(db, descriptions, data_types)
+        except Exception as load_error:
+            db.rollback()
+            print(f"Error fetching selected row IDs: {load_error}")
+            return []
+
+        all_ids = sorted(set().union(*selections.values())) if selections else []
+        if not all_ids:
+            rows = []
+        else:
+            query = text(f"""
+                SELECT {select_list}
+                FROM {table} m
+                WHERE m.id IN :ids
+                  AND m.Description IN :descriptions
+                  AND {active_filter}
+                ORDER BY {order_by}
+            """).bindparams(
+                bindparam("ids", expanding=True),
+                bindparam("descriptions", expanding=True),
+            )
+            result = db.execute(query, {"ids": all_ids, "descriptions": descriptions})
+            columns = list(result.keys())
+            rows = [
+                dict(zip(columns, row)) for row in result.fetchall()
+                if int(row[columns.index("id")]) in selections.get(
+                    row[columns.index("Description")], ())
+            ]
+
+    print(f"📊 {label}: {len(rows)} selected row(s) for {len(descriptions)} description(s)")
+    return rows
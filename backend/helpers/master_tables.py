@@ -0,0 +1,147 @@
+"""
+Master Table Migration
+Moves master mappings out of the shared master_mapping / master_rows tables
+for forms that now have their own pair (see services/lform_table_registry).
+
+Before the registry only the exact form numbers "L-1" and "L-3" had their
+own tables; every other form (L-1-A-RA, L-3-A, ...) was mapped into the
+shared tables, and its reports_<key>_extracted rows point at shared
+master_rows ids. For each such form this copies its mapping rows and the
+master rows they use into the form's tables and repoints master_row_id.
+
+Cluster labels are only unique within one master_rows table, so copied
+clusters get new labels above the target table's highest label, unless a
+master of the same name is already there (then that row is used). A form is
+migrated once: it is skipped when its new mapping table already has rows
+for it (already migrated, or mapped after the switch). The shared rows are
+left in place.
+"""
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+
+SHARED_TABLES = ("master_mapping", "master_rows")
+
+
+def _columns(engine, table: str) -> List[str]:
+    return [c["name"] for c in inspect(engine).get_columns(table)]
+
+
+def _migrate_form(conn, form_no: str, tables, mapping_columns: List[str],
+                  master_row_columns: List[str]) -> Dict:
+    mapping_table, master_rows_table = tables.mapping_table, tables.master_rows_table
+
+    if conn.execute(text(f"SELECT 1 FROM {mapping_table} WHERE form_no = :f LIMIT 1"),
+                    {"f": form_no}).fetchone():
+        return {"skipped": True}
+
+    mappings = conn.execute(text(f"""
+        SELECT {', '.join(mapping_columns)}
+        FROM master_mapping
+        WHERE form_no = :f
+    """), {"f": form_no}).mappings().all()
+    labels = sorted({m["cluster_label"] for m in mappings if m["cluster_label"] is not None})
+
+    offset = 1 + max(
+        conn.execute(text(f"SELECT COALESCE(MAX(cluster_label), -1) FROM {master_rows_table}")).scalar(),
+        conn.execute(text(f"SELECT COALESCE(MAX(cluster_label), -1) FROM {mapping_table}")).scalar(),
+    )
+    new_labels = {label: offset + i for i, label in enumerate(labels)}
+
+    # master_rows_l1 has a required display_order without a server default
+    extra = ", display_order" if "display_order" in master_row_columns else ""
+    insert_row_sql = text(f"""
+        INSERT INTO {master_rows_table} (cluster_label, master_name{extra})
+        VALUES (:l, :n{', 0' if extra else ''})
+    """)
+
+    new_ids = {}
+    for label in list(new_labels):
+        old = conn.execute(text(
+            "SELECT master_row_id, master_name FROM master_rows WHERE cluster_label = :l"),
+            {"l": label}).fetchone()
+        name = old[1] if old else next(
+            (m["master_name"] for m in mappings if m["cluster_label"] == label), None)
+
+        # A master of the same name already in the form's table is the same row
+        # (and master_rows_l1 names are unique)
+        existing = conn.execute(text(
+            f"SELECT master_row_id, cluster_label FROM {master_rows_table} WHERE master_name = :n LIMIT 1"),
+            {"n": name}).fetchone() if name is not None else None
+        if existing and existing[1] is not None:
+            new_id, new_labels[label] = existing[0], existing[1]
+        else:
+            conn.execute(insert_row_sql, {"l": new_labels[label], "n": name})
+            new_id = conn.execute(text(
+                f"SELECT master_row_id FROM {master_rows_table} WHERE cluster_label = :l"),
+                {"l": new_labels[label]}).scalar()
+        if old is not None:
+            new_ids[old[0]] = new_id
+
+    # Ids of the two tables overlap, so pick the rows first and update by row id
+    rows = conn.execute(text(f"""
+        SELECT e.id, e.master_row_id
+        FROM {tables.extracted_table} e
+        JOIN {tables.reports_table} r ON r.id = e.report_id
+        WHERE r.form_no = :f AND e.master_row_id IS NOT NULL
+    """), {"f": form_no}).fetchall()
+    updates = [{"id": row_id, "m": new_ids[old_id]} for row_id, old_id in rows if old_id in new_ids]
+    if updates:
+        conn.execute(text(
+            f"UPDATE {tables.extracted_table} SET master_row_id = :m WHERE id = :id"), updates)
+
+    insert_columns = [c for c in mapping_columns if c != "id"]
+    insert_sql = text(f"""
+        INSERT INTO {mapping_table} ({', '.join(insert_columns)})
+        VALUES ({', '.join(':' + c for c in insert_columns)})
+    """)
+    for mapping in mappings:
+        row = {c: mapping[c] for c in insert_columns}
+        row["cluster_label"] = new_labels.get(mapping["cluster_label"])
+        conn.execute(insert_sql, row)
+
+    return {"mappings": len(mappings), "clusters": len(labels), "rows_repointed": len(updates)}
+
+
+def migrate_shared_masters(engine) -> Dict[str, Dict]:
+    """
+    Copy each form's masters from the shared tables into its own tables
+
+    Args:
+        engine: SQLAlchemy engine (tables must exist, see ensure_schema)
+
+    Returns:
+        {form_no: {'mappings', 'clusters', 'rows_repointed'} or {'skipped': True}}
+    """
+    from services.lform_table_registry import resolve_form_tables
+
+    table_names = set(inspect(engine).get_table_names())
+    if "master_mapping" not in table_names:
+        return {}
+
+    with engine.connect() as conn:
+        form_nos = [r[0] for r in conn.execute(text(
+            "SELECT DISTINCT form_no FROM master_mapping WHERE form_no IS NOT NULL"))]
+
+    results = {}
+    for form_no in form_nos:
+        tables = resolve_form_tables(form_no)
+        if tables is None or (tables.mapping_table, tables.master_rows_table) == SHARED_TABLES:
+            continue
+        if tables.mapping_table not in table_names:
+            continue
+
+        # Copy the columns both mapping tables have (they share one model layout)
+        target_columns = set(_columns(engine, tables.mapping_table))
+        mapping_columns = [c for c in _columns(engine, "master_mapping") if c in target_columns]
+
+        with engine.begin() as conn:
+            results[form_no] = _migrate_form(
+                conn, form_no, tables, mapping_columns,
+                _columns(engine, tables.master_rows_table))
+
+        result = results[form_no]
+        if not result.get("skipped"):
+            print(f"🔀 {form_no}: {result['mappings']} mappings, {result['clusters']} clusters "
+                  f"-> {tables.mapping_table} ({result['rows_repointed']} rows repointed)")
+    return results
@@ -0,0 +1,245 @@
+"""
+Sort Key Helper
+Precomputed, indexed sort keys for the economy_master, industry_master and
+company_metrics value columns.
+
+ProcessedFYYear and ReportedValue are stored as text ("FY2024", "12.5"), so
+ordering them used to mean fetching every DISTINCT value and re-sorting in
+Python on each /unique-values call. Each row now also carries
+
+    ProcessedFYYearSortKey   INT     "FY2024" -> 2024, unparseable -> 0
+    ReportedValueSortKey     DOUBLE  "12.5"   -> 12.5, non-numeric -> NULL
+
+computed on write (ORM listeners for EconomyMaster / IndustryMaster, explicit
+params in the company_metrics raw SQL writers), so the ordering and LIMIT /
+OFFSET paging happen in SQL.
+
+ensure_sort_key_columns() adds the columns to databases created before they
+existed and backfills rows that were never keyed. The keys are not part of
+the API rows: queries that return whole rows list their columns with
+select_columns() instead of SELECT *.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, inspect, text
+
+SORT_KEY_COLUMNS = {
+    "ProcessedFYYear": "ProcessedFYYearSortKey",
+    "ReportedValue": "ReportedValueSortKey",
+}
+
+SORT_KEY_TABLES = ["economy_master", "industry_master", "company_metrics"]
+
+_BACKFILL_BATCH = 1000
+
+
+def fy_sort_key(value: Any) -> int:
+    """'FY2024' / '2024' -> 2024, anything else -> 0"""
+    if value is None:
+        return 0
+    val_str = str(value).upper().strip()
+    if val_str.startswith("FY"):
+        val_str = val_str[2:]
+    try:
+        return int(val_str)
+    except ValueError:
+        return 0
+
+
+def numeric_sort_key(value: Any) -> Optional[float]:
+    """'12.5' -> 12.5, non-numeric -> None (sorted last)"""
+    if value is None:
+        return None
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        return None
+    # NaN / inf are not storable in MySQL DOUBLE
+    return number if number == number and abs(number) != float("inf") else None
+
+
+def sort_key_values(processed_fy_year: Any, reported_value: Any) -> Dict[str, Any]:
+    """Sort key column values for one row"""
+    return {
+        "ProcessedFYYearSortKey": fy_sort_key(processed_fy_year),
+        "ReportedValueSortKey": numeric_sort_key(reported_value),
+    }
+
+
+def _set_sort_keys(mapper, connection, target):
+    for column, value in sort_key_values(target.ProcessedFYYear, target.ReportedValue).items():
+        setattr(target, column, value)
+
+
+def register_sort_key_listeners(*models):
+    """Keep the sort keys of ORM-written rows in step with their values"""
+    for model in models:
+        event.listen(model, "before_insert", _set_sort_keys)
+        event.listen(model, "before_update", _set_sort_keys)
+
+
+@lru_cache(maxsize=None)
+def select_columns(table: str, alias: str = "") -> str:
+    """
+    SELECT list of a sort-keyed table's columns, without the sort keys
+
+    Args:
+        table: economy_master, industry_master or company_metrics
+        alias: Table alias to qualify the columns with (e.g. "m")
+
+    Returns:
+        Comma-separated column list in model order
+    """
+    import databases.models  # noqa: F401  (registers the tables)
+    from databases.database import Base
+
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(
+        f"{prefix}{column.name}" for column in Base.metadata.tables[table].columns
+        if column.name not in SORT_KEY_COLUMNS.values()
+    )
+
+
+def ensure_sort_key_columns(engine, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Add missing sort key columns / indexes and backfill unkeyed rows
+
+    Args:
+        engine: SQLAlchemy engine
+        tables: Tables to migrate (default SORT_KEY_TABLES)
+
+    Returns:
+        {table: rows backfilled}
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    column_types = {"ProcessedFYYearSortKey": "INTEGER", "ReportedValueSortKey": "DOUBLE"}
+    if engine.dialect.name == "sqlite":
+        column_types["ReportedValueSortKey"] = "REAL"
+
+    backfilled = {}
+    for table in tables or SORT_KEY_TABLES:
+        if table not in existing_tables:
+            continue
+
+        columns = {c["name"] for c in inspector.get_columns(table)}
+        indexes = {i["name"] for i in inspector.get_indexes(table)}
+        with engine.begin() as conn:
+            for column, column_type in column_types.items():
+                if column not in columns:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type} NULL"))
+                    print(f"🔧 Added {table}.{column}")
+                index_name = f"ix_{table}_{column}"
+                if index_name not in indexes:
+                    conn.execute(text(f"CREATE INDEX {index_name} ON {table} ({column})"))
+
+        # Writers always set both keys, so a NULL FY key marks an unkeyed row
+        total = 0
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(text(f"""
+                    SELECT id, ProcessedFYYear, ReportedValue FROM {table}
+                    WHERE ProcessedFYYearSortKey IS NULL
+                    LIMIT {_BACKFILL_BATCH}
+                """)).fetchall()
+                if not rows:
+                    break
+                conn.execute(text(f"""
+                    UPDATE {table}
+                    SET ProcessedFYYearSortKey = :ProcessedFYYearSortKey,
+                        ReportedValueSortKey = :ReportedValueSortKey
+                    WHERE id = :id
+                """), [{"id": r[0], **sort_key_values(r[1], r[2])} for r in rows])
+                total += len(rows)
+
+        if total:
+            print(f"🔢 Backfilled sort keys for {total} {table} row(s)")
+        backfilled[table] = total
+
+    return backfilled
+
+
+def _python_sorted(values: List[str], field: str) -> List[str]:
+    """Pre-sort-key ordering, used when the sort key columns are unavailable"""
+    if field == "ProcessedFYYear":
+        return sorted(values, key=fy_sort_key, reverse=True)
+    if field == "ReportedValue":
+        return sorted(values, key=lambda v: (numeric_sort_key(v) is not None,
+                                             numeric_sort_key(v) or 0), reverse=True)
+    return sorted(values)
+
+
+def fetch_unique_values(
+    db,
+    table: str,
+    column: str,
+    where: str,
+    params: Dict[str, Any],
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> List[str]:
+    """
+    DISTINCT non-empty values of `column`, ordered for dropdowns
+
+    ProcessedFYYear and ReportedValue come back newest / highest first by
+    their sort key, everything else A-Z.
+
+    Args:
+        db: Database session
+        table: economy_master, industry_master or company_metrics
+        column: Column to list
+        where: Extra WHERE conditions (without the leading WHERE)
+        params: Bind params for `where`
+        limit: Page size (None returns all values)
+        offset: Page start
+
+    Returns:
+        List of values as strings
+    """
+    sort_column = SORT_KEY_COLUMNS.get(column)
+    if sort_column:
+        # MAX() keeps GROUP BY valid under ONLY_FULL_GROUP_BY; the key is a
+        # function of the value, so it is the same for every row in a group
+        order_by = f"MAX({sort_column}) IS NULL, MAX({sort_column}) DESC, {column}"
+    else:
+        order_by = column
+
+    page = ""
+    page_params = dict(params)
+    if limit is not None:
+        page = "LIMIT :limit OFFSET :offset"
+        page_params.update({"limit": int(limit), "offset": int(offset or 0)})
+    elif offset:
+        # LIMIT is required before OFFSET on both backends
+        page = "LIMIT :limit OFFSET :offset"
+        page_params.update({"limit": 2 ** 62, "offset": int(offset)})
+
+    try:
+        result = db.execute(text(f"""
+            SELECT {column}
+            FROM {table}
+            WHERE {where}
+            AND {column} <> ''
+            AND {column} IS NOT NULL
+            GROUP BY {column}
+            ORDER BY {order_by}
+            {page}
+        """), page_params)
+        return [str(row[0]) for row in result if row[0] is not None]
+    except Exception as e:
+        if not sort_column:
+            raise
+        # Sort key columns not migrated yet: previous Python ordering
+        db.rollback()
+        print(f"⚠️ {table}.{sort_column} unavailable, sorting in Python: {getattr(e, 'orig', e)}")
+        result = db.execute(text(f"""
+            SELECT DISTINCT {column}
+            FROM {table}
+            WHERE {where}
+            AND {column} <> ''
+            AND {column} IS NOT NULL
+        """), params).fetchall()
+        values = _python_sorted([str(row[0]) for row in result if row[0] is not None], column)
+        end = None if limit is None else (offset or 0) + int(limit)
+        return values[offset or 0:end]
@@ -1,10 +1,11 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import OperationalError
+from sqlalchemy import text
 from routes.pdf_splitter import router as pdf_splitter_router
-# from routes.peers import router as peers_router
+from routes.peers import router as peers_router
 from routes.economy import router as economy_router
 from routes.indusrty import router as indusrty_router
 from routes.periods import router as periods_router
@@ -15,17 +16,13 @@ from routes.menu import router as menu_router
 from routes.user import router as user_router
 from routes.auth import router as auth_router
 from routes.admin import router as admin_router
-from databases.database import Base, engine, get_db
-# Import models to ensure tables are created
-from databases.models import (
-    Company, EconomyMaster,
-    DashboardSelectedDescriptions, User, IndustryMaster
-)
+from databases.database import engine, async_engine, get_db, pool_status
 
 
 from routes import company
 import logging
 import os
+import time
 
 # Reduce logging to prevent disk space issues
 logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
@@ -73,31 +70,11 @@ app.add_middleware(
 )
 
 
-# Create tables with error handling for concurrent DDL operations
-# This is needed when using multiple workers (e.g., hypercorn with --workers)
-try:
-    Base.metadata.create_all(bind=engine)
-except (OperationalError, Exception) as e:
-    # Handle MySQL concurrent DDL error (1684) when multiple workers try to create tables
-    error_str = str(e)
-    # Check for MySQL error 1684 (concurrent DDL) or 1050 (Structure exists)
-    is_concurrent_ddl = (
-        "1684" in error_str or
-        "1050" in error_str or
-        "concurrent DDL" in error_str.lower() or
-        "was skipped since its definition is being modified" in error_str or
-        "already exists" in error_str
-    )
-    if is_concurrent_ddl:
-        # This is expected when multiple workers start simultaneously
-        # The first worker will create the tables, others will see this error
-        print(f"⚠️  Concurrent DDL operation detected (normal with multiple workers)")
-        print(f"   Error: {error_str[:200]}...")
-        print("   Tables will be created by the first worker that succeeds.")
-    else:
-        # Re-raise other errors as they might be important
-        print(f"❌ Error creating tables: {e}")
-        raise
+# DDL is a one-time migration step (scripts/migrate_schema.py), not part of
+# every worker's boot; the flag keeps the old behaviour for dev databases
+if os.getenv("DB_CREATE_SCHEMA_ON_STARTUP", "0") == "1":
+    from databases.schema import ensure_schema
+    ensure_schema(engine)
 
 # Initialize database with default companies
 
@@ -107,13 +84,26 @@ async def startup_event():
     """Initialize database on startup"""
     try:
         print("⚠️ Database initialization skipped - init_db module not available")
+
+        # Map rows whose queued jobs were lost with the previous worker
+        from services.master_mapping_queue import (
+            mapping_queue, is_async_enabled, is_catch_up_enabled
+        )
+        if is_async_enabled():
+            mapping_queue.start(catch_up=is_catch_up_enabled())
     except Exception as e:
         print(f"⚠️ Startup event failed: {e}")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the async pool's connections (aiosqlite runs each on a thread)"""
+    await async_engine.dispose()
+
 # Include routers
 app.include_router(pdf_splitter_router,
                    prefix="/api/pdf-splitter", tags=["pdf_splitter"])
-# app.include_router(peers_router, prefix="/api", tags=["peers"])
+app.include_router(peers_router, prefix="/api", tags=["peers"])
 app.include_router(company.router, prefix="/api")
 app.include_router(economy_router, prefix="/api/economy", tags=["Economy"])
 app.include_router(indusrty_router, prefix="/api/industry", tags=["Industry"])
@@ -201,10 +191,26 @@ def health_check():
 @app.get("/db-status")
 def db_status():
     """Database status endpoint for frontend health checks"""
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(status_code=503, content={
+            "status": "disconnected",
+            "database": engine.url.get_backend_name(),
+            "message": f"Database unavailable: {e}",
+            "pool": pool_status(),
+            "async_pool": pool_status(async_engine),
+        })
+
     return {
         "status": "connected",
-        "database": "operational",
-        "message": "Database is healthy"
+        "database": engine.url.get_backend_name(),
+        "message": "Database is healthy",
+        "ping_ms": round((time.perf_counter() - start) * 1000, 2),
+        "pool": pool_status(),
+        "async_pool": pool_status(async_engine),
     }
 
 
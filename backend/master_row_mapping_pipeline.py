@@ -22,14 +22,19 @@ from sklearn.cluster import AgglomerativeClustering, DBSCAN
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 import pymysql
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 import re
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
+import os
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from services.lform_table_registry import (
+    LFormTables, all_lform_tables, get_lform_tables, normalize_lform_key,
+    resolve_form_tables, resolve_master_tables
+)
 warnings.filterwarnings('ignore')
 
 # Database
@@ -68,6 +73,8 @@ class Config:
     CLUSTERING_METHOD = "agglomerative"  # or "dbscan"
     SIMILARITY_THRESHOLD = 0.75  # For Agglomerative clustering
     MIN_SIMILARITY_SCORE = 0.60  # Minimum fuzzy match score to accept
+    # Reuse an existing master cluster when fuzzy match >= this (0-1 scale)
+    REUSE_SIMILARITY_THRESHOLD = 0.85
 
     # Agglomerative Clustering params
     AGGLOM_DISTANCE_THRESHOLD = 0.5  # Lower = tighter clusters
@@ -77,6 +84,11 @@ class Config:
     DBSCAN_EPS = 0.3
     DBSCAN_MIN_SAMPLES = 2
 
+    # Loading: rows per server-side cursor fetch, and the report-id count
+    # above which IN (...) lists are replaced by a temporary id table
+    READ_CHUNK_SIZE = 20000
+    IN_LIST_MAX_IDS = 500
+
 
 # ============================================================================
 # TEXT NORMALIZATION
@@ -294,15 +306,95 @@ class RowClusterer:
 # DATABASE OPERATIONS
 # ============================================================================
 
+# Columns the pipeline needs from reports_l*_extracted
+EXTRACTED_COLUMNS = ['id', 'report_id', 'company_id',
+                     'particulars', 'normalized_text', 'row_index']
+
 class DatabaseManager:
     """Handles all database operations"""
 
     def __init__(self):
         """Initialize database connection using existing database config"""
         # Import the existing database configuration
-        from databases.database import engine as db_engine
+        from databases.database import engine as db_engine, SessionLocal
         self.engine = db_engine
-        self.Session = sessionmaker(bind=self.engine)
+        self.Session = SessionLocal
+
+    # Compact dtypes for the frames the pipeline keeps in memory
+    DTYPE_HINTS = {
+        'id': 'int64',
+        'report_id': 'int64',
+        'row_index': 'int32',
+        'cluster_label': 'int32',
+    }
+    CATEGORY_COLUMNS = ('company_id',)
+
+    @classmethod
+    def _apply_dtype_hints(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast a loaded chunk (nullable columns fall back to pandas' Int types)."""
+        for column, dtype in cls.DTYPE_HINTS.items():
+            if column not in df.columns:
+                continue
+            if df[column].isna().any():
+                dtype = dtype.capitalize()  # int32 -> Int32 (nullable)
+            df[column] = df[column].astype(dtype)
+        return df
+
+    def iter_sql_chunks(
+        self,
+        query,
+        params: Optional[Dict] = None,
+        chunksize: Optional[int] = None,
+        conn=None
+    ):
+        """
+        Yield compact DataFrame chunks read through a server-side cursor
+
+        Each chunk is downcast as it arrives. The pipeline's loaders all go
+        through read_sql_chunked, which keeps every chunk: clustering and
+        master assignment work over a whole form, so no caller processes
+        chunks independently and memory grows with the result.
+        """
+        chunksize = chunksize or Config.READ_CHUNK_SIZE
+
+        def _read(connection):
+            streaming = connection.execution_options(stream_results=True)
+            for chunk in pd.read_sql(query, streaming, params=params or {}, chunksize=chunksize):
+                yield self._apply_dtype_hints(chunk)
+
+        if conn is not None:
+            yield from _read(conn)
+            return
+
+        with self.engine.connect() as connection:
+            yield from _read(connection)
+
+    def read_sql_chunked(
+        self,
+        query,
+        params: Optional[Dict] = None,
+        columns: Optional[List[str]] = None,
+        conn=None
+    ) -> pd.DataFrame:
+        """
+        Stream a query in chunks and return one compact DataFrame
+
+        Every caller clusters / updates over the whole result, so the full
+        frame is materialized (briefly twice while the chunks are
+        concatenated). Memory is not bounded by the chunk size; what the
+        chunking avoids is the driver buffering the whole result set as
+        Python tuples and the uncompacted int64/object frame.
+        """
+        chunks = list(self.iter_sql_chunks(query, params, conn=conn))
+        if not chunks:
+            return pd.DataFrame(columns=columns or [])
+
+        df = pd.concat(chunks, ignore_index=True) if len(
+            chunks) > 1 else chunks[0]
+        for column in self.CATEGORY_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        return df
 
     def get_existing_masters(self, form_no: Optional[str] = None) -> pd.DataFrame:
         """
@@ -314,45 +406,47 @@ class DatabaseManager:
         Returns:
             DataFrame with columns: master_row_id, cluster_label, master_name, normalized_text
         """
+        # One row per cluster is produced server-side (GROUP BY) instead of a
+        # DISTINCT over the whole master x variant join + client-side dedupe
+        columns = ['master_row_id', 'cluster_label',
+                   'master_name', 'normalized_text']
         if form_no:
-            # Get masters only for this form
-            query = text("""
-                SELECT DISTINCT
+            # Get masters only for this form (from its own master tables)
+            master_mapping_table, master_rows_table = self._resolve_master_tables(
+                form_no)
+            query = text(f"""
+                SELECT
                     mr.master_row_id,
                     mr.cluster_label,
                     mr.master_name,
-                    mm.normalized_text
-                FROM master_rows mr
-                LEFT JOIN master_mapping mm ON mr.cluster_label = mm.cluster_label
+                    MIN(mm.normalized_text) AS normalized_text
+                FROM {master_rows_table} mr
+                JOIN {master_mapping_table} mm ON mr.cluster_label = mm.cluster_label
                 WHERE mm.form_no = :form_no
-                ORDER BY mr.cluster_label
+                GROUP BY mr.master_row_id, mr.cluster_label, mr.master_name
             """)
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params={"form_no": form_no})
+            df = self.read_sql_chunked(
+                query, {"form_no": form_no}, columns=columns)
         else:
             # Get all masters
             query = text("""
-                SELECT DISTINCT
+                SELECT
                     mr.master_row_id,
                     mr.cluster_label,
                     mr.master_name,
-                    mm.normalized_text
+                    MIN(mm.normalized_text) AS normalized_text
                 FROM master_rows mr
                 LEFT JOIN master_mapping mm ON mr.cluster_label = mm.cluster_label
-                ORDER BY mr.cluster_label
+                GROUP BY mr.master_row_id, mr.cluster_label, mr.master_name
             """)
-            with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn)
-
-        # Drop duplicates and keep first
-        df = df.drop_duplicates(subset=['cluster_label'], keep='first')
+            df = self.read_sql_chunked(query, columns=columns)
 
         print(f"  📚 Loaded {len(df)} existing master rows")
         return df
 
     def get_extracted_rows(self, form_no: str) -> pd.DataFrame:
         """
-        Fetch all distinct rows from reports_l2_extracted for a form
+        Fetch all distinct rows from the form's reports_l*_extracted table
 
         Args:
             form_no: L-form number (e.g., 'L-2-A')
@@ -360,30 +454,151 @@ class DatabaseManager:
         Returns:
             DataFrame with columns: id, report_id, company_id, particulars, normalized_text, row_index
         """
-        query = text("""
-            SELECT DISTINCT
+        tables = resolve_form_tables(form_no)
+        if tables is None:
+            print(f"  ⚠️ No extracted table registered for form {form_no}")
+            return pd.DataFrame()
+
+        # e.id is the primary key, so DISTINCT was a no-op; ordering is done
+        # by the callers that need it (sort_values on the compact frame)
+        query = text(f"""
+            SELECT
                 e.id,
                 e.report_id,
                 e.company_id,
                 e.particulars,
                 e.normalized_text,
-                e.master_row_id,
-                e.row_index,
-                r.form_no
-            FROM reports_l2_extracted e
-            JOIN reports_l2 r ON e.report_id = r.id
+                e.row_index
+            FROM {tables.extracted_table} e
+            JOIN {tables.reports_table} r ON e.report_id = r.id
             WHERE r.form_no = :form_no
                 AND e.particulars IS NOT NULL
                 AND e.particulars != ''
-            ORDER BY e.company_id, e.row_index
         """)
 
-        with self.engine.connect() as conn:
-            df = pd.read_sql(query, conn, params={"form_no": form_no})
+        df = self.read_sql_chunked(
+            query, {"form_no": form_no}, columns=EXTRACTED_COLUMNS)
 
         print(f"  📊 Loaded {len(df)} rows for form {form_no}")
         return df
 
+    def get_unmapped_rows(
+        self,
+        form_no: str,
+        table_key: str = "l2",
+        watermark: int = 0
+    ) -> pd.DataFrame:
+        """
+        Fetch only rows that still need mapping for a form
+
+        A row qualifies when it is newer than the watermark (e.id > watermark)
+        or has never been assigned a master (master_row_id IS NULL).
+
+        Args:
+            form_no: L-form number (e.g., 'L-2-A')
+            table_key: Normalized table key (e.g., 'l2', 'l6a')
+            watermark: Highest extracted row id processed by the last run
+
+        Returns:
+            DataFrame with columns: id, report_id, company_id, particulars, normalized_text, row_index
+        """
+        extracted_table = f"reports_{table_key}_extracted"
+        reports_table = f"reports_{table_key}"
+
+        query = text(f"""
+            SELECT
+                e.id,
+                e.report_id,
+                e.company_id,
+                e.particulars,
+                e.normalized_text,
+                e.row_index
+            FROM {extracted_table} e
+            JOIN {reports_table} r ON e.report_id = r.id
+            WHERE r.form_no = :form_no
+                AND (e.master_row_id IS NULL OR e.id > :watermark)
+                AND e.particulars IS NOT NULL
+                AND e.particulars != ''
+        """)
+
+        df = self.read_sql_chunked(query, {
+            "form_no": form_no, "watermark": int(watermark or 0)}, columns=EXTRACTED_COLUMNS)
+
+        print(
+            f"  📊 Loaded {len(df)} new/unmapped rows for form {form_no} (watermark: {watermark})")
+        return df
+
+    def _ensure_watermark_table(self):
+        """Create master_mapping_watermarks if it does not exist yet."""
+        from databases.models import MasterMappingWatermark
+        MasterMappingWatermark.__table__.create(
+            bind=self.engine, checkfirst=True)
+
+    def get_watermark(self, form_no: str) -> int:
+        """Return the last processed extracted row id for a form (0 if never run)."""
+        self._ensure_watermark_table()
+
+        query = text("""
+            SELECT last_extracted_id
+            FROM master_mapping_watermarks
+            WHERE form_no = :form_no
+            LIMIT 1
+        """)
+
+        with self.engine.connect() as conn:
+            value = conn.execute(query, {"form_no": form_no}).scalar()
+
+        return int(value or 0)
+
+    def set_watermark(self, form_no: str, last_extracted_id: int, rows_processed: int = 0):
+        """Advance the watermark for a form (manual upsert keyed on form_no)."""
+        self._ensure_watermark_table()
+
+        select_sql = text(
+            "SELECT id FROM master_mapping_watermarks WHERE form_no = :form_no LIMIT 1")
+        insert_sql = text("""
+            INSERT INTO master_mapping_watermarks (
+                form_no, last_extracted_id, rows_processed, updated_at
+            ) VALUES (
+                :form_no, :last_extracted_id, :rows_processed, CURRENT_TIMESTAMP
+            )
+        """)
+        update_sql = text("""
+            UPDATE master_mapping_watermarks
+            SET
+                last_extracted_id = :last_extracted_id,
+                rows_processed = :rows_processed,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = :id
+        """)
+
+        params = {
+            "form_no": form_no,
+            "last_extracted_id": int(last_extracted_id),
+            "rows_processed": int(rows_processed),
+        }
+
+        with self.engine.begin() as conn:
+            existing = conn.execute(select_sql, params).fetchone()
+            if existing:
+                conn.execute(update_sql, {**params, "id": existing[0]})
+            else:
+                conn.execute(insert_sql, params)
+
+        print(f"  🔖 Watermark for {form_no} set to id {last_extracted_id}")
+
+    def get_max_cluster_label(self, form_no: str) -> int:
+        """Return the highest cluster_label in the form's master_rows table (-1 if empty)."""
+        _, master_rows_table = self._resolve_master_tables(form_no)
+
+        query = text(f"""
+            SELECT COALESCE(MAX(cluster_label), -1) as max_cluster
+            FROM {master_rows_table}
+        """)
+
+        with self.engine.connect() as conn:
+            return int(conn.execute(query).scalar())
+
     def fetch_extracted_rows_by_reports(
         self,
         table_key: str,
@@ -406,35 +621,68 @@ class DatabaseManager:
 
         # Build table name
         extracted_table = f"reports_{table_key}_extracted"
+        report_ids = sorted({int(rid) for rid in report_ids})
 
-        # Build placeholders for IN clause
-        placeholders = ','.join([f':id{i}' for i in range(len(report_ids))])
-
-        query = text(f"""
-            SELECT 
-                id,
-                report_id,
-                company_id,
-                particulars,
-                normalized_text,
-                master_row_id,
-                row_index
-            FROM {extracted_table}
-            WHERE company_id = :company_id
-                AND report_id IN ({placeholders})
-                AND particulars IS NOT NULL
-                AND particulars != ''
-            ORDER BY report_id, row_index
-        """)
-
-        # Build params dict
-        params = {'company_id': company_id}
-        for i, rid in enumerate(report_ids):
-            params[f'id{i}'] = rid
+        select_sql = f"""
+            SELECT
+                e.id,
+                e.report_id,
+                e.company_id,
+                e.particulars,
+                e.normalized_text,
+                e.row_index
+            FROM {extracted_table} e
+        """
+        filter_sql = """
+            WHERE e.company_id = :company_id
+                AND e.particulars IS NOT NULL
+                AND e.particulars != ''
+        """
 
         try:
             with self.engine.connect() as conn:
-                df = pd.read_sql(query, conn, params=params)
+                if len(report_ids) <= Config.IN_LIST_MAX_IDS:
+                    # Small sets: one expanding bind parameter
+                    query = text(
+                        select_sql + filter_sql + " AND e.report_id IN :report_ids"
+                    ).bindparams(bindparam("report_ids", expanding=True))
+                    df = self.read_sql_chunked(
+                        query,
+                        {'company_id': company_id, 'report_ids': report_ids},
+                        columns=EXTRACTED_COLUMNS,
+                        conn=conn
+                    )
+                else:
+                    # Large sets: join against a connection-scoped temp table
+                    conn.execute(text(
+                        "CREATE TEMPORARY TABLE tmp_mapping_report_ids (report_id BIGINT PRIMARY KEY)"))
+                    try:
+                        conn.execute(
+                            text(
+                                "INSERT INTO tmp_mapping_report_ids (report_id) VALUES (:report_id)"),
+                            [{'report_id': rid} for rid in report_ids]
+                        )
+                        query = text(
+                            select_sql
+                            + " JOIN tmp_mapping_report_ids t ON t.report_id = e.report_id "
+                            + filter_sql
+                        )
+                        df = self.read_sql_chunked(
+                            query,
+                            {'company_id': company_id},
+                            columns=EXTRACTED_COLUMNS,
+                            conn=conn
+                        )
+                    finally:
+                        conn.execute(
+                            text("DROP TEMPORARY TABLE IF EXISTS tmp_mapping_report_ids")
+                            if conn.dialect.name == "mysql"
+                            else text("DROP TABLE IF EXISTS tmp_mapping_report_ids"))
+                        conn.commit()
+
+            if not df.empty:
+                df = df.sort_values(
+                    ['report_id', 'row_index']).reset_index(drop=True)
 
             print(f"  📊 Loaded {len(df)} rows from {extracted_table}")
             return df
@@ -463,12 +711,44 @@ class DatabaseManager:
 
     def _resolve_master_tables(self, form_no: str) -> tuple[str, str]:
         """Return (master_mapping_table, master_rows_table) for a given form."""
-        form_no_upper = str(form_no).strip().upper()
-        if form_no_upper == "L-1":
-            return "master_mapping_l1", "master_rows_l1"
-        elif form_no_upper == "L-3":
-            return "master_mapping_l3", "master_rows_l3"
-        return "master_mapping", "master_rows"
+        return resolve_master_tables(form_no)
+
+    def get_form_numbers(self, tables: LFormTables) -> List[str]:
+        """Distinct form_no values that have extracted rows in a registered table pair."""
+        query = text(f"""
+            SELECT DISTINCT r.form_no
+            FROM {tables.reports_table} r
+            JOIN {tables.extracted_table} e ON e.report_id = r.id
+            WHERE r.form_no IS NOT NULL
+            ORDER BY r.form_no
+        """)
+
+        try:
+            with self.engine.connect() as conn:
+                return [row[0] for row in conn.execute(query)]
+        except Exception as e:
+            print(f"  ⚠️ Could not read forms from {tables.reports_table}: {e}")
+            return []
+
+    def get_unmapped_form_numbers(self, tables: LFormTables) -> List[str]:
+        """Distinct form_no values that still have extracted rows without a master_row_id."""
+        query = text(f"""
+            SELECT DISTINCT r.form_no
+            FROM {tables.reports_table} r
+            JOIN {tables.extracted_table} e ON e.report_id = r.id
+            WHERE r.form_no IS NOT NULL
+                AND e.master_row_id IS NULL
+                AND e.particulars IS NOT NULL
+                AND e.particulars != ''
+            ORDER BY r.form_no
+        """)
+
+        try:
+            with self.engine.connect() as conn:
+                return [row[0] for row in conn.execute(query)]
+        except Exception as e:
+            print(f"  ⚠️ Could not read forms from {tables.reports_table}: {e}")
+            return []
 
     def upsert_master_mapping(self, mappings: List[Dict], form_no: str = ""):
         """Insert or update master mapping table (per form).
@@ -573,6 +853,10 @@ class DatabaseManager:
 
         print(f"  ✅ Updated {len(updates)} master_row_id values")
 
+        # Cached peer comparison frames are aligned on master_row_id
+        from services import peer_comparison
+        peer_comparison.invalidate(table_key)
+
 
 # ============================================================================
 # MAIN PIPELINE
@@ -586,6 +870,59 @@ class MasterMappingPipeline:
         self.normalizer = TextNormalizer()
         self.clusterer = RowClusterer(method=Config.CLUSTERING_METHOD)
 
+    def _match_existing_masters(
+        self,
+        unique_texts: List[str],
+        existing_masters_df: pd.DataFrame,
+        threshold: float = None
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Match normalized texts against existing master clusters
+
+        Args:
+            unique_texts: Normalized texts to match (in processing order)
+            existing_masters_df: Output of DatabaseManager.get_existing_masters
+            threshold: Minimum fuzz.ratio (0-1 scale) to reuse a cluster
+
+        Returns:
+            Tuple of ({text: reused cluster_label}, [texts with no match])
+        """
+        if threshold is None:
+            threshold = Config.REUSE_SIMILARITY_THRESHOLD
+
+        matched = {}
+        leftovers = []
+
+        choices = []
+        choice_clusters = []
+        if not existing_masters_df.empty:
+            for existing_normalized, cluster_label in zip(
+                existing_masters_df['normalized_text'],
+                existing_masters_df['cluster_label']
+            ):
+                if not existing_normalized or pd.isna(existing_normalized):
+                    continue
+                choices.append(existing_normalized)
+                choice_clusters.append(cluster_label)
+
+        for unique_text in unique_texts:
+            best = None
+            if choices:
+                best = process.extractOne(
+                    unique_text,
+                    choices,
+                    scorer=fuzz.ratio,
+                    score_cutoff=threshold * 100
+                )
+
+            if best is not None:
+                # best = (choice, score, index)
+                matched[unique_text] = int(choice_clusters[best[2]])
+            else:
+                leftovers.append(unique_text)
+
+        return matched, leftovers
+
     def run(self, form_no: str = Config.FORM_NO):
         """
         Execute the complete master mapping pipeline
@@ -604,6 +941,12 @@ class MasterMappingPipeline:
         print(f"🚀 MASTER ROW MAPPING PIPELINE - {form_no}")
         print("=" * 70)
 
+        tables = resolve_form_tables(form_no)
+        if tables is None:
+            print(f"  ⚠️  No extracted table registered for {form_no}. Exiting.")
+            return
+        table_key = tables.table_key
+
         # Step 1: Load data
         print("\n📥 Step 1: Loading extracted rows...")
         df = self.db.get_extracted_rows(form_no)
@@ -625,7 +968,8 @@ class MasterMappingPipeline:
         ]
 
         if updates_normalized:
-            self.db.update_normalized_text(updates_normalized, table_key="l2")
+            self.db.update_normalized_text(
+                updates_normalized, table_key=table_key)
             df['normalized_text'] = df['normalized_new']
 
         # Step 3: Assign clusters based on SEQUENCE (row_index)
@@ -718,9 +1062,10 @@ class MasterMappingPipeline:
 
         print(f"✅ Master rows synced: {sync_result['rows_synced']} rows")
 
-        # Step 6: Update master_row_ids in reports_l2_extracted
+        # Step 6: Update master_row_ids in reports_l*_extracted
         # CRITICAL: Now using master_rows.master_row_id (NOT master_mapping.id)
-        print("\n🔗 Step 5: Updating master_row_ids in reports_l2_extracted...")
+        print(
+            f"\n🔗 Step 5: Updating master_row_ids in {tables.extracted_table}...")
         cluster_to_master_id = self.db.get_cluster_master_row_ids(form_no)
 
         # Map each extracted row to its master_row_id
@@ -741,7 +1086,7 @@ class MasterMappingPipeline:
                 if master_row_id:
                     updates_master_ids.append((row['id'], master_row_id))
 
-        self.db.update_master_row_ids(updates_master_ids)
+        self.db.update_master_row_ids(updates_master_ids, table_key=table_key)
 
         # Summary
         print("\n" + "=" * 70)
@@ -784,9 +1129,7 @@ class MasterMappingPipeline:
             print(f"   Form Code: {form_code}")
 
             # Normalize form code to match database tables
-            from services.database_storage_service import DatabaseStorageService
-            storage_service = DatabaseStorageService()
-            table_key = storage_service._normalize_lform_key(form_code)
+            table_key = normalize_lform_key(form_code)
 
             if not table_key:
                 return {
@@ -845,16 +1188,9 @@ class MasterMappingPipeline:
             # Get existing masters for comparison
             existing_masters_df = self.db.get_existing_masters(form_code)
 
-            # CRITICAL FIX: Get the MAXIMUM existing cluster_label from master_rows
-            # so new clusters start AFTER existing ones
-            max_existing_cluster_query = text("""
-                SELECT COALESCE(MAX(cluster_label), -1) as max_cluster
-                FROM master_rows
-            """)
-
-            with self.db.engine.connect() as conn:
-                result = conn.execute(max_existing_cluster_query)
-                max_existing_cluster = result.scalar()
+            # CRITICAL FIX: Get the MAXIMUM existing cluster_label from the form's
+            # master_rows table so new clusters start AFTER existing ones
+            max_existing_cluster = self.db.get_max_cluster_label(form_code)
 
             # Prepare similarity matching using rapidfuzz
             from rapidfuzz import fuzz
@@ -877,38 +1213,16 @@ class MasterMappingPipeline:
             print(f"     Existing max cluster: {max_existing_cluster}")
 
             # For each unique text, find best matching existing master or create new
-            for unique_text in unique_texts_ordered:
-                best_match_cluster = None
-                best_similarity = 0.0
-
-                # Check similarity with ALL existing masters
-                if not existing_masters_df.empty:
-                    for _, existing in existing_masters_df.iterrows():
-                        existing_normalized = existing.get(
-                            'normalized_text', '')
-                        if not existing_normalized:
-                            continue
-
-                        # Calculate similarity between normalized texts
-                        similarity = fuzz.ratio(
-                            unique_text, existing_normalized) / 100.0
-
-                        if similarity > best_similarity:
-                            best_similarity = similarity
-                            best_match_cluster = existing['cluster_label']
-
-                # Decision: REUSE if similarity >= 85%, CREATE NEW if < 85%
-                SIMILARITY_THRESHOLD = 0.85
-
-                if best_similarity >= SIMILARITY_THRESHOLD:
-                    # REUSE existing cluster
-                    text_to_cluster[unique_text] = best_match_cluster
-                    reused_count += 1
-                else:
-                    # CREATE NEW cluster
-                    text_to_cluster[unique_text] = next_cluster_id
-                    next_cluster_id += 1
-                    new_count += 1
+            # Decision: REUSE if similarity >= threshold, CREATE NEW otherwise
+            matched, leftovers = self._match_existing_masters(
+                unique_texts_ordered, existing_masters_df)
+            text_to_cluster.update(matched)
+            reused_count = len(matched)
+
+            for unique_text in leftovers:
+                text_to_cluster[unique_text] = next_cluster_id
+                next_cluster_id += 1
+                new_count += 1
 
             # Map clusters to all rows
             df['cluster_label'] = df['normalized_text'].map(text_to_cluster)
@@ -926,9 +1240,10 @@ class MasterMappingPipeline:
 
             # IMPORTANT FIX: Check if clusters already have master_names from previous runs
             # Query existing master_names for this form to maintain consistency
-            existing_masters_query = text("""
+            master_mapping_table, _ = self.db._resolve_master_tables(form_code)
+            existing_masters_query = text(f"""
                 SELECT DISTINCT cluster_label, master_name
-                FROM master_mapping
+                FROM {master_mapping_table}
                 WHERE form_no = :form_no
                 GROUP BY cluster_label, master_name
             """)
@@ -1048,22 +1363,329 @@ class MasterMappingPipeline:
                 'error': error_msg
             }
 
+    def run_incremental(self, form_no: str = Config.FORM_NO) -> Dict:
+        """
+        Map only new or unmapped rows for a form (watermark-based)
+
+        Steps:
+        1. Load rows with id > watermark or master_row_id IS NULL
+        2. Normalize text
+        3. Reuse existing master clusters where similar enough
+        4. Cluster just the leftovers into new clusters
+        5. Upsert mappings, sync master_rows, update master_row_ids
+        6. Advance the watermark
+
+        Cost scales with the new data instead of the full history.
+
+        Args:
+            form_no: L-form number to process
+
+        Returns:
+            {
+                'success': bool,
+                'rows_processed': int,
+                'clusters_reused': int,
+                'clusters_created': int,
+                'rows_mapped': int,
+                'watermark': int,
+                'error': str (if failed)
+            }
+        """
+        try:
+            print("\n" + "=" * 70)
+            print(f"🚀 INCREMENTAL MASTER ROW MAPPING - {form_no}")
+            print("=" * 70)
+
+            tables = resolve_form_tables(form_no)
+            if tables is None:
+                return {
+                    'success': False,
+                    'error': f'No extracted table registered for form: {form_no}'
+                }
+            table_key = tables.table_key
+
+            # Step 1: Load only new / unmapped rows
+            print("\n📥 Step 1: Loading new and unmapped rows...")
+            watermark = self.db.get_watermark(form_no)
+            df = self.db.get_unmapped_rows(
+                form_no, table_key=table_key, watermark=watermark)
+
+            if df.empty:
+                print("  ✅ Nothing new to map.")
+                return {
+                    'success': True,
+                    'rows_processed': 0,
+                    'clusters_reused': 0,
+                    'clusters_created': 0,
+                    'rows_mapped': 0,
+                    'watermark': watermark
+                }
+
+            # Step 2: Normalize text
+            print("\n🔤 Step 2: Normalizing text...")
+            df['normalized_new'] = self.normalizer.batch_normalize(
+                df['particulars'])
+
+            updates_normalized = [
+                (row_id, new_text)
+                for row_id, new_text, old_text in zip(
+                    df['id'], df['normalized_new'], df['normalized_text'])
+                if new_text != old_text
+            ]
+            if updates_normalized:
+                self.db.update_normalized_text(
+                    updates_normalized, table_key=table_key)
+            df['normalized_text'] = df['normalized_new']
+
+            unique_texts_ordered = list(dict.fromkeys(
+                df.sort_values(['company_id', 'row_index'])['normalized_text']))
+
+            # Step 3: Match against existing masters
+            print("\n🔎 Step 3: Matching against existing masters...")
+            existing_masters_df = self.db.get_existing_masters(form_no)
+            text_to_cluster, leftovers = self._match_existing_masters(
+                unique_texts_ordered, existing_masters_df)
+
+            print(f"     Unique texts: {len(unique_texts_ordered)}")
+            print(f"     ✅ Reused {len(text_to_cluster)} existing clusters")
+            print(f"     Leftovers to cluster: {len(leftovers)}")
+
+            # Step 4: Cluster just the leftovers into NEW clusters
+            new_cluster_ids = set()
+            if leftovers:
+                print("\n🗂️  Step 4: Clustering leftovers...")
+                try:
+                    labels, _ = self.clusterer.fit_predict(leftovers)
+                except ValueError as e:
+                    # e.g. TF-IDF pruned every term on a tiny batch
+                    print(f"  ⚠️ Clustering skipped ({e}), one cluster per text")
+                    labels = np.arange(len(leftovers))
+
+                next_cluster_id = self.db.get_max_cluster_label(form_no) + 1
+                label_to_cluster = {}
+                for leftover_text, label in zip(leftovers, labels):
+                    if label not in label_to_cluster:
+                        label_to_cluster[label] = next_cluster_id
+                        next_cluster_id += 1
+                    text_to_cluster[leftover_text] = label_to_cluster[label]
+
+                new_cluster_ids = set(label_to_cluster.values())
+                print(f"     ✅ Created {len(new_cluster_ids)} new clusters")
+
+            df['cluster_label'] = df['normalized_text'].map(text_to_cluster)
+
+            # Step 5: Build mappings (existing clusters keep their master name)
+            print("\n📝 Step 5: Creating master mappings...")
+            existing_names = {}
+            if not existing_masters_df.empty:
+                existing_names = dict(zip(
+                    existing_masters_df['cluster_label'],
+                    existing_masters_df['master_name']))
+
+            all_mappings = []
+            for cluster_id, cluster_rows in df.groupby('cluster_label', sort=True):
+                master_text = existing_names.get(cluster_id)
+                if not master_text:
+                    master_text = max(cluster_rows['particulars'], key=len)
+
+                for _, row in cluster_rows.iterrows():
+                    all_mappings.append({
+                        'master_name': master_text,
+                        'company_id': int(row['company_id']),
+                        'form_no': form_no,
+                        'variant_text': row['particulars'],
+                        'normalized_text': row['normalized_text'],
+                        'cluster_label': int(cluster_id),
+                        'similarity_score': fuzz.ratio(row['particulars'], master_text) / 100.0
+                    })
+
+            self.db.upsert_master_mapping(all_mappings, form_no=form_no)
+
+            from services.master_rows_sync_service import MasterRowsSyncService
+            sync_result = MasterRowsSyncService().sync_master_rows(
+                form_no=form_no,
+                verbose=True
+            )
+            if not sync_result['success']:
+                return {
+                    'success': False,
+                    'error': f"Failed to sync master_rows: {sync_result.get('error')}"
+                }
+
+            # Step 6: Update master_row_ids and advance the watermark
+            print("\n🔗 Step 6: Updating master_row_ids...")
+            cluster_to_master_id = self.db.get_cluster_master_row_ids(form_no)
+            updates_master_ids = [
+                (row_id, cluster_to_master_id[cluster_label])
+                for row_id, cluster_label in zip(df['id'], df['cluster_label'])
+                if cluster_label in cluster_to_master_id
+            ]
+            self.db.update_master_row_ids(
+                updates_master_ids, table_key=table_key)
+
+            new_watermark = max(watermark, int(df['id'].max()))
+            self.db.set_watermark(
+                form_no, new_watermark, rows_processed=len(df))
+
+            print("\n" + "=" * 70)
+            print("✅ INCREMENTAL PIPELINE COMPLETE")
+            print("=" * 70)
+            print(f"  📊 Rows processed: {len(df)}")
+            print(f"  🔗 Master row IDs updated: {len(updates_master_ids)}")
+            print(f"  🔖 Watermark: {watermark} → {new_watermark}")
+            print("=" * 70 + "\n")
+
+            return {
+                'success': True,
+                'rows_processed': len(df),
+                'clusters_reused': len(set(text_to_cluster.values()) - new_cluster_ids),
+                'clusters_created': len(new_cluster_ids),
+                'rows_mapped': len(updates_master_ids),
+                'watermark': new_watermark
+            }
+
+        except Exception as e:
+            import traceback
+            error_msg = f"Incremental mapping failed: {str(e)}"
+            print(f"❌ {error_msg}")
+            print(f"❌ Traceback: {traceback.format_exc()}")
+
+            return {
+                'success': False,
+                'error': error_msg
+            }
+
+
+# ============================================================================
+# PARALLEL RUNNER (ALL L-FORMS)
+# ============================================================================
+
+def _init_pool_worker():
+    """Drop connections inherited from the parent so each process opens its own."""
+    from databases.database import engine as db_engine
+    db_engine.dispose(close=False)
+
+
+def _run_table_key(table_key: str, form_nos: List[str], incremental: bool) -> Tuple[str, Dict]:
+    """
+    Process every form_no stored under one table key, serially
+
+    Forms sharing a table key share their master tables, so they must never
+    be mapped concurrently; different table keys are fully independent.
+    """
+    pipeline = MasterMappingPipeline()
+    results = {}
+
+    for form_no in form_nos:
+        try:
+            if incremental:
+                results[form_no] = pipeline.run_incremental(form_no=form_no)
+            else:
+                pipeline.run(form_no=form_no)
+                results[form_no] = {'success': True}
+        except Exception as e:
+            results[form_no] = {'success': False, 'error': str(e)}
+
+    return table_key, results
+
+
+def run_all_forms(
+    incremental: bool = False,
+    max_workers: Optional[int] = None,
+    table_keys: Optional[List[str]] = None
+) -> Dict[str, Dict]:
+    """
+    Run master mapping for every registered L-form across a process pool
+
+    One task per table key (e.g. 'l2', 'l6a'), so a full refresh of all
+    forms uses every core instead of running serially.
+
+    Args:
+        incremental: Use run_incremental instead of a full recluster
+        max_workers: Pool size (default: os.cpu_count())
+        table_keys: Restrict to these table keys (default: whole registry)
+
+    Returns:
+        {table_key: {form_no: result}}
+    """
+    db = DatabaseManager()
+
+    registry = all_lform_tables()
+    if table_keys:
+        registry = [get_lform_tables(key) for key in table_keys
+                    if get_lform_tables(key) is not None]
+
+    jobs = {}
+    for tables in registry:
+        form_nos = db.get_form_numbers(tables)
+        if form_nos:
+            jobs[tables.table_key] = form_nos
+
+    if not jobs:
+        print("  ⚠️ No extracted rows found for any registered L-form")
+        return {}
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    print(
+        f"\n🚀 Mapping {sum(len(f) for f in jobs.values())} form(s) across {len(jobs)} table(s) with {max_workers} worker(s)")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_pool_worker) as pool:
+        futures = {
+            pool.submit(_run_table_key, table_key, form_nos, incremental): table_key
+            for table_key, form_nos in jobs.items()
+        }
+        for future in as_completed(futures):
+            table_key = futures[future]
+            try:
+                _, results[table_key] = future.result()
+            except Exception as e:
+                results[table_key] = {'*': {'success': False, 'error': str(e)}}
+            print(f"  ✅ Finished {table_key}")
+
+    return results
+
 
 # ============================================================================
 # ENTRY POINT
 # ============================================================================
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Master row mapping pipeline for IRDAI L-forms")
+    parser.add_argument("--form", default="L-2-A",
+                        help="L-form number to process (default: L-2-A)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only map rows newer than the watermark or with master_row_id IS NULL")
+    parser.add_argument("--all", action="store_true",
+                        help="Process every registered L-form in parallel (one table per worker)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Process pool size for --all (default: CPU count)")
+    args = parser.parse_args(argv)
+
     try:
-        pipeline = MasterMappingPipeline()
+        if args.all:
+            results = run_all_forms(
+                incremental=args.incremental, max_workers=args.workers)
+            failed = [
+                f"{key}:{form_no}"
+                for key, forms in results.items()
+                for form_no, result in forms.items()
+                if not result.get('success')
+            ]
+            print(
+                f"\n✅ Processed {len(results)} table(s), {len(failed)} failed form(s) {failed if failed else ''}")
+            return
 
-        # Process L-2-A form (change as needed)
-        pipeline.run(form_no="L-2-A")
+        pipeline = MasterMappingPipeline()
 
-        # Optionally process other forms
-        # pipeline.run(form_no="L-6A")
-        # pipeline.run(form_no="L-10")
+        if args.incremental:
+            pipeline.run_incremental(form_no=args.form)
+        else:
+            pipeline.run(form_no=args.form)
 
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from databases.database import get_db
 from databases.models import Company
+from utils.response_cache import invalidate_tags
 from pydantic import BaseModel
 from typing import List
 import logging
@@ -50,6 +51,7 @@ def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
         db_company = Company(name=company.name.strip().lower())
         db.add(db_company)
         db.commit()
+        invalidate_tags("company")
         db.refresh(db_company)
 
         logger.info(f"Created new company: {db_company.name}")
@@ -81,6 +83,7 @@ def delete_company(company_id: int, db: Session = Depends(get_db)):
 
         db.delete(company)
         db.commit()
+        invalidate_tags("company")
         logger.info(f"Deleted company: {company.name}")
         return {"message": f"Company '{company.name}' deleted successfully"}
     except HTTPException:
@@ -115,6 +118,7 @@ def update_company(company_id: int, company_update: CompanyUpdate, db: Session =
             company.name = company_update.name.strip().lower()
 
         db.commit()
+        invalidate_tags("company")
         db.refresh(company)
         logger.info(f"Updated company: {company.name}")
         return company
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import text
-from databases.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from databases.database import get_db, get_async_db
 from pydantic import BaseModel
 from typing import List, Optional
 import os
 import json
+from utils.response_cache import cached_response, invalidate_tags
+from utils.tabular_response import format_query, tabular_response
+from helpers.dashboard_data import fetch_selected_dashboard_rows
+from helpers.sort_keys import fetch_unique_values, select_columns, sort_key_values, SORT_KEY_COLUMNS, fy_sort_key, numeric_sort_key
 
 router = APIRouter()
 
@@ -16,26 +21,28 @@ class DashboardDataRequest(BaseModel):
 
 # 1️⃣ Get All Companies
 @router.get("/companies")
-def get_companies(db=Depends(get_db)):
+@cached_response(tags=["company_metrics"])
+async def get_companies(db: AsyncSession = Depends(get_async_db)):
     query = text("""
         SELECT DISTINCT CompanyInsurerShortName
         FROM company_metrics
         ORDER BY CompanyInsurerShortName;
     """)
-    result = db.execute(query).fetchall()
+    result = (await db.execute(query)).fetchall()
     return {"companies": [row[0] for row in result]}
 
 
 # 2️⃣ Get Premium Types for Selected Company
 @router.get("/premium-types")
-def get_premium_types(company: str, db=Depends(get_db)):
+@cached_response(tags=["company_metrics"])
+async def get_premium_types(company: str, db: AsyncSession = Depends(get_async_db)):
     query = text("""
         SELECT DISTINCT PremiumTypeLongName
         FROM company_metrics
         WHERE CompanyInsurerShortName = :company
         ORDER BY PremiumTypeLongName;
     """)
-    result = db.execute(query, {"company": company}).fetchall()
+    result = (await db.execute(query, {"company": company})).fetchall()
     return {
         "company": company,
         "premium_types": [row[0] for row in result]
@@ -44,7 +51,8 @@ def get_premium_types(company: str, db=Depends(get_db)):
 
 # 3️⃣ Get Categories for Company + Premium Type
 @router.get("/categories")
-def get_categories(company: str, premium_type: str, db=Depends(get_db)):
+@cached_response(tags=["company_metrics"])
+async def get_categories(company: str, premium_type: str, db: AsyncSession = Depends(get_async_db)):
     query = text("""
         SELECT DISTINCT CategoryLongName
         FROM company_metrics
@@ -52,10 +60,10 @@ def get_categories(company: str, premium_type: str, db=Depends(get_db)):
         AND PremiumTypeLongName = :premium_type
         ORDER BY CategoryLongName;
     """)
-    result = db.execute(
+    result = (await db.execute(
         query,
         {"company": company, "premium_type": premium_type}
-    ).fetchall()
+    )).fetchall()
 
     return {
         "company": company,
@@ -66,7 +74,8 @@ def get_categories(company: str, premium_type: str, db=Depends(get_db)):
 
 # 4️⃣ Get Descriptions for Company + Premium Type + Category
 @router.get("/descriptions")
-def get_descriptions(company: str, premium_type: str, category: str, db=Depends(get_db)):
+@cached_response(tags=["company_metrics"])
+async def get_descriptions(company: str, premium_type: str, category: str, db: AsyncSession = Depends(get_async_db)):
     query = text("""
         SELECT DISTINCT Description
         FROM company_metrics
@@ -75,10 +84,10 @@ def get_descriptions(company: str, premium_type: str, category: str, db=Depends(
         AND CategoryLongName = :category
         ORDER BY Description;
     """)
-    result = db.execute(
+    result = (await db.execute(
         query,
         {"company": company, "premium_type": premium_type, "category": category}
-    ).fetchall()
+    )).fetchall()
 
     return {
         "company": company,
@@ -90,9 +99,11 @@ def get_descriptions(company: str, premium_type: str, category: str, db=Depends(
 
 # 5️⃣ Get Full Details (Final API)
 @router.get("/details")
-def get_details(company: str, premium_type: str, category: str, description: str, db=Depends(get_db)):
-    query = text("""
-        SELECT *
+async def get_details(company: str, premium_type: str, category: str, description: str,
+                      format: str = format_query(),
+                      db: AsyncSession = Depends(get_async_db)):
+    query = text(f"""
+        SELECT {select_columns("company_metrics")}
         FROM company_metrics
         WHERE CompanyInsurerShortName = :company
         AND PremiumTypeLongName = :premium_type
@@ -101,7 +112,7 @@ def get_details(company: str, premium_type: str, category: str, description: str
         ORDER BY ReportedUnit, ReportedValue;
     """)
 
-    result = db.execute(
+    result = await db.execute(
         query,
         {
             "company": company,
@@ -113,34 +124,22 @@ def get_details(company: str, premium_type: str, category: str, description: str
 
     rows = result.fetchall()
 
-    # Return empty payload (200) when no data is found to avoid 404 in clients
-    if not rows:
-        return {
-            "company": company,
-            "premium_type": premium_type,
-            "category": category,
-            "description": description,
-            "count": 0,
-            "data": []
-        }
-
-    columns = result.keys()
-    return {
+    # No rows is an empty payload (200), not a 404, so clients need no special case
+    return tabular_response(result.keys(), rows, format, envelope={
         "company": company,
         "premium_type": premium_type,
         "category": category,
         "description": description,
         "count": len(rows),
-        "data": [dict(zip(columns, row)) for row in rows]
-    }
+    })
 
 
 # 6️⃣ Get Record by ID
 
 @router.get("/get/{id}")
-def get_record(id: int, db=Depends(get_db)):
-    query = text("SELECT * FROM company_metrics WHERE id = :id")
-    result = db.execute(query, {"id": id}).fetchone()
+async def get_record(id: int, db: AsyncSession = Depends(get_async_db)):
+    query = text(f"SELECT {select_columns('company_metrics')} FROM company_metrics WHERE id = :id")
+    result = (await db.execute(query, {"id": id})).fetchone()
 
     if not result:
         raise HTTPException(status_code=404, detail="Record not found")
@@ -165,7 +164,9 @@ def create_record(data: dict, db=Depends(get_db)):
             Description,
             ReportedUnit,
             ReportedValue,
-            IsActive
+            IsActive,
+            ProcessedFYYearSortKey,
+            ReportedValueSortKey
         )
         VALUES (
             :company,
@@ -178,7 +179,9 @@ def create_record(data: dict, db=Depends(get_db)):
             :description,
             :unit,
             :value,
-            :is_active
+            :is_active,
+            :ProcessedFYYearSortKey,
+            :ReportedValueSortKey
         )
     """)
 
@@ -193,10 +196,12 @@ def create_record(data: dict, db=Depends(get_db)):
         "description": data.get("Description"),
         "unit": data.get("ReportedUnit"),
         "value": data.get("ReportedValue"),
-        "is_active": data.get("IsActive", 1)
+        "is_active": data.get("IsActive", 1),
+        **sort_key_values(data.get("ProcessedFYYear"), data.get("ReportedValue"))
     })
 
     db.commit()
+    invalidate_tags("company_metrics")
 
     return {"message": "Record created successfully"}
 
@@ -217,7 +222,9 @@ def update_record(id: int, data: dict, db=Depends(get_db)):
             Description = :description,
             ReportedUnit = :unit,
             ReportedValue = :value,
-            IsActive = :is_active
+            IsActive = :is_active,
+            ProcessedFYYearSortKey = :ProcessedFYYearSortKey,
+            ReportedValueSortKey = :ReportedValueSortKey
         WHERE id = :id
     """)
 
@@ -233,10 +240,12 @@ def update_record(id: int, data: dict, db=Depends(get_db)):
         "description": data.get("Description"),
         "unit": data.get("ReportedUnit"),
         "value": data.get("ReportedValue"),
-        "is_active": data.get("IsActive", 1)
+        "is_active": data.get("IsActive", 1),
+        **sort_key_values(data.get("ProcessedFYYear"), data.get("ReportedValue"))
     })
 
     db.commit()
+    invalidate_tags("company_metrics")
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Record not found")
@@ -256,6 +265,14 @@ def patch_record(id: int, data: dict, db=Depends(get_db)):
         set_clauses.append(f"{key} = :{key}")
         params[key] = value
 
+    # Keep the /unique-values sort keys in step with the patched values
+    if "ProcessedFYYear" in data:
+        set_clauses.append(f"{SORT_KEY_COLUMNS['ProcessedFYYear']} = :fy_sort_key")
+        params["fy_sort_key"] = fy_sort_key(data["ProcessedFYYear"])
+    if "ReportedValue" in data:
+        set_clauses.append(f"{SORT_KEY_COLUMNS['ReportedValue']} = :value_sort_key")
+        params["value_sort_key"] = numeric_sort_key(data["ReportedValue"])
+
     if not set_clauses:
         raise HTTPException(status_code=400, detail="No fields to update")
 
@@ -267,6 +284,7 @@ def patch_record(id: int, data: dict, db=Depends(get_db)):
 
     result = db.execute(query, params)
     db.commit()
+    invalidate_tags("company_metrics")
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Record not found")
@@ -288,6 +306,7 @@ def delete_record(id: int, db=Depends(get_db)):
         query = text("DELETE FROM company_metrics WHERE id = :id")
         result = db.execute(query, {"id": id})
         db.commit()
+        invalidate_tags("company_metrics")
 
         if result.rowcount == 0:
             # Graceful, idempotent delete
@@ -304,9 +323,12 @@ def delete_record(id: int, db=Depends(get_db)):
 
 # 1️⃣1️⃣ Get unique values for form fields
 @router.get("/unique-values")
-def get_unique_values(company: str, field: str, db=Depends(get_db)):
+@cached_response(tags=["company_metrics"])
+async def get_unique_values(company: str, field: str,
+                            limit: Optional[int] = Query(None, ge=1),
+                            offset: int = Query(0, ge=0),
+                            db: AsyncSession = Depends(get_async_db)):
     """Get unique values for a specific field from company_metrics table"""
-    
     # Map field names to database columns
     field_map = {
         'ProcessedPeriodType': 'ProcessedPeriodType',
@@ -316,61 +338,21 @@ def get_unique_values(company: str, field: str, db=Depends(get_db)):
         'ReportedUnit': 'ReportedUnit',
         'ReportedValue': 'ReportedValue'
     }
-    
+
     if field not in field_map:
         return []
-    
-    column = field_map[field]
-    
-    # Query to get unique values for the company (get all values, not just active ones)
-    # This allows users to see all possible values that exist in the database
-    query = text(f"""
-        SELECT DISTINCT {column}
-        FROM company_metrics
-        WHERE CompanyInsurerShortName = :company
-        AND {column} <> ''
-        AND {column} IS NOT NULL
-    """)
-    
+
+    # All values for the company, not just active ones, so users see every
+    # value that exists in the database
+    # FY years / values newest-highest first via their sort keys, text A-Z
     try:
-        result = db.execute(query, {"company": company}).fetchall()
-        values = [str(row[0]) for row in result if row[0] is not None]
-        
-        # Sort values appropriately
-        if field in ['ProcessedFYYear', 'ReportedValue']:
-            # For numeric fields, sort descending (newest/highest first)
-            try:
-                if field == 'ProcessedFYYear':
-                    # Extract year number for sorting
-                    def extract_year(val):
-                        val_str = str(val).upper().strip()
-                        if val_str.startswith('FY'):
-                            try:
-                                return int(val_str[2:])
-                            except:
-                                return 0
-                        try:
-                            return int(val_str)
-                        except:
-                            return 0
-                    values.sort(key=extract_year, reverse=True)
-                else:  # ReportedValue
-                    # Try to sort by numeric value descending
-                    def extract_numeric(val):
-                        val_str = str(val).strip()
-                        try:
-                            return float(val_str)
-                        except:
-                            return float('-inf')
-                    values.sort(key=extract_numeric, reverse=True)
-            except Exception as sort_err:
-                print(f"Error sorting {field}: {sort_err}")
-                values.sort(reverse=True)
-        else:
-            # For text fields, sort ascending (A-Z)
-            values.sort()
-        
-        return values
+        return await db.run_sync(
+            fetch_unique_values, "company_metrics", field_map[field],
+            where="CompanyInsurerShortName = :company",
+            params={"company": company},
+            limit=limit,
+            offset=offset
+        )
     except Exception as e:
         print(f"Error in query for {field}: {e}")
         import traceback
@@ -380,76 +362,16 @@ def get_unique_values(company: str, field: str, db=Depends(get_db)):
 
 # 1️⃣2️⃣ Get Dashboard Data for Selected Descriptions (Metrics)
 @router.post("/dashboard-data")
-def get_dashboard_data(request: DashboardDataRequest, db=Depends(get_db)):
+async def get_dashboard_data(request: DashboardDataRequest, db: AsyncSession = Depends(get_async_db)):
     """Get all data for selected descriptions from company_metrics, filtered by selected row IDs"""
-    descriptions = request.descriptions
-    if not descriptions or len(descriptions) == 0:
-        return []
-    
-    DB_TYPE = os.getenv("DB_TYPE", "sqlite")
-    
-    # Get selected row IDs for each description
-    selected_row_ids_map = {}
-    for desc in descriptions:
-        try:
-            # Fetch selected row IDs for this description (try both Domestic and International)
-            for data_type in ['Domestic', 'International']:
-                query = text("""
-                    SELECT row_ids FROM dashboard_selected_row_ids 
-                    WHERE data_type = :data_type AND description = :description
-                """)
-                result = db.execute(query, {"data_type": data_type, "description": desc})
-                row = result.fetchone()
-                if row:
-                    if DB_TYPE == "mysql":
-                        row_ids = row[0] if isinstance(row[0], list) else json.loads(row[0])
-                    else:
-                        row_ids = json.loads(row[0])
-                    if desc not in selected_row_ids_map:
-                        selected_row_ids_map[desc] = []
-                    # Ensure row IDs are integers
-                    row_ids_int = [int(rid) for rid in row_ids if rid is not None]
-                    selected_row_ids_map[desc].extend(row_ids_int)
-                    print(f"✅ Loaded {len(row_ids_int)} selected row IDs for '{desc}' ({data_type}): {row_ids_int}")
-        except Exception as e:
-            print(f"Error fetching selected row IDs for {desc}: {e}")
-            # If no selected row IDs found, we'll show all data for that description
-    
-    # Create placeholders for IN clause
-    placeholders = ','.join([f':desc{i}' for i in range(len(descriptions))])
-    params = {f'desc{i}': desc for i, desc in enumerate(descriptions)}
-    
-    query = text(f"""
-        SELECT *
-        FROM company_metrics
-        WHERE Description IN ({placeholders})
-        AND (IsActive = 1 OR IsActive IS NULL)
-        ORDER BY CompanyInsurerShortName, PremiumTypeLongName, CategoryLongName, ProcessedFYYear;
-    """)
-    
-    result = db.execute(query, params)
-    columns = result.keys()
-    all_data = [dict(zip(columns, row)) for row in result.fetchall()]
-    
-    # Filter by selected row IDs - ONLY show data if row IDs are selected
-    # If a description is selected but has no selected row IDs, don't show any data for it
-    filtered_data = []
-    for item in all_data:
-        desc = item.get('Description', '')
-        item_id = item.get('id')
-        
-        # Only include data if this description has selected row IDs AND this row ID is in the selection
-        if desc in selected_row_ids_map and selected_row_ids_map[desc]:
-            # Convert both to int for comparison (row IDs might be stored as strings in JSON)
-            item_id_int = int(item_id) if item_id is not None else None
-            selected_ids = [int(rid) for rid in selected_row_ids_map[desc] if rid is not None]
-            if item_id_int is not None and item_id_int in selected_ids:
-                filtered_data.append(item)
-        # If description has no selected row IDs, don't include any data (don't show all data)
-    
-    print(f"📊 Metrics Dashboard filtering: {len(all_data)} total rows, {len(filtered_data)} after row ID filtering")
-    print(f"📋 Selected row IDs map: {selected_row_ids_map}")
-    print(f"📝 Descriptions requested: {descriptions}")
-    print(f"✅ Returning {len(filtered_data)} rows (only rows with selected IDs)")
-    
-    return filtered_data
+    # Only rows whose id is selected for their own description are returned;
+    # descriptions without a selection return nothing
+    return await db.run_sync(
+        fetch_selected_dashboard_rows,
+        table="company_metrics",
+        descriptions=request.descriptions or [],
+        data_types=['Domestic', 'International'],
+        order_by="m.CompanyInsurerShortName, m.PremiumTypeLongName, m.CategoryLongName, m.ProcessedFYYear",
+        active_filter="(m.IsActive = 1 OR m.IsActive IS NULL)",
+        label="Metrics Dashboard"
+    )
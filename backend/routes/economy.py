@@ -134,15 +134,20 @@
 #     return {"message": f"Record ID {id} deleted successfully!"}
 
 
-from fastapi import APIRouter, Depends
-from databases.database import get_db
+from fastapi import APIRouter, Depends, Query
+from databases.database import get_db, get_async_db
 from sqlalchemy import text, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from databases.models import EconomyMaster, DashboardSelectedDescriptions, DashboardChartConfig
 from fastapi import HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 import json
 import os
+from utils.response_cache import cached_response, invalidate_tags
+from utils.tabular_response import format_query, tabular_response
+from helpers.dashboard_data import fetch_selected_dashboard_rows
+from helpers.sort_keys import fetch_unique_values, select_columns
 
 # Pydantic models for create and update
 
@@ -194,7 +199,8 @@ def economy_health_check():
 
 
 @router.get("/premium-types")
-def get_premium_types(data_type: str, db=Depends(get_db)):
+@cached_response(tags=["economy_master"])
+async def get_premium_types(data_type: str, db: AsyncSession = Depends(get_async_db)):
     query = text("""
         SELECT DISTINCT PremiumTypeLongName
         FROM economy_master
@@ -203,14 +209,15 @@ def get_premium_types(data_type: str, db=Depends(get_db)):
         AND IsActive = 1
         ORDER BY PremiumTypeLongName;
     """)
-    result = db.execute(query, {"data_type": f"%{data_type}%"}).fetchall()
+    result = (await db.execute(query, {"data_type": f"%{data_type}%"})).fetchall()
     return [row[0] for row in result]
 
 # 2️⃣ Get Category List based on PremiumType and Country
 
 
 @router.get("/categories")
-def get_categories(data_type: str, premium: str, db=Depends(get_db)):
+@cached_response(tags=["economy_master"])
+async def get_categories(data_type: str, premium: str, db: AsyncSession = Depends(get_async_db)):
     query = text("""
         SELECT DISTINCT CategoryLongName
         FROM economy_master
@@ -220,16 +227,17 @@ def get_categories(data_type: str, premium: str, db=Depends(get_db)):
         AND IsActive = 1
         ORDER BY CategoryLongName;
     """)
-    result = db.execute(query, {
+    result = (await db.execute(query, {
         "data_type": f"%{data_type}%",
         "premium": f"%{premium}%"
-    }).fetchall()
+    })).fetchall()
     return [row[0] for row in result]
 
 
 # 3️⃣ Get Descriptions (for Category and Sub Category)
 @router.get("/descriptions")
-def get_descriptions(data_type: str, premium: str, category: str, db=Depends(get_db)):
+@cached_response(tags=["economy_master"])
+async def get_descriptions(data_type: str, premium: str, category: str, db: AsyncSession = Depends(get_async_db)):
     """Get unique descriptions for a specific Category and Sub Category"""
     query = text("""
         SELECT DISTINCT Description
@@ -242,19 +250,22 @@ def get_descriptions(data_type: str, premium: str, category: str, db=Depends(get
         AND IsActive = 1
         ORDER BY Description;
     """)
-    result = db.execute(query, {
+    result = (await db.execute(query, {
         "data_type": f"%{data_type}%",
         "premium": f"%{premium}%",
         "category": f"%{category}%"
-    }).fetchall()
+    })).fetchall()
     return [row[0] for row in result]
 
 
 # 3.5️⃣ Get unique values for form fields
 @router.get("/unique-values")
-def get_unique_values(data_type: str, field: str, db=Depends(get_db)):
+@cached_response(tags=["economy_master"])
+async def get_unique_values(data_type: str, field: str,
+                            limit: Optional[int] = Query(None, ge=1),
+                            offset: int = Query(0, ge=0),
+                            db: AsyncSession = Depends(get_async_db)):
     """Get unique values for a specific field, ordered appropriately"""
-    DB_TYPE = os.getenv("DB_TYPE", "sqlite")
     # Map field names to database columns
     field_map = {
         'ProcessedPeriodType': 'ProcessedPeriodType',
@@ -268,96 +279,42 @@ def get_unique_values(data_type: str, field: str, db=Depends(get_db)):
     if field not in field_map:
         return []
 
-    column = field_map[field]
-
-    # Simple query - we'll do sorting in Python for better compatibility
-    query = text(f"""
-        SELECT DISTINCT {column}
-        FROM economy_master
-        WHERE DataType LIKE :data_type
-        AND {column} <> ''
-        AND {column} IS NOT NULL
-        AND IsActive = 1
-    """)
-
+    # FY years / values newest-highest first via their sort keys, text A-Z
     try:
-        result = db.execute(query, {"data_type": f"%{data_type}%"}).fetchall()
-        values = [str(row[0]) for row in result if row[0] is not None]
-
-        # Sort values appropriately
-        if field in ['ProcessedFYYear', 'ReportedValue']:
-            # For numeric fields, sort descending (newest/highest first)
-            try:
-                if field == 'ProcessedFYYear':
-                    # Extract year number for sorting
-                    def extract_year(val):
-                        val_str = str(val).upper().strip()
-                        if val_str.startswith('FY'):
-                            try:
-                                return int(val_str[2:])
-                            except:
-                                return 0
-                        try:
-                            return int(val_str)
-                        except:
-                            return 0
-                    values.sort(key=extract_year, reverse=True)
-                else:  # ReportedValue
-                    # Try to sort by numeric value descending
-                    def extract_numeric(val):
-                        val_str = str(val).strip()
-                        try:
-                            # Try to parse as float
-                            return float(val_str)
-                        except:
-                            # If not numeric, put at end
-                            return float('-inf')
-                    values.sort(key=extract_numeric, reverse=True)
-            except Exception as sort_err:
-                print(f"Error sorting {field}: {sort_err}")
-                # Fallback to simple reverse sort
-                values.sort(reverse=True)
-        else:
-            # For text fields, sort ascending (A-Z)
-            values.sort()
-        return values
+        return await db.run_sync(
+            fetch_unique_values, "economy_master", field_map[field],
+            where="DataType LIKE :data_type AND IsActive = 1",
+            params={"data_type": f"%{data_type}%"},
+            limit=limit,
+            offset=offset
+        )
     except Exception as e:
-        # Fallback to simple query if complex ordering fails
-        print(f"Error in query for {field}, using simple query: {e}")
+        print(f"Error in query for {field}: {e}")
         import traceback
         traceback.print_exc()
-        query = text(f"""
-            SELECT DISTINCT {column}
-            FROM economy_master
-            WHERE DataType LIKE :data_type
-            AND {column} <> ''
-            AND {column} IS NOT NULL
-            AND IsActive = 1
-            ORDER BY {column} {'DESC' if field in ['ProcessedFYYear', 'ReportedValue'] else 'ASC'}
-        """)
-        result = db.execute(query, {"data_type": f"%{data_type}%"}).fetchall()
-        return [str(row[0]) for row in result if row[0] is not None]
+        return []
 
 
 # 4️⃣ Get full table data for both selections
 @router.get("/data")
-def get_data(data_type: str, premium: str, category: str, db=Depends(get_db)):
-    query = text("""
-        SELECT *
+async def get_data(data_type: str, premium: str, category: str,
+                   format: str = format_query(),
+                   db: AsyncSession = Depends(get_async_db)):
+    query = text(f"""
+        SELECT {select_columns("economy_master")}
         FROM economy_master
         WHERE DataType LIKE :data_type
         AND PremiumTypeLongName LIKE :premium
         AND CategoryLongName LIKE :category;
     """)
 
-    result = db.execute(query, {
+    result = await db.execute(query, {
         "data_type": f"%{data_type}%",
         "premium": f"%{premium}%",
         "category": f"%{category}%"
     })
 
-    columns = result.keys()
-    return [dict(zip(columns, row)) for row in result.fetchall()]
+    return tabular_response(result.keys(), result.fetchall(), format)
 
 
 @router.post("/add")
@@ -365,6 +322,7 @@ async def add_economy_row(data: EconomyCreate, db=Depends(get_db)):
     new_record = EconomyMaster(**data.dict())
     db.add(new_record)
     db.commit()
+    invalidate_tags("economy_master")
     db.refresh(new_record)
 
     return {"message": "Record added successfully!", "id": new_record.id}
@@ -383,6 +341,7 @@ async def update_economy_row(id: int, data: EconomyUpdate, db=Depends(get_db)):
         setattr(record, key, value)
 
     db.commit()
+    invalidate_tags("economy_master")
     db.refresh(record)
 
     return {"message": f"Record ID {id} updated successfully!"}
@@ -397,6 +356,7 @@ async def delete_economy_row(id: int, db=Depends(get_db)):
 
     db.delete(record)
     db.commit()
+    invalidate_tags("economy_master")
 
     return {"message": f"Record ID {id} deleted successfully!"}
 
@@ -407,89 +367,24 @@ class DashboardDataRequest(BaseModel):
 
 
 @router.post("/dashboard-data")
-def get_dashboard_data(request: DashboardDataRequest, db=Depends(get_db)):
+async def get_dashboard_data(request: DashboardDataRequest, db: AsyncSession = Depends(get_async_db)):
     """Get all data for selected descriptions, filtered by selected row IDs"""
-    descriptions = request.descriptions
-    if not descriptions or len(descriptions) == 0:
-        return []
-
-    DB_TYPE = os.getenv("DB_TYPE", "sqlite")
-
-    # Get selected row IDs for each description
-    selected_row_ids_map = {}
-    for desc in descriptions:
-        try:
-            # Fetch selected row IDs for this description (try both Domestic and International)
-            for data_type in ['Domestic', 'International']:
-                query = text("""
-                    SELECT row_ids FROM dashboard_selected_row_ids 
-                    WHERE data_type = :data_type AND description = :description
-                """)
-                result = db.execute(
-                    query, {"data_type": data_type, "description": desc})
-                row = result.fetchone()
-                if row:
-                    if DB_TYPE == "mysql":
-                        row_ids = row[0] if isinstance(
-                            row[0], list) else json.loads(row[0])
-                    else:
-                        row_ids = json.loads(row[0])
-                    if desc not in selected_row_ids_map:
-                        selected_row_ids_map[desc] = []
-                    # Ensure row IDs are integers
-                    row_ids_int = [int(rid)
-                                   for rid in row_ids if rid is not None]
-                    selected_row_ids_map[desc].extend(row_ids_int)
-                    print(
-                        f"✅ Loaded {len(row_ids_int)} selected row IDs for '{desc}' ({data_type}): {row_ids_int}")
-        except Exception as e:
-            print(f"Error fetching selected row IDs for {desc}: {e}")
-            # If no selected row IDs found, we'll show all data for that description
-
-    # Create placeholders for IN clause
-    placeholders = ','.join([f':desc{i}' for i in range(len(descriptions))])
-    params = {f'desc{i}': desc for i, desc in enumerate(descriptions)}
-
-    query = text(f"""
-        SELECT *
-        FROM economy_master
-        WHERE Description IN ({placeholders})
-        AND IsActive = 1
-        ORDER BY DataType, PremiumTypeLongName, CategoryLongName, ProcessedFYYear;
-    """)
-
-    result = db.execute(query, params)
-    columns = result.keys()
-    all_data = [dict(zip(columns, row)) for row in result.fetchall()]
-    # Filter by selected row IDs - ONLY show data if row IDs are selected
-    # If a description is selected but has no selected row IDs, don't show any data for it
-    filtered_data = []
-    for item in all_data:
-        desc = item.get('Description', '')
-        item_id = item.get('id')
-        # Only include data if this description has selected row IDs AND this row ID is in the selection
-        if desc in selected_row_ids_map and selected_row_ids_map[desc]:
-            # Convert both to int for comparison (row IDs might be stored as strings in JSON)
-            item_id_int = int(item_id) if item_id is not None else None
-            selected_ids = [
-                int(rid) for rid in selected_row_ids_map[desc] if rid is not None]
-            if item_id_int is not None and item_id_int in selected_ids:
-                filtered_data.append(item)
-        # If description has no selected row IDs, don't include any data (don't show all data)
-
-    print(
-        f"📊 Dashboard filtering: {len(all_data)} total rows, {len(filtered_data)} after row ID filtering")
-    print(f"📋 Selected row IDs map: {selected_row_ids_map}")
-    print(f"📝 Descriptions requested: {descriptions}")
-    print(
-        f"✅ Returning {len(filtered_data)} rows (only rows with selected IDs)")
-
-    return filtered_data
+    # Only rows whose id is selected for their own description are returned;
+    # descriptions without a selection return nothing
+    return await db.run_sync(
+        fetch_selected_dashboard_rows,
+        table="economy_master",
+        descriptions=request.descriptions or [],
+        data_types=['Domestic', 'International'],
+        order_by="m.DataType, m.PremiumTypeLongName, m.CategoryLongName, m.ProcessedFYYear",
+        active_filter="m.IsActive = 1",
+        label="Dashboard"
+    )
 
 
 # 5️⃣ Get selected descriptions (global for all users)
 @router.get("/selected-descriptions")
-def get_selected_descriptions(db=Depends(get_db)):
+async def get_selected_descriptions(db: AsyncSession = Depends(get_async_db)):
     """Get globally selected descriptions for dashboard"""
     try:
         # Check database type
@@ -515,13 +410,13 @@ def get_selected_descriptions(db=Depends(get_db)):
                 )
             """)
 
-        db.execute(create_table_query)
-        db.commit()
+        await db.execute(create_table_query)
+        await db.commit()
 
         # Now fetch descriptions
         query = text(
             "SELECT description FROM dashboard_selected_descriptions ORDER BY id")
-        result = db.execute(query)
+        result = await db.execute(query)
         descriptions = [row[0] for row in result.fetchall()]
         return {"descriptions": descriptions}
     except Exception as e:
@@ -630,7 +525,7 @@ def update_selected_descriptions(request: UpdateSelectedDescriptionsRequest, db=
 
 
 @router.get("/selected-row-ids")
-def get_selected_row_ids(data_type: str, description: str, db=Depends(get_db)):
+async def get_selected_row_ids(data_type: str, description: str, db: AsyncSession = Depends(get_async_db)):
     """Get selected row IDs for a specific description and data type"""
     try:
         DB_TYPE = os.getenv("DB_TYPE", "sqlite")
@@ -659,15 +554,15 @@ def get_selected_row_ids(data_type: str, description: str, db=Depends(get_db)):
                 )
             """)
 
-        db.execute(create_table_query)
-        db.commit()
+        await db.execute(create_table_query)
+        await db.commit()
 
         # Fetch row IDs for this data_type and description
         query = text("""
             SELECT row_ids FROM dashboard_selected_row_ids 
             WHERE data_type = :data_type AND description = :description
         """)
-        result = db.execute(
+        result = await db.execute(
             query, {"data_type": data_type, "description": description})
         row = result.fetchone()
 
@@ -815,7 +710,7 @@ def update_selected_row_ids(request: UpdateSelectedRowIdsRequest, db=Depends(get
 
 # 7️⃣ Get chart configurations for all descriptions
 @router.get("/chart-configs")
-def get_chart_configs(db=Depends(get_db)):
+async def get_chart_configs(db: AsyncSession = Depends(get_async_db)):
     """Get chart configurations (type and dimension) for all descriptions"""
     try:
         DB_TYPE = os.getenv("DB_TYPE", "sqlite")
@@ -844,13 +739,13 @@ def get_chart_configs(db=Depends(get_db)):
                 )
             """)
 
-        db.execute(create_table_query)
-        db.commit()
+        await db.execute(create_table_query)
+        await db.commit()
 
         # Fetch all configurations
         query = text(
             "SELECT description, chart_type, chart_dimension FROM dashboard_chart_config")
-        result = db.execute(query)
+        result = await db.execute(query)
         configs = {}
         for row in result.fetchall():
             configs[row[0]] = {
@@ -1,25 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from sqlalchemy import text, bindparam
-from sqlalchemy.orm import Session
-from databases.database import get_db, DB_TYPE
+from sqlalchemy.ext.asyncio import AsyncSession
+from databases.database import get_async_db, DB_TYPE
 import os
 import re
 from datetime import datetime
 import calendar
-from openpyxl import load_workbook
+import shutil
+import zipfile
+from typing import List, Optional
 import tempfile
-from services.irdai_excel_importer_enhanced import import_irdai_excel
+from starlette.concurrency import run_in_threadpool
+from services.irdai_rollup import range_source, source_text, refresh_irdai_rollup
+from utils.response_cache import cached_response, invalidate_tags
+from utils.tabular_response import format_query, tabular_response
 
 router = APIRouter()
 
 
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "user": os.getenv("DB_USER", "root"),
-    "password": os.getenv("DB_PASSWORD", ""),
-    "database": os.getenv("DB_NAME", "viyanta_web"),
-    "port": int(os.getenv("DB_PORT", 3306))
-}
 # ======================================================
 # UPLOAD IRDAI MONTHLY EXCEL
 # ======================================================
@@ -30,9 +28,10 @@ def extract_report_month_from_filename(filename: str) -> str:
     Example:
     FYP Aug 2023.xlsx → 2023-08-31
     IRDAI December 2024.xlsx → 2024-12-31
+    ... Period ended 31st March, 2018 → 2018-03-31
     """
     match = re.search(
-        r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+(\d{4})',
+        r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*,?\s+(\d{4})',
         filename,
         re.IGNORECASE
     )
@@ -48,6 +47,71 @@ def extract_report_month_from_filename(filename: str) -> str:
     return f"{year}-{month:02d}-{last_day:02d}"
 
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def spool_upload(file: UploadFile, dest_path: str) -> int:
+    """Copy an upload to disk in chunks; returns bytes written"""
+    written = 0
+    with open(dest_path, "wb") as out:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            out.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def extract_xlsx_from_zip(zip_path: str, dest_dir: str) -> List[tuple]:
+    """
+    Unpack the .xlsx members of a zip into dest_dir
+
+    Returns [(member name, extracted path)]; folders are flattened and
+    Office lock files / macOS metadata skipped. Raises ValueError, before
+    anything is extracted, if the archive is over the member count or
+    uncompressed size limits.
+    """
+    from services.irdai_excel_importer_enhanced import (
+        ZIP_MAX_MEMBERS, ZIP_MAX_UNCOMPRESSED_MB, check_zip_limits,
+    )
+
+    os.makedirs(dest_dir, exist_ok=True)
+    extracted = []
+    with zipfile.ZipFile(zip_path) as zf:
+        check_zip_limits(zf, ZIP_MAX_MEMBERS, ZIP_MAX_UNCOMPRESSED_MB)
+        for member in zf.infolist():
+            name = os.path.basename(member.filename)
+            if member.is_dir() or not name.lower().endswith(".xlsx") \
+                    or name.startswith("~$") or member.filename.startswith("__MACOSX/"):
+                continue
+            target = os.path.join(dest_dir, f"{len(extracted)}_{name}")
+            with zf.open(member) as src, open(target, "wb") as out:
+                shutil.copyfileobj(src, out, UPLOAD_CHUNK_SIZE)
+            extracted.append((member.filename, target))
+    return extracted
+
+
+def _report_month_for(sheet: str, title: str, filename: str, prefer_sheet: bool) -> tuple:
+    """
+    Report month from the sheet name, the sheet title or the file name,
+    whichever parses first
+
+    Returns:
+        (report_month, source) where source is 'sheet', 'title' or 'file'
+    """
+    sources = [("sheet", sheet), ("title", title), ("file", filename)]
+    if not prefer_sheet:
+        sources.insert(0, sources.pop())
+    for source, value in sources:
+        try:
+            return extract_report_month_from_filename(value or ""), source
+        except ValueError:
+            continue
+    raise ValueError(
+        f"Cannot extract report month from sheet '{sheet}', its title or file '{filename}'")
+
+
 @router.post("/upload-monthly-excel")
 async def upload_irdai_monthly_excel(
     file: UploadFile = File(...),
@@ -56,9 +120,12 @@ async def upload_irdai_monthly_excel(
     if not file.filename.lower().endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Only .xlsx files allowed")
 
+    # pandas / openpyxl are only needed for uploads
+    from services.irdai_excel_importer_enhanced import import_irdai_excel
+
     with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        tmp.write(await file.read())
         tmp_path = tmp.name
+    await spool_upload(file, tmp_path)
 
     try:
         # 1️⃣ SHEET NAME IS NOW REQUIRED
@@ -70,13 +137,14 @@ async def upload_irdai_monthly_excel(
         # 2️⃣ AUTO-DETECT REPORT MONTH
         report_month = extract_report_month_from_filename(file.filename)
 
-        # 3️⃣ CALL EXISTING IMPORT LOGIC (UNCHANGED)
-        result = import_irdai_excel(
+        # 3️⃣ CALL EXISTING IMPORT LOGIC (in a worker thread, it blocks)
+        result = await run_in_threadpool(
+            import_irdai_excel,
             excel_path=tmp_path,
             sheet_name=sheet_name,
             report_month=report_month,
-            db_config=DB_CONFIG,
         )
+        invalidate_tags("irdai_monthly_data")
 
         return {
             **result,
@@ -92,6 +160,127 @@ async def upload_irdai_monthly_excel(
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
 
+
+@router.post("/upload-monthly-excel/batch")
+async def upload_irdai_monthly_excel_batch(
+    files: List[UploadFile] = File(..., description=".xlsx workbooks and/or .zip archives of them"),
+    sheet_name: Optional[str] = Form(None, description="Import only this sheet of each workbook")
+):
+    """
+    Import a batch of monthly workbooks (e.g. a historical backfill)
+
+    Uploads are spooled to disk in chunks; zips are unpacked. Every sheet
+    (or only `sheet_name`) becomes a job whose report month comes from the
+    sheet name ("as at 30th Sep 2025"), the sheet's title row ("... for the
+    Period ended 30th September 2025") or the file name ("FYP Sep 2025").
+    A sheet whose month only the file name gives is skipped when another
+    sheet already has that month.
+    Jobs run in a worker pool, each sheet in its own transaction, and the
+    rollup is refreshed once at the end.
+    """
+    from services.irdai_excel_importer_enhanced import import_irdai_batch, list_sheet_titles
+
+    with tempfile.TemporaryDirectory(prefix="irdai_batch_") as tmp_dir:
+        workbooks = []  # (display name, path)
+        rejected = []
+        for i, upload in enumerate(files):
+            filename = os.path.basename(upload.filename or f"upload_{i}")
+            lower = filename.lower()
+            if not lower.endswith((".xlsx", ".zip")):
+                rejected.append({"file": filename, "status": "skipped",
+                                 "error": "Only .xlsx and .zip files allowed"})
+                continue
+
+            path = os.path.join(tmp_dir, f"{i}_{filename}")
+            await spool_upload(upload, path)
+
+            if lower.endswith(".zip"):
+                try:
+                    members = await run_in_threadpool(
+                        extract_xlsx_from_zip, path, os.path.join(tmp_dir, f"zip_{i}"))
+                except (zipfile.BadZipFile, ValueError) as e:
+                    rejected.append({"file": filename, "status": "failed", "error": str(e)})
+                    continue
+                workbooks += [(f"{filename}/{member}", member_path)
+                              for member, member_path in members]
+            else:
+                workbooks.append((filename, path))
+
+        jobs, seen_months = [], {}
+        for display_name, path in workbooks:
+            try:
+                titles = await run_in_threadpool(list_sheet_titles, path)
+            except Exception as e:
+                rejected.append({"file": display_name, "status": "failed", "error": str(e)})
+                continue
+
+            sheets = list(titles)
+            if sheet_name:
+                if sheet_name not in sheets:
+                    rejected.append({"file": display_name, "sheet_name": sheet_name,
+                                     "status": "skipped", "error": "Sheet not found"})
+                    continue
+                sheets = [sheet_name]
+
+            for sheet in sheets:
+                try:
+                    report_month, source = _report_month_for(
+                        sheet, titles[sheet], display_name, prefer_sheet=not sheet_name)
+                except ValueError as e:
+                    rejected.append({"file": display_name, "sheet_name": sheet,
+                                     "status": "skipped", "error": str(e)})
+                    continue
+
+                # Two sheets for one month would overwrite each other
+                if report_month in seen_months:
+                    error = f"Duplicate of {seen_months[report_month]}"
+                    if source == "file" and not sheet_name:
+                        error = (f"No month in the sheet name or title, and the file name's "
+                                 f"month ({report_month}) is already imported from "
+                                 f"{seen_months[report_month]}; pass sheet_name to choose the sheet")
+                    rejected.append({"file": display_name, "sheet_name": sheet,
+                                     "report_month": report_month, "status": "skipped",
+                                     "error": error})
+                    continue
+                seen_months[report_month] = f"{display_name} [{sheet}]"
+                jobs.append({"file": display_name, "path": path,
+                             "sheet_name": sheet, "report_month": report_month})
+
+        result = await run_in_threadpool(import_irdai_batch, jobs) \
+            if jobs else {"sheets": [], "rows_inserted": 0, "rollup": None}
+
+    if result["rows_inserted"]:
+        invalidate_tags("irdai_monthly_data")
+
+    # Per-file report
+    by_file = {}
+    for entry in result["sheets"] + rejected:
+        entry = {k: v for k, v in entry.items() if k != "path"}
+        by_file.setdefault(entry["file"], []).append(entry)
+
+    imported = [r for r in result["sheets"] if r["status"] == "success"]
+    problems = len(result["sheets"]) - len(imported) + len(rejected)
+    return {
+        "status": "success" if not problems else ("partial" if imported else "failed"),
+        "sheets_imported": len(imported),
+        "sheets_failed_or_skipped": problems,
+        "rows_inserted": result["rows_inserted"],
+        "files": [{"file": name, "sheets": entries} for name, entries in by_file.items()],
+        "rollup": result["rollup"],
+    }
+
+
+@router.post("/rollup/refresh")
+def refresh_monthly_rollup():
+    """Rebuild irdai_monthly_rollup from irdai_monthly_data (all periods)"""
+    result = refresh_irdai_rollup()
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=result.get("error"))
+
+    invalidate_tags("irdai_monthly_data")
+    return result
+
+
 # ======================================================
 # 1️⃣ PERIOD TYPES
 # ======================================================
@@ -111,9 +300,10 @@ def get_period_types():
 # 2️⃣ PERIOD OPTIONS
 # ======================================================
 @router.get("/period/options")
-def get_period_options(
+@cached_response(tags=["irdai_monthly_data"])
+async def get_period_options(
     type: str = Query(..., description="MONTH | Q | H | FY"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if type == "MONTH":
         sql = text("""
@@ -227,19 +417,21 @@ def get_period_options(
     else:
         raise HTTPException(status_code=400, detail="Invalid period type")
 
-    return db.execute(sql).mappings().all()
+    return (await db.execute(sql)).mappings().all()
 
 
 # ======================================================
 # 3️⃣ DASHBOARD TOTALS (PUBLIC / PRIVATE / GRAND)
 # ======================================================
 @router.get("/dashboard/totals")
-def get_dashboard_totals(
+async def get_dashboard_totals(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           -- FYP
           SUM(CASE WHEN insurer_name = 'LIC of India' THEN fyp_current ELSE 0 END)     AS fyp_public,
@@ -261,15 +453,11 @@ def get_dashboard_totals(
           SUM(CASE WHEN insurer_name = 'Private Total' THEN lives_current ELSE 0 END)AS nol_private,
           SUM(CASE WHEN insurer_name = 'Grand Total' THEN lives_current ELSE 0 END)  AS nol_grand
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND category = insurer_name
-    """)
+    """, source_params)
 
-    r = db.execute(sql, {
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().first()
+    r = (await db.execute(sql, source_params)).mappings().first()
 
     return {
         "FYP": {
@@ -299,12 +487,14 @@ def get_dashboard_totals(
 # 4️⃣ PREMIUM TYPE SUMMARY (PUBLIC vs PRIVATE)
 # ======================================================
 @router.get("/dashboard/premium-type-summary")
-def get_premium_type_summary(
+async def get_premium_type_summary(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           CASE
             WHEN insurer_name = 'LIC of India' THEN 'Public'
@@ -318,8 +508,7 @@ def get_premium_type_summary(
           SUM(lives_current) AS lives,
           SUM(pol_current)   AS policies
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
           AND category IN (
             'Individual Single Premium',
@@ -331,12 +520,9 @@ def get_premium_type_summary(
 
         GROUP BY insurer_type, category
         ORDER BY insurer_type, category
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+    return (await db.execute(sql, source_params)).mappings().all()
 
 
 # ======================================================
@@ -344,15 +530,16 @@ def get_premium_type_summary(
 # ======================================================
 
 @router.get("/dashboard/metric-wise-premium")
-def get_metric_wise_premium_breakup(
+async def get_metric_wise_premium_breakup(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT 'FYP' AS metric, category AS premium_type, SUM(fyp_current) AS value
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
           AND category IN (
             'Individual Single Premium',
@@ -366,8 +553,7 @@ def get_metric_wise_premium_breakup(
         UNION ALL
 
         SELECT 'SA', category, SUM(sa_current)
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
           AND category IN (
             'Individual Single Premium',
@@ -381,8 +567,7 @@ def get_metric_wise_premium_breakup(
         UNION ALL
 
         SELECT 'NOP', category, SUM(pol_current)
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
           AND category IN (
             'Individual Single Premium',
@@ -396,8 +581,7 @@ def get_metric_wise_premium_breakup(
         UNION ALL
 
         SELECT 'NOL', category, SUM(lives_current)
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
           AND category IN (
             'Individual Single Premium',
@@ -409,54 +593,52 @@ def get_metric_wise_premium_breakup(
         GROUP BY category
 
         ORDER BY metric, premium_type
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+    return (await db.execute(sql, source_params)).mappings().all()
 
 
 # ======================================================
 # COMPANYWISE Page
 # 6️⃣ INSURER LIST
 @router.get("/company/insurers")
-def get_company_list(db: Session = Depends(get_db)):
+@cached_response(tags=["irdai_monthly_data"])
+async def get_company_list(db: AsyncSession = Depends(get_async_db)):
     sql = text("""
         SELECT DISTINCT insurer_name
         FROM irdai_monthly_data
         WHERE insurer_name NOT IN ('Private Total', 'Grand Total')
         ORDER BY insurer_name
     """)
-    rows = db.execute(sql).fetchall()
+    rows = (await db.execute(sql)).fetchall()
     return [{"label": r[0], "value": r[0]} for r in rows]
 
 
 # 7️⃣ COMPANY TOTALS
 @router.get("/company/totals")
-def get_company_totals(
+async def get_company_totals(
     insurer_name: str,
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           SUM(fyp_current)   AS fyp,
           SUM(sa_current)    AS sa,
           SUM(pol_current)   AS nop,
           SUM(lives_current) AS nol
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category = insurer_name
-    """)
+    """, source_params)
 
-    row = db.execute(sql, {
+    row = (await db.execute(sql, {
         "insurer_name": insurer_name,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().first()
+        **source_params,
+    })).mappings().first()
 
     if not row:
         return {}
@@ -467,43 +649,45 @@ def get_company_totals(
 
 # 8️⃣ COMPANY PREMIUM TYPE BREAKUP
 @router.get("/company/premium-type")
-def get_company_premium_type_breakup(
+async def get_company_premium_type_breakup(
     insurer_name: str,
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           category AS premium_type,
           SUM(fyp_current)   AS fyp,
           SUM(sa_current)    AS sa,
           SUM(pol_current)   AS nop,
           SUM(lives_current) AS nol
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category <> insurer_name
         GROUP BY category
         ORDER BY category
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
+    return (await db.execute(sql, {
         "insurer_name": insurer_name,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+        **source_params,
+    })).mappings().all()
 
 
 # 9️⃣ COMPANY METRIC-WISE PREMIUM BREAKUP
 @router.get("/company/metric-wise-premium")
-def get_company_metric_wise_premium(
+async def get_company_metric_wise_premium(
     insurer_name: str,
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         /* ======================
            FYP
         ====================== */
@@ -511,8 +695,7 @@ def get_company_metric_wise_premium(
           'FYP' AS metric,
           category AS premium_type,
           SUM(fyp_current) AS value
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category IN (
             'Individual Single Premium',
@@ -532,8 +715,7 @@ def get_company_metric_wise_premium(
           'SA',
           category,
           SUM(sa_current)
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category IN (
             'Individual Single Premium',
@@ -553,8 +735,7 @@ def get_company_metric_wise_premium(
           'NOP',
           category,
           SUM(pol_current)
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category IN (
             'Individual Single Premium',
@@ -574,8 +755,7 @@ def get_company_metric_wise_premium(
           'NOL',
           category,
           SUM(lives_current)
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category IN (
             'Individual Single Premium',
@@ -587,13 +767,12 @@ def get_company_metric_wise_premium(
         GROUP BY category
 
         ORDER BY metric, premium_type
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
+    return (await db.execute(sql, {
         "insurer_name": insurer_name,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+        **source_params,
+    })).mappings().all()
 
 
 # 1️⃣0️⃣ PREMIUM TYPES
@@ -615,59 +794,59 @@ def get_premium_types():
 
 # 1️⃣1️⃣ PREMIUM WISE COMPANIES
 @router.get("/premium/companies")
-def get_premium_wise_companies(
+async def get_premium_wise_companies(
     premium_type: str,
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           insurer_name,
           SUM(fyp_current)   AS fyp,
           SUM(sa_current)    AS sa,
           SUM(pol_current)   AS nop,
           SUM(lives_current) AS nol
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND category = :premium_type
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
         GROUP BY insurer_name
         ORDER BY fyp DESC
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
+    return (await db.execute(sql, {
         "premium_type": premium_type,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+        **source_params,
+    })).mappings().all()
 
 
 # 1️⃣2️⃣ PREMIUM GRAND TOTALS
 @router.get("/premium/grand-totals")
-def get_premium_grand_totals(
+async def get_premium_grand_totals(
     premium_type: str,
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           SUM(fyp_current)   AS fyp,
           SUM(sa_current)    AS sa,
           SUM(pol_current)   AS nop,
           SUM(lives_current) AS nol
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND category = :premium_type
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
-    """)
+    """, source_params)
 
-    r = db.execute(sql, {
+    r = (await db.execute(sql, {
         "premium_type": premium_type,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().first()
+        **source_params,
+    })).mappings().first()
 
     return {
         "premium_type": premium_type,
@@ -680,12 +859,14 @@ def get_premium_grand_totals(
 
 # 1️⃣3️⃣ COMPANY PREMIUM MARKET SHARE
 @router.get("/market-share/company-premium")
-def get_company_premium_market_share(
+async def get_company_premium_market_share(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         /* =========================
            COMPANY TOTAL ROWS
         ========================= */
@@ -700,8 +881,7 @@ def get_company_premium_market_share(
 
           0 AS row_order
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND category = insurer_name
           AND insurer_name NOT IN ('Private Total', 'Grand Total')
 
@@ -723,8 +903,7 @@ def get_company_premium_market_share(
 
           1 AS row_order
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND category IN (
             'Individual Single Premium',
             'Individual Non-Single Premium',
@@ -735,23 +914,22 @@ def get_company_premium_market_share(
 
         GROUP BY insurer_name, category
         ORDER BY insurer_name, row_order, premium_type
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+    return (await db.execute(sql, source_params)).mappings().all()
 
 
 # 1️⃣4️⃣ PREMIUM MARKET SHARE BY INSURER
 @router.get("/market-share/premium-by-insurer")
-def get_premium_market_share_by_insurer(
+async def get_premium_market_share_by_insurer(
     insurer_name: str,
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sql = text("""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         /* =========================
            TOTAL ROW (REAL TOTAL)
         ========================= */
@@ -766,8 +944,7 @@ def get_premium_market_share_by_insurer(
 
           0 AS row_order
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category NOT IN (
             'Individual Single Premium',
@@ -795,8 +972,7 @@ def get_premium_market_share_by_insurer(
 
           1 AS row_order
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND category IN (
             'Individual Single Premium',
@@ -808,13 +984,12 @@ def get_premium_market_share_by_insurer(
 
         GROUP BY insurer_name, category
         ORDER BY row_order, premium_type
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
+    return (await db.execute(sql, {
         "insurer_name": insurer_name,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+        **source_params,
+    })).mappings().all()
 
 
 # 1️⃣4️⃣ GROWTH METRIC TYPES
@@ -845,12 +1020,12 @@ def get_growth_metric_types():
 
 
 @router.get("/growth/company-premium")
-def get_company_premium_growth(
+async def get_company_premium_growth(
     insurer_name: str,
     metric: str,   # FYP | SA | NOP | NOL
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     metric_map = {
         "FYP": {
@@ -896,7 +1071,9 @@ def get_company_premium_growth(
 
     m = metric_map[metric]
 
-    sql = text(f"""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           insurer_name,
           category AS premium_type,
@@ -922,8 +1099,7 @@ def get_company_premium_growth(
             ELSE 1
           END AS row_order
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name = :insurer_name
           AND (
             category NOT IN (
@@ -944,22 +1120,22 @@ def get_company_premium_growth(
 
         GROUP BY insurer_name, category
         ORDER BY row_order, premium_type
-    """)
+    """, source_params)
 
-    return db.execute(sql, {
+    return (await db.execute(sql, {
         "insurer_name": insurer_name,
-        "start_date": start_date,
-        "end_date": end_date
-    }).mappings().all()
+        **source_params,
+    })).mappings().all()
 
 # 1️⃣6️⃣ MONTHWISE – ALL COMPANIES – ALL METRICS
 
 
 @router.get("/monthwise/all-companies-all-metrics")
-def get_monthwise_all_companies_all_metrics(
+async def get_monthwise_all_companies_all_metrics(
     start_date: str,
     end_date: str,
-    db: Session = Depends(get_db)
+    format: str = format_query(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     sql = text("""
         SELECT
@@ -1020,20 +1196,21 @@ def get_monthwise_all_companies_all_metrics(
           category
     """)
 
-    return db.execute(sql, {
+    result = await db.execute(sql, {
         "start_date": start_date,
         "end_date": end_date
-    }).mappings().all()
+    })
+    return tabular_response(result.keys(), result.fetchall(), format)
 # 1️⃣7️⃣ PRIVATE vs PUBLIC TABLE
 
 
 @router.get("/pvt-vs-public/table")
-def get_pvt_vs_public_table(
+async def get_pvt_vs_public_table(
     start_date: str,
     end_date: str,
     sector: str = "BOTH",        # PRIVATE | PUBLIC | BOTH
     premium_type: str = "ALL",   # ALL | Individual Single Premium | ...
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # ----------------------------
     # Sector filter
@@ -1062,7 +1239,9 @@ def get_pvt_vs_public_table(
     else:
         premium_filter = "category = :premium_type"
 
-    sql = text(f"""
+    source, source_params = await db.run_sync(range_source, start_date, end_date)
+
+    sql = source_text(f"""
         SELECT
           insurer_name,
           category AS row_name,
@@ -1084,8 +1263,7 @@ def get_pvt_vs_public_table(
             ELSE 1
           END AS row_order
 
-        FROM irdai_monthly_data
-        WHERE report_month BETWEEN :start_date AND :end_date
+        FROM {source}
           AND insurer_name IN {insurer_filter}
           AND ({premium_filter})
 
@@ -1095,23 +1273,21 @@ def get_pvt_vs_public_table(
           section_order,
           row_order,
           category
-    """)
+    """, source_params)
 
-    params = {
-        "start_date": start_date,
-        "end_date": end_date,
-    }
+    params = dict(source_params)
 
     if premium_type != "ALL":
         params["premium_type"] = premium_type
 
-    return db.execute(sql, params).mappings().all()
+    return (await db.execute(sql, params)).mappings().all()
 
   # 1️⃣8️⃣ PEER INSURERS LIST
 
 
 @router.get("/dropdown/insurers")
-def get_insurer_dropdown(db: Session = Depends(get_db)):
+@cached_response(tags=["irdai_monthly_data"])
+async def get_insurer_dropdown(db: AsyncSession = Depends(get_async_db)):
     sql = text("""
         SELECT DISTINCT insurer_name
         FROM irdai_monthly_data
@@ -1119,7 +1295,7 @@ def get_insurer_dropdown(db: Session = Depends(get_db)):
         AND (insurer_name LIKE '%Limited%' OR insurer_name LIKE 'LIC%') 
         ORDER BY insurer_name
     """)
-    insurers = [r[0] for r in db.execute(sql).all()]
+    insurers = [r[0] for r in (await db.execute(sql)).all()]
 
     return {
         "max_select": 5,
@@ -1128,13 +1304,13 @@ def get_insurer_dropdown(db: Session = Depends(get_db)):
 
 
 @router.get("/peers/comparison")
-def get_peer_comparison(
+async def get_peer_comparison(
     insurers: list[str] = Query(..., description="Select up to 5 insurers"),
     metric: str = Query(..., description="FYP | SA | NOP | NOL"),
     premium_type: str = Query(...),
     start_date: str = Query(...),
     end_date: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # ----------------------------
     # VALIDATIONS
@@ -1203,7 +1379,7 @@ def get_peer_comparison(
         ORDER BY insurer_name
     """)
 
-    rows = db.execute(sql, params).mappings().all()
+    rows = (await db.execute(sql, params)).mappings().all()
 
     # ----------------------------
     # RESPONSE
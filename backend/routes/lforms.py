@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from databases.database import get_db
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from databases.database import get_async_db
 from databases.models import Company, ReportModels
+from services.report_row_store import get_report_rows, project_row_values
+from utils.response_cache import cached_response
+from utils.tabular_response import format_query, tabular_response
 import json
 
 router = APIRouter()
@@ -21,26 +24,29 @@ def get_table_name(company: str):
 
 # 1️⃣ Get all companies
 @router.get("/companies")
-def get_companies(db: Session = Depends(get_db)):
-    result = db.query(Company).order_by(Company.name).all()
+@cached_response(tags=["company"])
+async def get_companies(db: AsyncSession = Depends(get_async_db)):
+    result = (await db.execute(select(Company).order_by(Company.name))).scalars().all()
     return [c.name for c in result]
 
 
 # 🔹 2️⃣ Get distinct periods for company
 @router.get("/periods")
-def get_periods(company: str, db: Session = Depends(get_db)):
+@cached_response(tags=["reports"])
+async def get_periods(company: str, db: AsyncSession = Depends(get_async_db)):
     table = get_table_name(company)
     sql = text(f"""
         SELECT DISTINCT period
         FROM {table}
         ORDER BY period;
     """)
-    return [row[0] for row in db.execute(sql).fetchall()]
+    return [row[0] for row in (await db.execute(sql)).fetchall()]
 
 
 # 🔹 3️⃣ Get distinct L-Forms by company + period
 @router.get("/lforms")
-def get_lforms(company: str, period: str, db: Session = Depends(get_db)):
+@cached_response(tags=["reports"])
+async def get_lforms(company: str, period: str, db: AsyncSession = Depends(get_async_db)):
     table = get_table_name(company)
     sql = text(f"""
         SELECT DISTINCT form_no
@@ -48,13 +54,14 @@ def get_lforms(company: str, period: str, db: Session = Depends(get_db)):
         WHERE period = :period
         ORDER BY form_no;
     """)
-    return [row[0] for row in db.execute(sql, {"period": period}).fetchall()]
+    return [row[0] for row in (await db.execute(sql, {"period": period})).fetchall()]
 
 
 # 🔹 4️⃣ Get Report Types dynamically
 @router.get("/reporttypes")
-def get_report_types(company: str, form_no: str, period: str,
-                     db: Session = Depends(get_db)):
+@cached_response(tags=["reports"])
+async def get_report_types(company: str, form_no: str, period: str,
+                           db: AsyncSession = Depends(get_async_db)):
     table = get_table_name(company)
     sql = text(f"""
         SELECT DISTINCT ReportType
@@ -64,15 +71,16 @@ def get_report_types(company: str, form_no: str, period: str,
         AND ReportType IS NOT NULL
         AND ReportType <> ''
     """)
-    return [row[0] for row in db.execute(sql,
-                                         {"form_no": form_no, "period": period}).fetchall()]
+    return [row[0] for row in (await db.execute(sql,
+                                                {"form_no": form_no, "period": period})).fetchall()]
 
 
 # 5️⃣ Extract Final JSON table rows dynamically
 @router.get("/data")
-def get_report_data(company: str, form_no: str, period: str,
-                    report_type: str | None = None,
-                    db: Session = Depends(get_db)):
+async def get_report_data(company: str, form_no: str, period: str,
+                          report_type: str | None = None,
+                          format: str = format_query(),
+                          db: AsyncSession = Depends(get_async_db)):
 
     table = get_table_name(company)
 
@@ -89,7 +97,7 @@ def get_report_data(company: str, form_no: str, period: str,
         q += " AND ReportType = :report_type"
         params["report_type"] = report_type
 
-    row = db.execute(text(q), params).fetchone()
+    row = (await db.execute(text(q), params)).fetchone()
     if not row:
         raise HTTPException(404, "No matching report found")
 
@@ -105,32 +113,9 @@ def get_report_data(company: str, form_no: str, period: str,
     if not headers:
         raise HTTPException(500, "Headers empty")
 
-    # Step 3: Create JSON_EXTRACT projection
-    json_cols = ", ".join(
-        f'JSON_UNQUOTE(JSON_EXTRACT(item, \'$."{h}"\')) AS `{h}`' for h in headers
-    )
+    # Step 3: Rows come from the per-row cache filled at ingest; older
+    # reports are parsed from data_rows in Python once and then cached
+    rows = await db.run_sync(get_report_rows, table, report_id)
 
-    # Step 4: Recursively extract JSON rows
-    sql = text(f"""
-        WITH RECURSIVE cte AS (
-            SELECT 
-                0 AS idx,
-                JSON_EXTRACT(data_rows, '$[0]') AS item
-            FROM {table}
-            WHERE id = :id
-
-            UNION ALL
-
-            SELECT
-                idx + 1,
-                JSON_EXTRACT(t.data_rows, CONCAT('$[', idx + 1, ']'))
-            FROM cte
-            JOIN {table} t ON t.id = :id
-            WHERE JSON_EXTRACT(t.data_rows, CONCAT('$[', idx + 1, ']')) IS NOT NULL
-        )
-        SELECT {json_cols}
-        FROM cte;
-    """)
-
-    result = db.execute(sql, {"id": report_id}).mappings().all()
-    return [dict(r) for r in result]
+    # Step 4: Project each row onto the flat headers
+    return tabular_response(headers, project_row_values(rows, headers), format)
@@ -14,7 +14,9 @@ import time
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 from services.pdf_splitter import PDFSplitterService
+from services import pdf_catalog
 
 
 # Load environment variables
@@ -163,30 +165,9 @@ async def get_available_companies():
     Get list of all companies that have PDFs
     """
     try:
-        companies = []
-        splits_dir = Path("pdf_splits")
-
-        if splits_dir.exists():
-            for company_folder in splits_dir.iterdir():
-                if company_folder.is_dir():
-                    # Convert folder name back to display name
-                    company_name = company_folder.name.replace(
-                        "_", " ").title()
-
-                    # Count PDFs in this company folder
-                    pdf_count = len(
-                        [f for f in company_folder.iterdir() if f.is_dir()])
-
-                    if pdf_count > 0:
-                        companies.append({
-                            "name": company_name,
-                            "folder_name": company_folder.name,
-                            "pdf_count": pdf_count
-                        })
-
         return {
             "success": True,
-            "companies": companies
+            "companies": pdf_splitter.get_companies()
         }
 
     except Exception as e:
@@ -215,6 +196,8 @@ async def delete_pdf_and_splits(company_name: str, pdf_name: str):
             if pdf_file.is_file():
                 pdf_file.unlink()
 
+        pdf_catalog.remove_pdf(company_name, pdf_name)
+
         return {
             "success": True,
             "message": f"PDF '{pdf_name}' and all splits deleted successfully"
@@ -224,6 +207,19 @@ async def delete_pdf_and_splits(company_name: str, pdf_name: str):
         raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
 
 
+@router.post("/catalog/reconcile")
+async def reconcile_pdf_catalog():
+    """
+    Rebuild the split / extraction catalog from pdf_splits/, extractions/
+    and gemini_verified_json/ (after files were changed outside the API)
+    """
+    result = await run_in_threadpool(pdf_catalog.reconcile_catalog)
+    if not result["success"]:
+        raise HTTPException(
+            status_code=500, detail=f"Catalog reconcile failed: {result['error']}")
+    return result
+
+
 @router.post("/extract-form")
 async def extract_form_data(
     company_name: str = Form(...),
@@ -281,6 +277,32 @@ async def extract_form_data(
         raise HTTPException(status_code=500, detail=detailed_error)
 
 
+@router.get("/master-mapping/status")
+async def get_master_mapping_status():
+    """
+    Status of background master mapping jobs queued by /extract-form
+    (per form_code + company_id: pending / running / done / failed)
+    """
+    from services.master_mapping_queue import mapping_queue, is_async_enabled
+
+    return {
+        "success": True,
+        "async_enabled": is_async_enabled(),
+        **mapping_queue.status()
+    }
+
+
+@router.post("/master-mapping/flush")
+async def flush_master_mapping_queue():
+    """
+    Run all pending master mapping jobs now instead of waiting for the debounce window
+    """
+    from services.master_mapping_queue import mapping_queue
+
+    mapping_queue.flush()
+    return {"success": True, "message": "Pending master mapping jobs scheduled"}
+
+
 @router.get("/companies/{company_name}/pdfs/{pdf_name}/form-preferences")
 async def get_form_preferences(company_name: str, pdf_name: str):
     """
@@ -481,76 +503,29 @@ async def get_extracted_data(company_name: str, pdf_name: str, split_filename: s
     Get previously extracted data for a split - checks both extractions and gemini_verified_json directories
     """
     try:
-        # Helper function to find company directory with flexible naming
-        def find_company_dir(base_path: Path, company_name: str):
-            # Create both underscore and spaced versions
-            company_slug = company_name.lower().replace(" ", "_")
-            company_spaced = company_name.lower().replace("_", " ")
-
-            # Try underscore version first
-            underscore_path = base_path / company_slug
-            if underscore_path.exists():
-                return underscore_path
-
-            # Try spaced version
-            spaced_path = base_path / company_spaced
-            if spaced_path.exists():
-                return spaced_path
-
-            # Try original input as-is
-            original_path = base_path / company_name.lower()
-            if original_path.exists():
-                return original_path
-
-            # If none exist, return the underscore version for consistency
-            return underscore_path
-
-        # Find company directories with flexible naming
-        gemini_company_dir = find_company_dir(
-            Path("gemini_verified_json"), company_name)
-        extractions_company_dir = find_company_dir(
-            Path("extractions"), company_name)
-
-        # Check Gemini-verified directory first (highest priority)
-        gemini_dir = gemini_company_dir / pdf_name
-        gemini_corrected_json = gemini_dir / \
-            f"{Path(split_filename).stem}_corrected.json"
-        gemini_metadata_path = gemini_dir / \
-            f"{Path(split_filename).stem}_metadata.json"
-
-        # Check original extractions directory
-        extractions_dir = extractions_company_dir / pdf_name
-        corrected_json = extractions_dir / \
-            f"{Path(split_filename).stem}_corrected.json"
-        extracted_json = extractions_dir / \
-            f"{Path(split_filename).stem}_extracted.json"
-        metadata_path = extractions_dir / \
-            f"{Path(split_filename).stem}_metadata.json"
-
-        # Priority order: Gemini-verified > corrected > extracted
-        json_path = None
-        metadata_source = None
-        source_type = None
-
-        if gemini_corrected_json.exists():
-            json_path = gemini_corrected_json
-            metadata_source = gemini_metadata_path if gemini_metadata_path.exists() else metadata_path
-            source_type = "gemini_verified"
-            print(f"📋 Using Gemini-verified JSON: {json_path}")
-        elif corrected_json.exists():
-            json_path = corrected_json
-            metadata_source = metadata_path
-            source_type = "corrected"
-            print(f"📋 Using corrected JSON: {json_path}")
-        elif extracted_json.exists():
-            json_path = extracted_json
-            metadata_source = metadata_path
-            source_type = "extracted"
-            print(f"📋 Using extracted JSON: {json_path}")
-
-        if not json_path:
+        # The catalog records where the latest extraction was written; probe
+        # the candidate files only for splits it does not know or stale paths
+        try:
+            located = pdf_catalog.get_split_extraction(
+                company_name, pdf_name, split_filename)
+        except Exception as e:
+            print(f"⚠️ PDF catalog unavailable, probing extraction files: {e}")
+            located = None
+
+        if located is None or (located["source"] and not Path(located["json_path"]).exists()):
+            located = pdf_catalog.locate_extraction(
+                company_name, pdf_name, split_filename)
+            # Bring the catalog up to date (new split, or files moved / removed)
+            pdf_catalog.record_extraction(company_name, pdf_name, split_filename)
+
+        if not located or not located["source"]:
             return {"success": False, "message": "No extraction data found"}
 
+        json_path = Path(located["json_path"])
+        metadata_source = Path(located["metadata_path"]) if located["metadata_path"] else None
+        source_type = located["source"]
+        print(f"📋 Using {source_type} JSON: {json_path}")
+
         with open(json_path, "r", encoding="utf-8") as f:
             data = json.load(f)
 
@@ -0,0 +1,189 @@
+"""
+IRDAI Excel Import Benchmark
+Times the vectorized detailed-format parser against the previous
+cell-by-cell loop on an IRDAI monthly workbook and checks both produce the
+same rows.
+
+With --mysql it also times the write path against the configured MySQL
+database (DB_TYPE=mysql with DB_HOST / DB_USER / ... as for the app): one
+cursor.execute per row versus DELETE + executemany upsert. Both writes use
+a sentinel report_month and are rolled back, so no data is changed.
+
+Usage (from backend/):
+    python scripts/benchmark_irdai_excel_import.py
+    python scripts/benchmark_irdai_excel_import.py --excel "databases/FYP Sep 2025.xlsx" --repeat 20
+    python scripts/benchmark_irdai_excel_import.py --mysql
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_EXCEL = os.path.join(BACKEND_DIR, "databases", "FYP Sep 2025.xlsx")
+BENCH_REPORT_MONTH = "1900-01-31"
+
+
+def parse_cell_by_cell(df, report_month, month_year) -> List[tuple]:
+    """The importer's previous loop (df.iloc per cell), collecting rows"""
+    from services.irdai_excel_importer_enhanced import clean, is_footer_row
+
+    metric_columns = [("fyp", 2), ("pol", 9), ("lives", 16), ("sa", 23)]
+    records = []
+    row = 3
+    while row < len(df):
+        sl = df.iloc[row, 0]
+        insurer = df.iloc[row, 1]
+
+        if is_footer_row(insurer):
+            break
+
+        is_block = (
+            isinstance(insurer, str)
+            and insurer.strip()
+            and (
+                (isinstance(sl, (int, float)) and not math.isnan(sl))
+                or insurer.strip() in ("Private Total", "Grand Total")
+            )
+        )
+
+        if is_block:
+            insurer_name = insurer.strip()
+            categories = [(insurer_name, row)]
+            for k in range(1, 6):
+                if row + k < len(df):
+                    cat = df.iloc[row + k, 1]
+                    if isinstance(cat, str) and cat.strip():
+                        categories.append((cat.strip(), row + k))
+
+            for category, r in categories[:6]:
+                data_block = []
+                for _, start_col in metric_columns:
+                    for i in range(7):
+                        col = start_col + i
+                        data_block.append(clean(df.iloc[r, col] if col < df.shape[1] else None))
+                records.append((report_month, month_year, insurer_name, category, *data_block))
+            row += 6
+        else:
+            row += 1
+    return records
+
+
+def _median_ms(func, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def bench_mysql_write(records_old: List[tuple], records_new: List[tuple], repeat: int) -> Dict:
+    """Per-row INSERT vs DELETE + executemany upsert, each rolled back"""
+    from databases.database import engine
+    from services.irdai_excel_importer_enhanced import UPSERT_DETAILED_SQL, upsert_detailed_rows
+
+    conn = engine.raw_connection()
+    cursor = conn.cursor()
+
+    def per_row():
+        for record in records_old:
+            cursor.execute(UPSERT_DETAILED_SQL, record)
+        conn.rollback()
+
+    def batched():
+        upsert_detailed_rows(cursor, records_new, BENCH_REPORT_MONTH)
+        conn.rollback()
+
+    try:
+        per_row_ms, _ = _median_ms(per_row, repeat)
+        batched_ms, _ = _median_ms(batched, repeat)
+    finally:
+        cursor.close()
+        conn.close()
+
+    return {"per_row_ms": round(per_row_ms, 2), "executemany_ms": round(batched_ms, 2)}
+
+
+def run_benchmark(excel_path: str, sheet_name: Optional[str], repeat: int, mysql: bool) -> Dict:
+    import pandas as pd
+    from services.irdai_excel_importer_enhanced import parse_detailed_rows
+
+    sheet_name = sheet_name or pd.ExcelFile(excel_path).sheet_names[0]
+    read_ms, df = _median_ms(
+        lambda: pd.read_excel(excel_path, sheet_name=sheet_name, header=None), 3)
+    df = df.where(pd.notnull(df), None)
+
+    month_year = datetime.strptime(BENCH_REPORT_MONTH, "%Y-%m-%d").strftime("%b %y")
+    old_ms, old_rows = _median_ms(
+        lambda: parse_cell_by_cell(df, BENCH_REPORT_MONTH, month_year), repeat)
+    new_ms, new_rows = _median_ms(
+        lambda: parse_detailed_rows(df, BENCH_REPORT_MONTH, month_year), repeat)
+
+    report = {
+        "excel": os.path.basename(excel_path),
+        "sheet": sheet_name,
+        "shape": list(df.shape),
+        "rows": len(new_rows),
+        "read_excel_ms": round(read_ms, 2),
+        "parse_cell_by_cell_ms": round(old_ms, 2),
+        "parse_vectorized_ms": round(new_ms, 2),
+        "identical": old_rows == new_rows,
+    }
+    if mysql:
+        report["write"] = bench_mysql_write(old_rows, new_rows, repeat)
+    return report
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 64)
+    print(f"📊 IRDAI EXCEL IMPORT BENCHMARK ({report['excel']})")
+    print("=" * 64)
+    print(f"Sheet: {report['sheet']}  shape {report['shape'][0]}x{report['shape'][1]}  "
+          f"rows parsed: {report['rows']}")
+    print(f"read_excel:             {report['read_excel_ms']:>9} ms")
+    print(f"parse (cell by cell):   {report['parse_cell_by_cell_ms']:>9} ms")
+    print(f"parse (vectorized):     {report['parse_vectorized_ms']:>9} ms  "
+          f"({report['parse_cell_by_cell_ms'] / report['parse_vectorized_ms']:.1f}x)")
+    print(f"same rows:              {'✅' if report['identical'] else '❌'}")
+    if "write" in report:
+        w = report["write"]
+        print(f"write (per-row):        {w['per_row_ms']:>9} ms")
+        print(f"write (executemany):    {w['executemany_ms']:>9} ms  "
+              f"({w['per_row_ms'] / w['executemany_ms']:.1f}x)")
+    print("=" * 64 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the IRDAI monthly Excel importer")
+    parser.add_argument("--excel", default=DEFAULT_EXCEL)
+    parser.add_argument("--sheet", help="Sheet name (default: first sheet)")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Runs per measurement (median is reported)")
+    parser.add_argument("--mysql", action="store_true",
+                        help="Also time writes against the configured MySQL database")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.excel, args.sheet, args.repeat, args.mysql)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+    return 0 if report["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+IRDAI Rollup Benchmark
+Compares the /api/irdai-monthly aggregate endpoints answered from
+irdai_monthly_rollup against the raw irdai_monthly_data scan.
+
+By default it fills a throwaway SQLite database with synthetic monthly data
+(insurers x categories x months), builds the rollup, then calls every
+endpoint handler for a set of date ranges with the rollup on and off. It
+checks the two paths return the same numbers and reports median latency.
+
+Usage (from backend/):
+    python scripts/benchmark_irdai_rollup.py
+    python scripts/benchmark_irdai_rollup.py --months 60 --insurers 40 --repeat 7
+    python scripts/benchmark_irdai_rollup.py --use-app-db   # current DB_TYPE database
+"""
+import argparse
+import asyncio
+import calendar
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PREMIUM_TYPES = [
+    "Individual Single Premium",
+    "Individual Non-Single Premium",
+    "Group Single Premium",
+    "Group Non-Single Premium",
+    "Group Yearly Renewable Premium",
+]
+
+
+def _month_ends(count: int, last: date) -> List[date]:
+    months = []
+    year, month = last.year, last.month
+    for _ in range(count):
+        months.append(date(year, month, calendar.monthrange(year, month)[1]))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return sorted(months)
+
+
+def seed_synthetic(engine, months: int, insurers: int, seed: int = 7) -> int:
+    """Insert synthetic irdai_monthly_data rows; returns rows inserted"""
+    from sqlalchemy import text
+    from services.irdai_rollup import METRIC_COLUMNS
+
+    rng = random.Random(seed)
+    names = ["LIC of India"] + [f"Insurer {i:02d} Life Insurance Company Limited"
+                                for i in range(1, insurers)]
+    names += ["Private Total", "Grand Total"]
+
+    columns = ["report_month", "month_year", "insurer_name", "category"] + METRIC_COLUMNS
+    insert = text(f"""
+        INSERT INTO irdai_monthly_data ({', '.join(columns)})
+        VALUES ({', '.join(':' + c for c in columns)})
+    """)
+
+    rows = []
+    for m in _month_ends(months, date(2025, 3, 31)):
+        for name in names:
+            # The insurer total row uses category = insurer_name
+            for category in [name] + PREMIUM_TYPES:
+                row = {
+                    "report_month": m.isoformat(),
+                    "month_year": m.strftime("%b %y"),
+                    "insurer_name": name,
+                    "category": category,
+                }
+                for c in METRIC_COLUMNS:
+                    row[c] = round(rng.uniform(0, 5000), 2)
+                rows.append(row)
+
+    with engine.begin() as conn:
+        conn.execute(insert, rows)
+    return len(rows)
+
+
+def _normalize(value):
+    """Make raw/rollup results comparable (Decimal vs float, row mappings)"""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if hasattr(value, "keys") and hasattr(value, "__getitem__"):
+        return {k: _normalize(value[k]) for k in value.keys()}
+    if isinstance(value, (Decimal, float)):
+        return round(float(value), 2)
+    return value
+
+
+def build_cases(months: List[date], insurer: str) -> List[Dict]:
+    """(endpoint, kwargs) pairs across month, quarter, FY and multi-year ranges"""
+    from routes import irdai_monthly as r
+
+    last = months[-1]
+    ranges = {
+        "month": (last.replace(day=1), last),
+        "quarter": (months[-3].replace(day=1), last),
+        "fy": (months[-12].replace(day=1), last),
+        "all": (months[0].replace(day=1), last),
+        # Straddles FY boundaries: mix of months, quarters and a full FY
+        "ragged": (months[-17].replace(day=1), months[-2]),
+    }
+
+    endpoints = [
+        ("dashboard/totals", r.get_dashboard_totals, {}),
+        ("dashboard/premium-type-summary", r.get_premium_type_summary, {}),
+        ("dashboard/metric-wise-premium", r.get_metric_wise_premium_breakup, {}),
+        ("company/totals", r.get_company_totals, {"insurer_name": insurer}),
+        ("company/premium-type", r.get_company_premium_type_breakup, {"insurer_name": insurer}),
+        ("company/metric-wise-premium", r.get_company_metric_wise_premium, {"insurer_name": insurer}),
+        ("premium/companies", r.get_premium_wise_companies, {"premium_type": PREMIUM_TYPES[0]}),
+        ("premium/grand-totals", r.get_premium_grand_totals, {"premium_type": PREMIUM_TYPES[0]}),
+        ("market-share/company-premium", r.get_company_premium_market_share, {}),
+        ("market-share/premium-by-insurer", r.get_premium_market_share_by_insurer, {"insurer_name": insurer}),
+        ("growth/company-premium", r.get_company_premium_growth, {"insurer_name": insurer, "metric": "FYP"}),
+        ("pvt-vs-public/table", r.get_pvt_vs_public_table, {"sector": "BOTH", "premium_type": "ALL"}),
+    ]
+
+    cases = []
+    for range_name, (start, end) in ranges.items():
+        for name, func, extra in endpoints:
+            cases.append({
+                "endpoint": name,
+                "range": range_name,
+                "func": func,
+                "kwargs": {"start_date": start.isoformat(), "end_date": end.isoformat(), **extra},
+            })
+    return cases
+
+
+async def time_call(func, kwargs, repeat: int):
+    from databases.database import AsyncSessionLocal
+
+    timings = []
+    result = None
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            result = await func(db=db, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), _normalize(result)
+
+
+async def run_cases(cases: List[Dict], repeat: int) -> List[Dict]:
+    """Time each case with the rollup off and on, on one event loop"""
+    from databases.database import async_engine
+    from services import irdai_rollup
+
+    results = []
+    try:
+        for case in cases:
+            irdai_rollup.ROLLUP_ENABLED = False
+            raw_ms, raw_result = await time_call(case["func"], case["kwargs"], repeat)
+            irdai_rollup.ROLLUP_ENABLED = True
+            rollup_ms, rollup_result = await time_call(case["func"], case["kwargs"], repeat)
+
+            results.append({
+                "endpoint": case["endpoint"],
+                "range": case["range"],
+                "raw_ms": round(raw_ms, 2),
+                "rollup_ms": round(rollup_ms, 2),
+                "speedup": round(raw_ms / rollup_ms, 2) if rollup_ms else None,
+                "identical": raw_result == rollup_result,
+            })
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def run_benchmark(months: int, insurers: int, repeat: int, use_app_db: bool) -> Dict:
+    from sqlalchemy import text
+    from databases.database import Base, engine
+    import databases.models  # noqa: F401
+    from services import irdai_rollup
+
+    if not use_app_db:
+        Base.metadata.create_all(bind=engine)
+        seeded = seed_synthetic(engine, months, insurers)
+        print(f"🌱 Seeded {seeded} irdai_monthly_data rows")
+
+    refresh = irdai_rollup.refresh_irdai_rollup()
+    if not refresh.get("success"):
+        raise RuntimeError(refresh.get("error"))
+
+    with engine.connect() as conn:
+        month_list = sorted(irdai_rollup._as_date(r[0]) for r in conn.execute(
+            text("SELECT DISTINCT report_month FROM irdai_monthly_data")))
+        insurer = conn.execute(text("""
+            SELECT insurer_name FROM irdai_monthly_data
+            WHERE insurer_name NOT IN ('Private Total', 'Grand Total', 'LIC of India')
+            LIMIT 1
+        """)).scalar()
+    if len(month_list) < 17:
+        raise RuntimeError("Need at least 17 months of data for the range mix")
+
+    results = asyncio.run(run_cases(build_cases(month_list, insurer), repeat))
+
+    return {
+        "database": engine.url.get_backend_name(),
+        "months": len(month_list),
+        "rollup": refresh,
+        "cases": results,
+    }
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 88)
+    print(f"📊 IRDAI ROLLUP BENCHMARK ({report['database']}, {report['months']} months)")
+    print("=" * 88)
+    print(f"{'endpoint':<34}{'range':<9}{'raw ms':>10}{'rollup ms':>12}{'speedup':>10}  same")
+    for c in report["cases"]:
+        print(f"{c['endpoint']:<34}{c['range']:<9}{c['raw_ms']:>10}{c['rollup_ms']:>12}"
+              f"{str(c['speedup']) + 'x':>10}  {'✅' if c['identical'] else '❌'}")
+
+    raw_total = sum(c["raw_ms"] for c in report["cases"])
+    rollup_total = sum(c["rollup_ms"] for c in report["cases"])
+    mismatches = [c for c in report["cases"] if not c["identical"]]
+    print("-" * 88)
+    print(f"Total: raw {raw_total:.1f} ms, rollup {rollup_total:.1f} ms "
+          f"({raw_total / rollup_total:.2f}x), mismatches: {len(mismatches)}")
+    print("=" * 88 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark IRDAI endpoints: rollup vs raw scan")
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--insurers", type=int, default=26)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Calls per case (median is reported)")
+    parser.add_argument("--use-app-db", action="store_true",
+                        help="Benchmark the configured database instead of synthetic SQLite")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not args.use_app_db:
+            os.environ["DB_TYPE"] = "sqlite"
+            os.environ["SQLITE_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'irdai.db')}"
+        if BACKEND_DIR not in sys.path:
+            sys.path.insert(0, BACKEND_DIR)
+
+        report = run_benchmark(args.months, args.insurers, args.repeat, args.use_app_db)
+
+        from databases.database import engine
+        engine.dispose()
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"💾 Report written to {args.output}")
+
+    return 0 if all(c["identical"] for c in report["cases"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
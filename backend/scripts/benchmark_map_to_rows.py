@@ -0,0 +1,161 @@
+"""
+map_to_rows Benchmark
+Maps a synthetic extracted table (header rows, metadata rows, blank rows,
+unsplit row strings, rows with extra cells) onto template headers the way
+extract_form does for each table of a form, and times it:
+
+    row-by-row    map_rows_rowwise, the reference
+    vectorized    column-wise path (map_frame_to_rows)
+
+for a list table (pdfplumber / text extraction: ragged rows, row strings)
+and a camelot-style DataFrame (same table without ragged rows). Both paths
+must return the same rows on the same input. --profile prints the cProfile
+hot path of both paths on the DataFrame and their Python function calls,
+which are stable across runs where the timings are not.
+
+Usage (from backend/):
+    python scripts/benchmark_map_to_rows.py
+    python scripts/benchmark_map_to_rows.py --rows 300 --tables 60 --profile
+"""
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+HEADERS = ["Sl No", "Particulars", "Schedule", "Current Year", "Previous Year"]
+PAGE_TEXT = (
+    "FORM L-1-A-RA\n"
+    "SAMPLE LIFE INSURANCE COMPANY LIMITED\n"
+    "Regn. No. 111 dated 29.03.2001\n"
+    "REVENUE ACCOUNT FOR THE QUARTER ENDED 30th June 2024\n"
+    "(Amount in Rs. Lakhs)\n"
+)
+TEMPLATE = {"Form No": "L-1-A-RA", "Title": "Revenue Account", "FlatHeaders": HEADERS}
+
+
+def make_table(rows: int) -> List:
+    """Camelot-style table: list of cell lists, plus some unsplit row strings"""
+    table = [
+        ["", "FORM L-1-A-RA", "", "", ""],
+        ["Sl No", "Particulars", "Schedule", "Current Year (Rs in Lakhs)", "Previous Year"],
+    ]
+    for i in range(rows):
+        kind = i % 8
+        if kind == 0:
+            table.append(["", "", "", "", ""])
+        elif kind == 1:
+            table.append(["Particulars", "Current", "Previous", "Total", "Rs"])
+        elif kind == 2:
+            table.append(f"{i}  Other income   {i * 3},{i % 1000:03d}  (12)")
+        elif kind == 3:
+            table.append(["Net", f"Premium {i}", "L-4", "", "", "extra", f"{i}"])
+        elif kind == 4:
+            table.append(["Sample Life Insurance Company Limited", "", "", "", ""])
+        elif kind == 5:
+            table.append([None, f"Benefits paid {i}\n(net)", "L-6", f"{i * 12.5:,.2f}", f"({i:,})"])
+        else:
+            table.append([str(i), f"Commission {i}; first year", "L-5",
+                          f"{i * 1234.5:,.2f}", f"{i * 987:,.0f}"])
+    return table
+
+
+@contextlib.contextmanager
+def _quiet():
+    """map_to_rows logs every row"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def run_benchmark(rows: int, tables: int, repeat: int, profile: bool = False) -> Dict:
+    import pandas as pd
+    from services import pdf_splitted_extraction as pse
+
+    table = make_table(rows)
+    frame = pd.DataFrame([row for row in table if isinstance(row, list) and len(row) == len(HEADERS)])
+    with _quiet():
+        meta = pse.extract_metadata(PAGE_TEXT, TEMPLATE)
+
+    def run(data, vectorized):
+        return [pse.map_to_rows(data, HEADERS, meta, vectorized=vectorized) for _ in range(tables)]
+
+    cases = []
+    for input_name, data in (("list", table), ("DataFrame", frame)):
+        cases += [
+            (input_name, "row-by-row", lambda d=data: run(d, False)),
+            (input_name, "vectorized", lambda d=data: run(d, True)),
+        ]
+
+    results, references = {}, {}
+    for input_name, name, fn in cases:
+        times = []
+        for _ in range(repeat):
+            with _quiet():
+                start = time.perf_counter()
+                output = fn()
+                times.append(time.perf_counter() - start)
+        reference = references.setdefault(input_name, output)
+        results[f"{input_name}: {name}"] = {
+            "seconds": round(statistics.median(times), 4),
+            "rows_out": len(output[0]),
+            "identical": output == reference,
+        }
+
+    report = {"rows": rows, "tables": tables, "cases": results}
+    if profile:
+        report["profile_calls"] = {}
+        for name, vectorized in (("row-by-row", False), ("vectorized", True)):
+            profiler = cProfile.Profile()
+            with _quiet():
+                profiler.enable()
+                run(frame, vectorized)
+                profiler.disable()
+            stats = pstats.Stats(profiler)
+            report["profile_calls"][name] = stats.total_calls
+            print(f"\n--- {name} ---")
+            stats.sort_stats("tottime").print_stats(8)
+    return report
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 64)
+    print(f"📊 MAP_TO_ROWS BENCHMARK ({report['tables']} tables x {report['rows']} rows)")
+    print("=" * 64)
+    print(f"{'case':<28}{'seconds':>10}{'rows out':>10}{'identical':>12}")
+    for name, r in report["cases"].items():
+        print(f"{name:<28}{r['seconds']:>10}{r['rows_out']:>10}{str(r['identical']):>12}")
+    for name, calls in report.get("profile_calls", {}).items():
+        print(f"Profiled function calls, DataFrame {name}: {calls}")
+    print("=" * 64 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark map_to_rows")
+    parser.add_argument("--rows", type=int, default=300, help="Rows per table")
+    parser.add_argument("--tables", type=int, default=20, help="Tables per form")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (median)")
+    parser.add_argument("--profile", action="store_true", help="Print the cProfile hot path")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.rows, args.tables, args.repeat, args.profile)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0 if all(r["identical"] for r in report["cases"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
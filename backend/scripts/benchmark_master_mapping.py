@@ -0,0 +1,413 @@
+"""
+Master Mapping Benchmark
+Measures throughput and mapping quality of master_row_mapping_pipeline.
+
+Loads a frozen fixture of extracted L-form particulars (with a gold canonical
+label per row) into a throwaway SQLite database and runs the real pipeline
+end to end:
+
+    full         MasterMappingPipeline.run() over the seed companies
+    targeted     run_targeted_mapping() for the holdout_targeted companies
+    incremental  run_incremental() for the holdout_incremental companies
+
+For every phase it reports rows/sec, peak memory, time per stage (load,
+normalize, match, cluster, upsert, sync, write), cluster count and
+purity / inverse purity of the resulting master_row_ids against the gold
+labels. Peak memory is the phase's own tracemalloc peak (Python objects
+and numpy buffers, tracing restarted per phase); a process-wide RSS peak
+would only ever report the largest phase so far. Tracing adds some
+overhead to every phase's timings alike. Results are printed and optionally written as JSON so a later run
+can be compared with --baseline.
+
+Usage (from backend/):
+    python scripts/benchmark_master_mapping.py
+    python scripts/benchmark_master_mapping.py --scale 20 --output bench.json
+    python scripts/benchmark_master_mapping.py --baseline bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE = os.path.join(
+    BACKEND_DIR, "scripts", "fixtures", "master_mapping_gold.json")
+
+# Stage name -> (import path of owner, attribute) wrapped for timing
+STAGE_HOOKS = [
+    ("load", "db", "get_extracted_rows"),
+    ("load", "db", "get_unmapped_rows"),
+    ("load", "db", "fetch_extracted_rows_by_reports"),
+    ("load", "db", "get_existing_masters"),
+    ("normalize", "normalizer", "batch_normalize"),
+    ("match", "pipeline", "_match_existing_masters"),
+    ("cluster", "clusterer", "fit_predict"),
+    ("upsert", "db", "upsert_master_mapping"),
+    ("write", "db", "update_normalized_text"),
+    ("write", "db", "update_master_row_ids"),
+    ("write", "db", "set_watermark"),
+]
+
+
+def start_memory_trace():
+    """Start (or restart) tracing so the next peak is this phase's alone"""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    tracemalloc.start()
+
+
+def stop_memory_trace() -> float:
+    """Peak traced allocation in MB since start_memory_trace()"""
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / (1024 * 1024), 1)
+
+
+def setup_database(db_path: str):
+    """Point the app at a fresh SQLite file and create the schema"""
+    os.environ["DB_TYPE"] = "sqlite"
+    os.environ["SQLITE_DATABASE_URL"] = f"sqlite:///{db_path}"
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    from databases.database import Base, engine
+    import databases.models  # noqa: F401  (registers every table)
+
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+class StageTimer:
+    """Accumulates wall time per stage by wrapping pipeline methods"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+
+    def wrap(self, stage: str, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[stage] += time.perf_counter() - start
+        return timed
+
+    def instrument(self, pipeline):
+        owners = {
+            "db": pipeline.db,
+            "normalizer": pipeline.normalizer,
+            "clusterer": pipeline.clusterer,
+            "pipeline": pipeline,
+        }
+        for stage, owner_name, attr in STAGE_HOOKS:
+            owner = owners[owner_name]
+            if hasattr(owner, attr):
+                setattr(owner, attr, self.wrap(stage, getattr(owner, attr)))
+
+    def reset(self):
+        self.totals.clear()
+
+
+class Fixture:
+    """Frozen particulars per company, replicated `scale` times as reports"""
+
+    def __init__(self, path: str, scale: int = 1):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.form_no: str = data["form_no"]
+        self.companies: List[Dict] = data["companies"]
+        self.scale = max(1, int(scale))
+
+    def companies_for(self, role: str) -> List[Dict]:
+        return [c for c in self.companies if c.get("role", "seed") == role]
+
+
+def load_companies(engine, tables, form_no: str, companies: List[Dict], scale: int) -> Dict:
+    """
+    Insert reports and extracted rows for the given companies
+
+    Returns:
+        {'report_ids': {company_id: [ids]}, 'gold': {extracted_id: label}}
+    """
+    from sqlalchemy import text
+
+    report_ids: Dict[int, List[int]] = defaultdict(list)
+    gold: Dict[int, str] = {}
+
+    insert_report = text(f"""
+        INSERT INTO {tables.reports_table}
+            (company, company_id, form_no, period, data_rows)
+        VALUES (:company, :company_id, :form_no, :period, :data_rows)
+    """)
+    insert_row = text(f"""
+        INSERT INTO {tables.extracted_table}
+            (report_id, company_id, row_index, particulars)
+        VALUES (:report_id, :company_id, :row_index, :particulars)
+    """)
+
+    with engine.begin() as conn:
+        for company in companies:
+            company_id = int(company["company_id"])
+            conn.execute(
+                text("INSERT OR IGNORE INTO company (id, name) VALUES (:id, :name)"),
+                {"id": company_id, "name": company["name"]})
+
+            for copy in range(scale):
+                result = conn.execute(insert_report, {
+                    "company": company["name"],
+                    "company_id": company_id,
+                    "form_no": form_no,
+                    "period": f"Q{copy % 4 + 1} FY{2000 + copy // 4}",
+                    "data_rows": "[]",
+                })
+                report_id = int(result.lastrowid)
+                report_ids[company_id].append(report_id)
+
+                for row_index, row in enumerate(company["rows"]):
+                    inserted = conn.execute(insert_row, {
+                        "report_id": report_id,
+                        "company_id": company_id,
+                        "row_index": row_index,
+                        "particulars": row["particulars"],
+                    })
+                    gold[int(inserted.lastrowid)] = row["gold"]
+
+    return {"report_ids": dict(report_ids), "gold": gold}
+
+
+def score_clusters(engine, tables, gold: Dict[int, str]) -> Dict:
+    """Purity / inverse purity of master_row_id against gold labels"""
+    from sqlalchemy import text
+
+    if not gold:
+        return {"rows": 0}
+
+    with engine.connect() as conn:
+        assigned = {
+            int(row[0]): row[1]
+            for row in conn.execute(text(
+                f"SELECT id, master_row_id FROM {tables.extracted_table}"))
+            if int(row[0]) in gold
+        }
+
+    mapped = {rid: mid for rid, mid in assigned.items() if mid is not None}
+    predicted: Dict[int, Counter] = defaultdict(Counter)
+    actual: Dict[str, Counter] = defaultdict(Counter)
+    for rid, master_row_id in mapped.items():
+        predicted[master_row_id][gold[rid]] += 1
+        actual[gold[rid]][master_row_id] += 1
+
+    total = len(gold)
+    purity = sum(max(c.values()) for c in predicted.values()) / total
+    inverse_purity = sum(max(c.values()) for c in actual.values()) / total
+
+    return {
+        "rows": total,
+        "rows_mapped": len(mapped),
+        "clusters": len(predicted),
+        "gold_clusters": len(set(gold.values())),
+        "purity": round(purity, 4),
+        "inverse_purity": round(inverse_purity, 4),
+    }
+
+
+def run_phase(name: str, func, rows: int, timer: StageTimer, verbose: bool) -> Dict:
+    timer.reset()
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    start_memory_trace()
+    start = time.perf_counter()
+    with sink:
+        result = func()
+    elapsed = time.perf_counter() - start
+    peak_mb = stop_memory_trace()
+
+    stages = {stage: round(seconds, 4)
+              for stage, seconds in sorted(timer.totals.items())}
+    stages["other"] = round(max(elapsed - sum(timer.totals.values()), 0.0), 4)
+
+    success = True
+    if isinstance(result, dict):
+        success = bool(result.get("success", True))
+
+    return {
+        "phase": name,
+        "success": success,
+        "rows": rows,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "peak_mb": peak_mb,
+        "stages": stages,
+        "error": result.get("error") if isinstance(result, dict) else None,
+    }
+
+
+def run_benchmark(fixture_path: str, scale: int, db_path: str, verbose: bool = False) -> Dict:
+    engine = setup_database(db_path)
+
+    # Imported after the database is configured
+    from master_row_mapping_pipeline import MasterMappingPipeline
+    from services import master_rows_sync_service
+    from services.lform_table_registry import resolve_form_tables
+
+    fixture = Fixture(fixture_path, scale)
+    form_no = fixture.form_no
+    tables = resolve_form_tables(form_no)
+    if tables is None:
+        raise ValueError(f"No tables registered for form {form_no}")
+
+    timer = StageTimer()
+    pipeline = MasterMappingPipeline()
+    timer.instrument(pipeline)
+
+    sync_cls = master_rows_sync_service.MasterRowsSyncService
+    sync_cls.sync_master_rows = timer.wrap("sync", sync_cls.sync_master_rows)
+
+    phases = []
+    all_gold: Dict[int, str] = {}
+
+    # Phase 1: full pipeline over the seed companies
+    seed = load_companies(engine, tables, form_no,
+                          fixture.companies_for("seed"), fixture.scale)
+    all_gold.update(seed["gold"])
+    phase = run_phase("full", lambda: pipeline.run(form_no),
+                      len(seed["gold"]), timer, verbose)
+    phase["quality"] = score_clusters(engine, tables, seed["gold"])
+    phases.append(phase)
+
+    # Phase 2: targeted mapping, as run after /extract-form
+    targeted = load_companies(engine, tables, form_no,
+                              fixture.companies_for("holdout_targeted"), fixture.scale)
+    all_gold.update(targeted["gold"])
+
+    def _targeted():
+        results = [
+            pipeline.run_targeted_mapping(
+                company_id=company_id, report_ids=report_ids, form_code=form_no)
+            for company_id, report_ids in targeted["report_ids"].items()
+        ]
+        failed = [r for r in results if not r.get("success")]
+        return failed[0] if failed else {"success": True}
+
+    phase = run_phase("targeted", _targeted,
+                      len(targeted["gold"]), timer, verbose)
+    phase["quality"] = score_clusters(engine, tables, targeted["gold"])
+    phases.append(phase)
+
+    # Phase 3: incremental pass picks up only rows past the watermark
+    if all_gold:
+        pipeline.db.set_watermark(form_no, max(all_gold))
+    incremental = load_companies(engine, tables, form_no,
+                                 fixture.companies_for("holdout_incremental"), fixture.scale)
+    all_gold.update(incremental["gold"])
+    phase = run_phase("incremental", lambda: pipeline.run_incremental(form_no),
+                      len(incremental["gold"]), timer, verbose)
+    phase["quality"] = score_clusters(engine, tables, incremental["gold"])
+    phases.append(phase)
+
+    return {
+        "form_no": form_no,
+        "fixture": os.path.relpath(fixture_path, BACKEND_DIR),
+        "scale": fixture.scale,
+        "phases": phases,
+        "overall": score_clusters(engine, tables, all_gold),
+    }
+
+
+def compare_with_baseline(report: Dict, baseline: Dict) -> List[str]:
+    """One line per phase with deltas against a previous JSON report"""
+    lines = []
+    previous = {p["phase"]: p for p in baseline.get("phases", [])}
+    for phase in report["phases"]:
+        old = previous.get(phase["phase"])
+        if not old:
+            continue
+
+        def _delta(new_value, old_value):
+            if new_value is None or not old_value:
+                return "n/a"
+            return f"{(new_value - old_value) / old_value * 100:+.1f}%"
+
+        lines.append(
+            f"  {phase['phase']:<12} rows/sec {old.get('rows_per_sec')} -> {phase['rows_per_sec']} "
+            f"({_delta(phase['rows_per_sec'], old.get('rows_per_sec'))}), "
+            f"purity {old.get('quality', {}).get('purity')} -> {phase['quality'].get('purity')}"
+        )
+    return lines
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 70)
+    print(
+        f"📊 MASTER MAPPING BENCHMARK - {report['form_no']} (scale x{report['scale']})")
+    print("=" * 70)
+    for phase in report["phases"]:
+        quality = phase["quality"]
+        status = "✅" if phase["success"] else "❌"
+        print(f"\n{status} {phase['phase']}: {phase['rows']} rows in {phase['seconds']}s "
+              f"({phase['rows_per_sec']} rows/sec), peak {phase['peak_mb']} MB allocated")
+        if phase.get("error"):
+            print(f"   Error: {phase['error']}")
+        print("   Stages: " + ", ".join(
+            f"{stage} {seconds}s" for stage, seconds in phase["stages"].items()))
+        print(f"   Clusters: {quality.get('clusters')} (gold {quality.get('gold_clusters')}), "
+              f"purity {quality.get('purity')}, inverse purity {quality.get('inverse_purity')}")
+
+    overall = report["overall"]
+    print(f"\n🏷️  Overall: {overall.get('clusters')} clusters for {overall.get('gold_clusters')} gold labels, "
+          f"purity {overall.get('purity')}, inverse purity {overall.get('inverse_purity')}")
+    print("=" * 70 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark master row mapping throughput and quality")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE,
+                        help="Fixture JSON with particulars and gold labels")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Reports loaded per company (multiplies row count)")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--db-path", help="SQLite file to use (default: temp file)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Show pipeline output")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db_path or os.path.join(tmp_dir, "benchmark.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        report = run_benchmark(os.path.abspath(args.fixture), args.scale,
+                               db_path, verbose=args.verbose)
+
+        # Release the SQLite file before the temp dir is removed
+        from databases.database import engine
+        engine.dispose()
+
+    print_report(report)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("📈 Compared with baseline:")
+        for line in compare_with_baseline(report, baseline):
+            print(line)
+        print()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+    return 0 if all(p["success"] for p in report["phases"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+PDF Split Benchmark
+Runs split_pdf with each split writer backend on the same PDF, checks that
+they produce the same metadata.json and split page counts, and times the
+whole split and the write phase alone:
+
+    pypdf2     PyPDF2 PdfWriter.add_page, sequential (the original path)
+    fitz       PyMuPDF insert_pdf, in-process (the default)
+    fitz xN    PyMuPDF insert_pdf from N spawned worker processes, forced
+               regardless of SPLIT_PARALLEL_MIN_PAGES to measure the pool
+
+Without --pdf a synthetic filing is generated (index pages listing the
+forms, then the form pages with their "FORM L-n" headers).
+
+Usage (from backend/):
+    python scripts/benchmark_pdf_split.py
+    python scripts/benchmark_pdf_split.py --forms 80 --pages-per-form 6 --workers 4
+    python scripts/benchmark_pdf_split.py --pdf "uploads/sbi_life/SBI Life S FY2025 Q1.pdf" \\
+        --company "SBI Life"
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def make_sample_pdf(path: str, forms: int, pages_per_form: int, rows: int = 40):
+    """Synthetic public-disclosure PDF: index pages, then each form's pages"""
+    import fitz
+
+    doc = fitz.open()
+    per_index_page = 45
+    index_pages = -(-forms // per_index_page)
+    for i in range(forms):
+        if i % per_index_page == 0:
+            index = doc.new_page()
+            y = 50
+        start = index_pages + 1 + i * pages_per_form
+        index.insert_text((50, y), f"L-{i + 1} Form schedule {i + 1} {start}-{start + pages_per_form - 1}",
+                          fontsize=10)
+        y += 16
+
+    for i in range(forms):
+        for p in range(pages_per_form):
+            page = doc.new_page()
+            page.insert_text((40, 40), f"FORM L-{i + 1} SCHEDULE {i + 1}", fontsize=10)
+            for r in range(rows):
+                page.insert_text(
+                    (40, 70 + r * 18),
+                    f"Row {r + 1} particulars of schedule {i + 1} page {p + 1}   "
+                    f"{(r + 1) * 1234.5:,.2f}   {(r + 1) * 987.0:,.2f}",
+                    fontsize=8)
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def _normalized_metadata(metadata: Dict, output_root: str) -> Dict:
+    """metadata.json with the run's output folder replaced by a placeholder"""
+    return json.loads(json.dumps(metadata).replace(
+        json.dumps(output_root)[1:-1], "<out>"))
+
+
+def _split_page_counts(metadata: Dict) -> List[int]:
+    import fitz
+    counts = []
+    for split in metadata["split_files"]:
+        with fitz.open(split["path"]) as doc:
+            counts.append(doc.page_count)
+    return counts
+
+
+def run_benchmark(pdf_path: str, company: str, workers: int, repeat: int) -> Dict:
+    from test_extraction import index_extraction
+    from test_extraction.index_extraction import split_pdf, write_splits
+
+    min_pages = index_extraction.SPLIT_PARALLEL_MIN_PAGES
+
+    cases = [("pypdf2", "pypdf2", 1), ("fitz", "fitz", 1)]
+    if workers > 1:
+        cases.append((f"fitz x{workers}", "fitz", workers))
+
+    results, reference = {}, None
+    for name, backend, case_workers in cases:
+        index_extraction.SPLIT_WORKERS = case_workers
+        index_extraction.SPLIT_PARALLEL_MIN_PAGES = 0 if case_workers > 1 else min_pages
+        totals, writes = [], []
+        for _ in range(repeat):
+            out = tempfile.mkdtemp(prefix="split_bench_")
+            try:
+                start = time.perf_counter()
+                _, _, metadata = split_pdf(pdf_path, out, company_name=company, backend=backend)
+                totals.append(time.perf_counter() - start)
+
+                # Write phase alone, same jobs
+                jobs = [(s["filename"], s["start_page"], s["end_page"])
+                        for s in metadata["split_files"]]
+                write_dir = os.path.join(out, "write_only")
+                os.makedirs(write_dir)
+                start = time.perf_counter()
+                errors = write_splits(pdf_path, write_dir, jobs, backend=backend,
+                                      workers=case_workers)
+                writes.append(time.perf_counter() - start)
+                if errors:
+                    raise RuntimeError(f"{name}: {len(errors)} splits failed: {errors}")
+
+                normalized = _normalized_metadata(metadata, out)
+                page_counts = _split_page_counts(metadata)
+            finally:
+                shutil.rmtree(out, ignore_errors=True)
+
+        if reference is None:
+            reference = (normalized, page_counts)
+        results[name] = {
+            "total_s": round(statistics.median(totals), 4),
+            "write_s": round(statistics.median(writes), 4),
+            "splits": len(metadata["split_files"]),
+            "metadata_identical": normalized == reference[0],
+            "pages_identical": page_counts == reference[1],
+        }
+
+    return {"pdf": pdf_path, "cases": results}
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 78)
+    print(f"📊 PDF SPLIT BENCHMARK ({os.path.basename(report['pdf'])})")
+    print("=" * 78)
+    print(f"{'backend':<14}{'split_pdf s':>13}{'write s':>10}{'splits':>8}"
+          f"{'same metadata':>16}{'same pages':>13}")
+    for name, r in report["cases"].items():
+        print(f"{name:<14}{r['total_s']:>13}{r['write_s']:>10}{r['splits']:>8}"
+              f"{str(r['metadata_identical']):>16}{str(r['pages_identical']):>13}")
+    print("=" * 78 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark split_pdf backends")
+    parser.add_argument("--pdf", help="PDF to split (synthetic filing if omitted)")
+    parser.add_argument("--company", default="Benchmark Life",
+                        help="Company name (selects the company-specific range logic)")
+    parser.add_argument("--forms", type=int, default=60, help="Forms in the synthetic PDF")
+    parser.add_argument("--pages-per-form", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Processes for the parallel fitz case")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend (median)")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    tmp_dir = None
+    pdf_path = args.pdf
+    if not pdf_path:
+        tmp_dir = tempfile.mkdtemp(prefix="split_bench_src_")
+        pdf_path = os.path.join(tmp_dir, "Benchmark Life S FY2025 Q1.pdf")
+        make_sample_pdf(pdf_path, args.forms, args.pages_per_form)
+
+    try:
+        report = run_benchmark(pdf_path, args.company, args.workers, args.repeat)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    ok = all(r["metadata_identical"] and r["pages_identical"] for r in report["cases"].values())
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
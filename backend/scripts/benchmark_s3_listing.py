@@ -0,0 +1,167 @@
+"""
+S3 Listing Benchmark
+Seeds a bucket with a users/{user}/{folder}/... tree and times the
+S3Service listings, counting list_objects_v2 calls, cold and cached.
+
+Runs against moto's in-process S3 (pip install moto) by default, or against
+an S3-compatible endpoint such as MinIO with --endpoint-url (the bucket is
+created if missing; seeded keys are deleted afterwards unless --keep).
+
+Usage (from backend/):
+    python scripts/benchmark_s3_listing.py
+    python scripts/benchmark_s3_listing.py --users 20 --folders 10 --files 30
+    python scripts/benchmark_s3_listing.py --endpoint-url http://localhost:9000 \\
+        --access-key minioadmin --secret-key minioadmin
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+BENCH_BUCKET = "viyanta-s3-listing-bench"
+
+
+def seed_keys(users: int, folders: int, files: int) -> List[str]:
+    keys = []
+    for u in range(users):
+        for f in range(folders):
+            prefix = f"users/user{u:03d}/folder{f:03d}"
+            for i in range(files):
+                keys += [
+                    f"{prefix}/pdf/doc{i}.pdf",
+                    f"{prefix}/json/doc{i}.json",
+                    f"{prefix}/doc{i}_original_uploaded.pdf",
+                    f"{prefix}/doc{i}_json_extracted.json",
+                ]
+    return keys
+
+
+def _put_all(client, bucket: str, keys: List[str]):
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda key: client.put_object(Bucket=bucket, Key=key, Body=b"x"), keys))
+
+
+def _delete_all(client, bucket: str, keys: List[str]):
+    for i in range(0, len(keys), 1000):
+        client.delete_objects(Bucket=bucket, Delete={
+            "Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True})
+
+
+def run_benchmark(client, users: int, folders: int, files: int, repeat: int, keep: bool) -> Dict:
+    from services.s3_service import S3Service
+
+    with contextlib.suppress(Exception):
+        client.create_bucket(Bucket=BENCH_BUCKET)
+    keys = seed_keys(users, folders, files)
+    _put_all(client, BENCH_BUCKET, keys)
+
+    calls = []
+    client.meta.events.register(
+        "before-call.s3.ListObjectsV2", lambda **kwargs: calls.append(1))
+    service = S3Service(s3_client=client, bucket_name=BENCH_BUCKET)
+
+    cases = {
+        "list_user_folders": lambda: service.list_user_folders("user000"),
+        "list_user_folder_files": lambda: service.list_user_folder_files("user000", "folder000"),
+        "list_all_users_data": service.list_all_users_data,
+    }
+
+    results = {}
+    try:
+        for name, func in cases.items():
+            cold = []
+            for _ in range(repeat):
+                service._listing_cache.clear()
+                before = len(calls)
+                start = time.perf_counter()
+                result = func()
+                cold.append((time.perf_counter() - start) * 1000)
+                cold_calls = len(calls) - before
+                if not result.get("success"):
+                    raise RuntimeError(f"{name} failed: {result.get('error')}")
+
+            before = len(calls)
+            start = time.perf_counter()
+            func()
+            cached_ms = (time.perf_counter() - start) * 1000
+
+            results[name] = {
+                "cold_ms": round(statistics.median(cold), 2),
+                "list_calls": cold_calls,
+                "cached_ms": round(cached_ms, 3),
+                "cached_list_calls": len(calls) - before,
+            }
+    finally:
+        if not keep:
+            _delete_all(client, BENCH_BUCKET, keys)
+
+    return {"users": users, "folders": folders, "files": files,
+            "keys": len(keys), "workers": service.listing_workers, "cases": results}
+
+
+def print_report(report: Dict):
+    print("\n" + "=" * 72)
+    print(f"📊 S3 LISTING BENCHMARK ({report['keys']} keys: {report['users']} users x "
+          f"{report['folders']} folders, {report['workers']} workers)")
+    print("=" * 72)
+    print(f"{'listing':<26}{'cold ms':>10}{'list calls':>12}{'cached ms':>12}{'calls':>8}")
+    for name, r in report["cases"].items():
+        print(f"{name:<26}{r['cold_ms']:>10}{r['list_calls']:>12}"
+              f"{r['cached_ms']:>12}{r['cached_list_calls']:>8}")
+    print("=" * 72 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark S3Service listings")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--folders", type=int, default=5)
+    parser.add_argument("--files", type=int, default=30,
+                        help="Documents per folder (4 keys each)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Cold runs per listing (median is reported)")
+    parser.add_argument("--endpoint-url", help="S3-compatible endpoint (e.g. MinIO); moto if omitted")
+    parser.add_argument("--access-key", default=os.getenv("AWS_ACCESS_KEY_ID", "testing"))
+    parser.add_argument("--secret-key", default=os.getenv("AWS_SECRET_ACCESS_KEY", "testing"))
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded keys")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    import boto3
+
+    if args.endpoint_url:
+        backend = contextlib.nullcontext()
+    else:
+        try:
+            from moto import mock_aws
+        except ImportError:
+            print("❌ moto is not installed: pip install moto, or pass --endpoint-url")
+            return 1
+        backend = mock_aws()
+
+    with backend:
+        client = boto3.client(
+            "s3", endpoint_url=args.endpoint_url, region_name=args.region,
+            aws_access_key_id=args.access_key, aws_secret_access_key=args.secret_key)
+        report = run_benchmark(client, args.users, args.folders, args.files,
+                               args.repeat, args.keep)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+S3 Transfer Benchmark
+Times S3Service uploads and downloads of large files and JSON documents:
+
+    file upload    single put_object vs upload_file with the TransferConfig
+                   (multipart, parts in parallel)
+    json upload    json.dumps + put_object vs the streamed encoder, plain and
+                   gzip (bytes stored, peak Python memory via tracemalloc)
+    download       get_object().read() vs iter_file_content chunks
+
+Runs against moto's in-process S3 (pip install moto) by default, or against
+an S3-compatible endpoint such as MinIO with --endpoint-url, which is where
+the multipart concurrency shows (moto has no network latency). The bucket is
+created if missing; the benchmark keys are deleted afterwards. Under moto
+the peak memory also counts moto's own copy of the stored object, so compare
+the JSON cases with each other rather than read them as absolute numbers.
+
+Usage (from backend/):
+    python scripts/benchmark_s3_transfer.py
+    python scripts/benchmark_s3_transfer.py --file-mb 128 --json-rows 200000
+    python scripts/benchmark_s3_transfer.py --endpoint-url http://localhost:9000 \\
+        --access-key minioadmin --secret-key minioadmin
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+BENCH_BUCKET = "viyanta-s3-transfer-bench"
+BENCH_PREFIX = "benchmark/transfer"
+MB = 1024 * 1024
+
+
+def sample_extraction(rows: int) -> Dict:
+    """Extraction-shaped JSON document with `rows` table rows"""
+    return {
+        "form_no": "L-2-A",
+        "company": "Benchmark Life",
+        "pages_used": 2,
+        "Rows": [
+            {
+                "Particulars": f"Premium earned - row {i} (₹ in lakhs)",
+                "Schedule": f"L-{i % 40 + 1}",
+                "ForTheQuarterCurrentYear": f"{i * 1234.5:,.2f}",
+                "UpToTheQuarterCurrentYear": f"{i * 4321.0:,.2f}",
+                "ForTheQuarterPreviousYear": f"({i * 98.7:,.2f})",
+                "UpToTheQuarterPreviousYear": "-",
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def _timed(func: Callable) -> Tuple[float, int]:
+    """
+    Seconds of one call, and peak traced Python memory of a second call
+
+    Timed and traced separately: tracemalloc slows allocation-heavy code
+    (the incremental encoder) far more than a single json.dumps.
+    """
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func()
+        return seconds, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _mb_per_s(size: int, seconds: float) -> float:
+    return round(size / MB / seconds, 1) if seconds else 0.0
+
+
+def run_benchmark(client, file_mb: int, json_rows: int) -> Dict:
+    from services.s3_service import S3Service, json_chunks
+
+    with contextlib.suppress(Exception):
+        client.create_bucket(Bucket=BENCH_BUCKET)
+    service = S3Service(s3_client=client, bucket_name=BENCH_BUCKET)
+    keys: List[str] = []
+
+    def key(name: str) -> str:
+        keys.append(f"{BENCH_PREFIX}/{name}")
+        return keys[-1]
+
+    results: Dict[str, Dict] = {}
+    tmp = tempfile.NamedTemporaryFile(suffix=".bin", delete=False)
+    try:
+        tmp.write(os.urandom(file_mb * MB))
+        tmp.close()
+        size = file_mb * MB
+
+        # File uploads
+        def single_put():
+            with open(tmp.name, "rb") as f:
+                client.put_object(Bucket=BENCH_BUCKET, Key=key("file_single.bin"), Body=f.read())
+
+        seconds, _ = _timed(single_put)
+        results["upload: put_object"] = {"seconds": seconds, "mb_s": _mb_per_s(size, seconds)}
+
+        seconds, _ = _timed(lambda: client.upload_file(
+            tmp.name, BENCH_BUCKET, key("file_multipart.bin"), Config=service.transfer_config))
+        results["upload: upload_file (TransferConfig)"] = {
+            "seconds": seconds, "mb_s": _mb_per_s(size, seconds)}
+
+        # Downloads
+        download_key = keys[-1]
+        seconds, peak = _timed(lambda: client.get_object(
+            Bucket=BENCH_BUCKET, Key=download_key)["Body"].read())
+        results["download: get_object().read()"] = {
+            "seconds": seconds, "mb_s": _mb_per_s(size, seconds), "peak_mb": peak / MB}
+
+        def iterate():
+            for _ in service.iter_file_content(download_key):
+                pass
+
+        seconds, peak = _timed(iterate)
+        results["download: iter_file_content"] = {
+            "seconds": seconds, "mb_s": _mb_per_s(size, seconds), "peak_mb": peak / MB}
+
+        # JSON uploads
+        document = sample_extraction(json_rows)
+        json_size = sum(len(c) for c in json_chunks(document, ensure_ascii=False))
+
+        def dumps_put():
+            body = json.dumps(document, indent=2, default=str, ensure_ascii=False).encode("utf-8")
+            client.put_object(Bucket=BENCH_BUCKET, Key=key("doc_dumps.json"), Body=body,
+                              ContentType="application/json")
+
+        for name, func in (
+            ("json: dumps + put_object", dumps_put),
+            ("json: streamed", lambda: service._upload_json_stream(
+                document, key("doc_stream.json"), {}, compress=False, ensure_ascii=False)),
+            ("json: streamed + gzip", lambda: service._upload_json_stream(
+                document, key("doc_stream_gzip.json"), {}, compress=True, ensure_ascii=False)),
+        ):
+            seconds, peak = _timed(func)
+            stored = client.head_object(Bucket=BENCH_BUCKET, Key=keys[-1])["ContentLength"]
+            results[name] = {"seconds": seconds, "mb_s": _mb_per_s(json_size, seconds),
+                             "peak_mb": peak / MB, "stored_mb": stored / MB}
+
+        # The gzip object must read back to the same document
+        restored = json.loads(service.download_file_content(keys[-1]))
+        if restored != json.loads(json.dumps(document, default=str)):
+            raise RuntimeError("gzip JSON round trip mismatch")
+    finally:
+        os.unlink(tmp.name)
+        for k in set(keys):
+            with contextlib.suppress(Exception):
+                client.delete_object(Bucket=BENCH_BUCKET, Key=k)
+
+    config = service.transfer_config
+    return {
+        "file_mb": file_mb,
+        "json_rows": json_rows,
+        "json_mb": json_size / MB,
+        "transfer_config": {
+            "multipart_threshold_mb": config.multipart_threshold / MB,
+            "multipart_chunksize_mb": config.multipart_chunksize / MB,
+            "max_concurrency": config.max_concurrency,
+        },
+        "cases": {name: {k: round(v, 3) for k, v in r.items()} for name, r in results.items()},
+    }
+
+
+def print_report(report: Dict):
+    config = report["transfer_config"]
+    print("\n" + "=" * 78)
+    print(f"📊 S3 TRANSFER BENCHMARK ({report['file_mb']} MB file, "
+          f"{report['json_rows']} row JSON = {report['json_mb']:.1f} MB)")
+    print(f"   multipart above {config['multipart_threshold_mb']:g} MB, "
+          f"{config['multipart_chunksize_mb']:g} MB parts, {config['max_concurrency']} in flight")
+    print("=" * 78)
+    print(f"{'case':<40}{'seconds':>9}{'MB/s':>8}{'peak MB':>10}{'stored MB':>11}")
+    for name, r in report["cases"].items():
+        print(f"{name:<40}{r['seconds']:>9}{r['mb_s']:>8}"
+              f"{r.get('peak_mb', ''):>10}{r.get('stored_mb', ''):>11}")
+    print("=" * 78 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark S3Service transfers")
+    parser.add_argument("--file-mb", type=int, default=64, help="Size of the binary file")
+    parser.add_argument("--json-rows", type=int, default=50000,
+                        help="Rows in the JSON extraction document")
+    parser.add_argument("--endpoint-url", help="S3-compatible endpoint (e.g. MinIO); moto if omitted")
+    parser.add_argument("--access-key", default=os.getenv("AWS_ACCESS_KEY_ID", "testing"))
+    parser.add_argument("--secret-key", default=os.getenv("AWS_SECRET_ACCESS_KEY", "testing"))
+    parser.add_argument("--region", default="us-east-1")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    import boto3
+
+    if args.endpoint_url:
+        backend = contextlib.nullcontext()
+    else:
+        try:
+            from moto import mock_aws
+        except ImportError:
+            print("❌ moto is not installed: pip install moto, or pass --endpoint-url")
+            return 1
+        backend = mock_aws()
+
+    with backend:
+        client = boto3.client(
+            "s3", endpoint_url=args.endpoint_url, region_name=args.region,
+            aws_access_key_id=args.access_key, aws_secret_access_key=args.secret_key)
+        report = run_benchmark(client, args.file_mb, args.json_rows)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Tabular Response Benchmark
+Compares the encodings of utils/tabular_response on a synthetic
+economy_master-shaped result (13 columns: ids, text, FY, values):
+
+    legacy     list of dicts -> jsonable_encoder -> json.dumps (previous JSONResponse path)
+    rows       list of dicts -> orjson               (format=rows)
+    columnar   column arrays -> orjson               (format=columnar)
+    arrow      Arrow IPC stream                      (format=arrow, needs pyarrow)
+
+Reports median encode time and body size, raw and gzip-compressed.
+
+Usage (from backend/):
+    python scripts/benchmark_tabular_response.py
+    python scripts/benchmark_tabular_response.py --rows 100000 --repeat 5
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+COLUMNS = [
+    "id", "ProcessedPeriodType", "ProcessedFYYear", "DataType", "CountryName",
+    "PremiumTypeLongName", "CategoryLongName", "Description", "ReportedUnit",
+    "ReportedValue", "IsActive", "ProcessedFYYearSortKey", "ReportedValueSortKey",
+]
+
+
+def synthetic_rows(count: int, seed: int = 7) -> List[tuple]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        year = rng.randint(2010, 2025)
+        value = Decimal(rng.randint(0, 10_000_000)) / 100
+        rows.append((
+            i + 1, "FY", f"FY{year}", rng.choice(["Domestic", "International"]),
+            rng.choice(["India", "China", "USA", "UK", None]),
+            rng.choice(["Life", "Non-Life", "Health"]),
+            rng.choice(["Gross Premium", "Claims", "Penetration", "Density"]),
+            f"Description {rng.randint(1, 400)}", rng.choice(["INR Cr", "%", "USD Mn"]),
+            str(value), 1, year, float(value),
+        ))
+    return rows
+
+
+def _median_ms(func, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def run_benchmark(row_count: int, repeat: int) -> Dict:
+    from fastapi.encoders import jsonable_encoder
+    from utils.tabular_response import tabular_response
+
+    rows = synthetic_rows(row_count)
+
+    def legacy():
+        payload = [dict(zip(COLUMNS, row)) for row in rows]
+        # Same settings as starlette's JSONResponse
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode("utf-8")
+
+    encoders = {
+        "legacy": legacy,
+        "rows": lambda: tabular_response(COLUMNS, rows, "rows").body,
+        "columnar": lambda: tabular_response(COLUMNS, rows, "columnar").body,
+    }
+    try:
+        import pyarrow  # noqa: F401
+        encoders["arrow"] = lambda: tabular_response(COLUMNS, rows, "arrow").body
+    except ImportError:
+        print("⚠️ pyarrow not installed, skipping format=arrow")
+
+    results = {}
+    for name, func in encoders.items():
+        ms, body = _median_ms(func, repeat)
+        results[name] = {
+            "encode_ms": round(ms, 2),
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, 6)),
+        }
+    return {"rows": row_count, "columns": len(COLUMNS), "formats": results}
+
+
+def print_report(report: Dict):
+    legacy = report["formats"]["legacy"]
+    print("\n" + "=" * 72)
+    print(f"📊 TABULAR RESPONSE BENCHMARK ({report['rows']} rows x {report['columns']} columns)")
+    print("=" * 72)
+    print(f"{'format':<10}{'encode ms':>12}{'cpu':>8}{'bytes':>14}{'size':>8}{'gzip bytes':>14}")
+    for name, r in report["formats"].items():
+        print(f"{name:<10}{r['encode_ms']:>12}{legacy['encode_ms'] / r['encode_ms']:>7.1f}x"
+              f"{r['bytes']:>14}{legacy['bytes'] / r['bytes']:>7.1f}x{r['gzip_bytes']:>14}")
+    print("=" * 72 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the rows / columnar / arrow table encodings")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per encoding (median is reported)")
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.rows, args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
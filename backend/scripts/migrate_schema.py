@@ -0,0 +1,41 @@
+"""
+Migrate Schema
+One-time schema step for a deployment: creates missing tables of all models
+and the sort key columns, then moves the masters of forms that now have
+their own master tables out of the shared ones (helpers/master_tables.py).
+Run it before starting the API workers, which no longer run DDL at import
+(see databases/schema.py).
+
+Usage (from backend/):
+    python scripts/migrate_schema.py
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argparse.ArgumentParser(
+        description="Create missing tables and sort key columns").parse_args(argv)
+
+    from databases.database import engine
+    from databases.schema import ensure_schema
+    from helpers.master_tables import migrate_shared_masters
+
+    try:
+        if not ensure_schema(engine):
+            return 1
+        migrate_shared_masters(engine)
+        return 0
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Reconcile PDF Catalog
+Rebuilds pdf_catalog / pdf_split_catalog from pdf_splits/*/*/metadata.json
+and the extraction outputs in extractions/ and gemini_verified_json/.
+
+Run after split folders or extraction files are copied, restored or deleted
+outside the API (the API keeps the catalog current for its own writes).
+
+Usage (from backend/):
+    python scripts/reconcile_pdf_catalog.py
+    python scripts/reconcile_pdf_catalog.py --splits-dir /data/pdf_splits
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the PDF split / extraction catalog from disk")
+    parser.add_argument("--splits-dir", help="Split folders root (default pdf_splits/)")
+    args = parser.parse_args(argv)
+
+    from databases.database import Base, engine
+    from databases.models import PdfCatalog, PdfSplitCatalog
+    from services.pdf_catalog import reconcile_catalog
+
+    Base.metadata.create_all(
+        bind=engine, tables=[PdfCatalog.__table__, PdfSplitCatalog.__table__])
+
+    result = reconcile_catalog(args.splits_dir)
+    if not result["success"]:
+        return 1
+
+    print(f"📚 {result['pdfs']} PDFs, {result['splits']} splits, "
+          f"{result['extracted']} with extraction output")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
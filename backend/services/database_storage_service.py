@@ -11,6 +11,8 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.exc import IntegrityError
 from services.period_column_detector import PeriodColumnDetector
+from services.report_row_store import store_report_rows
+from utils.response_cache import invalidate_tags
 
 
 class DatabaseStorageService:
@@ -120,6 +122,9 @@ class DatabaseStorageService:
                     )
 
                 db.commit()
+                invalidate_tags("reports", "company")
+                from services import peer_comparison
+                peer_comparison.invalidate(table_key)
 
                 print(f"✅ Successfully stored {len(report_ids)} report(s)")
                 print(f"=== END DATABASE STORAGE ===\n")
@@ -251,52 +256,15 @@ class DatabaseStorageService:
 
         Allowed suffix tables: l6a, l9a, l14a, l25_i, l25_ii (defined in models.py extra_forms)
         Note: Keys are like 'l6a', not 'reports_l6a'
+
+        Delegates to services.lform_table_registry.normalize_lform_key
         """
-        if not form_code:
-            return ""
+        from services.lform_table_registry import normalize_lform_key
 
-        # Extract base form code (L-1, L-6A, etc.)
-        form_code_upper = form_code.upper().replace('_', '-')
-
-        # Define which suffix forms have dedicated tables (from models.py extra_forms)
-        ALLOWED_SUFFIX_TABLES = {'l6a', 'l9a', 'l14a', 'l25_i', 'l25_ii'}
-
-        # Match patterns: L-1-A, L-6A, L-10
-        patterns = [
-            # L-6A or L-2-A (captures number and suffix separately)
-            r'(L-\d+)([A-Z]+)',
-            r'(L-\d+)-([A-Z]+)',  # L-1-A (with dash)
-            r'(L-\d+)',  # L-10 (just number)
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, form_code_upper)
-            if match:
-                if len(match.groups()) == 2:
-                    # Has suffix (e.g., L-6A or L-2-A)
-                    base_num = match.group(1).replace('-', '')  # L6 or L2
-                    suffix = match.group(2).lower()  # 'a'
-
-                    # Try with suffix first (e.g., l6a)
-                    full_key = f"{base_num.lower()}{suffix}"  # e.g., 'l6a'
-
-                    # Check if this suffix form is allowed AND exists in ReportModels
-                    if full_key in ALLOWED_SUFFIX_TABLES and full_key in self.ReportModels:
-                        print(f"[DB] Using specific suffix table: {full_key}")
-                        return full_key
-
-                    # Fall back to base form (e.g., l2)
-                    base_key = base_num.lower()  # Just "l2"
-                    print(
-                        f"[DB] Suffix table '{full_key}' not available, using base: {base_key}")
-                    return base_key
-                else:
-                    # No suffix (e.g., L-10 → l10)
-                    base = match.group(1).replace('-', '').lower()
-                    table_key = base  # Just "l10"
-                    return table_key
-
-        return ""
+        table_key = normalize_lform_key(form_code)
+        if table_key in self.ReportModels:
+            print(f"[DB] Using L-form table key: {table_key}")
+        return table_key
 
     def _insert_reports(
         self,
@@ -384,6 +352,10 @@ class DatabaseStorageService:
                 db.add(report_obj)
                 db.flush()
 
+                # Per-row copy of data_rows served by /api/lforms/data
+                store_report_rows(db, report_model.__tablename__,
+                                  report_obj.id, combined_rows)
+
                 report_ids.append(report_obj.id)
                 print(
                     f"[DB] ✅ Created report ID: {report_obj.id} for period: {report_period}")
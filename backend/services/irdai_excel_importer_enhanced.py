@@ -1,12 +1,23 @@
 """
 Enhanced IRDAI Excel Importer - Handles multiple formats
+
+Sheets are parsed in bulk (vectorized block detection and metric slicing)
+and written with executemany. Re-importing a month replaces the rows it
+previously wrote, keyed by (report_month, insurer_name, category).
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import mysql.connector
 import math
 import os
 import logging
+import time
+import zipfile
+from openpyxl import load_workbook
+
+from databases.database import engine
+from services.irdai_rollup import METRIC_COLUMNS, refresh_irdai_rollup
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,6 +26,12 @@ logger = logging.getLogger(__name__)
 # HELPERS
 # ======================================================
 
+# Footer / notes rows that end the data section
+FOOTER_PREFIXES = (
+    "note", "compiled", "the first year premium", "*consequent", "consequent", "source:"
+)
+
+
 def clean(v):
     """
     Normalize numeric values:
@@ -52,15 +69,7 @@ def is_footer_row(text):
     if not isinstance(text, str):
         return False
 
-    text = text.lower().strip()
-    return (
-        text.startswith("note")
-        or text.startswith("compiled")
-        or text.startswith("the first year premium")
-        or text.startswith("*consequent")
-        or text.startswith("consequent")
-        or text.startswith("source:")
-    )
+    return text.lower().strip().startswith(FOOTER_PREFIXES)
 
 
 def detect_excel_format(df):
@@ -139,7 +148,7 @@ def import_simple_format(df, report_month, month_year, cursor):
     
     # Start reading data
     data_start_row = header_row + 2 if sub_headers else header_row + 1
-    total_inserted = 0
+    records = []
     
     for row in range(data_start_row, len(df)):
         sl = df.iloc[row, 0]
@@ -180,161 +189,319 @@ def import_simple_format(df, report_month, month_year, cursor):
             col_value = data_values[i]
             row_data.extend([col_name, col_value])
         
-        try:
-            cursor.execute(insert_sql, tuple(row_data))
-            total_inserted += 1
-            logger.info(f"Inserted row {row}: {insurer_name}")
-        except Exception as e:
-            logger.error(f"Error inserting row {row} ({insurer_name}): {e}")
-    
-    return total_inserted
+        records.append(tuple(row_data))
+
+    if not records:
+        return 0
+
+    # Re-importing a month replaces its rows for the same insurers
+    insurer_names = list(dict.fromkeys(r[3] for r in records))
+    cursor.execute(
+        "DELETE FROM irdai_monthly_data_simple WHERE report_month = %s "
+        f"AND insurer_name IN ({','.join(['%s'] * len(insurer_names))})",
+        (report_month, *insurer_names),
+    )
+    cursor.executemany(insert_sql, records)
+    logger.info(f"Inserted {len(records)} simple-format rows")
+
+    return len(records)
 
 
 # ======================================================
-# DETAILED FORMAT IMPORTER (Original)
+# DETAILED FORMAT IMPORTER
 # ======================================================
 
-def import_detailed_format(df, report_month, month_year, cursor):
-    """
-    Import detailed format Excel (with sub-categories per insurer)
-    Original logic from irdai_excel_importer.py
-    """
-    
-    insert_sql = """
+# Layout of the detailed sheet: data starts at row 3; each insurer block is
+# a total row (Sl No. set, or Private/Grand Total) followed by up to five
+# premium-category rows; columns 2-29 hold the 4 metric groups x 7 columns
+# in METRIC_COLUMNS order.
+DETAILED_DATA_START_ROW = 3
+DETAILED_BLOCK_ROWS = 6
+DETAILED_FIRST_METRIC_COL = 2
+TOTAL_ROW_NAMES = ("Private Total", "Grand Total")
+
+DETAILED_KEY_COLUMNS = ["report_month", "month_year", "insurer_name", "category"]
+
+UPSERT_DETAILED_SQL = f"""
     INSERT INTO irdai_monthly_data (
-      report_month, month_year, insurer_name, category,
+      {", ".join(DETAILED_KEY_COLUMNS + METRIC_COLUMNS)}
+    ) VALUES (
+      {",".join(["%s"] * (len(DETAILED_KEY_COLUMNS) + len(METRIC_COLUMNS)))}
+    )
+    ON DUPLICATE KEY UPDATE
+      {", ".join(f"{c} = VALUES({c})" for c in ["month_year"] + METRIC_COLUMNS)}
+"""
 
-      fyp_prev, fyp_current, fyp_growth,
-      fyp_ytd_prev, fyp_ytd_current, fyp_growth_ytd, fyp_market_share,
+# (insurer_name, category) pairs per DELETE statement
+_DELETE_BATCH = 500
 
-      pol_prev, pol_current, pol_growth,
-      pol_ytd_prev, pol_ytd_current, pol_growth_ytd, pol_market_share,
 
-      lives_prev, lives_current, lives_growth,
-      lives_ytd_prev, lives_ytd_current, lives_growth_ytd, lives_market_share,
+def _is_number(v):
+    return isinstance(v, (int, float, np.number))
 
-      sa_prev, sa_current, sa_growth,
-      sa_ytd_prev, sa_ytd_current, sa_growth_ytd, sa_market_share
-    ) VALUES (
-      %s,%s,%s,%s,
-      %s,%s,%s,%s,%s,%s,%s,
-      %s,%s,%s,%s,%s,%s,%s,
-      %s,%s,%s,%s,%s,%s,%s,
-      %s,%s,%s,%s,%s,%s,%s
-    )
+
+def clean_block(block):
     """
+    Vectorized clean() over a 2-D block of cells
 
-    # Metric start columns (as per IRDAI format)
-    metric_columns = [
-        ("fyp", 2),
-        ("pol", 9),
-        ("lives", 16),
-        ("sa", 23),
-    ]
+    Same rules as clean(): blanks / NA / '-' / unparseable -> None, comma
+    numbers -> float. Returns an object ndarray of floats and None.
+    """
+    block = np.asarray(block, dtype=object)
+    # One pass over all cells (column-major), reshaped back at the end
+    cells = pd.Series(block.ravel(order="F"), dtype=object)
 
-    row = 3  # Data starts here
-    total_inserted = 0
+    # Numbers convert as-is; only text cells need strip / comma handling
+    numbers = pd.to_numeric(cells.where(cells.map(_is_number)), errors="coerce")
+    is_text = cells.map(lambda v: isinstance(v, str))
+    if is_text.any():
+        text = cells[is_text].astype(str).str.strip().str.replace(",", "", regex=False)
+        numbers = numbers.fillna(pd.to_numeric(text, errors="coerce"))
 
-    while row < len(df):
-        sl = df.iloc[row, 0]
-        insurer = df.iloc[row, 1]
+    values = numbers.to_numpy(dtype=float).reshape(block.shape, order="F")
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out
 
-        # Stop if footer reached
-        if is_footer_row(insurer):
+
+def parse_detailed_rows(df, report_month, month_year):
+    """
+    Parse a detailed-format sheet into irdai_monthly_data rows
+
+    Masks for block starts and footers are computed per column; only the
+    block starts are walked (to keep the original "skip the 6-row block"
+    rule) and the 4 x 7 metric grid is sliced and cleaned in one go.
+
+    Returns:
+        List of tuples in DETAILED_KEY_COLUMNS + METRIC_COLUMNS order
+    """
+    n_rows = len(df)
+    if n_rows <= DETAILED_DATA_START_ROW or df.shape[1] < 2:
+        return []
+
+    serial = df.iloc[:, 0]
+    names = df.iloc[:, 1]
+
+    is_text = names.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    stripped = names.where(is_text, "").astype(str).str.strip()
+    has_name = is_text & (stripped != "").to_numpy()
+    has_serial = serial.map(
+        lambda v: isinstance(v, (int, float)) and not math.isnan(v)
+    ).to_numpy(dtype=bool)
+
+    is_start = has_name & (has_serial | stripped.isin(TOTAL_ROW_NAMES).to_numpy())
+    is_footer = is_text & stripped.str.lower().str.startswith(FOOTER_PREFIXES).to_numpy()
+
+    # Rows inside an accepted block are never inspected, so only visited
+    # rows may start a block or end the sheet
+    block_starts = []
+    next_row = DETAILED_DATA_START_ROW
+    for r in np.flatnonzero(is_start | is_footer):
+        if r < next_row:
+            continue
+        if is_footer[r]:
             break
+        block_starts.append(r)
+        next_row = r + DETAILED_BLOCK_ROWS
+
+    row_index, insurers, categories = [], [], []
+    names_list = stripped.tolist()
+    for start in block_starts:
+        insurer_name = names_list[start]
+        # First row = TOTAL, then the (non-blank) premium categories
+        for r in range(start, min(start + DETAILED_BLOCK_ROWS, n_rows)):
+            if r == start or has_name[r]:
+                row_index.append(r)
+                insurers.append(insurer_name)
+                categories.append(names_list[r])
+
+    if not row_index:
+        return []
+
+    last_col = DETAILED_FIRST_METRIC_COL + len(METRIC_COLUMNS)
+    grid = df.iloc[row_index, DETAILED_FIRST_METRIC_COL:last_col].to_numpy(dtype=object)
+    if grid.shape[1] < len(METRIC_COLUMNS):
+        # Narrow sheet: missing metric columns are None
+        padding = np.full((grid.shape[0], len(METRIC_COLUMNS) - grid.shape[1]), None, dtype=object)
+        grid = np.hstack([grid, padding])
+
+    metrics = clean_block(grid).tolist()
+    return [
+        (report_month, month_year, insurer, category, *values)
+        for insurer, category, values in zip(insurers, categories, metrics)
+    ]
+
 
-        is_block = (
-            isinstance(insurer, str)
-            and insurer.strip()
-            and (
-                (isinstance(sl, (int, float)) and not math.isnan(sl))
-                or insurer.strip() in ("Private Total", "Grand Total")
-            )
+def upsert_detailed_rows(cursor, records, report_month):
+    """
+    Write parsed rows, replacing any earlier import of the same
+    (report_month, insurer_name, category)
+
+    Rows already stored for those keys are deleted first, so re-imports are
+    idempotent even where irdai_monthly_data predates its unique key; the
+    ON DUPLICATE KEY UPDATE covers repeated keys within the sheet.
+    """
+    if not records:
+        return 0
+
+    keys = list(dict.fromkeys((r[2], r[3]) for r in records))
+    for i in range(0, len(keys), _DELETE_BATCH):
+        batch = keys[i:i + _DELETE_BATCH]
+        cursor.execute(
+            "DELETE FROM irdai_monthly_data WHERE report_month = %s "
+            f"AND (insurer_name, category) IN ({','.join(['(%s,%s)'] * len(batch))})",
+            (report_month, *[v for key in batch for v in key]),
         )
 
-        if is_block:
-            insurer_name = insurer.strip()
-
-            # First row = TOTAL
-            categories = [(insurer_name, row)]
-
-            # Next 5 premium categories
-            for k in range(1, 6):
-                if row + k < len(df):
-                    cat = df.iloc[row + k, 1]
-                    if isinstance(cat, str) and cat.strip():
-                        categories.append((cat.strip(), row + k))
-
-            categories = categories[:6]
-
-            for category, r in categories:
-                data_block = []
-
-                for _, start_col in metric_columns:
-                    for i in range(7):
-                        col = start_col + i
-                        val = clean(df.iloc[r, col]
-                                    if col < df.shape[1] else None)
-                        data_block.append(val)
-
-                cursor.execute(
-                    insert_sql,
-                    (
-                        report_month,
-                        month_year,
-                        insurer_name,
-                        category,
-                        *data_block,
-                    ),
-                )
-
-                total_inserted += 1
-
-            row += 6
-        else:
-            row += 1
-    
-    return total_inserted
+    cursor.executemany(UPSERT_DETAILED_SQL, records)
+    return len(records)
+
+
+def import_detailed_format(df, report_month, month_year, cursor):
+    """
+    Import detailed format Excel (with sub-categories per insurer)
+    Block detection as in the original irdai_excel_importer.py
+    """
+    records = parse_detailed_rows(df, report_month, month_year)
+    return upsert_detailed_rows(cursor, records, report_month)
 
 
 # ======================================================
 # MAIN IMPORT FUNCTION (Enhanced)
 # ======================================================
 
-def import_irdai_excel(
+# Uploaded .zip archives and the workbooks themselves (an .xlsx is a zip)
+# are checked against these before anything is decompressed. Sizes come
+# from the central directory; zipfile never reads past a member's declared
+# size, so the check also bounds what extraction writes.
+ZIP_MAX_MEMBERS = int(os.getenv("IRDAI_ZIP_MAX_MEMBERS", "100"))
+ZIP_MAX_UNCOMPRESSED_MB = int(os.getenv("IRDAI_ZIP_MAX_UNCOMPRESSED_MB", "500"))
+WORKBOOK_MAX_MEMBERS = int(os.getenv("IRDAI_WORKBOOK_MAX_MEMBERS", "2000"))
+WORKBOOK_MAX_UNCOMPRESSED_MB = int(os.getenv("IRDAI_WORKBOOK_MAX_UNCOMPRESSED_MB", "200"))
+
+
+def check_zip_limits(zf: zipfile.ZipFile, max_members: int, max_mb: int, label: str = "Archive"):
+    """
+    Reject an archive with too many entries or too much uncompressed data
+
+    Args:
+        zf: Open ZipFile (only the central directory is read)
+        max_members: Maximum number of entries
+        max_mb: Maximum total uncompressed size in MB
+        label: Name used in the error message
+
+    Returns:
+        Total uncompressed size in bytes
+
+    Raises:
+        ValueError: If either limit is exceeded
+    """
+    members = zf.infolist()
+    if len(members) > max_members:
+        raise ValueError(f"{label} has {len(members)} entries (limit {max_members})")
+
+    total = sum(member.file_size for member in members)
+    if total > max_mb * 1024 * 1024:
+        raise ValueError(
+            f"{label} uncompresses to {total / (1024 * 1024):.0f} MB (limit {max_mb} MB)")
+    return total
+
+
+def check_workbook_limits(excel_path: str):
+    """Apply the workbook limits to an .xlsx before openpyxl unpacks it"""
+    with zipfile.ZipFile(excel_path) as zf:
+        check_zip_limits(zf, WORKBOOK_MAX_MEMBERS, WORKBOOK_MAX_UNCOMPRESSED_MB, "Workbook")
+
+
+# Rows searched for the sheet title ("... for the Period ended 30th June, 2021")
+SHEET_TITLE_ROWS = 3
+
+
+def list_sheet_titles(excel_path: str):
+    """
+    {sheet name: title text} of a workbook
+
+    The title is the text cells of the sheet's first SHEET_TITLE_ROWS rows,
+    joined by spaces; only those rows are read.
+    """
+    check_workbook_limits(excel_path)
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        titles = {}
+        for ws in wb.worksheets:
+            cells = [
+                value.strip()
+                for row in ws.iter_rows(max_row=SHEET_TITLE_ROWS, values_only=True)
+                for value in row if isinstance(value, str) and value.strip()
+            ]
+            titles[ws.title] = " ".join(cells)
+        return titles
+    finally:
+        wb.close()
+
+
+def read_sheet_frame(excel_path: str, sheet_name: str):
+    """
+    Load one sheet as a header-less DataFrame of raw cell values
+
+    Uses openpyxl read_only row iteration, which streams the sheet XML
+    instead of building the full workbook model. Trailing blank rows and
+    columns (formatting-only cells) are trimmed so the shape matches
+    pd.read_excel(header=None); missing cells are None.
+    """
+    check_workbook_limits(excel_path)
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = list(wb[sheet_name].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+    df = pd.DataFrame(rows, dtype=object)
+    df = df.where(pd.notnull(df), None)
+
+    filled = df.notna().to_numpy()
+    if not filled.any():
+        return df.iloc[0:0, 0:0]
+    last_row = int(np.flatnonzero(filled.any(axis=1))[-1])
+    last_col = int(np.flatnonzero(filled.any(axis=0))[-1])
+    df = df.iloc[:last_row + 1, :last_col + 1]
+    df.columns = range(df.shape[1])
+    return df
+
+
+def import_irdai_sheet(
     excel_path: str,
     sheet_name: str,
-    report_month: str,
-    db_config: dict
+    report_month: str
 ):
     """
-    Imports IRDAI Monthly Excel into appropriate table
-    Automatically detects format and uses correct importer
+    Import one sheet in its own pooled connection / transaction (no rollup refresh)
+
+    Returns:
+        {'rows_inserted': int, 'report_month': str, 'format': str}
     """
 
     # Month label (ex: Aug 24)
     month_year = datetime.strptime(report_month, "%Y-%m-%d").strftime("%b %y")
 
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
-
     # Read Excel
-    df = pd.read_excel(excel_path, sheet_name=sheet_name, header=None)
-    df = df.where(pd.notnull(df), None)
-    
+    df = read_sheet_frame(excel_path, sheet_name)
+
     # Detect format
     excel_format = detect_excel_format(df)
     logger.info(f"Detected Excel format: {excel_format}")
     logger.info(f"Excel shape: {df.shape[0]} rows x {df.shape[1]} columns")
 
-    total_inserted = 0
+    # DBAPI connection checked out of the shared SQLAlchemy pool
+    conn = engine.raw_connection()
+    cursor = conn.cursor()
 
     try:
         if excel_format == 'simple':
             total_inserted = import_simple_format(df, report_month, month_year, cursor)
         else:
             total_inserted = import_detailed_format(df, report_month, month_year, cursor)
-        
+
         conn.commit()
         logger.info(f"Successfully inserted {total_inserted} rows")
 
@@ -348,8 +515,88 @@ def import_irdai_excel(
         conn.close()
 
     return {
-        "status": "success",
         "rows_inserted": total_inserted,
         "report_month": report_month,
-        "format": excel_format
+        "format": excel_format,
+    }
+
+
+def import_irdai_excel(
+    excel_path: str,
+    sheet_name: str,
+    report_month: str
+):
+    """
+    Imports IRDAI Monthly Excel into appropriate table
+    Automatically detects format and uses correct importer
+    """
+    result = import_irdai_sheet(excel_path, sheet_name, report_month)
+
+    # Re-sum the rollup for this month's financial year
+    rollup = refresh_irdai_rollup(report_months=[report_month])
+    if not rollup.get("success"):
+        logger.warning(f"IRDAI rollup refresh failed: {rollup.get('error')}")
+
+    return {
+        "status": "success",
+        **result,
+        "rollup": rollup
+    }
+
+
+def _is_deadlock(error: Exception) -> bool:
+    """MySQL ER_LOCK_DEADLOCK (1213), as raised by pymysql"""
+    return bool(error.args) and error.args[0] == 1213
+
+
+def _import_job(job: dict):
+    """Run one batch job, retrying once on a lock deadlock between workers"""
+    start = time.perf_counter()
+    for attempt in range(2):
+        try:
+            result = import_irdai_sheet(
+                job["path"], job["sheet_name"], job["report_month"])
+            return {**job, **result, "status": "success",
+                    "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            if _is_deadlock(e) and attempt == 0:
+                logger.warning(f"Deadlock importing {job['sheet_name']}, retrying")
+                continue
+            error = e
+        break
+
+    return {**job, "status": "failed", "rows_inserted": 0, "error": str(error),
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+def import_irdai_batch(jobs, max_workers: int = None):
+    """
+    Import many sheets concurrently, then refresh the rollup once
+
+    Args:
+        jobs: [{'file': str, 'path': str, 'sheet_name': str, 'report_month': str}]
+        max_workers: Worker threads (default IRDAI_IMPORT_WORKERS or 4);
+            each holds one pooled connection while it imports
+
+    Returns:
+        {'sheets': [per-job result in input order], 'rows_inserted': int,
+         'rollup': dict}
+    """
+    max_workers = max_workers or int(os.getenv("IRDAI_IMPORT_WORKERS", "4"))
+    results = [None] * len(jobs)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs) or 1))) as pool:
+        futures = {pool.submit(_import_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    months = sorted({r["report_month"] for r in results if r["status"] == "success"})
+    rollup = refresh_irdai_rollup(report_months=months) if months else None
+    if rollup and not rollup.get("success"):
+        logger.warning(f"IRDAI rollup refresh failed: {rollup.get('error')}")
+
+    return {
+        "sheets": results,
+        "rows_inserted": sum(r["rows_inserted"] for r in results),
+        "rollup": rollup,
     }
@@ -0,0 +1,250 @@
+"""
+IRDAI Monthly Rollup
+Maintains irdai_monthly_rollup, the pre-summed copy of irdai_monthly_data
+that the /api/irdai-monthly aggregate endpoints read, and its period catalog
+irdai_monthly_rollup_periods.
+
+Periods follow the Indian financial year (April - March):
+
+    MONTH  one report_month                     key M:2024-04-30
+    Q      FY quarter to date (Apr-Jun = Q1)    key Q:2024-25-Q1
+    FY     financial year to date               key FY:2024-25
+
+A dashboard range [start_date, end_date] is answered by the fewest periods
+that lie entirely inside it (whole FYs, then whole quarters, then single
+months), so SUM() over the chosen rollup rows equals SUM() over the raw rows
+with report_month BETWEEN start_date AND end_date.
+
+Environment:
+    IRDAI_ROLLUP_ENABLED   "0" makes endpoints scan irdai_monthly_data directly
+"""
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+
+from databases.database import engine as default_engine
+
+ROLLUP_TABLE = "irdai_monthly_rollup"
+PERIODS_TABLE = "irdai_monthly_rollup_periods"
+RAW_TABLE = "irdai_monthly_data"
+
+ROLLUP_ENABLED = os.getenv("IRDAI_ROLLUP_ENABLED", "1") != "0"
+
+METRIC_COLUMNS = [
+    f"{prefix}_{suffix}"
+    for prefix in ("fyp", "pol", "lives", "sa")
+    for suffix in ("prev", "current", "growth", "ytd_prev", "ytd_current",
+                   "growth_ytd", "market_share")
+]
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def fy_key(d: date) -> str:
+    """Financial year of a date, e.g. 2024-05-31 -> '2024-25'"""
+    start_year = d.year if d.month >= 4 else d.year - 1
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def q_key(d: date) -> str:
+    """FY quarter of a date, e.g. 2024-05-31 -> '2024-25-Q1'"""
+    quarter = ((d.month - 4) % 12) // 3 + 1
+    return f"{fy_key(d)}-Q{quarter}"
+
+
+def _build_periods(months: Iterable[date]) -> List[Dict]:
+    """MONTH / Q / FY period rows for a set of report_month dates"""
+    months = sorted(set(months))
+    quarters: "OrderedDict[str, List[date]]" = OrderedDict()
+    years: "OrderedDict[str, List[date]]" = OrderedDict()
+
+    periods = []
+    for m in months:
+        periods.append({
+            "period_type": "MONTH", "period_key": f"M:{m.isoformat()}",
+            "fy_key": fy_key(m), "q_key": q_key(m),
+            "period_start": m, "period_end": m,
+        })
+        quarters.setdefault(q_key(m), []).append(m)
+        years.setdefault(fy_key(m), []).append(m)
+
+    for key, members in quarters.items():
+        periods.append({
+            "period_type": "Q", "period_key": f"Q:{key}",
+            "fy_key": fy_key(members[0]), "q_key": key,
+            "period_start": members[0], "period_end": members[-1],
+        })
+    for key, members in years.items():
+        periods.append({
+            "period_type": "FY", "period_key": f"FY:{key}",
+            "fy_key": key, "q_key": None,
+            "period_start": members[0], "period_end": members[-1],
+        })
+    return periods
+
+
+def refresh_irdai_rollup(report_months: Optional[Iterable] = None, engine=None) -> Dict:
+    """
+    Rebuild irdai_monthly_rollup from irdai_monthly_data
+
+    Args:
+        report_months: Months just imported; only their financial years are
+            rebuilt. None rebuilds everything.
+        engine: SQLAlchemy engine (defaults to the app engine)
+
+    Returns:
+        {'success': bool, 'periods': int, 'rows': int, 'financial_years': [...],
+         'seconds': float, 'error': str (if failed)}
+    """
+    engine = engine or default_engine
+    start = time.perf_counter()
+
+    metric_list = ", ".join(METRIC_COLUMNS)
+    metric_sums = ", ".join(f"SUM({c})" for c in METRIC_COLUMNS)
+    insert_sql = text(f"""
+        INSERT INTO {ROLLUP_TABLE} (
+            period_type, period_key, fy_key, q_key, period_start, period_end,
+            insurer_name, category, {metric_list}, row_count
+        )
+        SELECT
+            :period_type, :period_key, :fy_key, :q_key, :period_start, :period_end,
+            insurer_name, category, {metric_sums}, COUNT(*)
+        FROM {RAW_TABLE}
+        WHERE report_month BETWEEN :period_start AND :period_end
+        GROUP BY insurer_name, category
+    """)
+
+    try:
+        with engine.begin() as conn:
+            months = [
+                _as_date(r[0]) for r in conn.execute(
+                    text(f"SELECT DISTINCT report_month FROM {RAW_TABLE}"))
+                if r[0] is not None
+            ]
+
+            if report_months is None:
+                for table in (ROLLUP_TABLE, PERIODS_TABLE):
+                    conn.execute(text(f"DELETE FROM {table}"))
+                affected = sorted({fy_key(m) for m in months})
+            else:
+                affected = sorted({fy_key(_as_date(m)) for m in report_months})
+                months = [m for m in months if fy_key(m) in affected]
+                if affected:
+                    for table in (ROLLUP_TABLE, PERIODS_TABLE):
+                        conn.execute(
+                            text(f"DELETE FROM {table} WHERE fy_key IN :fy_keys")
+                            .bindparams(bindparam("fy_keys", expanding=True)),
+                            {"fy_keys": affected})
+
+            periods = [
+                {**p, "period_start": p["period_start"].isoformat(),
+                 "period_end": p["period_end"].isoformat()}
+                for p in _build_periods(months)
+            ]
+            rows = 0
+            for period in periods:
+                result = conn.execute(insert_sql, period)
+                rows += max(result.rowcount or 0, 0)
+
+            if periods:
+                conn.execute(text(f"""
+                    INSERT INTO {PERIODS_TABLE} (
+                        period_key, period_type, fy_key, q_key, period_start, period_end
+                    )
+                    VALUES (
+                        :period_key, :period_type, :fy_key, :q_key, :period_start, :period_end
+                    )
+                """), periods)
+
+        seconds = round(time.perf_counter() - start, 3)
+        print(
+            f"📊 IRDAI rollup refreshed: {len(periods)} periods, {rows} rows ({', '.join(affected) or 'none'}) in {seconds}s")
+        return {
+            "success": True,
+            "periods": len(periods),
+            "rows": rows,
+            "financial_years": affected,
+            "seconds": seconds,
+        }
+
+    except Exception as e:
+        print(f"❌ IRDAI rollup refresh failed: {e}")
+        return {"success": False, "error": str(e)}
+
+
+def select_rollup_periods(db, start_date: str, end_date: str) -> Optional[List[str]]:
+    """
+    Period keys that exactly cover report_month BETWEEN start_date AND end_date
+
+    Returns None when the rollup is disabled, missing or empty so callers
+    fall back to scanning irdai_monthly_data.
+    """
+    if not ROLLUP_ENABLED:
+        return None
+
+    try:
+        rows = db.execute(text(f"""
+            SELECT period_type, period_key, fy_key, q_key
+            FROM {PERIODS_TABLE}
+            WHERE period_start >= :start_date AND period_end <= :end_date
+        """), {"start_date": str(start_date)[:10], "end_date": str(end_date)[:10]}).fetchall()
+
+        if not rows:
+            # Distinguish "no data in range" from "rollup never built"
+            if db.execute(text(f"SELECT 1 FROM {PERIODS_TABLE} LIMIT 1")).first() is None:
+                return None
+            return []
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ {ROLLUP_TABLE} unavailable, scanning {RAW_TABLE}: {e}")
+        return None
+
+    full_years = {r[2] for r in rows if r[0] == "FY"}
+    full_quarters = {r[3] for r in rows if r[0] == "Q" and r[2] not in full_years}
+
+    keys = [r[1] for r in rows if r[0] == "FY"]
+    keys += [r[1] for r in rows if r[0] == "Q" and r[3] in full_quarters]
+    keys += [
+        r[1] for r in rows
+        if r[0] == "MONTH" and r[2] not in full_years and r[3] not in full_quarters
+    ]
+    return sorted(keys)
+
+
+def range_source(db, start_date: str, end_date: str) -> Tuple[str, Dict]:
+    """
+    FROM/WHERE fragment and params for a report_month range
+
+    Returns ("<table> WHERE <range filter>", params). The fragment reads the
+    rollup when it can and irdai_monthly_data otherwise; both expose the same
+    metric column names, so SUM()-based queries work unchanged on either.
+    """
+    period_keys = select_rollup_periods(db, start_date, end_date)
+    if period_keys is None:
+        return (
+            f"{RAW_TABLE} WHERE report_month BETWEEN :start_date AND :end_date",
+            {"start_date": start_date, "end_date": end_date},
+        )
+    return f"{ROLLUP_TABLE} WHERE period_key IN :period_keys", {"period_keys": period_keys}
+
+
+def source_text(sql: str, params: Dict):
+    """text() for a query built on range_source (binds the expanding IN list)"""
+    stmt = text(sql)
+    if "period_keys" in params:
+        stmt = stmt.bindparams(bindparam("period_keys", expanding=True))
+    return stmt
+
+
+if __name__ == "__main__":
+    print(refresh_irdai_rollup())
@@ -0,0 +1,350 @@
+"""
+L-Form Index
+In-memory inverted index from L-form code to the companies / PDFs / splits
+that contain it, used by the peers lookups.
+
+peers.find_companies_with_lform used to list every company and PDF folder
+under pdf_splits/ and extractions/, load each metadata.json and regex-match
+every split on each request. The index is built from disk on first lookup
+and kept current in this process by the PDF catalog hooks: record_split
+(index_pdf), remove_pdf (remove_pdf), record_extraction (add_extraction)
+and reconcile_catalog (invalidate, rebuilt on the next lookup).
+
+Other hypercorn workers run those hooks on their own copies, so each lookup
+first reads the catalog's generation marker (pdf_catalog.catalog_generation)
+and rebuilds the index when it differs from the one seen at the last build.
+
+Matching rules (unchanged from the directory scan):
+
+    split fields     form_name / form_code / original_form_no. "L-1" matches a
+                     field equal to it or containing an L-1 token (L-1, L-1-A),
+                     not L-10; a lettered form like "L-9A" matches exactly only.
+    extraction files *_extracted.json / *_metadata.json whose name contains
+                     the L-form (with '-' or '_').
+
+    split keys       exact field value, and every L-\\d+[A-Z]? token in it
+    extraction keys  every L[-_]?\\d+[A-Z]* token in the file name ('_' -> '-')
+"""
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+PDF_SPLITS_DIR = os.path.join(BASE_DIR, "pdf_splits")
+EXTRACTIONS_DIR = os.path.join(BASE_DIR, "extractions")
+
+SPLIT_FIELDS = ("form_name", "form_code", "original_form_no")
+EXTRACTION_SUFFIXES = ("_extracted.json", "_metadata.json")
+
+_SPLIT_TOKEN = re.compile(r'L-\d+[A-Z]?')
+_FILENAME_TOKEN = re.compile(r'L[-_]?\d+[A-Z]*')
+_LETTER_SUFFIX = re.compile(r'^(L-\d+)([A-Z]+)')
+_BASE_FORM = re.compile(r'^(L-\d+)')
+
+# (company folder, pdf folder)
+PdfKey = Tuple[str, str]
+
+
+def _split_keys(split: Dict) -> Tuple[Set[str], Set[str]]:
+    """Exact values and L-form tokens of a split's form fields"""
+    exact, tokens = set(), set()
+    for field in SPLIT_FIELDS:
+        value = split.get(field)
+        if not value or not isinstance(value, str):
+            continue
+        value_upper = value.upper().strip()
+        exact.add(value_upper)
+        tokens.update(_SPLIT_TOKEN.findall(value_upper))
+    return exact, tokens
+
+
+def _filename_tokens(filename: str) -> Set[str]:
+    return {t.replace('_', '-') for t in _FILENAME_TOKEN.findall(filename.upper())}
+
+
+def _is_extraction_file(filename: str) -> bool:
+    return filename.endswith(EXTRACTION_SUFFIXES)
+
+
+def _find_metadata(pdf_folder_path: str) -> Optional[str]:
+    """metadata.json of a split folder, or of its nested folder (e.g. "X/X/metadata.json")"""
+    metadata_path = os.path.join(pdf_folder_path, "metadata.json")
+    if os.path.exists(metadata_path):
+        return metadata_path
+    for nested_folder in os.listdir(pdf_folder_path):
+        nested_metadata = os.path.join(pdf_folder_path, nested_folder, "metadata.json")
+        if os.path.exists(nested_metadata):
+            return nested_metadata
+    return None
+
+
+def company_entry(company_dir: str, pdfs: List[Dict]) -> Dict:
+    """Company result in the peers response shape"""
+    return {
+        "id": company_dir.lower().replace(' ', '-'),
+        "name": company_dir.replace('_', ' ').title(),
+        "pdfs": pdfs,
+    }
+
+
+class LFormIndex:
+    """Inverted index of split form fields and extraction file names"""
+
+    def __init__(
+        self,
+        splits_dir: str = PDF_SPLITS_DIR,
+        extractions_dir: str = EXTRACTIONS_DIR,
+        generation: Optional[Callable[[], Hashable]] = None
+    ):
+        """
+        Args:
+            splits_dir: Root of the split folders
+            extractions_dir: Root of the extraction outputs
+            generation: Returns a marker that changes whenever splits or
+                extractions change in any process; the index is rebuilt
+                when it differs from the marker of the last build (None:
+                only this process's hooks keep it current)
+        """
+        self.splits_dir = splits_dir
+        self.extractions_dir = extractions_dir
+        self._generation_source = generation
+        self._generation: Optional[Hashable] = None
+        self._lock = threading.RLock()
+        self._built = False
+        self._reset()
+
+    def _reset(self):
+        # Splits: per-PDF split summaries, postings are (company, pdf, split position)
+        self._pdf_splits: Dict[PdfKey, List[Dict]] = {}
+        self._split_exact: Dict[str, Set[Tuple[str, str, int]]] = defaultdict(set)
+        self._split_tokens: Dict[str, Set[Tuple[str, str, int]]] = defaultdict(set)
+        # Extractions: postings are (company, pdf, file name)
+        self._extraction_files: Dict[PdfKey, Set[str]] = defaultdict(set)
+        self._extraction_tokens: Dict[str, Set[Tuple[str, str, str]]] = defaultdict(set)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _unindex_pdf(self, key: PdfKey):
+        for position, split in enumerate(self._pdf_splits.pop(key, [])):
+            posting = (*key, position)
+            for value in split["_exact"]:
+                self._split_exact[value].discard(posting)
+            for token in split["_tokens"]:
+                self._split_tokens[token].discard(posting)
+
+    def _index_pdf(self, company_dir: str, pdf_folder: str, metadata: Dict):
+        key = (company_dir, pdf_folder)
+        self._unindex_pdf(key)
+        splits = []
+        for position, split_file in enumerate(metadata.get('split_files') or []):
+            exact, tokens = _split_keys(split_file)
+            splits.append({
+                'name': split_file.get('form_name', ''),
+                'code': split_file.get('form_code', ''),
+                'pages': f"{split_file.get('start_page', '')}-{split_file.get('end_page', '')}",
+                '_exact': exact,
+                '_tokens': tokens,
+            })
+            posting = (company_dir, pdf_folder, position)
+            for value in exact:
+                self._split_exact[value].add(posting)
+            for token in tokens:
+                self._split_tokens[token].add(posting)
+        self._pdf_splits[key] = splits
+
+    def _add_extraction(self, company_dir: str, pdf_folder: str, filename: str):
+        if not _is_extraction_file(filename):
+            return
+        files = self._extraction_files[(company_dir, pdf_folder)]
+        if filename in files:
+            return
+        files.add(filename)
+        for token in _filename_tokens(filename):
+            self._extraction_tokens[token].add((company_dir, pdf_folder, filename))
+
+    def _build(self):
+        """Read pdf_splits/ and extractions/ once"""
+        self._reset()
+        pdfs = files = 0
+
+        if os.path.exists(self.splits_dir):
+            for company_dir in os.listdir(self.splits_dir):
+                company_path = os.path.join(self.splits_dir, company_dir)
+                if not os.path.isdir(company_path):
+                    continue
+                for pdf_folder in os.listdir(company_path):
+                    pdf_folder_path = os.path.join(company_path, pdf_folder)
+                    if not os.path.isdir(pdf_folder_path):
+                        continue
+                    try:
+                        metadata_path = _find_metadata(pdf_folder_path)
+                        if not metadata_path:
+                            continue
+                        with open(metadata_path, 'r', encoding='utf-8') as f:
+                            self._index_pdf(company_dir, pdf_folder, json.load(f))
+                        pdfs += 1
+                    except Exception as e:
+                        print(f"⚠️ Error reading metadata for {company_dir}/{pdf_folder}: {e}")
+
+        if os.path.exists(self.extractions_dir):
+            for company_dir in os.listdir(self.extractions_dir):
+                company_path = os.path.join(self.extractions_dir, company_dir)
+                if not os.path.isdir(company_path):
+                    continue
+                for pdf_folder in os.listdir(company_path):
+                    pdf_folder_path = os.path.join(company_path, pdf_folder)
+                    if not os.path.isdir(pdf_folder_path):
+                        continue
+                    try:
+                        for filename in os.listdir(pdf_folder_path):
+                            self._add_extraction(company_dir, pdf_folder, filename)
+                            files += _is_extraction_file(filename)
+                    except Exception as e:
+                        print(f"⚠️ Error reading extractions for {company_dir}/{pdf_folder}: {e}")
+
+        self._built = True
+        print(f"🗂️ L-form index built: {pdfs} split PDFs, {files} extraction files, "
+              f"{len(self._split_tokens)} split tokens")
+
+    def _current_generation(self) -> Optional[Hashable]:
+        if self._generation_source is None:
+            return None
+        try:
+            return self._generation_source()
+        except Exception as e:
+            # Catalog unavailable: keep serving what this process has
+            print(f"⚠️ L-form index generation check failed: {e}")
+            return self._generation
+
+    def _ensure_built(self):
+        # Read before the build, so a change made during it triggers the next one
+        generation = self._current_generation()
+        if not self._built or generation != self._generation:
+            self._build()
+            self._generation = generation
+
+    def index_pdf(self, company_dir: str, pdf_folder: str, metadata: Dict):
+        """(Re)index the splits of one PDF after it was split"""
+        with self._lock:
+            if self._built:
+                self._index_pdf(company_dir, pdf_folder, metadata)
+
+    def remove_pdf(self, company_dir: str, pdf_folder: str):
+        """Drop the splits of a deleted PDF (its extraction files stay on disk)"""
+        with self._lock:
+            if self._built:
+                self._unindex_pdf((company_dir, pdf_folder))
+
+    def add_extraction(self, company_dir: str, pdf_folder: str, filename: str):
+        """Index an extraction output file written for a split"""
+        with self._lock:
+            if self._built:
+                self._add_extraction(company_dir, pdf_folder, filename)
+
+    def invalidate(self):
+        """Rebuild from disk on the next lookup"""
+        with self._lock:
+            self._built = False
+            self._reset()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _split_postings(self, lform_number: str) -> Set[Tuple[str, str, int]]:
+        lform_upper = lform_number.upper().strip()
+        postings = set(self._split_exact.get(lform_upper, ()))
+        # "L-9A" style forms match exactly only; "L-1" matches L-1 and L-1-A, not L-10
+        if not _LETTER_SUFFIX.match(lform_upper):
+            base = _BASE_FORM.match(lform_upper)
+            if base:
+                postings |= self._split_tokens.get(base.group(1), set())
+        return postings
+
+    def _extraction_postings(self, lform_number: str) -> Set[Tuple[str, str, str]]:
+        # A file matches when the L-form appears in its name, e.g. L-1 in L_1_... or L_12_...
+        # Candidates come from the leading token ("L-1" of "L-1-A"); the name check
+        # then keeps L_1_A_RA but not L_1_B for "L-1-A"
+        lform_dashed = lform_number.replace('_', '-')
+        lform_underscore = lform_dashed.replace('-', '_')
+        lead = _FILENAME_TOKEN.match(lform_dashed)
+        prefix = lead.group(0) if lead else lform_dashed
+        postings = set()
+        for token, token_postings in self._extraction_tokens.items():
+            if token.startswith(prefix):
+                postings |= token_postings
+        return {
+            posting for posting in postings
+            if lform_underscore in posting[2].upper() or lform_dashed in posting[2].upper()
+        }
+
+    def companies_with_lform(self, lform_number: str) -> List[Dict]:
+        """
+        Companies with a split or extraction file for an L-form
+
+        Args:
+            lform_number: Normalized L-form (e.g. "L-1", "L-9A")
+
+        Returns:
+            [{'id', 'name', 'pdfs': [{'name', 'splits': [{'name', 'code', 'pages'}]}]}],
+            split matches first, then companies found only in extractions
+        """
+        with self._lock:
+            self._ensure_built()
+
+            split_hits: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+            for company_dir, pdf_folder, position in self._split_postings(lform_number):
+                split_hits[company_dir][pdf_folder].append(position)
+
+            companies = []
+            for company_dir in sorted(split_hits):
+                pdfs = []
+                for pdf_folder in sorted(split_hits[company_dir]):
+                    splits = self._pdf_splits[(company_dir, pdf_folder)]
+                    pdfs.append({
+                        'name': pdf_folder,
+                        'splits': [
+                            {k: splits[p][k] for k in ('name', 'code', 'pages')}
+                            for p in sorted(split_hits[company_dir][pdf_folder])
+                        ],
+                    })
+                companies.append(company_entry(company_dir, pdfs))
+
+            extraction_hits: Dict[str, Dict[str, str]] = defaultdict(dict)
+            for company_dir, pdf_folder, filename in self._extraction_postings(lform_number):
+                current = extraction_hits[company_dir].get(pdf_folder)
+                if current is None or filename < current:
+                    extraction_hits[company_dir][pdf_folder] = filename
+
+        found = {company["id"] for company in companies}
+        for company_dir in sorted(extraction_hits):
+            company = company_entry(company_dir, [
+                {
+                    'name': pdf_folder,
+                    'splits': [{
+                        'name': filename.replace('_extracted.json', '').replace('_metadata.json', '').replace('_', ' '),
+                        'code': lform_number,
+                        'pages': 'N/A',
+                    }],
+                }
+                for pdf_folder, filename in sorted(extraction_hits[company_dir].items())
+            ])
+            if company["id"] not in found:
+                found.add(company["id"])
+                companies.append(company)
+
+        return companies
+
+
+def _catalog_generation() -> Hashable:
+    # pdf_catalog imports this module for its hooks
+    from services.pdf_catalog import catalog_generation
+    return catalog_generation()
+
+
+lform_index = LFormIndex(generation=_catalog_generation)
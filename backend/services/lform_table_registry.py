@@ -0,0 +1,116 @@
+"""L-form table registry.
+
+Single table-driven lookup from an L-form code (e.g. ``L-2-A``, ``L-6A``) to
+the tables that hold its data:
+
+- ``reports_<key>``            one row per report (JSON data_rows)
+- ``reports_<key>_extracted``  one row per particulars line
+- master mapping table         variants -> cluster_label
+- master rows table            canonical cluster_label -> master_row_id
+
+L-2 keeps the original shared ``master_mapping`` / ``master_rows`` tables;
+every other form has its own ``master_mapping_<key>`` / ``master_rows_<key>``.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from databases.models import ReportModels, lform_tables, normalized_extra_tables
+
+
+@dataclass(frozen=True)
+class LFormTables:
+    table_key: str
+    reports_table: str
+    extracted_table: str
+    mapping_table: str
+    master_rows_table: str
+
+
+# Tables that predate the per-form naming convention
+LEGACY_MASTER_TABLES = {
+    "l2": ("master_mapping", "master_rows"),
+}
+
+# Used when a form code cannot be resolved to a registered key
+DEFAULT_MASTER_TABLES = ("master_mapping", "master_rows")
+
+
+def _build_registry() -> Dict[str, LFormTables]:
+    registry: Dict[str, LFormTables] = {}
+    for key in lform_tables:
+        extracted_table = f"reports_{key}_extracted"
+        if extracted_table not in ReportModels:
+            continue
+
+        mapping_table, master_rows_table = LEGACY_MASTER_TABLES.get(
+            key, (f"master_mapping_{key}", f"master_rows_{key}"))
+
+        registry[key] = LFormTables(
+            table_key=key,
+            reports_table=f"reports_{key}",
+            extracted_table=extracted_table,
+            mapping_table=mapping_table,
+            master_rows_table=master_rows_table,
+        )
+    return registry
+
+
+LFORM_TABLE_REGISTRY: Dict[str, LFormTables] = _build_registry()
+
+
+def normalize_lform_key(form_code: str) -> str:
+    """Normalize a form code to its table key with suffix fallback.
+
+    L-6A -> l6a (dedicated suffix table), L-2-A -> l2 (no l2a table),
+    L-10 -> l10. Returns "" if the code is not an L-form.
+    """
+    if not form_code:
+        return ""
+
+    form_code_upper = form_code.upper().replace('_', '-')
+
+    patterns = [
+        r'(L-\d+)([A-Z]+)',   # L-6A
+        r'(L-\d+)-([A-Z]+)',  # L-1-A
+        r'(L-\d+)',           # L-10
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, form_code_upper)
+        if not match:
+            continue
+
+        base_key = match.group(1).replace('-', '').lower()
+        if len(match.groups()) == 2:
+            full_key = f"{base_key}{match.group(2).lower()}"
+            if full_key in normalized_extra_tables and full_key in ReportModels:
+                return full_key
+        return base_key
+
+    return ""
+
+
+def get_lform_tables(table_key: str) -> Optional[LFormTables]:
+    """Tables for a normalized key (e.g. 'l2'), or None if not registered."""
+    return LFORM_TABLE_REGISTRY.get(table_key)
+
+
+def resolve_form_tables(form_no: str) -> Optional[LFormTables]:
+    """Tables for a raw form code (e.g. 'L-2-A'), or None if not registered."""
+    return get_lform_tables(normalize_lform_key(str(form_no).strip()))
+
+
+def resolve_master_tables(form_no: str) -> tuple[str, str]:
+    """Return (master_mapping_table, master_rows_table) for a form."""
+    tables = resolve_form_tables(form_no)
+    if tables is None:
+        return DEFAULT_MASTER_TABLES
+    return tables.mapping_table, tables.master_rows_table
+
+
+def all_lform_tables() -> List[LFormTables]:
+    return list(LFORM_TABLE_REGISTRY.values())
@@ -0,0 +1,340 @@
+"""
+Master Mapping Queue
+Runs master row mapping off the request path with a debounced per-form worker.
+
+`/extract-form` used to run targeted mapping synchronously after the Gemini
+step, reloading the master set on every call. Extractions now enqueue their
+report_ids per (form_code, company_id); a single background thread waits for
+the debounce window to go quiet, then runs ONE batched mapping pass for all
+report_ids collected for that key.
+
+Environment:
+    MASTER_MAPPING_ASYNC             "0" runs mapping inline (old behaviour)
+    MASTER_MAPPING_DEBOUNCE_SECONDS  quiet period before a batch runs (default 30)
+    MASTER_MAPPING_MAX_WAIT_SECONDS  upper bound a job can be deferred (default 300)
+    MASTER_MAPPING_CATCH_UP          "0" skips the catch-up pass at startup
+    MASTER_MAPPING_STATUS_MAX        finished jobs kept in the status (default 500)
+    MASTER_MAPPING_STATUS_TTL_SECONDS  how long a finished job is kept (default 86400)
+
+Note: the queue lives in process memory, so with several hypercorn workers
+each worker coalesces (and reports status for) its own extractions. Jobs
+still pending when a worker stops are not lost: their rows keep
+master_row_id NULL, and at startup one worker (file lock) runs the
+watermark-based incremental pass for every form that has such rows.
+"""
+import os
+import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CATCH_UP_LOCK_PATH = os.path.join(tempfile.gettempdir(), "master_mapping_catch_up.lock")
+
+
+def run_mapping_job(form_code: str, company_id: int, report_ids: List[int]) -> Dict:
+    """
+    Run targeted master mapping for a batch of reports, then sync master_rows
+
+    Returns the result dict of MasterMappingPipeline.run_targeted_mapping
+    """
+    from master_row_mapping_pipeline import MasterMappingPipeline
+
+    mapper = MasterMappingPipeline()
+    result = mapper.run_targeted_mapping(
+        company_id=company_id,
+        report_ids=report_ids,
+        form_code=form_code
+    )
+
+    if result['success']:
+        print(f"✅ Master mapping completed")
+        print(
+            f"   Master rows created: {result.get('master_rows_created', 0)}")
+        print(f"   Rows mapped: {result.get('rows_mapped', 0)}")
+
+        # Auto-sync master_rows table
+        try:
+            from services.master_rows_sync_service import MasterRowsSyncService
+
+            print(f"\n🔄 Auto-syncing master_rows table...")
+            sync_result = MasterRowsSyncService().sync_master_rows(
+                form_no=form_code,
+                company_id=company_id,
+                verbose=False
+            )
+
+            if sync_result['success']:
+                print(
+                    f"✅ Master rows synced: {sync_result['rows_synced']} clusters")
+            else:
+                print(
+                    f"⚠️ Master rows sync failed: {sync_result.get('error', 'Unknown')}")
+        except Exception as sync_error:
+            print(f"⚠️ Master rows sync error: {sync_error}")
+            # Don't fail if sync fails
+    else:
+        print(
+            f"⚠️ Master mapping failed: {result.get('error', 'Unknown error')}")
+
+    return result
+
+
+class MasterMappingQueue:
+    """Debounced, coalescing queue of master mapping jobs keyed by (form_code, company_id)"""
+
+    def __init__(
+        self,
+        debounce_seconds: Optional[float] = None,
+        max_wait_seconds: Optional[float] = None
+    ):
+        self.debounce_seconds = float(
+            debounce_seconds if debounce_seconds is not None
+            else os.getenv("MASTER_MAPPING_DEBOUNCE_SECONDS", "30"))
+        self.max_wait_seconds = float(
+            max_wait_seconds if max_wait_seconds is not None
+            else os.getenv("MASTER_MAPPING_MAX_WAIT_SECONDS", "300"))
+
+        self.status_max = int(os.getenv("MASTER_MAPPING_STATUS_MAX", "500"))
+        self.status_ttl_seconds = float(os.getenv("MASTER_MAPPING_STATUS_TTL_SECONDS", "86400"))
+
+        self._cond = threading.Condition()
+        self._pending: Dict[Tuple[str, int], Dict] = {}
+        # Least recently updated first; finished entries are pruned
+        self._status: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()
+        self._finished: Dict[Tuple[str, int], float] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._catch_up = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def enqueue(self, form_code: str, company_id: int, report_ids: List[int]) -> Dict:
+        """Add report_ids to the pending batch for (form_code, company_id)"""
+        key = (form_code, int(company_id))
+        now = time.monotonic()
+
+        with self._cond:
+            job = self._pending.get(key)
+            if job is None:
+                job = {
+                    'report_ids': set(),
+                    'first_enqueued': now,
+                    'enqueued_at': datetime.now().isoformat()
+                }
+                self._pending[key] = job
+
+            job['report_ids'].update(int(rid) for rid in report_ids)
+            # Trailing-edge debounce, capped so a busy key still gets mapped
+            job['due'] = min(now + self.debounce_seconds,
+                             job['first_enqueued'] + self.max_wait_seconds)
+
+            status = self._status.setdefault(key, {'runs': 0})
+            status.update({
+                'state': 'pending',
+                'pending_report_ids': sorted(job['report_ids'])
+            })
+            self._status.move_to_end(key)
+            self._finished.pop(key, None)
+            self._prune_status()
+
+            self._ensure_worker()
+            self._cond.notify()
+
+            return {
+                'success': True,
+                'queued': True,
+                'form_code': form_code,
+                'company_id': int(company_id),
+                'pending_report_ids': sorted(job['report_ids']),
+                'debounce_seconds': self.debounce_seconds
+            }
+
+    def start(self, catch_up: bool = True):
+        """
+        Start the worker at app startup
+
+        Args:
+            catch_up: Run the incremental catch-up pass first (skipped when
+                another worker process already holds the catch-up lock)
+        """
+        with self._cond:
+            self._catch_up = catch_up
+            self._ensure_worker()
+
+    def flush(self):
+        """Make every pending job due immediately"""
+        with self._cond:
+            for job in self._pending.values():
+                job['due'] = 0
+            self._cond.notify()
+
+    def status(self) -> Dict:
+        """Snapshot of pending/running/finished jobs"""
+        with self._cond:
+            jobs = []
+            for (form_code, company_id), status in sorted(self._status.items()):
+                jobs.append({
+                    'form_code': form_code,
+                    'company_id': company_id,
+                    **status
+                })
+
+            return {
+                'debounce_seconds': self.debounce_seconds,
+                'max_wait_seconds': self.max_wait_seconds,
+                'worker_alive': bool(self._worker and self._worker.is_alive()),
+                'pending': len(self._pending),
+                'jobs': jobs
+            }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="master-mapping-worker", daemon=True)
+            self._worker.start()
+
+    def _prune_status(self):
+        """Drop finished entries past the TTL, then the oldest beyond the cap"""
+        now = time.monotonic()
+        for key in [k for k, t in self._finished.items() if now - t > self.status_ttl_seconds]:
+            del self._finished[key]
+            del self._status[key]
+        for key in [k for k in self._status if k in self._finished][:max(0, len(self._finished) - self.status_max)]:
+            del self._finished[key]
+            del self._status[key]
+
+    def _run_catch_up(self):
+        lock = _try_catch_up_lock()
+        if not lock:
+            print("ℹ️ Master mapping catch-up running in another worker, skipped")
+            return
+        try:
+            print("\n🗺️ Master mapping catch-up: forms with unmapped rows")
+            results = run_catch_up()
+            mapped = sum(r.get('rows_mapped', 0) for r in results.values())
+            print(f"✅ Master mapping catch-up: {len(results)} form(s), {mapped} row(s) mapped")
+        except Exception as e:
+            print(f"⚠️ Master mapping catch-up error: {e}")
+        finally:
+            if lock is not True:
+                lock.close()
+
+    def _next_due(self) -> Optional[Tuple[Tuple[str, int], Dict]]:
+        """Pop the next due job, or wait until one becomes due"""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+
+                key, job = min(self._pending.items(),
+                               key=lambda item: item[1]['due'])
+                wait = job['due'] - time.monotonic()
+                if wait <= 0:
+                    del self._pending[key]
+                    self._status[key].update({
+                        'state': 'running',
+                        'pending_report_ids': [],
+                        'started_at': datetime.now().isoformat()
+                    })
+                    return key, job
+
+                self._cond.wait(timeout=wait)
+
+    def _run(self):
+        with self._cond:
+            catch_up, self._catch_up = self._catch_up, False
+        if catch_up:
+            self._run_catch_up()
+
+        while True:
+            (form_code, company_id), job = self._next_due()
+            report_ids = sorted(job['report_ids'])
+
+            print(
+                f"\n🗺️ Master mapping batch: {form_code} / company {company_id} ({len(report_ids)} report(s))")
+
+            try:
+                result = run_mapping_job(form_code, company_id, report_ids)
+            except Exception as e:
+                print(f"⚠️ Master mapping error: {e}")
+                print(f"❌ Traceback: {traceback.format_exc()}")
+                result = {'success': False, 'error': str(e)}
+
+            with self._cond:
+                status = self._status[(form_code, company_id)]
+                status['runs'] += 1
+                status.update({
+                    # A new enqueue during the run leaves the key pending again
+                    'state': 'pending' if (form_code, company_id) in self._pending
+                    else ('done' if result.get('success') else 'failed'),
+                    'finished_at': datetime.now().isoformat(),
+                    'last_report_ids': report_ids,
+                    'last_result': result
+                })
+                self._status.move_to_end((form_code, company_id))
+                if status['state'] != 'pending':
+                    self._finished[(form_code, company_id)] = time.monotonic()
+                self._prune_status()
+
+
+def run_catch_up() -> Dict[str, Dict]:
+    """
+    Incremental mapping pass for every form that has unmapped extracted rows
+
+    Catches up jobs that were queued but not run before a restart.
+
+    Returns:
+        {form_no: result of MasterMappingPipeline.run_incremental}
+    """
+    from master_row_mapping_pipeline import MasterMappingPipeline
+    from services.lform_table_registry import all_lform_tables
+
+    pipeline = MasterMappingPipeline()
+    results = {}
+    for tables in all_lform_tables():
+        for form_no in pipeline.db.get_unmapped_form_numbers(tables):
+            try:
+                results[form_no] = pipeline.run_incremental(form_no=form_no)
+            except Exception as e:
+                print(f"⚠️ Master mapping catch-up failed for {form_no}: {e}")
+                results[form_no] = {'success': False, 'error': str(e)}
+    return results
+
+
+def _try_catch_up_lock():
+    """Non-blocking exclusive lock so only one worker process catches up"""
+    try:
+        import fcntl
+    except ImportError:  # no flock (Windows dev): single-process anyway
+        return True
+    handle = open(CATCH_UP_LOCK_PATH, "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+# Shared per-process queue
+mapping_queue = MasterMappingQueue()
+
+
+def is_async_enabled() -> bool:
+    return os.getenv("MASTER_MAPPING_ASYNC", "1") != "0"
+
+
+def is_catch_up_enabled() -> bool:
+    return os.getenv("MASTER_MAPPING_CATCH_UP", "1") != "0"
@@ -1,7 +1,8 @@
 """Master rows synchronization service.
 
 This project keeps *variants* in `master_mapping` and a canonical lookup in
-`master_rows` (keyed by `master_row_id`, with `cluster_label` unique).
+`master_rows` (keyed by `master_row_id`, with `cluster_label` unique). The
+per-form table names come from `services.lform_table_registry`.
 
 `MasterRowsSyncService` ensures that for every (form_no, cluster_label) that
 exists in `master_mapping`, a corresponding row exists in `master_rows`.
@@ -17,6 +18,7 @@ from typing import Any, Dict, Optional
 from sqlalchemy import text
 
 from databases.database import engine
+from services.lform_table_registry import resolve_master_tables
 
 
 @dataclass
@@ -45,13 +47,7 @@ class MasterRowsSyncService:
 
     def _resolve_tables(self, form_no: str) -> tuple[str, str]:
         """Return (master_mapping_table, master_rows_table) for a form."""
-        # Current DB design: L-1 and L-3 have their own master tables.
-        form_no_upper = str(form_no).strip().upper()
-        if form_no_upper == "L-1":
-            return "master_mapping_l1", "master_rows_l1"
-        elif form_no_upper == "L-3":
-            return "master_mapping_l3", "master_rows_l3"
-        return "master_mapping", "master_rows"
+        return resolve_master_tables(form_no)
 
     def sync_master_rows(
         self,
@@ -100,12 +96,22 @@ class MasterRowsSyncService:
                 inserted = 0
                 updated = 0
 
+                if self.engine.dialect.name == "sqlite":
+                    upsert_clause = """
+                    ON CONFLICT(cluster_label) DO UPDATE SET
+                        master_name = excluded.master_name
+                    """
+                else:
+                    upsert_clause = """
+                    ON DUPLICATE KEY UPDATE
+                        master_name = VALUES(master_name)
+                    """
+
                 upsert_sql = text(
                     f"""
                     INSERT INTO {master_rows_table} (cluster_label, master_name)
                     VALUES (:cluster_label, :master_name)
-                    ON DUPLICATE KEY UPDATE
-                        master_name = VALUES(master_name)
+                    {upsert_clause}
                     """
                 )
 
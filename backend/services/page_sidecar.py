@@ -0,0 +1,118 @@
+"""
+Page Sidecar
+Per-page text of a split PDF, extracted once at split time and stored next
+to the split as <split>.pages.parquet (one row per page).
+
+Only the Gemini verifier reads it: its PDF context uses the stored text
+instead of opening the split with PyMuPDF again, and that text is the same
+get_text("text") it computed before. Stages tuned to pdfplumber
+text (extract_form's form type, metadata and table-of-contents patterns)
+keep parsing the PDF with pdfplumber; PyMuPDF text is not interchangeable
+with it (word spacing, "(cid:n)" glyphs), and table extraction still reads
+the PDF.
+
+Row layout:
+
+    page          1-based page number within the split
+    source_page   1-based page number in the uploaded PDF
+    text          PyMuPDF page text (get_text("text"))
+
+Only depends on PyMuPDF and pyarrow (both optional: without them no sidecar
+is written and readers fall back to the PDF). It imports nothing from the
+app, so the extraction scripts that run as subprocesses can load it.
+
+Environment:
+    PDF_PAGE_SIDECAR    "0" disables writing sidecars at split time
+"""
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SIDECAR_SUFFIX = ".pages.parquet"
+SIDECAR_ENABLED = os.getenv("PDF_PAGE_SIDECAR", "1") == "1"
+
+
+def sidecar_path(pdf_path) -> Path:
+    """L-1_3_5.pdf -> L-1_3_5.pages.parquet"""
+    pdf_path = Path(pdf_path)
+    return pdf_path.with_name(pdf_path.stem + SIDECAR_SUFFIX)
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("page", pa.int32()),
+        ("source_page", pa.int32()),
+        ("text", pa.string()),
+    ])
+
+
+def extract_page(page) -> Dict:
+    """Sidecar columns of one PyMuPDF page"""
+    return {"text": page.get_text("text") or ""}
+
+
+def write_split_sidecars(pdf_path: str, output_dir, splits: Iterable[Tuple[str, int, int]]) -> int:
+    """
+    Write the sidecar of each split, reading each source page once
+
+    Args:
+        pdf_path: Uploaded (unsplit) PDF
+        output_dir: Folder holding the split files
+        splits: [(split filename, start_page, end_page)], 1-based inclusive
+
+    Returns:
+        Number of sidecars written (0 when disabled or PyMuPDF / pyarrow
+        are not installed)
+    """
+    if not SIDECAR_ENABLED:
+        return 0
+    try:
+        import fitz
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        print(f"⚠️ Page sidecars skipped ({e})")
+        return 0
+
+    schema = _schema()
+    pages: Dict[int, Dict] = {}
+    written = 0
+    with fitz.open(pdf_path) as doc:
+        for filename, start_page, end_page in splits:
+            rows = []
+            for number in range(start_page, end_page + 1):
+                if not 1 <= number <= doc.page_count:
+                    continue
+                if number not in pages:
+                    pages[number] = extract_page(doc[number - 1])
+                rows.append({"page": len(rows) + 1, "source_page": number, **pages[number]})
+
+            target = sidecar_path(Path(output_dir) / filename)
+            try:
+                pq.write_table(pa.Table.from_pylist(rows, schema=schema), target,
+                               compression="zstd")
+                written += 1
+            except Exception as e:
+                print(f"⚠️ Page sidecar for {filename} failed: {e}")
+    return written
+
+
+def load_pages(pdf_path) -> Optional[List[Dict]]:
+    """
+    Pages of a split from its sidecar
+
+    Returns:
+        Page dicts in page order, or None when there is no sidecar, it is
+        older than the PDF, or it cannot be read (callers parse the PDF)
+    """
+    path = sidecar_path(pdf_path)
+    try:
+        if not path.exists() or path.stat().st_mtime < Path(pdf_path).stat().st_mtime:
+            return None
+        import pyarrow.parquet as pq
+        return pq.read_table(path).to_pylist()
+    except Exception as e:
+        print(f"⚠️ Could not read page sidecar {path}: {e}")
+        return None
@@ -0,0 +1,443 @@
+"""
+PDF Split Catalog
+Database index of split PDFs and their extraction outputs (tables
+pdf_catalog and pdf_split_catalog).
+
+The pdf-splitter listings used to walk pdf_splits/ and parse every
+metadata.json on each request, and /extraction probed up to six candidate
+files across gemini_verified_json/ and extractions/. The catalog is written
+when a PDF is split (record_split) and when a split is extracted
+(record_extraction), so listings and lookups are single indexed queries.
+
+reconcile_catalog() rebuilds both tables from disk; it runs once per process
+when the catalog is empty and can be run by hand after files are copied or
+removed outside the API:
+
+    python scripts/reconcile_pdf_catalog.py
+
+The same hooks keep the in-memory L-form index (services/lform_index)
+current in the writing process; other processes notice catalog_generation()
+change and rebuild theirs.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from databases.database import engine as default_engine
+from services.lform_index import lform_index
+
+PDF_TABLE = "pdf_catalog"
+SPLIT_TABLE = "pdf_split_catalog"
+
+SPLITS_DIR = Path("pdf_splits")
+EXTRACTIONS_DIR = Path("extractions")
+GEMINI_DIR = Path("gemini_verified_json")
+
+_bootstrap_lock = threading.Lock()
+_bootstrapped = False
+
+
+def company_slug(company_name: str) -> str:
+    """Folder name used for a company under pdf_splits/ and extractions/"""
+    return company_name.lower().replace(" ", "_")
+
+
+def _find_company_dir(base_path: Path, company_name: str) -> Path:
+    """Company folder under base_path: underscore, spaced or as-is naming"""
+    for candidate in (company_name.lower().replace(" ", "_"),
+                      company_name.lower().replace("_", " "),
+                      company_name.lower()):
+        path = base_path / candidate
+        if path.exists():
+            return path
+    return base_path / company_slug(company_name)
+
+
+def locate_extraction(company_name: str, pdf_name: str, split_filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the best extraction output of a split on disk
+
+    Priority: gemini_verified_json/*_corrected.json, then extractions/
+    *_corrected.json, then extractions/*_extracted.json.
+
+    Returns:
+        {'source', 'json_path', 'metadata_path', 'extracted_at'} or None
+    """
+    stem = Path(split_filename).stem
+    gemini_dir = _find_company_dir(GEMINI_DIR, company_name) / pdf_name
+    extractions_dir = _find_company_dir(EXTRACTIONS_DIR, company_name) / pdf_name
+    metadata_path = extractions_dir / f"{stem}_metadata.json"
+
+    gemini_metadata_path = gemini_dir / f"{stem}_metadata.json"
+    candidates = [
+        ("gemini_verified", gemini_dir / f"{stem}_corrected.json",
+         gemini_metadata_path if gemini_metadata_path.exists() else metadata_path),
+        ("corrected", extractions_dir / f"{stem}_corrected.json", metadata_path),
+        ("extracted", extractions_dir / f"{stem}_extracted.json", metadata_path),
+    ]
+    for source, json_path, meta_path in candidates:
+        if json_path.exists():
+            return {
+                "source": source,
+                "json_path": str(json_path),
+                "metadata_path": str(meta_path),
+                "extracted_at": datetime.fromtimestamp(json_path.stat().st_mtime),
+            }
+    return None
+
+
+def _split_rows(slug: str, pdf_name: str, company_name: str, metadata: Dict) -> List[Dict]:
+    """pdf_split_catalog rows for one metadata.json"""
+    rows = []
+    for order, split in enumerate(metadata.get("split_files") or []):
+        filename = split.get("filename")
+        if not filename:
+            continue
+        extraction = locate_extraction(company_name, pdf_name, filename) or {}
+        rows.append({
+            "company_slug": slug,
+            "pdf_name": pdf_name,
+            "split_filename": filename,
+            "split_order": order,
+            "split_path": split.get("path"),
+            "form_code": split.get("form_code"),
+            "form_name": split.get("form_name"),
+            "original_form_no": split.get("original_form_no"),
+            "serial_no": str(split.get("serial_no") or ""),
+            "start_page": split.get("start_page"),
+            "end_page": split.get("end_page"),
+            "split_json": json.dumps(split, ensure_ascii=False, default=str),
+            "extraction_source": extraction.get("source"),
+            "extraction_path": extraction.get("json_path"),
+            "extraction_metadata_path": extraction.get("metadata_path"),
+            "extracted_at": extraction.get("extracted_at"),
+        })
+    return rows
+
+
+def _pdf_row(slug: str, pdf_name: str, metadata: Dict) -> Dict:
+    return {
+        "company_slug": slug,
+        "company_name": metadata.get("company_name"),
+        "pdf_name": pdf_name,
+        "original_filename": metadata.get("original_filename"),
+        "method": metadata.get("method", "unknown"),
+        "total_splits": metadata.get("total_splits", 0),
+        "splits_folder": metadata.get("splits_folder"),
+    }
+
+
+def _insert(conn, pdf_rows: List[Dict], split_rows: List[Dict]):
+    if pdf_rows:
+        conn.execute(text(f"""
+            INSERT INTO {PDF_TABLE} (
+                company_slug, company_name, pdf_name, original_filename,
+                method, total_splits, splits_folder
+            )
+            VALUES (
+                :company_slug, :company_name, :pdf_name, :original_filename,
+                :method, :total_splits, :splits_folder
+            )
+        """), pdf_rows)
+    if split_rows:
+        conn.execute(text(f"""
+            INSERT INTO {SPLIT_TABLE} (
+                company_slug, pdf_name, split_filename, split_order, split_path,
+                form_code, form_name, original_form_no, serial_no, start_page,
+                end_page, split_json, extraction_source, extraction_path,
+                extraction_metadata_path, extracted_at
+            )
+            VALUES (
+                :company_slug, :pdf_name, :split_filename, :split_order, :split_path,
+                :form_code, :form_name, :original_form_no, :serial_no, :start_page,
+                :end_page, :split_json, :extraction_source, :extraction_path,
+                :extraction_metadata_path, :extracted_at
+            )
+        """), split_rows)
+
+
+def _delete_pdf(conn, slug: str, pdf_name: str):
+    params = {"company_slug": slug, "pdf_name": pdf_name}
+    for table in (SPLIT_TABLE, PDF_TABLE):
+        conn.execute(text(f"""
+            DELETE FROM {table}
+            WHERE company_slug = :company_slug AND pdf_name = :pdf_name
+        """), params)
+
+
+def record_split(company_name: str, pdf_name: str, metadata: Dict, engine=None) -> bool:
+    """
+    Replace the catalog entry of a PDF after it was (re)split
+
+    Existing extraction outputs of the new split files are picked up from disk.
+    A failure is logged and does not fail the split.
+    """
+    engine = engine or default_engine
+    slug = company_slug(company_name)
+    lform_index.index_pdf(slug, pdf_name, metadata)
+    try:
+        split_rows = _split_rows(slug, pdf_name, company_name, metadata)
+        with engine.begin() as conn:
+            _delete_pdf(conn, slug, pdf_name)
+            _insert(conn, [_pdf_row(slug, pdf_name, metadata)], split_rows)
+        print(f"🗂️ Catalog: {slug}/{pdf_name} with {len(split_rows)} split(s)")
+        return True
+    except Exception as e:
+        print(f"⚠️ Catalog update failed for {slug}/{pdf_name}: {e}")
+        return False
+
+
+def record_extraction(company_name: str, pdf_name: str, split_filename: str, engine=None) -> bool:
+    """
+    Point a split's catalog row at its current extraction output
+
+    Called after an extraction wrote its files; a split missing from the
+    catalog has its PDF re-read from disk instead.
+    """
+    engine = engine or default_engine
+    slug = company_slug(company_name)
+    extraction = locate_extraction(company_name, pdf_name, split_filename) or {}
+    extractions_dir = _find_company_dir(EXTRACTIONS_DIR, company_name)
+    stem = Path(split_filename).stem
+    for suffix in ("_extracted.json", "_metadata.json"):
+        if (extractions_dir / pdf_name / f"{stem}{suffix}").exists():
+            lform_index.add_extraction(extractions_dir.name, pdf_name, f"{stem}{suffix}")
+    try:
+        with engine.begin() as conn:
+            result = conn.execute(text(f"""
+                UPDATE {SPLIT_TABLE}
+                SET extraction_source = :source,
+                    extraction_path = :json_path,
+                    extraction_metadata_path = :metadata_path,
+                    extracted_at = :extracted_at
+                WHERE company_slug = :company_slug
+                  AND pdf_name = :pdf_name
+                  AND split_filename = :split_filename
+            """), {
+                "source": extraction.get("source"),
+                "json_path": extraction.get("json_path"),
+                "metadata_path": extraction.get("metadata_path"),
+                "extracted_at": extraction.get("extracted_at"),
+                "company_slug": slug,
+                "pdf_name": pdf_name,
+                "split_filename": split_filename,
+            })
+        if result.rowcount:
+            return True
+        return reconcile_pdf(company_name, pdf_name, engine=engine)
+    except Exception as e:
+        print(f"⚠️ Catalog extraction update failed for {slug}/{pdf_name}/{split_filename}: {e}")
+        return False
+
+
+def remove_pdf(company_name: str, pdf_name: str, engine=None) -> bool:
+    """Drop a deleted PDF and its splits from the catalog"""
+    engine = engine or default_engine
+    lform_index.remove_pdf(company_slug(company_name), pdf_name)
+    try:
+        with engine.begin() as conn:
+            _delete_pdf(conn, company_slug(company_name), pdf_name)
+        return True
+    except Exception as e:
+        print(f"⚠️ Catalog delete failed for {company_name}/{pdf_name}: {e}")
+        return False
+
+
+def _read_metadata(pdf_folder: Path) -> Optional[Dict]:
+    metadata_path = pdf_folder / "metadata.json"
+    if not metadata_path.exists():
+        return None
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def reconcile_pdf(company_name: str, pdf_name: str, engine=None) -> bool:
+    """Re-read one PDF's metadata.json into the catalog (removed if gone)"""
+    engine = engine or default_engine
+    metadata = _read_metadata(SPLITS_DIR / company_slug(company_name) / pdf_name)
+    if metadata is None:
+        return remove_pdf(company_name, pdf_name, engine=engine)
+    return record_split(company_name, pdf_name, metadata, engine=engine)
+
+
+def reconcile_catalog(splits_dir: Optional[Path] = None, engine=None) -> Dict:
+    """
+    Rebuild pdf_catalog / pdf_split_catalog from the files on disk
+
+    Args:
+        splits_dir: Root of the split folders (default pdf_splits/)
+        engine: SQLAlchemy engine (defaults to the app engine)
+
+    Returns:
+        {'success': bool, 'pdfs': int, 'splits': int, 'extracted': int,
+         'seconds': float, 'error': str (if failed)}
+    """
+    engine = engine or default_engine
+    splits_dir = Path(splits_dir or SPLITS_DIR)
+    start = time.perf_counter()
+    lform_index.invalidate()
+
+    pdf_rows, split_rows = [], []
+    try:
+        if splits_dir.exists():
+            for company_folder in sorted(splits_dir.iterdir()):
+                if not company_folder.is_dir():
+                    continue
+                for pdf_folder in sorted(company_folder.iterdir()):
+                    if not pdf_folder.is_dir():
+                        continue
+                    try:
+                        metadata = _read_metadata(pdf_folder)
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️ Skipping {pdf_folder}: unreadable metadata.json ({e})")
+                        continue
+                    if metadata is None:
+                        continue
+                    pdf_rows.append(_pdf_row(company_folder.name, pdf_folder.name, metadata))
+                    split_rows.extend(_split_rows(
+                        company_folder.name, pdf_folder.name, company_folder.name, metadata))
+
+        with engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {SPLIT_TABLE}"))
+            conn.execute(text(f"DELETE FROM {PDF_TABLE}"))
+            _insert(conn, pdf_rows, split_rows)
+
+        extracted = sum(1 for r in split_rows if r["extraction_source"])
+        seconds = round(time.perf_counter() - start, 3)
+        print(f"🗂️ PDF catalog rebuilt: {len(pdf_rows)} PDFs, {len(split_rows)} splits "
+              f"({extracted} extracted) in {seconds}s")
+        return {
+            "success": True,
+            "pdfs": len(pdf_rows),
+            "splits": len(split_rows),
+            "extracted": extracted,
+            "seconds": seconds,
+        }
+
+    except Exception as e:
+        print(f"❌ PDF catalog reconcile failed: {e}")
+        return {"success": False, "error": str(e)}
+
+
+def catalog_generation(engine=None) -> tuple:
+    """
+    Marker that changes whenever any process writes the catalog
+
+    Row counts and highest ids of both tables (record_split deletes and
+    re-inserts, and ids are never reused, so the highest id moves;
+    remove_pdf lowers the counts) and the number of splits with an
+    extraction (record_extraction fills it in).
+    Timestamps are not used: DATETIME has whole-second resolution and the
+    extraction UPDATE does not touch updated_at.
+    """
+    engine = engine or default_engine
+    with engine.connect() as conn:
+        return tuple(conn.execute(text(f"""
+            SELECT
+                (SELECT COUNT(*) FROM {PDF_TABLE}),
+                (SELECT MAX(id) FROM {PDF_TABLE}),
+                (SELECT COUNT(*) FROM {SPLIT_TABLE}),
+                (SELECT MAX(id) FROM {SPLIT_TABLE}),
+                (SELECT COUNT(extraction_path) FROM {SPLIT_TABLE})
+        """)).one())
+
+
+def ensure_catalog(engine=None):
+    """Build the catalog from disk the first time this process finds it empty"""
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    engine = engine or default_engine
+    with _bootstrap_lock:
+        if _bootstrapped:
+            return
+        with engine.connect() as conn:
+            empty = conn.execute(text(f"SELECT 1 FROM {PDF_TABLE} LIMIT 1")).first() is None
+        if empty and SPLITS_DIR.exists() and any(SPLITS_DIR.iterdir()):
+            result = reconcile_catalog(engine=engine)
+            if not result["success"]:
+                raise RuntimeError(result["error"])
+        _bootstrapped = True
+
+
+def list_companies(engine=None) -> List[Dict]:
+    """Companies with at least one split PDF"""
+    engine = engine or default_engine
+    ensure_catalog(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT company_slug, COUNT(*) FROM {PDF_TABLE}
+            GROUP BY company_slug
+            ORDER BY company_slug
+        """)).fetchall()
+    return [
+        {"name": slug.replace("_", " ").title(), "folder_name": slug, "pdf_count": count}
+        for slug, count in rows
+    ]
+
+
+def list_company_pdfs(company_name: str, engine=None) -> List[Dict]:
+    """Split PDFs of one company"""
+    engine = engine or default_engine
+    ensure_catalog(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT pdf_name, total_splits, original_filename, method
+            FROM {PDF_TABLE}
+            WHERE company_slug = :company_slug
+            ORDER BY pdf_name
+        """), {"company_slug": company_slug(company_name)}).fetchall()
+    return [
+        {"pdf_name": r[0], "total_splits": r[1] or 0, "original_filename": r[2], "method": r[3]}
+        for r in rows
+    ]
+
+
+def list_pdf_splits(company_name: str, pdf_name: str, engine=None) -> List[Dict]:
+    """metadata.json split_files entries of one PDF, in split order"""
+    engine = engine or default_engine
+    ensure_catalog(engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT split_json FROM {SPLIT_TABLE}
+            WHERE company_slug = :company_slug AND pdf_name = :pdf_name
+            ORDER BY split_order
+        """), {"company_slug": company_slug(company_name), "pdf_name": pdf_name}).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+
+def get_split_extraction(company_name: str, pdf_name: str, split_filename: str,
+                         engine=None) -> Optional[Dict[str, Any]]:
+    """
+    Catalogued extraction output of a split
+
+    Returns:
+        None if the split is not catalogued, {'source': None} if it was never
+        extracted, else {'source', 'json_path', 'metadata_path', 'extracted_at'}
+    """
+    engine = engine or default_engine
+    ensure_catalog(engine)
+    with engine.connect() as conn:
+        row = conn.execute(text(f"""
+            SELECT extraction_source, extraction_path, extraction_metadata_path, extracted_at
+            FROM {SPLIT_TABLE}
+            WHERE company_slug = :company_slug
+              AND pdf_name = :pdf_name
+              AND split_filename = :split_filename
+        """), {
+            "company_slug": company_slug(company_name),
+            "pdf_name": pdf_name,
+            "split_filename": split_filename,
+        }).first()
+    if row is None:
+        return None
+    return {"source": row[0], "json_path": row[1], "metadata_path": row[2], "extracted_at": row[3]}
+
+
+if __name__ == "__main__":
+    print(reconcile_catalog())
@@ -1,10 +1,69 @@
 import json
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
+import pandas as pd
 import pdfplumber
-import camelot
 import string
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Compiled patterns (metadata runs per page, row / cell helpers per row and cell)
+# ---------------------------------------------------------------------------
+
+WHITESPACE = re.compile(r"\s+")
+MULTI_SPACE = re.compile(r"\s{2,}")
+NON_ALNUM = re.compile(r"[^A-Za-z0-9\s]")
+DIGIT = re.compile(r"\d")
+WORDS = re.compile(r"[a-z]+")
+
+PERIOD = re.compile(
+    r"(for the .*?ended.*?\d{4}|revenue account.*?ended.*?\d{4}|period ended.*?\d{4}|balance sheet.*?\d{4})",
+    re.IGNORECASE)
+PERIOD_REWRITES = (
+    (re.compile(r"REVENUE\s+ACCOUNT\s+FOR\s+THE\s+QUARTER\s+ENDED", re.IGNORECASE),
+     "For the quarter ended"),
+    (re.compile(r"FOR\s+THE\s+PERIOD\s+ENDED", re.IGNORECASE), "For the period ended"),
+    (re.compile(r"BALANCE\s+SHEET\s+AS\s+AT", re.IGNORECASE), "As at"),
+)
+TEMPLATE_FORM_KEY = re.compile(r"form[\s\-_]*", re.IGNORECASE)
+FORM_NO = re.compile(r"(L[-\s]?\d+[A-Z]*)", re.IGNORECASE)
+COMPANY_NAME = re.compile(
+    r"([A-Z0-9\s&\.\-']+(?:INSURANCE COMPANY LIMITED|COMPANY LIMITED|INSURANCE LIMITED|COMPANY LTD|INSURANCE CO\.? LTD))",
+    re.IGNORECASE)
+TITLE_PREFIX = re.compile(
+    r"^(RA|BS|P&L|Revenue Account|Balance Sheet|REVENUE|BALANCE|Form\s*L[-\s]?\d+)\s*[\:\-]?\s*",
+    re.IGNORECASE)
+REGISTRATION = re.compile(
+    r"(?:Regn\.?\s*No\.?|Registration\s*Number|Reg\s*No|Reg\s*Number|registration\s*no)\s*[:\-]?\s*(.+?)(?:\n|$)",
+    re.IGNORECASE)
+CURRENCY = re.compile(r"(?:\(|\b)(₹|Rs|INR).{0,20}?(lakh|lac|lacs|crore|cr)\b", re.IGNORECASE)
+CURRENCY_LAKHS = re.compile(r"(amt\.?\s*in\s*rs\.?\s*lakhs|rs\.?\s*in\s*lakhs)", re.IGNORECASE)
+CURRENCY_CRORES = re.compile(r"(amt\.?\s*in\s*rs\.?\s*crores|rs\.?\s*in\s*crores)", re.IGNORECASE)
+
+TEXT_TABLE_SPLIT = re.compile(r"\s{2,}|\t+|(?<=\d)\s+(?=[A-Za-z])|(?<=[a-z])\s+(?=\d)")
+NUMBER_TEXT_BOUNDARY = re.compile(r"(?<=\d)\s+(?=[A-Za-z])|(?<=[a-z])\s+(?=\d)")
+AMOUNT_START = re.compile(r"\s+(?=Rs\.|₹|\d+,\d+|\(\d+\))")
+LEADING_SERIALS = re.compile(r"^((?:\d+\s+){2,})(.+)$")
+CELL_SPLIT = re.compile(r"\s{2,}|\n|;|\|")
+CURRENCY_CELL = re.compile(r"₹|rs\b|inr\b|\(.*lakh.*\)|lakh\b|crore\b|amt\.? in", re.IGNORECASE)
+
+TOC_FORM_TOKEN = re.compile(r"\bL-\d+[A-Z]*\b", re.IGNORECASE)
+TOC_LIST_STRUCTURE = re.compile(r"\.\.\.\.*\s*\d+|page\s+\d+|\d+\s*\.\s*\d+")
+
+# Row mapping: map_to_rows works on whole columns (pandas / NumPy) unless
+# PDF_MAP_ROWS_VECTORIZED=0, which selects the original row-by-row path
+MAP_ROWS_VECTORIZED = os.getenv("PDF_MAP_ROWS_VECTORIZED", "1") == "1"
+
+HEADER_ROW_TERMS = ("particulars", "current", "previous", "amount", "balance")
+SKIP_ROW_PATTERNS = (
+    "form no", "form number", "registration number", "regn no",
+    "revenue account", "balance sheet", "profit and loss",
+    "insurance company", "limited", "page", "continued",
+)
+SERIAL_HEADER_TOKENS = ("sl", "no", "s.no", "sl.", "serial")
 
 
 def load_template(path):
@@ -47,10 +106,11 @@ def load_template(path):
     return template
 
 
+@lru_cache(maxsize=16384)
 def normalize_text(s: str) -> str:
     if not s:
         return ""
-    s = re.sub(r"\s+", " ", s).strip()
+    s = WHITESPACE.sub(" ", s).strip()
     return s.strip(string.punctuation + " ").lower()
 
 
@@ -58,14 +118,12 @@ def normalize_header_for_display(h: str) -> str:
     if not h:
         return ""
     # Remove internal newlines / multiple spaces; keep single space
-    h2 = re.sub(r"\s+", " ", h.replace("\n", " ").replace("\r", " ")).strip()
+    h2 = WHITESPACE.sub(" ", h.replace("\n", " ").replace("\r", " ")).strip()
     return h2
 
 
 def extract_period(text):
-    match = re.search(
-        r"(for the .*?ended.*?\d{4}|revenue account.*?ended.*?\d{4}|period ended.*?\d{4}|balance sheet.*?\d{4})",
-        text, flags=re.IGNORECASE)
+    match = PERIOD.search(text)
     return match.group(1).strip() if match else ""
 
 
@@ -77,68 +135,56 @@ def extract_metadata(text, template):
 
     # Method 1: From template
     for key in template.keys():
-        if re.match(r"form[\s\-_]*", key, re.IGNORECASE):
+        if TEMPLATE_FORM_KEY.match(key):
             form_val = template[key]
             break
 
     # Method 2: Extract from filename or content
     if not form_val:
         # Look for L-XX patterns in text
-        match = re.search(r"(L[-\s]?\d+[A-Z]*)", text, flags=re.IGNORECASE)
+        match = FORM_NO.search(text)
         if match:
             form_val = match.group(1).upper().replace(" ", "-")
 
     # Method 3: Handle special cases based on content
     if not form_val or form_val == "":
-        if "embedded value" in text.lower():
+        text_lower = text.lower()
+        if "embedded value" in text_lower:
             form_val = "L-44"
-        elif "voting activity" in text.lower() or "stewardship" in text.lower():
+        elif "voting activity" in text_lower or "stewardship" in text_lower:
             form_val = "L-43"
-        elif "solvency margin" in text.lower():
+        elif "solvency margin" in text_lower:
             form_val = "L-32"
-        elif "revenue account" in text.lower():
+        elif "revenue account" in text_lower:
             form_val = "L-1-A"
-        elif "balance sheet" in text.lower():
+        elif "balance sheet" in text_lower:
             form_val = "L-3-A"
-        elif "profit" in text.lower() and "loss" in text.lower():
+        elif "profit" in text_lower and "loss" in text_lower:
             form_val = "L-2-A"
 
     meta["Form No"] = form_val
 
     # 2. Title
-    company_match = re.search(
-        r"([A-Z0-9\s&\.\-']+(?:INSURANCE COMPANY LIMITED|COMPANY LIMITED|INSURANCE LIMITED|COMPANY LTD|INSURANCE CO\.? LTD))",
-        text,
-        flags=re.IGNORECASE
-    )
+    company_match = COMPANY_NAME.search(text)
     title_raw = company_match.group(
         1) if company_match else template.get("Title", "")
-    title = re.sub(r"^(RA|BS|P&L|Revenue Account|Balance Sheet|REVENUE|BALANCE|Form\s*L[-\s]?\d+)\s*[\:\-]?\s*", "", (title_raw or ""),
-                   flags=re.IGNORECASE)
-    meta["Title"] = re.sub(r"\s+", " ", title).strip()
+    title = TITLE_PREFIX.sub("", title_raw or "")
+    meta["Title"] = WHITESPACE.sub(" ", title).strip()
 
     # 3. Registration number
-    reg_match = re.search(
-        r"(?:Regn\.?\s*No\.?|Registration\s*Number|Reg\s*No|Reg\s*Number|registration\s*no)\s*[:\-]?\s*(.+?)(?:\n|$)",
-        text,
-        flags=re.IGNORECASE
-    )
+    reg_match = REGISTRATION.search(text)
     meta["RegistrationNumber"] = reg_match.group(
         1).strip() if reg_match else ""
 
     # 4. Period
     raw_period = extract_period(text) or template.get("Period", "")
     rp = raw_period
-    rp = re.sub(r"REVENUE\s+ACCOUNT\s+FOR\s+THE\s+QUARTER\s+ENDED",
-                "For the quarter ended", rp, flags=re.IGNORECASE)
-    rp = re.sub(r"FOR\s+THE\s+PERIOD\s+ENDED",
-                "For the period ended", rp, flags=re.IGNORECASE)
-    rp = re.sub(r"BALANCE\s+SHEET\s+AS\s+AT", "As at", rp, flags=re.IGNORECASE)
+    for pattern, replacement in PERIOD_REWRITES:
+        rp = pattern.sub(replacement, rp)
     meta["Period"] = rp.strip()
 
     # 5. Currency
-    currency_match = re.search(
-        r"(?:\(|\b)(₹|Rs|INR).{0,20}?(lakh|lac|lacs|crore|cr)\b", text, flags=re.IGNORECASE)
+    currency_match = CURRENCY.search(text)
     if currency_match:
         unit = currency_match.group(2).lower()
         if "cr" in unit or "crore" in unit:
@@ -146,9 +192,9 @@ def extract_metadata(text, template):
         else:
             meta["Currency"] = "in Lakhs"
     else:
-        if re.search(r"(amt\.?\s*in\s*rs\.?\s*lakhs|rs\.?\s*in\s*lakhs)", text, flags=re.IGNORECASE):
+        if CURRENCY_LAKHS.search(text):
             meta["Currency"] = "in Lakhs"
-        elif re.search(r"(amt\.?\s*in\s*rs\.?\s*crores|rs\.?\s*in\s*crores)", text, flags=re.IGNORECASE):
+        elif CURRENCY_CRORES.search(text):
             meta["Currency"] = "in Crores"
         else:
             meta["Currency"] = ""
@@ -163,17 +209,19 @@ def extract_tables_from_page(pdf_path, page_number):
     # PRIMARY: Use camelot first (better for complex tables)
     print("[INFO] Trying camelot extraction...")
     try:
+        # Imported here so the module (and its row mapping) loads without
+        # camelot; a missing install falls through to pdfplumber below
+        import camelot
+
         # Try lattice first (works better for bordered tables), then stream
         camelot_tables = camelot.read_pdf(
             pdf_path, pages=str(page_number), flavor="lattice")
         print(f"Camelot lattice found {len(camelot_tables)} tables")
 
         for i, t in enumerate(camelot_tables):
-            table_data = t.df.values.tolist()
-            if table_data and len(table_data) > 0:
-                print(
-                    f"Camelot table {i}: {len(table_data)} rows, {len(table_data[0]) if table_data else 0} cols")
-                tables.append(table_data)
+            if len(t.df) > 0:
+                print(f"Camelot table {i}: {t.df.shape[0]} rows, {t.df.shape[1]} cols")
+                tables.append(t.df)
 
         # If lattice didn't find good tables, try stream as a fallback
         if not tables:
@@ -183,11 +231,10 @@ def extract_tables_from_page(pdf_path, page_number):
             print(f"Camelot stream found {len(camelot_tables)} tables")
 
             for i, t in enumerate(camelot_tables):
-                table_data = t.df.values.tolist()
-                if table_data and len(table_data) > 0:
+                if len(t.df) > 0:
                     print(
-                        f"Camelot stream table {i}: {len(table_data)} rows, {len(table_data[0]) if table_data else 0} cols")
-                    tables.append(table_data)
+                        f"Camelot stream table {i}: {t.df.shape[0]} rows, {t.df.shape[1]} cols")
+                    tables.append(t.df)
 
     except Exception as e:
         print(f"[WARNING] Camelot extraction failed: {e}")
@@ -243,27 +290,38 @@ def extract_tables_from_page(pdf_path, page_number):
     return tables
 
 
+def _table_shape(table) -> Tuple[int, int]:
+    """(rows, columns of the first row) of a camelot DataFrame or a list of rows"""
+    if isinstance(table, pd.DataFrame):
+        return table.shape
+    if not table:
+        return 0, 0
+    return len(table), len(table[0])
+
+
+def _first_cell(table):
+    if isinstance(table, pd.DataFrame):
+        return table.iat[0, 0] if table.shape[1] else ""
+    return table[0][0] if table[0] else ""
+
+
 def _is_similar_table(new_table, existing_tables):
     """Check if a table is similar to existing ones to avoid duplicates"""
-    if not existing_tables or not new_table:
+    if not existing_tables or not _table_shape(new_table)[0]:
         return False
 
-    new_rows = len(new_table)
-    new_cols = len(new_table[0]) if new_table else 0
+    new_rows, new_cols = _table_shape(new_table)
 
     for existing in existing_tables:
-        existing_rows = len(existing)
-        existing_cols = len(existing[0]) if existing else 0
+        existing_rows, existing_cols = _table_shape(existing)
 
         # Similar dimensions
         if abs(new_rows - existing_rows) <= 1 and abs(new_cols - existing_cols) <= 1:
             # Check first few cells for similarity
-            if new_table and existing:
+            if existing_rows:
                 try:
-                    new_first = str(
-                        new_table[0][0] if new_table[0] else "").strip().lower()
-                    existing_first = str(
-                        existing[0][0] if existing[0] else "").strip().lower()
+                    new_first = str(_first_cell(new_table)).strip().lower()
+                    existing_first = str(_first_cell(existing)).strip().lower()
                     if new_first and existing_first and new_first == existing_first:
                         return True
                 except (IndexError, AttributeError):
@@ -284,7 +342,7 @@ def _extract_table_from_text(text):
 
         # Look for lines that might be table rows
         # Criteria: contains numbers, financial terms, or typical table patterns
-        if (re.search(r'\d', line) or
+        if (DIGIT.search(line) or
                 any(keyword in line.lower() for keyword in [
                     'commission', 'total', 'gross', 'net', 'premium', 'expense',
                     'particulars', 'revenue', 'income', 'claims', 'assets',
@@ -292,8 +350,7 @@ def _extract_table_from_text(text):
                 ])):
 
             # Split by multiple spaces, tabs, or common separators
-            cols = re.split(
-                r'\s{2,}|\t+|(?<=\d)\s+(?=[A-Za-z])|(?<=[a-z])\s+(?=\d)', line)
+            cols = TEXT_TABLE_SPLIT.split(line)
 
             # Clean and filter columns
             cols = [col.strip() for col in cols if col.strip()]
@@ -313,8 +370,8 @@ def build_header_token_set(flat_headers):
     for h in flat_headers:
         if not h:
             continue
-        raw = re.sub(r"[^A-Za-z0-9\s]", " ", h)
-        raw = re.sub(r"\s+", " ", raw).strip().lower()
+        raw = NON_ALNUM.sub(" ", h)
+        raw = WHITESPACE.sub(" ", raw).strip().lower()
         if raw:
             tokens.add(raw)
             for w in raw.split():
@@ -325,25 +382,34 @@ def build_header_token_set(flat_headers):
     return tokens
 
 
-def cell_is_header_like(cell_value: str, header_tokens: set):
+def build_token_prefixes(header_tokens):
+    """Every 1-4 char prefix of the tokens: cell_is_header_like's short-value check as a set lookup"""
+    return {t[:n] for t in header_tokens for n in range(1, 5)}
+
+
+def cell_is_header_like(cell_value: str, header_tokens: set, token_prefixes: Optional[set] = None):
     if not cell_value:
         return False
     nv = normalize_text(cell_value)
     if not nv:
         return False
-    if re.search(r"₹|rs\b|inr\b|\(.*lakh.*\)|lakh\b|crore\b|amt\.? in", cell_value, flags=re.IGNORECASE):
+    if CURRENCY_CELL.search(cell_value):
         return True
     if nv in header_tokens:
         return True
-    words = [w for w in re.findall(r"[a-z]+", nv)]
+    words = WORDS.findall(nv)
     if words and all(w in header_tokens for w in words):
         return True
-    if len(nv) <= 4 and any(nv == t[:len(nv)] for t in header_tokens):
-        return True
+    if len(nv) <= 4:
+        if token_prefixes is not None:
+            return nv in token_prefixes
+        if any(nv == t[:len(nv)] for t in header_tokens):
+            return True
     return False
 
 
-def is_row_header_like(mapped_row: dict, header_tokens: set, meta_values_norm: set):
+def is_row_header_like(mapped_row: dict, header_tokens: set, meta_values_norm: set,
+                       token_prefixes: Optional[set] = None):
     non_empty = [(h, v) for h, v in mapped_row.items() if v and v.strip()]
     if not non_empty:
         return True
@@ -358,7 +424,7 @@ def is_row_header_like(mapped_row: dict, header_tokens: set, meta_values_norm: s
 
     header_like_count = 0
     for _, val in non_empty:
-        if cell_is_header_like(val, header_tokens):
+        if cell_is_header_like(val, header_tokens, token_prefixes):
             header_like_count += 1
 
     if header_like_count >= 2:
@@ -373,8 +439,7 @@ def normalize_row(mapped, flat_headers):
         cell = mapped.get(h, "").replace("\n", " ").strip()
         if cell:
             # Split long cell values using multiple-spaces or semicolons, but keep single-word values intact
-            tokens = [tok.strip() for tok in re.split(
-                r"\s{2,}|\n|;|\|", cell) if tok.strip()]
+            tokens = [tok.strip() for tok in CELL_SPLIT.split(cell) if tok.strip()]
             # If a token looks like multiple serial numbers ("1 2 3"), keep it as-is for now
             all_values.extend(tokens)
         else:
@@ -386,7 +451,7 @@ def normalize_row(mapped, flat_headers):
             return False
         # Consider digits, parentheses markers, a/b labels and common markers as numeric-like
         s2 = s.replace(',', '').replace('*', '').strip()
-        return bool(re.search(r"\d", s2))
+        return bool(DIGIT.search(s2))
 
     # If headers expect a leading serial number but the first value is non-numeric
     # and another cell contains numeric data, try to realign by moving the rightmost numeric token into the serial column
@@ -403,7 +468,7 @@ def normalize_row(mapped, flat_headers):
     # Post-process alignment heuristics
     # If first header looks like a serial (sl, sl., s.no, no.) but value is not numeric
     first_h = flat_headers[0].lower() if flat_headers else ""
-    if any(tok in first_h for tok in ["sl", "no", "s.no", "sl.", "serial"]) and not is_numeric_like(cleaned.get(flat_headers[0], "")):
+    if any(tok in first_h for tok in SERIAL_HEADER_TOKENS) and not is_numeric_like(cleaned.get(flat_headers[0], "")):
         # find rightmost numeric-like column
         right_numeric_idx = None
         for idx in range(len(flat_headers)-1, -1, -1):
@@ -421,8 +486,36 @@ def normalize_row(mapped, flat_headers):
     return cleaned
 
 
-def map_to_rows(table, flat_headers, meta):
-    """Map extracted table rows to template headers, being more inclusive to avoid missing data."""
+def map_to_rows(table, flat_headers, meta, vectorized: Optional[bool] = None):
+    """
+    Map extracted table rows to template headers, being more inclusive to avoid missing data.
+
+    Args:
+        table: camelot DataFrame (t.df) or list of rows (pdfplumber / text)
+        flat_headers: Template headers
+        meta: Page metadata (rows repeating it are skipped)
+        vectorized: Column-wise path (map_frame_to_rows) or row-by-row
+            path (map_rows_rowwise); defaults to MAP_ROWS_VECTORIZED
+
+    Returns:
+        List of {header: value} rows; both paths return the same rows
+    """
+    if not _table_shape(table)[0] or not flat_headers:
+        print("WARNING: Empty table or no headers available")
+        return []
+
+    if vectorized is None:
+        vectorized = MAP_ROWS_VECTORIZED
+    # Duplicate header names collapse in the row dicts; only the row path models that
+    if vectorized and len(set(flat_headers)) == len(flat_headers):
+        return map_frame_to_rows(table, flat_headers, meta)
+    return map_rows_rowwise(table, flat_headers, meta)
+
+
+def map_rows_rowwise(table, flat_headers, meta):
+    """Row-by-row map_to_rows: each row is cleaned, mapped, filtered and normalized on its own"""
+    if isinstance(table, pd.DataFrame):
+        table = table.values.tolist()
     if not table or not flat_headers:
         print("WARNING: Empty table or no headers available")
         return []
@@ -435,6 +528,7 @@ def map_to_rows(table, flat_headers, meta):
     mapped_rows = []
 
     header_tokens = build_header_token_set(flat_headers)
+    token_prefixes = build_token_prefixes(header_tokens)
     meta_values_norm = {normalize_text(str(v)) for v in meta.values() if v}
 
     # Find actual header row (might not be first row)
@@ -468,7 +562,7 @@ def map_to_rows(table, flat_headers, meta):
         mapped = _map_row_to_headers(cleaned, flat_headers)
 
         # Check if this looks like a data row (less strict filtering)
-        if _is_valid_data_row(mapped, header_tokens, meta_values_norm):
+        if _is_valid_data_row(mapped, header_tokens, meta_values_norm, token_prefixes):
             # Always normalize the row
             normalized = normalize_row(mapped, flat_headers)
             mapped_rows.append(normalized)
@@ -481,11 +575,226 @@ def map_to_rows(table, flat_headers, meta):
     return mapped_rows
 
 
+def _per_value(cells: np.ndarray, fn, dtype=object) -> np.ndarray:
+    """
+    fn of every cell, called once per distinct value (pd.factorize) and
+    broadcast back to the cells' shape. Table cells repeat a lot (blank
+    cells, header words, schedule codes), and .str methods on object
+    columns loop in Python anyway.
+    """
+    codes, values = pd.factorize(cells.ravel(), use_na_sentinel=False)
+    per_value = np.empty(len(values), dtype=dtype)
+    per_value[:] = [fn(v) for v in values]
+    return per_value[codes].reshape(cells.shape)
+
+
+def _clean_cell(cell) -> str:
+    return str(cell).strip() if cell is not None else ""
+
+
+# Called per cell, not per distinct value: factorize treats None / NaN and
+# 1 / 1.0 / True as equal, while str() of them differs
+_clean_cells = np.frompyfunc(_clean_cell, 1, 1)
+
+
+def _table_cells(table) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Table as a 2-D array of stripped strings (None -> "", as in the row
+    path) and the cell count of each row. Rows of a list table are split
+    like the row path does (string rows via _smart_split_row) and short
+    rows padded with "".
+    """
+    if isinstance(table, pd.DataFrame):
+        cells = table.to_numpy(dtype=object)
+        widths = np.full(len(cells), cells.shape[1])
+    else:
+        rows = [_smart_split_row(row) if isinstance(row, str) else list(row) for row in table]
+        widths = np.array([len(row) for row in rows], dtype=int)
+        cells = np.full((len(rows), int(widths.max(initial=0))), None, dtype=object)
+        for i, row in enumerate(rows):
+            cells[i, :len(row)] = row
+    return _clean_cells(cells).astype(object), widths
+
+
+def _find_header_row_cells(cells: np.ndarray, flat_headers) -> int:
+    """_find_header_row over the first 10 rows"""
+    head = cells[:10]
+    if not head.size:
+        return -1
+    normalized_headers = [normalize_text(h) for h in flat_headers if h]
+
+    def header_matches(cell: str) -> int:
+        cell = cell.lower()
+        if not cell:
+            return 0
+        cell_norm = normalize_text(cell)
+        return (any(header in cell_norm for header in normalized_headers)
+                + any(term in cell for term in HEADER_ROW_TERMS))
+
+    matches = _per_value(head, header_matches, dtype=int).sum(axis=1)
+    found = np.flatnonzero(matches >= max(1, min(2, len(flat_headers) // 2)))
+    return int(found[0]) if found.size else -1
+
+
+def _join_nonblank(block: np.ndarray) -> np.ndarray:
+    """Non-empty cells of each row joined with spaces, built column by column"""
+    if block.shape[1] == 0:
+        return np.full(block.shape[0], "", dtype=object)
+    joined = block[:, 0].copy()
+    for j in range(1, block.shape[1]):
+        col = block[:, j]
+        joined = np.where(col == "", joined, np.where(joined == "", col, joined + " " + col))
+    return joined
+
+
+def _map_cells_to_headers(cells: np.ndarray, widths: np.ndarray, flat_headers) -> np.ndarray:
+    """
+    _map_row_to_headers for a whole table: rows with more cells than headers
+    are merged per distinct cell count, all other rows are cut / padded
+    """
+    n_headers = len(flat_headers)
+    if cells.shape[1] < n_headers:
+        padding = np.full((cells.shape[0], n_headers - cells.shape[1]), "", dtype=object)
+        cells = np.hstack([cells, padding])
+    mapped = cells[:, :n_headers].copy()
+
+    first_h = flat_headers[0].lower()
+    particulars_first = 'particular' in first_h or 'information' in first_h
+    for width in np.unique(widths[widths > n_headers]):
+        rows = np.flatnonzero(widths == width)
+        block = cells[rows, :width]
+        if not particulars_first:
+            # Extra cells go into the last column
+            merged = np.column_stack([block[:, :n_headers - 1],
+                                      _join_nonblank(block[:, n_headers - 1:])])
+        elif n_headers == 1:
+            merged = block[:, :1]
+        else:
+            # Middle cells become the second column, the right-aligned tail
+            # fills the rest (its last cell falls off, as in the row path)
+            tail_start = width - (n_headers - 1)
+            merged = np.column_stack([block[:, 0], _join_nonblank(block[:, 1:tail_start]),
+                                      block[:, tail_start:width - 1]])
+        mapped[rows] = merged
+    return mapped
+
+
+def _valid_data_rows(mapped: np.ndarray, header_tokens: set, meta_values_norm: set) -> np.ndarray:
+    """_is_valid_data_row as a boolean mask over the mapped rows"""
+    filled = mapped != ""
+    filled_count = filled.sum(axis=1)
+    token_prefixes = build_token_prefixes(header_tokens)
+
+    def skipped_first_value(value: str) -> bool:
+        particulars_norm = normalize_text(value)
+        return bool(particulars_norm) and (
+            any(pattern in particulars_norm for pattern in SKIP_ROW_PATTERNS)
+            or any(particulars_norm in mv for mv in meta_values_norm))
+
+    skipped = _per_value(mapped[:, 0], skipped_first_value, dtype=bool)
+    header_like = _per_value(
+        mapped, lambda v: cell_is_header_like(v, header_tokens, token_prefixes), dtype=bool)
+    mostly_headers = (header_like & filled).sum(axis=1) >= filled_count * 0.7
+
+    return (filled_count > 0) & filled[:, 0] & ~skipped & ~mostly_headers
+
+
+def _cell_values(cell: str) -> List[str]:
+    """normalize_row's split of one cell: an empty cell keeps its slot"""
+    if not cell:
+        return [""]
+    return [tok.strip() for tok in CELL_SPLIT.split(cell) if tok.strip()]
+
+
+def _normalize_cells(mapped: np.ndarray, flat_headers) -> np.ndarray:
+    """
+    normalize_row for a whole table: cells holding several values (double
+    spaces, ";" or "|") refill their row left to right, then rows whose
+    first value is not numeric get the serial-number realignment, done with
+    index arithmetic
+    """
+    n_rows, n_headers = mapped.shape
+    result = _per_value(mapped, lambda v: v.replace("\n", " ").strip())
+    multi = _per_value(result, lambda v: CELL_SPLIT.search(v) is not None, dtype=bool)
+
+    multi_rows = np.flatnonzero(multi.any(axis=1))
+    if multi_rows.size:
+        block = result[multi_rows]
+        codes, cells = pd.factorize(block.ravel())
+        cell_values = [_cell_values(cell) for cell in cells]
+        counts = np.array([len(values) for values in cell_values], dtype=int)[codes]
+        row = np.repeat(np.arange(len(multi_rows)), counts.reshape(block.shape).sum(axis=1))
+        # Position of each value within its row
+        row_starts = np.flatnonzero(np.r_[True, row[1:] != row[:-1]]) if row.size else row
+        slot = np.arange(len(row)) - np.repeat(row_starts, np.diff(np.r_[row_starts, len(row)]))
+        flat_values = np.empty(len(row), dtype=object)
+        flat_values[:] = [value for code in codes for value in cell_values[code]]
+        refilled = np.full(block.shape, "", dtype=object)
+        fits = slot < n_headers
+        refilled[row[fits], slot[fits]] = flat_values[fits]
+        result[multi_rows] = refilled
+
+    first_h = flat_headers[0].lower()
+    if any(tok in first_h for tok in SERIAL_HEADER_TOKENS):
+        # First value not numeric: move the rightmost numeric value to the
+        # front and shift the values before it one column right
+        numeric = _per_value(result, lambda v: DIGIT.search(v) is not None, dtype=bool)
+        shift = ~numeric[:, 0] & numeric.any(axis=1)
+        if shift.any():
+            rightmost = n_headers - 1 - np.argmax(numeric[:, ::-1], axis=1)
+            cols = np.arange(n_headers)
+            source = np.where(cols <= rightmost[:, None], cols - 1, cols)
+            source[:, 0] = rightmost
+            source = np.where(shift[:, None], source, cols)
+            result = np.take_along_axis(result, source, axis=1)
+    return result
+
+
+def map_frame_to_rows(table, flat_headers, meta):
+    """
+    Column-wise map_to_rows: the table stays a pandas / NumPy cell array
+    through header detection, empty-row removal, header mapping, filtering
+    and realignment; rows become dicts only at the end. Same rows as
+    map_rows_rowwise.
+    """
+    cells, widths = _table_cells(table)
+    if not cells.size:
+        return []
+
+    print(
+        f"Mapping table with {len(cells)} rows to {len(flat_headers)} headers: {flat_headers}")
+
+    header_row_idx = _find_header_row_cells(cells, flat_headers)
+    data_start_idx = header_row_idx + 1 if header_row_idx >= 0 else 0
+    if data_start_idx >= len(cells):
+        data_start_idx = 0
+    print(
+        f"Header row detected at index: {header_row_idx}, data starts at: {data_start_idx}")
+
+    cells, widths = cells[data_start_idx:], widths[data_start_idx:]
+    non_empty = (cells != "").any(axis=1)
+    cells, widths = cells[non_empty], widths[non_empty]
+    if not len(cells):
+        print("Final mapped rows: 0")
+        return []
+
+    mapped = _map_cells_to_headers(cells, widths, flat_headers)
+    meta_values_norm = {normalize_text(str(v)) for v in meta.values() if v}
+    valid = _valid_data_rows(mapped, build_header_token_set(flat_headers), meta_values_norm)
+    rows = _normalize_cells(mapped[valid], flat_headers) if valid.any() else mapped[valid]
+
+    print(f"Skipped {int((~valid).sum())} non-data rows, {int((~non_empty).sum())} empty rows")
+    print(f"Final mapped rows: {len(rows)}")
+    return [dict(zip(flat_headers, row)) for row in rows.tolist()]
+
+
 def _find_header_row(rows, flat_headers, header_tokens):
     """Find the actual header row in the table"""
     if not rows:
         return -1
 
+    normalized_headers = [normalize_text(h) for h in flat_headers if h]
+
     for i, row in enumerate(rows[:10]):  # Check first 10 rows
         if isinstance(row, str):
             row = _smart_split_row(row)
@@ -498,12 +807,11 @@ def _find_header_row(rows, flat_headers, header_tokens):
         for cell in row_clean:
             if cell:
                 # Check against known headers
-                for header in flat_headers:
-                    if header and normalize_text(header) in normalize_text(cell):
-                        header_matches += 1
-                        break
+                cell_norm = normalize_text(cell)
+                if any(header in cell_norm for header in normalized_headers):
+                    header_matches += 1
                 # Check against common header terms
-                if any(term in cell for term in ['particulars', 'current', 'previous', 'amount', 'balance']):
+                if any(term in cell for term in HEADER_ROW_TERMS):
                     header_matches += 1
 
         # If majority of cells look like headers, this is likely the header row
@@ -520,7 +828,7 @@ def _smart_split_row(row_str):
 
     # Try different splitting strategies
     # 1. Split by multiple spaces (2 or more)
-    cols = re.split(r'\s{2,}', row_str.strip())
+    cols = MULTI_SPACE.split(row_str.strip())
     if len(cols) > 1:
         return cols
 
@@ -530,18 +838,18 @@ def _smart_split_row(row_str):
         return [c.strip() for c in cols if c.strip()]
 
     # 3. Split by number-text boundaries (for financial data)
-    cols = re.split(r'(?<=\d)\s+(?=[A-Za-z])|(?<=[a-z])\s+(?=\d)', row_str)
+    cols = NUMBER_TEXT_BOUNDARY.split(row_str)
     if len(cols) > 1:
         return [c.strip() for c in cols if c.strip()]
 
     # 4. Split by common patterns in financial documents
-    cols = re.split(r'\s+(?=Rs\.|₹|\d+,\d+|\(\d+\))', row_str)
+    cols = AMOUNT_START.split(row_str)
     if len(cols) > 1:
         return [c.strip() for c in cols if c.strip()]
 
     # 5. Detect leading series of serial numbers (e.g., "1 2 3  No. of branches ... 0")
     # If we detect multiple leading numbers separated by spaces followed by text, keep them joined with commas
-    m = re.match(r'^((?:\d+\s+){2,})(.+)$', row_str.strip())
+    m = LEADING_SERIALS.match(row_str.strip())
     if m:
         nums = m.group(1).strip()
         rest = m.group(2).strip()
@@ -608,7 +916,7 @@ def _map_row_to_headers(cleaned_cells, flat_headers):
     return mapped
 
 
-def _is_valid_data_row(mapped_row, header_tokens, meta_values_norm):
+def _is_valid_data_row(mapped_row, header_tokens, meta_values_norm, token_prefixes=None):
     """Check if a row contains valid data (less strict than before)"""
     non_empty = [(h, v) for h, v in mapped_row.items() if v and v.strip()]
 
@@ -628,13 +936,7 @@ def _is_valid_data_row(mapped_row, header_tokens, meta_values_norm):
     particulars_norm = normalize_text(first_value)
 
     # Skip only obvious header rows or metadata
-    skip_patterns = [
-        'form no', 'form number', 'registration number', 'regn no',
-        'revenue account', 'balance sheet', 'profit and loss',
-        'insurance company', 'limited', 'page', 'continued'
-    ]
-
-    if any(pattern in particulars_norm for pattern in skip_patterns):
+    if any(pattern in particulars_norm for pattern in SKIP_ROW_PATTERNS):
         return False
 
     # Skip if it looks like metadata (company name, period, etc.)
@@ -644,7 +946,7 @@ def _is_valid_data_row(mapped_row, header_tokens, meta_values_norm):
     # Skip obvious header rows (multiple header-like cells)
     header_like_count = 0
     for _, val in non_empty:
-        if cell_is_header_like(val, header_tokens):
+        if cell_is_header_like(val, header_tokens, token_prefixes):
             header_like_count += 1
 
     # Only skip if most cells are header-like
@@ -673,8 +975,7 @@ def is_table_of_contents_page(text):
             return True
 
     # Check for multiple form numbers in a list format (typical TOC pattern)
-    form_pattern_matches = len(re.findall(
-        r"\bL-\d+[A-Z]*\b", text, re.IGNORECASE))
+    form_pattern_matches = len(TOC_FORM_TOKEN.findall(text))
 
     # More conservative: require many forms AND no financial data AND clear list structure
     has_many_forms = form_pattern_matches > 8  # Increased threshold
@@ -686,7 +987,7 @@ def is_table_of_contents_page(text):
 
     # Check for list-like structure (page numbers, dots, etc.)
     has_list_structure = bool(
-        re.search(r'\.\.\.\.*\s*\d+|page\s+\d+|\d+\s*\.\s*\d+', text_lower))
+        TOC_LIST_STRUCTURE.search(text_lower))
 
     # Only skip if it's clearly a TOC: many forms, no financial data, and list structure
     if has_many_forms and not has_financial_data and has_list_structure:
@@ -695,6 +996,16 @@ def is_table_of_contents_page(text):
     return False
 
 
+def _read_page_texts(pdf_path) -> List[str]:
+    """
+    pdfplumber text of every page. The form type, metadata and TOC patterns
+    are tuned to pdfplumber's output, so this does not use the page sidecar
+    (PyMuPDF text differs in spacing and glyph handling on real filings).
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
 def extract_form(pdf_path, template_json, output_json):
     print(
         f"Starting extraction: PDF={pdf_path}, Template={template_json}, Output={output_json}")
@@ -717,94 +1028,96 @@ def extract_form(pdf_path, template_json, output_json):
             normalize_header_for_display(h) for h in flat_headers]
         results = []
 
-        with pdfplumber.open(pdf_path) as pdf:
-            print(f"PDF has {len(pdf.pages)} pages")
-
-            # First, analyze the content to adjust headers if needed
-            if pdf.pages:
-                sample_text = pdf.pages[0].extract_text() or ""
-                form_type = _detect_form_type(sample_text)
-                print(f"Detected form type: {form_type}")
-
-                # Adjust headers based on detected form type
-                adjusted_headers = _get_headers_for_form_type(
-                    form_type, flat_headers)
-                if adjusted_headers != flat_headers:
-                    flat_headers = adjusted_headers
-                    normalized_headers = [
-                        normalize_header_for_display(h) for h in flat_headers]
-                    print(f"Adjusted headers for {form_type}: {flat_headers}")
-
-            for page_idx, page in enumerate(pdf.pages, start=1):
-                print(f"\nProcessing page {page_idx}")
-                text = page.extract_text() or ""
-
-                # More lenient text length check
-                if len(text) < 20:
-                    print(
-                        f"Page {page_idx} has very little text ({len(text)} chars), but still processing...")
-                else:
-                    print(f"Page {page_idx} text length: {len(text)} chars")
-
-                # Skip table of contents pages (but be less aggressive)
-                if is_table_of_contents_page(text):
-                    print(
-                        f"Skipping page {page_idx} - detected as table of contents")
-                    continue
+        page_texts = _read_page_texts(pdf_path)
+        print(f"PDF has {len(page_texts)} pages")
+
+        # First, analyze the content to adjust headers if needed
+        if page_texts:
+            sample_text = page_texts[0]
+            form_type = _detect_form_type(sample_text)
+            print(f"Detected form type: {form_type}")
+
+            # Adjust headers based on detected form type
+            adjusted_headers = _get_headers_for_form_type(
+                form_type, flat_headers)
+            if adjusted_headers != flat_headers:
+                flat_headers = adjusted_headers
+                normalized_headers = [
+                    normalize_header_for_display(h) for h in flat_headers]
+                print(f"Adjusted headers for {form_type}: {flat_headers}")
+
+        for page_idx, text in enumerate(page_texts, start=1):
+            print(f"\nProcessing page {page_idx}")
+
+            # More lenient text length check
+            if len(text) < 20:
+                print(
+                    f"Page {page_idx} has very little text ({len(text)} chars), but still processing...")
+            else:
+                print(f"Page {page_idx} text length: {len(text)} chars")
 
-                meta = extract_metadata(text, template)
-                form_no = meta.get("Form No", "")
+            # Skip table of contents pages (but be less aggressive)
+            if is_table_of_contents_page(text):
                 print(
-                    f"Extracted metadata: Form No='{form_no}', Title='{meta.get('Title', '')}', Currency='{meta.get('Currency', '')}'")
+                    f"Skipping page {page_idx} - detected as table of contents")
+                continue
 
-                # Extract all tables from this page
-                tables = extract_tables_from_page(pdf_path, page_idx)
-                print(f"Found {len(tables)} tables on page {page_idx}")
+            meta = extract_metadata(text, template)
+            form_no = meta.get("Form No", "")
+            print(
+                f"Extracted metadata: Form No='{form_no}', Title='{meta.get('Title', '')}', Currency='{meta.get('Currency', '')}'")
 
-                page_total_rows = 0
-                page_has_data = False
+            # Extract all tables from this page
+            tables = extract_tables_from_page(pdf_path, page_idx)
+            print(f"Found {len(tables)} tables on page {page_idx}")
 
-                # Process each table separately and combine results
-                for table_idx, table in enumerate(tables):
-                    print(
-                        f"\nProcessing table {table_idx + 1}/{len(tables)} on page {page_idx}")
-                    print(
-                        f"Table dimensions: {len(table)} rows x {len(table[0]) if table else 0} cols")
+            page_total_rows = 0
+            page_has_data = False
 
-                    rows = map_to_rows(table, flat_headers, meta)
-                    table_row_count = len(rows)
-                    page_total_rows += table_row_count
+            # Process each table separately and combine results
+            for table_idx, table in enumerate(tables):
+                print(
+                    f"\nProcessing table {table_idx + 1}/{len(tables)} on page {page_idx}")
+                table_rows, table_cols = _table_shape(table)
+                print(f"Table dimensions: {table_rows} rows x {table_cols} cols")
 
-                    print(
-                        f"Table {table_idx + 1} produced {table_row_count} data rows")
-
-                    # Add data for each table that has rows
-                    if rows:
-                        page_has_data = True
-                        results.append({
-                            **meta,
-                            "PagesUsed": page_idx,
-                            "TableIndex": table_idx + 1,  # Track which table this data came from
-                            "FlatHeaders": flat_headers,
-                            "FlatHeadersNormalized": normalized_headers,
-                            "Rows": rows
-                        })
-                        print(
-                            f"[OK] Added {table_row_count} rows from table {table_idx + 1}")
+                rows = map_to_rows(table, flat_headers, meta)
+                table_row_count = len(rows)
+                page_total_rows += table_row_count
 
                 print(
-                    f"Page {page_idx} summary: {len(tables)} tables processed, {page_total_rows} total rows extracted")
-
-                # If no data was found but we had tables, show a warning
-                if tables and not page_has_data:
+                    f"Table {table_idx + 1} produced {table_row_count} data rows")
+
+                # Add data for each table that has rows
+                if rows:
+                    page_has_data = True
+                    results.append({
+                        **meta,
+                        "PagesUsed": page_idx,
+                        "TableIndex": table_idx + 1,  # Track which table this data came from
+                        "FlatHeaders": flat_headers,
+                        "FlatHeadersNormalized": normalized_headers,
+                        "Rows": rows
+                    })
                     print(
-                        f"[WARNING] Page {page_idx} had {len(tables)} tables but no data rows extracted!")
+                        f"[OK] Added {table_row_count} rows from table {table_idx + 1}")
+
+            print(
+                f"Page {page_idx} summary: {len(tables)} tables processed, {page_total_rows} total rows extracted")
 
-                    # Debug: show raw table data for first table
-                    if tables:
-                        print("Debug - First table raw data (first 3 rows):")
-                        for i, row in enumerate(tables[0][:3]):
-                            print(f"  Row {i}: {row}")
+            # If no data was found but we had tables, show a warning
+            if tables and not page_has_data:
+                print(
+                    f"[WARNING] Page {page_idx} had {len(tables)} tables but no data rows extracted!")
+
+                # Debug: show raw table data for first table
+                if tables:
+                    print("Debug - First table raw data (first 3 rows):")
+                    first_table = tables[0]
+                    if isinstance(first_table, pd.DataFrame):
+                        first_table = first_table.values.tolist()
+                    for i, row in enumerate(first_table[:3]):
+                        print(f"  Row {i}: {row}")
 
         print(
             f"\nExtraction complete: {len(results)} result sections with data")
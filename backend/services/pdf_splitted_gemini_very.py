@@ -21,6 +21,11 @@ import google.generativeai as genai
 import fitz
 import threading
 
+try:
+    from services.page_sidecar import load_pages
+except ImportError:  # run as a script from services/
+    from page_sidecar import load_pages
+
 # Optional JSON repair libraries
 try:
     from json_repair import repair_json as json_repair
@@ -78,18 +83,27 @@ MAX_PROMPT_SIZE = None  # No prompt size limit
 MAX_ROWS = None  # No row limit
 
 
+def _page_texts(pdf_path: str):
+    """Page texts from the split's page sidecar, else from the PDF"""
+    pages = load_pages(pdf_path)
+    if pages is not None:
+        safe_info(f"Using page sidecar for {pdf_path}")
+        return [page["text"] for page in pages]
+    with fitz.open(pdf_path) as doc:
+        return [page.get_text("text") or "" for page in doc]
+
+
 def extract_pdf_context(pdf_path: str, max_pages: int = None) -> str:
     try:
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
+        texts = _page_texts(pdf_path)
+        total_pages = len(texts)
         pages_to_extract = total_pages if max_pages is None else min(
             max_pages, total_pages)
         parts = []
         for i in range(pages_to_extract):
-            text = doc[i].get_text("text") or ""
+            text = texts[i]
             if text.strip():
                 parts.append(f"=== PAGE {i+1} ===\n{text}")
-        doc.close()
         full_text = "\n\n".join(parts)
         if MAX_PROMPT_SIZE is not None and len(full_text) > MAX_PROMPT_SIZE:
             safe_warning(
@@ -3,7 +3,7 @@ import json
 import shutil
 from pathlib import Path
 from typing import List, Dict, Optional
-from test_extraction.index_extraction import split_pdf, extract_index_entries
+from services import pdf_catalog
 import uuid
 import re
 
@@ -38,6 +38,9 @@ class PDFSplitterService:
                 pdf_name_clean
             splits_folder.mkdir(parents=True, exist_ok=True)
 
+            # PDF libraries load on the first upload, not at app import
+            from test_extraction.index_extraction import split_pdf
+
             # Split the PDF using index extraction
             split_files, ranges, metadata = split_pdf(
                 str(pdf_path), str(splits_folder), company_name=company_name)
@@ -48,6 +51,8 @@ class PDFSplitterService:
             with open(metadata_path, "w", encoding="utf-8") as f:
                 json.dump(metadata, f, indent=2, ensure_ascii=False)
 
+            pdf_catalog.record_split(company_name, pdf_name_clean, metadata)
+
             return {
                 "success": True,
                 # "upload_id": metadata.get("upload_id"),
@@ -151,10 +156,44 @@ class PDFSplitterService:
         # Fallback: just clean up the original
         return re.sub(r'[^A-Za-z0-9\-\s&]', ' ', form_no)[:60].strip()
 
+    def get_companies(self) -> List[Dict]:
+        """
+        Get all companies that have split PDFs
+        """
+        try:
+            return pdf_catalog.list_companies()
+        except Exception as e:
+            print(f"⚠️ PDF catalog unavailable, scanning {self.base_splits_dir}: {e}")
+            return self._scan_companies()
+
+    def _scan_companies(self) -> List[Dict]:
+        companies = []
+        for company_folder in self.base_splits_dir.iterdir():
+            if company_folder.is_dir():
+                # Count PDFs in this company folder
+                pdf_count = len(
+                    [f for f in company_folder.iterdir() if f.is_dir()])
+
+                if pdf_count > 0:
+                    companies.append({
+                        # Convert folder name back to display name
+                        "name": company_folder.name.replace("_", " ").title(),
+                        "folder_name": company_folder.name,
+                        "pdf_count": pdf_count
+                    })
+        return companies
+
     def get_company_pdfs(self, company_name: str) -> List[Dict]:
         """
         Get all PDFs for a company
         """
+        try:
+            return pdf_catalog.list_company_pdfs(company_name)
+        except Exception as e:
+            print(f"⚠️ PDF catalog unavailable, scanning {self.base_splits_dir}: {e}")
+            return self._scan_company_pdfs(company_name)
+
+    def _scan_company_pdfs(self, company_name: str) -> List[Dict]:
         try:
             company_folder = self.base_splits_dir / company_name.lower().replace(" ", "_")
             if not company_folder.exists():
@@ -186,6 +225,13 @@ class PDFSplitterService:
         """
         Get all split files for a specific PDF
         """
+        try:
+            return pdf_catalog.list_pdf_splits(company_name, pdf_name)
+        except Exception as e:
+            print(f"⚠️ PDF catalog unavailable, reading metadata.json: {e}")
+            return self._scan_pdf_splits(company_name, pdf_name)
+
+    def _scan_pdf_splits(self, company_name: str, pdf_name: str) -> List[Dict]:
         try:
             splits_folder = self.base_splits_dir / \
                 company_name.lower().replace(" ", "_") / pdf_name
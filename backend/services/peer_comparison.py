@@ -0,0 +1,305 @@
+"""
+Peer Comparison
+Aligned master row x company matrix of one L-form for one reporting period.
+
+Rows come from reports_<key>_extracted, lined up across companies by the
+master_row_id the master mapping pipeline fills, and named from the form's
+master rows table. For a (form, period, value column) the whole matrix (all
+companies that reported the period) is read with one conditional-aggregation
+pivot, its text values are parsed to numbers once, and the frame is cached;
+a comparison of N companies is a column selection on the cached frame.
+
+Each company contributes its latest report for the period and, per master
+row, the first extracted row mapped to it.
+
+Cached frames are dropped when reports are stored or master_row_ids are
+updated in this process (invalidate); the TTL bounds staleness across workers.
+
+Environment:
+    PEER_COMPARISON_CACHE_TTL_SECONDS   frame lifetime (default 300)
+    PEER_COMPARISON_CACHE_MAX_FRAMES    LRU capacity (default 64)
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from databases.database import engine as default_engine
+from databases.models import ReportModels
+from services.lform_table_registry import LFormTables, resolve_form_tables
+
+# pandas is imported where frames are built, keeping it out of app startup
+if TYPE_CHECKING:
+    import pandas as pd
+
+CACHE_TTL_SECONDS = float(os.getenv("PEER_COMPARISON_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_FRAMES = int(os.getenv("PEER_COMPARISON_CACHE_MAX_FRAMES", "64"))
+
+# reports_*_extracted columns that are not values
+NON_VALUE_COLUMNS = {
+    "id", "report_id", "company_id", "row_index", "particulars",
+    "normalized_text", "master_row_id", "schedule", "created_at",
+}
+
+# Preferred value column per table layout (L-2 style, L-3, L-1)
+DEFAULT_VALUE_COLUMNS = ("for_current_period", "as_at_current_period", "total")
+
+_NEGATIVE = re.compile(r'^\((.*)\)$')
+_NOT_NUMERIC = re.compile(r'[,\s₹%]')
+
+
+@dataclass
+class PeerFrame:
+    """Cached matrix of one (form, period, value column)"""
+    table_key: str
+    period: str
+    value_column: str
+    # index master_row_id, column master_name
+    master: "pd.DataFrame"
+    # index master_row_id, one float column per company_id
+    values: "pd.DataFrame"
+    # company_id -> reported company name
+    companies: Dict[int, str]
+    built_at: float
+
+
+_frames: "OrderedDict[Tuple[str, str, str], PeerFrame]" = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def invalidate(table_key: Optional[str] = None) -> int:
+    """Drop cached frames of one form (or all); returns the number dropped"""
+    with _frames_lock:
+        keys = [k for k in _frames if table_key is None or k[0] == table_key]
+        for key in keys:
+            del _frames[key]
+    return len(keys)
+
+
+def value_columns(tables: LFormTables) -> List[str]:
+    """Value columns of a form's extracted table, in table order"""
+    model = ReportModels[tables.extracted_table]
+    return [c.name for c in model.__table__.columns if c.name not in NON_VALUE_COLUMNS]
+
+
+def default_value_column(tables: LFormTables) -> str:
+    columns = value_columns(tables)
+    for column in DEFAULT_VALUE_COLUMNS:
+        if column in columns:
+            return column
+    return columns[0]
+
+
+def parse_numeric(values: "pd.Series") -> "pd.Series":
+    """
+    Reported values -> float
+
+    "1,23,456.78" -> 123456.78, "(1,234)" -> -1234.0; blanks, "-", "NA"
+    and other text -> NaN. DECIMAL columns (L-1) convert as-is.
+    """
+    import pandas as pd
+
+    text_values = values.astype("string").str.strip()
+    negative = text_values.str.match(_NEGATIVE.pattern).fillna(False).astype(bool)
+    cleaned = (text_values
+               .str.replace(_NEGATIVE.pattern, r'\1', regex=True)
+               .str.replace(_NOT_NUMERIC.pattern, '', regex=True))
+    numbers = pd.to_numeric(cleaned, errors="coerce").astype(float)
+    return numbers.where(~negative, -numbers)
+
+
+def normalize_company(name: Any) -> str:
+    """"SBI Life", "sbi_life" and "sbi-life" compare equal"""
+    return re.sub(r'[\s_\-]+', ' ', str(name)).strip().lower()
+
+
+def resolve_tables(lform: str) -> LFormTables:
+    tables = resolve_form_tables(lform)
+    if tables is None:
+        raise ValueError(f"No extracted table for L-form: {lform}")
+    return tables
+
+
+def list_periods(lform: str, engine=None) -> List[Dict]:
+    """Reported periods of a form, most recently stored first"""
+    engine = engine or default_engine
+    tables = resolve_tables(lform)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT period, COUNT(DISTINCT company_id), MAX(id)
+            FROM {tables.reports_table}
+            GROUP BY period
+            ORDER BY MAX(id) DESC
+        """)).fetchall()
+    return [{"period": r[0], "companies": r[1]} for r in rows]
+
+
+def _pivot_sql(tables: LFormTables, value_column: str, company_count: int) -> str:
+    pivot_columns = ",\n".join(
+        f"MAX(CASE WHEN f.company_id = :c_{i} THEN e.{value_column} END) AS v_{i}"
+        for i in range(company_count))
+    return f"""
+        SELECT e.master_row_id, MAX(m.master_name) AS master_name,
+        {pivot_columns}
+        FROM (
+            SELECT l.company_id, MIN(e.id) AS id
+            FROM (
+                SELECT company_id, MAX(id) AS report_id
+                FROM {tables.reports_table}
+                WHERE period = :period
+                GROUP BY company_id
+            ) l
+            JOIN {tables.extracted_table} e ON e.report_id = l.report_id
+            WHERE e.master_row_id IS NOT NULL
+            GROUP BY l.company_id, e.master_row_id
+        ) f
+        JOIN {tables.extracted_table} e ON e.id = f.id
+        LEFT JOIN {tables.master_rows_table} m ON m.master_row_id = e.master_row_id
+        GROUP BY e.master_row_id
+        ORDER BY e.master_row_id
+    """
+
+
+def _build_frame(tables: LFormTables, period: str, value_column: str, engine) -> PeerFrame:
+    import pandas as pd
+
+    with engine.connect() as conn:
+        companies = conn.execute(text(f"""
+            SELECT company_id, MAX(company)
+            FROM {tables.reports_table}
+            WHERE period = :period
+            GROUP BY company_id
+            ORDER BY company_id
+        """), {"period": period}).fetchall()
+
+        company_ids = [int(r[0]) for r in companies]
+        rows = []
+        if company_ids:
+            params = {"period": period}
+            params.update({f"c_{i}": cid for i, cid in enumerate(company_ids)})
+            rows = conn.execute(
+                text(_pivot_sql(tables, value_column, len(company_ids))), params).fetchall()
+
+    frame = pd.DataFrame(
+        [tuple(r) for r in rows],
+        columns=["master_row_id", "master_name", *company_ids],
+    ).set_index("master_row_id")
+
+    values = pd.DataFrame(
+        {cid: parse_numeric(frame[cid]) for cid in company_ids}, index=frame.index)
+
+    return PeerFrame(
+        table_key=tables.table_key,
+        period=period,
+        value_column=value_column,
+        master=frame[["master_name"]],
+        values=values,
+        companies={int(r[0]): r[1] for r in companies},
+        built_at=time.time(),
+    )
+
+
+def get_frame(lform: str, period: str, value_column: Optional[str] = None,
+              engine=None) -> PeerFrame:
+    """Cached aligned frame of a form and period (built on a miss)"""
+    engine = engine or default_engine
+    tables = resolve_tables(lform)
+    value_column = value_column or default_value_column(tables)
+    if value_column not in value_columns(tables):
+        raise ValueError(
+            f"Invalid value column for {tables.table_key}: {value_column} "
+            f"(one of {', '.join(value_columns(tables))})")
+
+    key = (tables.table_key, period, value_column)
+    with _frames_lock:
+        frame = _frames.get(key)
+        if frame is not None and time.time() - frame.built_at < CACHE_TTL_SECONDS:
+            _frames.move_to_end(key)
+            return frame
+
+    start = time.perf_counter()
+    frame = _build_frame(tables, period, value_column, engine)
+    print(f"🧮 Peer frame {tables.table_key} / {period} / {value_column}: "
+          f"{len(frame.values)} master rows x {len(frame.companies)} companies "
+          f"in {time.perf_counter() - start:.3f}s")
+
+    with _frames_lock:
+        _frames[key] = frame
+        _frames.move_to_end(key)
+        while len(_frames) > CACHE_MAX_FRAMES:
+            _frames.popitem(last=False)
+    return frame
+
+
+def compare(
+    lform: str,
+    companies: Sequence[str],
+    period: Optional[str] = None,
+    value_column: Optional[str] = None,
+    engine=None
+) -> Dict[str, Any]:
+    """
+    Master row x company matrix for the selected companies
+
+    Args:
+        lform: L-form code or label (e.g. "L-2", "L-2-A Revenue")
+        companies: Company names (any case, '_' / '-' for spaces) or ids
+        period: Report period; defaults to the most recently stored one
+        value_column: Extracted value column (default: current period / total)
+        engine: SQLAlchemy engine (defaults to the app engine)
+
+    Returns:
+        {'table_key', 'period', 'value_column', 'companies': [{'id', 'name',
+         'rows_with_values'}], 'missing': [names], 'columns': [...],
+         'rows': [(master_row_id, master_name, value per company), ...]}
+    """
+    engine = engine or default_engine
+    if period is None:
+        periods = list_periods(lform, engine=engine)
+        if not periods:
+            raise ValueError(f"No reports stored for L-form: {lform}")
+        period = periods[0]["period"]
+
+    frame = get_frame(lform, period, value_column, engine=engine)
+
+    by_name = {normalize_company(name): cid for cid, name in frame.companies.items()}
+    selected, missing = [], []
+    for company in companies:
+        cid = by_name.get(normalize_company(company))
+        if cid is None and str(company).isdigit() and int(company) in frame.companies:
+            cid = int(company)
+        if cid is None:
+            missing.append(company)
+        elif cid not in selected:
+            selected.append(cid)
+
+    values = frame.values[selected]
+    # Master rows none of the selected companies reported
+    values = values[values.notna().any(axis=1)]
+    names = frame.master["master_name"].reindex(values.index)
+
+    matrix = values.astype(object).where(values.notna(), None)
+    rows = [
+        (int(master_row_id), master_name, *row)
+        for master_row_id, master_name, row in zip(
+            values.index, names.tolist(), matrix.itertuples(index=False, name=None))
+    ]
+
+    return {
+        "table_key": frame.table_key,
+        "period": frame.period,
+        "value_column": frame.value_column,
+        "companies": [
+            {"id": cid, "name": frame.companies[cid],
+             "rows_with_values": int(values[cid].notna().sum())}
+            for cid in selected
+        ],
+        "missing": missing,
+        "columns": ["master_row_id", "master_name", *(frame.companies[cid] for cid in selected)],
+        "rows": rows,
+    }
@@ -0,0 +1,137 @@
+"""
+Report Row Store
+Normalized per-row copy of reports_*.data_rows (table: report_row_cache).
+
+Rows are written once at ingest by DatabaseStorageService, so serving a
+report is a single indexed range scan on (report_table, report_id) instead
+of exploding the data_rows JSON inside the database. Reports ingested before
+the cache existed fall back to parsing data_rows in Python once, and the
+parsed rows are written back so the next request hits the cache.
+
+Works the same on MySQL and SQLite (no JSON SQL functions are used).
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+ROW_CACHE_TABLE = "report_row_cache"
+
+
+def _load_json(value: Any, default: Any):
+    """JSON columns come back as str on some drivers and parsed on others"""
+    if value is None:
+        return default
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except (TypeError, ValueError):
+            return default
+    return value
+
+
+def _cell(value: Any) -> Optional[str]:
+    """Render a cell the way JSON_UNQUOTE(JSON_EXTRACT(...)) used to"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def project_row_values(rows: List[Any], headers: List[str]) -> List[List[Optional[str]]]:
+    """data_rows entries as value lists in flat_headers order (missing keys -> None)"""
+    return [
+        [_cell(row.get(h)) for h in headers] if isinstance(row, dict) else [None] * len(headers)
+        for row in rows
+    ]
+
+
+def project_rows(rows: List[Any], headers: List[str]) -> List[Dict[str, Optional[str]]]:
+    """Project data_rows entries onto flat_headers (missing keys -> None)"""
+    return [dict(zip(headers, values)) for values in project_row_values(rows, headers)]
+
+
+def store_report_rows(db, report_table: str, report_id: int, rows: List[Any]) -> int:
+    """
+    Replace the cached rows of one report
+
+    Args:
+        db: Session or Connection (caller owns the transaction)
+        report_table: reports_* table the report lives in
+        report_id: id of the report row
+        rows: the report's data_rows list
+
+    Returns:
+        Number of rows cached
+    """
+    params = {"report_table": report_table, "report_id": int(report_id)}
+
+    db.execute(text(f"""
+        DELETE FROM {ROW_CACHE_TABLE}
+        WHERE report_table = :report_table AND report_id = :report_id
+    """), params)
+
+    payload = [
+        {**params, "row_index": idx,
+            "row_json": json.dumps(row, ensure_ascii=False, default=str)}
+        for idx, row in enumerate(rows or [])
+    ]
+    if payload:
+        db.execute(text(f"""
+            INSERT INTO {ROW_CACHE_TABLE} (report_table, report_id, row_index, row_json)
+            VALUES (:report_table, :report_id, :row_index, :row_json)
+        """), payload)
+
+    return len(payload)
+
+
+def get_report_rows(db, report_table: str, report_id: int) -> List[Any]:
+    """
+    Return a report's data_rows, from the row cache when populated
+
+    Falls back to parsing reports_*.data_rows in Python and backfills the
+    cache (best effort) for reports ingested before the cache existed.
+    """
+    try:
+        cached = db.execute(text(f"""
+            SELECT row_json
+            FROM {ROW_CACHE_TABLE}
+            WHERE report_table = :report_table AND report_id = :report_id
+            ORDER BY row_index
+        """), {"report_table": report_table, "report_id": int(report_id)}).fetchall()
+        cache_available = True
+    except Exception as e:
+        # Table not created yet (schema creation disabled): serve from data_rows
+        db.rollback()
+        print(f"⚠️ {ROW_CACHE_TABLE} unavailable: {e}")
+        cached, cache_available = [], False
+
+    if cached:
+        return [_load_json(r[0], {}) for r in cached]
+
+    raw = db.execute(
+        text(f"SELECT data_rows FROM {report_table} WHERE id = :id"),
+        {"id": int(report_id)}
+    ).scalar()
+    rows = _load_json(raw, [])
+    if not isinstance(rows, list):
+        rows = []
+
+    if rows and cache_available:
+        try:
+            store_report_rows(db, report_table, report_id, rows)
+            db.commit()
+            print(
+                f"📦 Cached {len(rows)} row(s) for {report_table}#{report_id}")
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ Row cache backfill failed for {report_table}#{report_id}: {e}")
+
+    return rows
@@ -1,14 +1,41 @@
 """
 AWS S3 Service for File Management
 Handles uploading, downloading, and managing files in S3
+
+Listings go through the list_objects_v2 paginator (no 1000-key truncation),
+count a folder's files in the same pass that finds it, fan independent
+prefixes (users, top-level folders) out over a thread pool, and are cached
+for a few seconds; uploads and deletes through this service clear the cache.
+
+File transfers use a TransferConfig (multipart above a threshold, parts sent /
+fetched concurrently). JSON uploads are encoded incrementally straight into
+the upload stream, optionally gzip-compressed (Content-Encoding: gzip), and
+reads can be consumed as a chunk iterator (iter_file_content), whole or by
+byte range, so large extraction files never have to sit in memory at once.
+
+Environment (besides the AWS credentials / bucket / region):
+    S3_ENDPOINT_URL                 S3-compatible endpoint (e.g. MinIO)
+    S3_LISTING_WORKERS              listing thread pool size (default 8)
+    S3_LISTING_CACHE_TTL_SECONDS    listing cache lifetime, 0 disables (default 30)
+    S3_MULTIPART_THRESHOLD_MB       multipart above this size (default 8)
+    S3_MULTIPART_CHUNKSIZE_MB       part size (default 8)
+    S3_MAX_CONCURRENCY              parts in flight per transfer (default 10)
+    S3_JSON_GZIP                    "1" gzips JSON uploads by default
 """
 
 import boto3
+import copy
+import functools
+import io
 import os
 import json
-from typing import Optional, Dict, Any
+import threading
+import time
+import zlib
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
 from datetime import datetime
-import tempfile
 from dotenv import load_dotenv
 import logging
 
@@ -19,15 +46,155 @@ load_dotenv(dotenv_path=env_path)
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+STREAM_CHUNK_SIZE = 1 * MB
+# gzip container for zlib (compressobj / decompressobj)
+GZIP_WBITS = 31
+
+
+def transfer_config_from_env() -> TransferConfig:
+    """Multipart / concurrency settings for upload_file / download_file / *_fileobj"""
+    return TransferConfig(
+        multipart_threshold=int(float(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")) * MB),
+        multipart_chunksize=int(float(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", "8")) * MB),
+        max_concurrency=int(os.getenv("S3_MAX_CONCURRENCY", "10")),
+        use_threads=True
+    )
+
+
+class IterStream(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def json_chunks(data: Any, compress: bool = False, ensure_ascii: bool = True,
+                chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Indented JSON of data as UTF-8 byte chunks, encoded incrementally
+
+    Same text as json.dumps(data, indent=2, default=str, ensure_ascii=...);
+    with compress=True the chunks form a gzip stream.
+    """
+    encoder = json.JSONEncoder(indent=2, default=str, ensure_ascii=ensure_ascii)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS) if compress else None
+
+    pieces, size = [], 0
+    for piece in encoder.iterencode(data):
+        pieces.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            chunk = "".join(pieces).encode("utf-8")
+            pieces, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+
+    tail = "".join(pieces).encode("utf-8")
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
+
+
+def gunzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Decompress a gzip byte stream chunk by chunk"""
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+class ListingCache:
+    """Thread-safe short-TTL cache of listing results"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+        # Callers may modify the result
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: Tuple, value: Any):
+        if self.ttl_seconds <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def cached_listing(func: Callable) -> Callable:
+    """Serve a successful listing from the service's ListingCache"""
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        key = (func.__name__, *args)
+        result = self._listing_cache.get(key)
+        if result is None:
+            result = func(self, *args)
+            if result.get("success"):
+                self._listing_cache.set(key, result)
+        return result
+    return wrapper
+
 
 class S3Service:
     """Service for handling AWS S3 operations"""
 
-    def __init__(self):
+    def __init__(self, s3_client=None, bucket_name: Optional[str] = None):
+        """
+        Args:
+            s3_client: Pre-built boto3 S3 client (e.g. for a local S3 stand-in);
+                built from the environment when omitted
+            bucket_name: Bucket to use instead of S3_BUCKET_NAME
+        """
         self.aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
         self.aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-        self.bucket_name = os.getenv("S3_BUCKET_NAME")
+        self.bucket_name = bucket_name or os.getenv("S3_BUCKET_NAME")
         self.region = os.getenv("S3_REGION")
+        self.endpoint_url = os.getenv("S3_ENDPOINT_URL") or None
+
+        self.listing_workers = int(os.getenv("S3_LISTING_WORKERS", "8"))
+        self.transfer_config = transfer_config_from_env()
+        self.gzip_json = os.getenv("S3_JSON_GZIP", "0") == "1"
+        self._listing_cache = ListingCache(
+            float(os.getenv("S3_LISTING_CACHE_TTL_SECONDS", "30")))
+
+        if s3_client is not None:
+            self.s3_client = s3_client
+            return
 
         # Only initialize S3 if all required environment variables are set
         if not all([self.aws_access_key_id, self.aws_secret_access_key, self.bucket_name, self.region]):
@@ -40,7 +207,8 @@ class S3Service:
             's3',
             aws_access_key_id=self.aws_access_key_id,
             aws_secret_access_key=self.aws_secret_access_key,
-            region_name=self.region
+            region_name=self.region,
+            endpoint_url=self.endpoint_url
         )
 
         # Verify bucket exists
@@ -92,9 +260,11 @@ class S3Service:
                 local_file_path,
                 self.bucket_name,
                 s3_key,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
             )
 
+            self._listing_cache.clear()
             s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
             logger.info(f"Successfully uploaded PDF to S3: {s3_url}")
 
@@ -114,7 +284,7 @@ class S3Service:
                 "file_type": "pdf"
             }
 
-    def upload_json_extraction(self, json_data: Dict[Any, Any], user_id: str, folder_name: str, filename: str, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    def upload_json_extraction(self, json_data: Dict[Any, Any], user_id: str, folder_name: str, filename: str, metadata: Optional[Dict[str, str]] = None, compress: Optional[bool] = None) -> Dict[str, Any]:
         """
         Upload JSON extraction data to S3 with vifiles bucket structure
 
@@ -124,6 +294,7 @@ class S3Service:
             folder_name: Folder name for organizing files
             filename: JSON filename (should end with .json)
             metadata: Optional metadata to attach to the file
+            compress: Gzip the object (default: S3_JSON_GZIP)
 
         Returns:
             Dict with upload results
@@ -136,10 +307,6 @@ class S3Service:
             # S3 path: vifiles/users/{user_id}/{folder_name}/json/{filename}
             s3_key = f"users/{user_id}/{folder_name}/json/{filename}"
 
-            # Convert JSON to string
-            json_str = json.dumps(json_data, indent=2,
-                                  default=str, ensure_ascii=False)
-
             extra_args = {
                 'ContentType': 'application/json',
                 'Metadata': {
@@ -151,12 +318,8 @@ class S3Service:
                 }
             }
 
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=json_str.encode('utf-8'),
-                **extra_args
-            )
+            self._upload_json_stream(
+                json_data, s3_key, extra_args, compress=compress, ensure_ascii=False)
 
             s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
             logger.info(f"Successfully uploaded JSON to S3: {s3_url}")
@@ -209,9 +372,11 @@ class S3Service:
                 local_file_path,
                 self.bucket_name,
                 final_s3_key,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
             )
 
+            self._listing_cache.clear()
             s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{final_s3_key}"
             logger.info(f"Successfully uploaded file to S3: {s3_url}")
             return s3_url
@@ -220,7 +385,7 @@ class S3Service:
             logger.error(f"Failed to upload file to S3: {str(e)}")
             raise
 
-    def upload_json_data(self, data: Dict[Any, Any], s3_key: str, metadata: Optional[Dict[str, str]] = None, user_id: str = None) -> str:
+    def upload_json_data(self, data: Dict[Any, Any], s3_key: str, metadata: Optional[Dict[str, str]] = None, user_id: str = None, compress: Optional[bool] = None) -> str:
         """
         Upload JSON data directly to S3 with user-based organization
 
@@ -229,6 +394,7 @@ class S3Service:
             s3_key: S3 object key (path in bucket)
             metadata: Optional metadata to attach to the file
             user_id: User ID for organizing files by user
+            compress: Gzip the object (default: S3_JSON_GZIP)
 
         Returns:
             S3 URL of the uploaded file
@@ -238,24 +404,86 @@ class S3Service:
             return None
             
         try:
-            # Create a temporary file with JSON data
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                json.dump(data, temp_file, indent=2, default=str)
-                temp_file_path = temp_file.name
+            # Organize by user if user_id provided
+            final_s3_key = f"users/{user_id}/{s3_key}" if user_id else s3_key
 
-            try:
-                # Upload the temporary file
-                result = self.upload_file(
-                    temp_file_path, s3_key, metadata, user_id)
-                return result
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
+            extra_args = {}
+            if metadata:
+                extra_args['Metadata'] = metadata
+
+            self._upload_json_stream(data, final_s3_key, extra_args, compress=compress)
+
+            s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{final_s3_key}"
+            logger.info(f"Successfully uploaded JSON data to S3: {s3_url}")
+            return s3_url
 
         except Exception as e:
             logger.error(f"Failed to upload JSON data to S3: {str(e)}")
             raise
 
+    def _upload_json_stream(self, data: Any, s3_key: str, extra_args: Dict[str, Any],
+                            compress: Optional[bool] = None, ensure_ascii: bool = True):
+        """
+        Encode data as JSON straight into a (multipart) upload
+
+        The document is never materialized as one string: encoder output is
+        batched into chunks, optionally gzipped, and read by upload_fileobj.
+        """
+        compress = self.gzip_json if compress is None else compress
+        extra_args = dict(extra_args)
+        extra_args.setdefault('ContentType', 'application/json')
+        if compress:
+            extra_args['ContentEncoding'] = 'gzip'
+
+        body = io.BufferedReader(
+            IterStream(json_chunks(data, compress=compress, ensure_ascii=ensure_ascii)),
+            buffer_size=STREAM_CHUNK_SIZE)
+        self.s3_client.upload_fileobj(
+            body, self.bucket_name, s3_key,
+            ExtraArgs=extra_args, Config=self.transfer_config)
+        self._listing_cache.clear()
+
+    def iter_file_content(self, s3_key: str, chunk_size: int = STREAM_CHUNK_SIZE,
+                          byte_range: Optional[Tuple[int, Optional[int]]] = None,
+                          decompress: bool = True) -> Iterator[bytes]:
+        """
+        Stream an object as byte chunks instead of reading it whole
+
+        Args:
+            s3_key: S3 object key (path in bucket)
+            chunk_size: Bytes per chunk read from the response body
+            byte_range: (start, end) inclusive byte offsets of the stored
+                object, end None for "to the end"; whole object if omitted
+            decompress: Gunzip gzip-encoded objects (whole-object reads only;
+                a byte range of a gzip object is returned as stored)
+
+        Yields:
+            Chunks of the object content
+        """
+        if self.s3_client is None:
+            logger.warning("S3 service is disabled. Cannot read file.")
+            return
+
+        kwargs = {}
+        if byte_range is not None:
+            start, end = byte_range
+            kwargs['Range'] = f"bytes={start}-{'' if end is None else end}"
+
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name, Key=s3_key, **kwargs)
+        chunks = response['Body'].iter_chunks(chunk_size=chunk_size)
+        if decompress and byte_range is None and response.get('ContentEncoding') == 'gzip':
+            chunks = gunzip_chunks(chunks)
+        yield from chunks
+
+    @staticmethod
+    def _read_body(response: Dict[str, Any]) -> str:
+        """Text of a get_object response, gunzipped if stored with gzip encoding"""
+        body = response['Body'].read()
+        if response.get('ContentEncoding') == 'gzip':
+            body = zlib.decompress(body, GZIP_WBITS)
+        return body.decode('utf-8')
+
     def download_file(self, s3_key: str, local_file_path: str):
         """
         Download a file from S3
@@ -266,7 +494,8 @@ class S3Service:
         """
         try:
             self.s3_client.download_file(
-                self.bucket_name, s3_key, local_file_path)
+                self.bucket_name, s3_key, local_file_path,
+                Config=self.transfer_config)
             logger.info(f"Successfully downloaded file from S3: {s3_key}")
         except Exception as e:
             logger.error(f"Failed to download file from S3: {str(e)}")
@@ -285,7 +514,7 @@ class S3Service:
         try:
             response = self.s3_client.get_object(
                 Bucket=self.bucket_name, Key=s3_key)
-            content = response['Body'].read().decode('utf-8')
+            content = self._read_body(response)
             logger.info(
                 f"Successfully downloaded file content from S3: {s3_key}")
             return content
@@ -329,16 +558,7 @@ class S3Service:
             List of file keys
         """
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
-
-            files = []
-            if 'Contents' in response:
-                files = [obj['Key'] for obj in response['Contents']]
-
-            return files
+            return [obj['Key'] for obj in self._iter_objects(prefix)]
         except Exception as e:
             logger.error(f"Failed to list files in S3: {str(e)}")
             raise
@@ -352,6 +572,7 @@ class S3Service:
         """
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            self._listing_cache.clear()
             logger.info(f"Successfully deleted file from S3: {s3_key}")
         except Exception as e:
             logger.error(f"Failed to delete file from S3: {str(e)}")
@@ -373,6 +594,39 @@ class S3Service:
         except:
             return False
 
+    def _iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """Every object under a prefix, across list_objects_v2 pages"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield from page.get('Contents', [])
+
+    def _list_prefix_pages(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """Delimited list_objects_v2 pages (CommonPrefixes = sub-folders) of a prefix"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        yield from paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter='/')
+
+    def _group_by_folder(self, prefix: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        One scan of a prefix, objects grouped by their first path segment
+
+        Objects directly under the prefix (no folder) are skipped. Folders are
+        in key order, the order of a delimited listing's CommonPrefixes.
+        """
+        folders: Dict[str, List[Dict[str, Any]]] = {}
+        for obj in self._iter_objects(prefix):
+            folder_name, sep, _ = obj['Key'][len(prefix):].partition('/')
+            if sep and folder_name:
+                folders.setdefault(folder_name, []).append(obj)
+        return folders
+
+    def _map_prefixes(self, func: Callable, items: List[str]) -> list:
+        """func over independent prefixes on the listing thread pool, results in order"""
+        if len(items) <= 1 or self.listing_workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.listing_workers, len(items))) as pool:
+            return list(pool.map(func, items))
+
+    @cached_listing
     def list_user_folders(self, user_id: str) -> Dict[str, Any]:
         """
         List all folders for a specific user in vifiles bucket
@@ -385,31 +639,24 @@ class S3Service:
         """
         try:
             prefix = f"users/{user_id}/"
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                Delimiter='/'
-            )
 
+            # Folders and their pdf/ and json/ file counts from one scan
             folders = []
-            if 'CommonPrefixes' in response:
-                for prefix_info in response['CommonPrefixes']:
-                    folder_path = prefix_info['Prefix']
-                    folder_name = folder_path.replace(
-                        f"users/{user_id}/", "").rstrip('/')
-                    if folder_name:
-                        # Get folder metadata
-                        pdf_count = self._count_files_in_folder(
-                            user_id, folder_name, "pdf")
-                        json_count = self._count_files_in_folder(
-                            user_id, folder_name, "json")
-
-                        folders.append({
-                            "folder_name": folder_name,
-                            "pdf_count": pdf_count,
-                            "json_count": json_count,
-                            "s3_prefix": folder_path
-                        })
+            for folder_name, objects in self._group_by_folder(prefix).items():
+                folder_prefix = f"{prefix}{folder_name}/"
+                counts = {"pdf": 0, "json": 0}
+                for obj in objects:
+                    file_type, sep, _ = obj['Key'][len(folder_prefix):].partition('/')
+                    # Skip directory entries
+                    if sep and file_type in counts and not obj['Key'].endswith('/'):
+                        counts[file_type] += 1
+
+                folders.append({
+                    "folder_name": folder_name,
+                    "pdf_count": counts["pdf"],
+                    "json_count": counts["json"],
+                    "s3_prefix": folder_prefix
+                })
 
             logger.info(f"Listed {len(folders)} folders for user {user_id}")
             return {
@@ -428,6 +675,7 @@ class S3Service:
                 "folders": []
             }
 
+    @cached_listing
     def list_user_folder_files(self, user_id: str, folder_name: str) -> Dict[str, Any]:
         """
         List all files in a specific user folder
@@ -444,42 +692,26 @@ class S3Service:
             pdf_prefix = f"users/{user_id}/{folder_name}/pdf/"
             json_prefix = f"users/{user_id}/{folder_name}/json/"
 
-            pdf_response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=pdf_prefix
-            )
-
-            json_response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=json_prefix
-            )
-
             # Create file mapping
             files = []
             pdf_files = {}
             json_files = {}
 
-            # Process PDF files
-            if 'Contents' in pdf_response:
-                for obj in pdf_response['Contents']:
-                    filename = obj['Key'].replace(pdf_prefix, '')
-                    if filename:  # Skip directory entries
-                        pdf_files[filename] = {
-                            'size': obj['Size'],
-                            'last_modified': obj['LastModified'].isoformat(),
-                            's3_key': obj['Key']
-                        }
-
-            # Process JSON files
-            if 'Contents' in json_response:
-                for obj in json_response['Contents']:
-                    filename = obj['Key'].replace(json_prefix, '')
-                    if filename:  # Skip directory entries
-                        json_files[filename] = {
-                            'size': obj['Size'],
-                            'last_modified': obj['LastModified'].isoformat(),
-                            's3_key': obj['Key']
-                        }
+            # PDF and JSON files from one scan of the folder
+            for obj in self._iter_objects(f"users/{user_id}/{folder_name}/"):
+                key = obj['Key']
+                if key.startswith(pdf_prefix):
+                    type_files, filename = pdf_files, key[len(pdf_prefix):]
+                elif key.startswith(json_prefix):
+                    type_files, filename = json_files, key[len(json_prefix):]
+                else:
+                    continue
+                if filename:  # Skip directory entries
+                    type_files[filename] = {
+                        'size': obj['Size'],
+                        'last_modified': obj['LastModified'].isoformat(),
+                        's3_key': key
+                    }
 
             # Combine PDF and JSON info
             for pdf_filename, pdf_info in pdf_files.items():
@@ -537,7 +769,7 @@ class S3Service:
                 Key=s3_key
             )
 
-            content = response['Body'].read().decode('utf-8')
+            content = self._read_body(response)
             json_data = json.loads(content)
 
             logger.info(f"Successfully retrieved JSON content: {s3_key}")
@@ -562,35 +794,7 @@ class S3Service:
                 "s3_key": s3_key if 's3_key' in locals() else None
             }
 
-    def _count_files_in_folder(self, user_id: str, folder_name: str, file_type: str) -> int:
-        """
-        Count files in a specific folder and type
-
-        Args:
-            user_id: User ID
-            folder_name: Folder name
-            file_type: File type ('pdf' or 'json')
-
-        Returns:
-            Number of files
-        """
-        try:
-            prefix = f"users/{user_id}/{folder_name}/{file_type}/"
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
-
-            if 'Contents' in response:
-                # Filter out directory entries
-                return len([obj for obj in response['Contents']
-                           if not obj['Key'].endswith('/')])
-            return 0
-
-        except Exception as e:
-            logger.error(f"Failed to count files: {str(e)}")
-            return 0
-
+    @cached_listing
     def list_all_users_data(self) -> Dict[str, Any]:
         """List all users and their data from S3 bucket"""
         try:
@@ -604,46 +808,39 @@ class S3Service:
                 "prefix_used": prefix
             }
 
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                Delimiter='/',
-                MaxKeys=1000
-            )
+            # Users (CommonPrefixes) and loose objects, across all pages
+            common_prefixes, contents = [], []
+            pages = 0
+            for page in self._list_prefix_pages(prefix):
+                pages += 1
+                common_prefixes.extend(page.get('CommonPrefixes', []))
+                contents.extend(page.get('Contents', []))
 
             # Add response debug info
             s3_debug.update({
-                "objects_found": response.get("KeyCount", 0),
-                "common_prefixes_count": len(response.get("CommonPrefixes", [])),
-                "is_truncated": response.get("IsTruncated", False)
+                "objects_found": len(contents) + len(common_prefixes),
+                "common_prefixes_count": len(common_prefixes),
+                "is_truncated": False,
+                "pages": pages
             })
 
-            all_users_data = {}
             user_prefixes = []
 
             # Get user folders from CommonPrefixes
-            if 'CommonPrefixes' in response:
-                for prefix_info in response['CommonPrefixes']:
-                    # Extract user_id from prefix like "users/user123/"
-                    user_prefix = prefix_info['Prefix']
-                    user_id = user_prefix.replace("users/", "").rstrip('/')
-
-                    if user_id:
-                        user_prefixes.append(user_id)
-                        logger.info(f"Found user in S3: {user_id}")
-
-                        # Get detailed folder info for this user
-                        user_data = self._get_user_data_from_s3(user_id)
-                        if user_data:
-                            all_users_data[user_id] = user_data
+            for prefix_info in common_prefixes:
+                # Extract user_id from prefix like "users/user123/"
+                user_id = prefix_info['Prefix'][len(prefix):].rstrip('/')
+                if user_id:
+                    user_prefixes.append(user_id)
+                    logger.info(f"Found user in S3: {user_id}")
 
             # Fallback: If no CommonPrefixes, scan objects directly
-            if not user_prefixes and 'Contents' in response:
+            if not user_prefixes and contents:
                 logger.info(
                     "No CommonPrefixes found, scanning objects directly...")
                 derived_users = set()
 
-                for obj in response['Contents']:
+                for obj in contents:
                     key = obj['Key']
                     # Extract user_id from keys like "users/user123/folder/..."
                     parts = key.split('/')
@@ -652,13 +849,15 @@ class S3Service:
                         if user_id:
                             derived_users.add(user_id)
 
-                user_prefixes = list(derived_users)
+                user_prefixes = sorted(derived_users)
                 s3_debug["derived_users"] = user_prefixes
 
-                for user_id in user_prefixes:
-                    user_data = self._get_user_data_from_s3(user_id)
-                    if user_data:
-                        all_users_data[user_id] = user_data
+            # Users are independent prefixes: get their folder details concurrently
+            all_users_data = {}
+            for user_id, user_data in zip(
+                    user_prefixes, self._map_prefixes(self._get_user_data_from_s3, user_prefixes)):
+                if user_data:
+                    all_users_data[user_id] = user_data
 
             s3_debug["detected_users"] = user_prefixes
             logger.info(f"Total users found in S3: {len(all_users_data)}")
@@ -730,9 +929,11 @@ class S3Service:
                 local_file_path,
                 self.bucket_name,
                 s3_key,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
             )
 
+            self._listing_cache.clear()
             s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{s3_key}"
             logger.info(
                 f"Successfully uploaded {file_type} file to S3: {s3_url}")
@@ -791,7 +992,8 @@ class S3Service:
             self.s3_client.download_file(
                 self.bucket_name,
                 s3_key,
-                local_path
+                local_path,
+                Config=self.transfer_config
             )
 
             logger.info(
@@ -812,6 +1014,7 @@ class S3Service:
                 "file_type": file_type
             }
 
+    @cached_listing
     def list_folders_new_structure(self) -> Dict[str, Any]:
         """
         List all folders in the new S3 structure (vifiles/{folder_name}/)
@@ -820,24 +1023,15 @@ class S3Service:
             Dict with list of folders and their contents
         """
         try:
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(
-                Bucket=self.bucket_name,
-                Delimiter='/'
-            )
-
-            folders = {}
-
-            for page in page_iterator:
-                # Get folder names (common prefixes)
-                if 'CommonPrefixes' in page:
-                    for prefix_info in page['CommonPrefixes']:
-                        folder_name = prefix_info['Prefix'].rstrip('/')
+            folder_names = [
+                prefix_info['Prefix'].rstrip('/')
+                for page in self._list_prefix_pages("")
+                for prefix_info in page.get('CommonPrefixes', [])
+            ]
 
-                        # Get folder contents
-                        folder_contents = self._get_folder_contents_new_structure(
-                            folder_name)
-                        folders[folder_name] = folder_contents
+            # Get folder contents, one independent prefix per folder
+            folders = dict(zip(folder_names, self._map_prefixes(
+                self._get_folder_contents_new_structure, folder_names)))
 
             return {
                 "success": True,
@@ -865,10 +1059,6 @@ class S3Service:
         """
         try:
             prefix = f"{folder_name}/"
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
 
             files = {
                 "original": [],
@@ -876,36 +1066,35 @@ class S3Service:
                 "verified_json": []
             }
 
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    key = obj['Key']
-                    relative_path = key[len(prefix):]
-
-                    # Categorize files based on their path structure
-                    if '/' in relative_path:
-                        subfolder, filename = relative_path.split('/', 1)
-                        if subfolder.endswith('_json') and not subfolder.endswith('_verified_json'):
-                            files["json"].append({
-                                "key": key,
-                                "filename": filename,
-                                "size": obj['Size'],
-                                "last_modified": obj['LastModified'].isoformat()
-                            })
-                        elif subfolder.endswith('_verified_json'):
-                            files["verified_json"].append({
-                                "key": key,
-                                "filename": filename,
-                                "size": obj['Size'],
-                                "last_modified": obj['LastModified'].isoformat()
-                            })
-                        else:
-                            # This is an original file
-                            files["original"].append({
-                                "key": key,
-                                "filename": filename,
-                                "size": obj['Size'],
-                                "last_modified": obj['LastModified'].isoformat()
-                            })
+            for obj in self._iter_objects(prefix):
+                key = obj['Key']
+                relative_path = key[len(prefix):]
+
+                # Categorize files based on their path structure
+                if '/' in relative_path:
+                    subfolder, filename = relative_path.split('/', 1)
+                    if subfolder.endswith('_json') and not subfolder.endswith('_verified_json'):
+                        files["json"].append({
+                            "key": key,
+                            "filename": filename,
+                            "size": obj['Size'],
+                            "last_modified": obj['LastModified'].isoformat()
+                        })
+                    elif subfolder.endswith('_verified_json'):
+                        files["verified_json"].append({
+                            "key": key,
+                            "filename": filename,
+                            "size": obj['Size'],
+                            "last_modified": obj['LastModified'].isoformat()
+                        })
+                    else:
+                        # This is an original file
+                        files["original"].append({
+                            "key": key,
+                            "filename": filename,
+                            "size": obj['Size'],
+                            "last_modified": obj['LastModified'].isoformat()
+                        })
 
             return {
                 "folder_name": folder_name,
@@ -954,7 +1143,7 @@ class S3Service:
                 Key=s3_key
             )
 
-            content = response['Body'].read().decode('utf-8')
+            content = self._read_body(response)
 
             if file_type in ['json', 'verified_json']:
                 content = json.loads(content)
@@ -988,53 +1177,13 @@ class S3Service:
         try:
             user_prefix = f"users/{user_id}/"
 
-            # List all folders for this user
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=user_prefix,
-                Delimiter='/',
-                MaxKeys=1000
-            )
-
+            # All folders and their files from one scan of the user's prefix
             folders = []
-
-            # Get folders from CommonPrefixes
-            if 'CommonPrefixes' in response:
-                for prefix_info in response['CommonPrefixes']:
-                    folder_prefix = prefix_info['Prefix']
-                    folder_name = folder_prefix.replace(
-                        user_prefix, "").rstrip('/')
-
-                    if folder_name:
-                        # Get folder details
-                        folder_data = self._get_folder_data_from_s3(
-                            user_id, folder_name)
-                        if folder_data:
-                            folders.append(folder_data)
-
-            # If no CommonPrefixes, scan objects to derive folders
-            if not folders:
-                response_objects = self.s3_client.list_objects_v2(
-                    Bucket=self.bucket_name,
-                    Prefix=user_prefix,
-                    MaxKeys=1000
-                )
-
-                derived_folders = set()
-                if 'Contents' in response_objects:
-                    for obj in response_objects['Contents']:
-                        key = obj['Key']
-                        relative_path = key.replace(user_prefix, "")
-                        if '/' in relative_path:
-                            folder_name = relative_path.split('/')[0]
-                            if folder_name:
-                                derived_folders.add(folder_name)
-
-                for folder_name in derived_folders:
-                    folder_data = self._get_folder_data_from_s3(
-                        user_id, folder_name)
-                    if folder_data:
-                        folders.append(folder_data)
+            for folder_name, objects in self._group_by_folder(user_prefix).items():
+                folder_data = self._build_folder_data(
+                    folder_name, f"{user_prefix}{folder_name}/", objects)
+                if folder_data:
+                    folders.append(folder_data)
 
             return {
                 "user_id": user_id,
@@ -1059,165 +1208,173 @@ class S3Service:
         """
         try:
             folder_prefix = f"users/{user_id}/{folder_name}/"
+            return self._build_folder_data(
+                folder_name, folder_prefix, list(self._iter_objects(folder_prefix)))
 
-            # List all files in this folder
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=folder_prefix,
-                MaxKeys=1000
-            )
-
-            files = []
-            pdf_count = 0
-            json_count = 0
-            folder_created_at = None
+        except Exception as e:
+            logger.error(
+                f"Failed to get folder data for {user_id}/{folder_name}: {str(e)}")
+            return None
 
-            if 'Contents' in response:
-                # Group files by base name and type for enhanced naming convention
-                file_groups = {}  # base_name -> {original_pdf, extracted_json, gemini_verified_json}
+    def _build_folder_data(self, folder_name: str, folder_prefix: str,
+                           objects: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Folder data structure from the listed objects under folder_prefix
 
-                for obj in response['Contents']:
-                    key = obj['Key']
-                    filename = os.path.basename(key)
-                    relative_path = key.replace(folder_prefix, "")
+        Args:
+            folder_name: Folder name
+            folder_prefix: S3 prefix of the folder
+            objects: list_objects_v2 entries under the prefix
 
-                    # Skip directory entries
-                    if not filename:
-                        continue
-
-                    # Track earliest creation time as folder creation time
-                    if folder_created_at is None or obj['LastModified'] < folder_created_at:
-                        folder_created_at = obj['LastModified']
-
-                    # Parse new naming convention
-                    if filename.endswith('_original_uploaded.pdf'):
-                        base_name = filename.replace(
-                            '_original_uploaded.pdf', '')
-                        if base_name not in file_groups:
-                            file_groups[base_name] = {}
-                        file_groups[base_name]['original_pdf'] = {
-                            'filename': filename,
-                            'size': obj['Size'],
-                            'created_at': obj['LastModified'].isoformat(),
-                            's3_key': key,
-                            'type': 'original_pdf'
-                        }
-                        pdf_count += 1
-
-                    elif filename.endswith('_json_extracted.json'):
-                        base_name = filename.replace(
-                            '_json_extracted.json', '')
-                        if base_name not in file_groups:
-                            file_groups[base_name] = {}
-                        file_groups[base_name]['extracted_json'] = {
-                            'filename': filename,
-                            'size': obj['Size'],
-                            'created_at': obj['LastModified'].isoformat(),
-                            's3_key': key,
-                            'type': 'extracted_json'
-                        }
-                        json_count += 1
-
-                    elif filename.endswith('_json_gemini_verified.json'):
-                        base_name = filename.replace(
-                            '_json_gemini_verified.json', '')
-                        if base_name not in file_groups:
-                            file_groups[base_name] = {}
-                        file_groups[base_name]['gemini_verified_json'] = {
-                            'filename': filename,
-                            'size': obj['Size'],
-                            'created_at': obj['LastModified'].isoformat(),
-                            's3_key': key,
-                            'type': 'gemini_verified_json'
-                        }
-                        json_count += 1
-
-                    # Handle legacy files for backward compatibility
-                    elif filename.lower().endswith('.pdf') and not filename.endswith('_original_uploaded.pdf'):
-                        base_name = os.path.splitext(filename)[0]
-                        if base_name not in file_groups:
-                            file_groups[base_name] = {}
-                        file_groups[base_name]['legacy_pdf'] = {
-                            'filename': filename,
-                            'size': obj['Size'],
-                            'created_at': obj['LastModified'].isoformat(),
-                            's3_key': key,
-                            'type': 'legacy_pdf'
-                        }
-                        pdf_count += 1
-
-                    elif filename.lower().endswith('.json') and not any(suffix in filename for suffix in ['_json_extracted.json', '_json_gemini_verified.json']):
-                        base_name = os.path.splitext(filename)[0]
-                        if base_name not in file_groups:
-                            file_groups[base_name] = {}
-                        file_groups[base_name]['legacy_json'] = {
-                            'filename': filename,
-                            'size': obj['Size'],
-                            'created_at': obj['LastModified'].isoformat(),
-                            's3_key': key,
-                            'type': 'legacy_json'
-                        }
-                        json_count += 1
-
-                # Convert file groups to file list with priority for Gemini verified JSON
-                for base_name, file_group in file_groups.items():
-                    # Determine best JSON file (priority: gemini_verified > extracted > legacy)
-                    best_json = None
-                    json_priority = 'none'
-
-                    if 'gemini_verified_json' in file_group:
-                        best_json = file_group['gemini_verified_json']
-                        json_priority = 'gemini_verified'
-                    elif 'extracted_json' in file_group:
-                        best_json = file_group['extracted_json']
-                        json_priority = 'extracted'
-                    elif 'legacy_json' in file_group:
-                        best_json = file_group['legacy_json']
-                        json_priority = 'legacy'
-
-                    # Determine best PDF file (priority: original > legacy)
-                    best_pdf = None
-                    if 'original_pdf' in file_group:
-                        best_pdf = file_group['original_pdf']
-                    elif 'legacy_pdf' in file_group:
-                        best_pdf = file_group['legacy_pdf']
-
-                    # Create file entry
-                    file_entry = {
-                        'base_name': base_name,
-                        'json_priority': json_priority,
-                        'has_gemini_verification': 'gemini_verified_json' in file_group,
-                        'available_files': {
-                            k: v for k, v in file_group.items()
-                        }
+        Returns:
+            Dict with folder data structure
+        """
+        files = []
+        pdf_count = 0
+        json_count = 0
+        folder_created_at = None
+
+        if objects:
+            # Group files by base name and type for enhanced naming convention
+            file_groups = {}  # base_name -> {original_pdf, extracted_json, gemini_verified_json}
+
+            for obj in objects:
+                key = obj['Key']
+                filename = os.path.basename(key)
+                relative_path = key.replace(folder_prefix, "")
+
+                # Skip directory entries
+                if not filename:
+                    continue
+
+                # Track earliest creation time as folder creation time
+                if folder_created_at is None or obj['LastModified'] < folder_created_at:
+                    folder_created_at = obj['LastModified']
+
+                # Parse new naming convention
+                if filename.endswith('_original_uploaded.pdf'):
+                    base_name = filename.replace(
+                        '_original_uploaded.pdf', '')
+                    if base_name not in file_groups:
+                        file_groups[base_name] = {}
+                    file_groups[base_name]['original_pdf'] = {
+                        'filename': filename,
+                        'size': obj['Size'],
+                        'created_at': obj['LastModified'].isoformat(),
+                        's3_key': key,
+                        'type': 'original_pdf'
                     }
+                    pdf_count += 1
+
+                elif filename.endswith('_json_extracted.json'):
+                    base_name = filename.replace(
+                        '_json_extracted.json', '')
+                    if base_name not in file_groups:
+                        file_groups[base_name] = {}
+                    file_groups[base_name]['extracted_json'] = {
+                        'filename': filename,
+                        'size': obj['Size'],
+                        'created_at': obj['LastModified'].isoformat(),
+                        's3_key': key,
+                        'type': 'extracted_json'
+                    }
+                    json_count += 1
+
+                elif filename.endswith('_json_gemini_verified.json'):
+                    base_name = filename.replace(
+                        '_json_gemini_verified.json', '')
+                    if base_name not in file_groups:
+                        file_groups[base_name] = {}
+                    file_groups[base_name]['gemini_verified_json'] = {
+                        'filename': filename,
+                        'size': obj['Size'],
+                        'created_at': obj['LastModified'].isoformat(),
+                        's3_key': key,
+                        'type': 'gemini_verified_json'
+                    }
+                    json_count += 1
+
+                # Handle legacy files for backward compatibility
+                elif filename.lower().endswith('.pdf') and not filename.endswith('_original_uploaded.pdf'):
+                    base_name = os.path.splitext(filename)[0]
+                    if base_name not in file_groups:
+                        file_groups[base_name] = {}
+                    file_groups[base_name]['legacy_pdf'] = {
+                        'filename': filename,
+                        'size': obj['Size'],
+                        'created_at': obj['LastModified'].isoformat(),
+                        's3_key': key,
+                        'type': 'legacy_pdf'
+                    }
+                    pdf_count += 1
+
+                elif filename.lower().endswith('.json') and not any(suffix in filename for suffix in ['_json_extracted.json', '_json_gemini_verified.json']):
+                    base_name = os.path.splitext(filename)[0]
+                    if base_name not in file_groups:
+                        file_groups[base_name] = {}
+                    file_groups[base_name]['legacy_json'] = {
+                        'filename': filename,
+                        'size': obj['Size'],
+                        'created_at': obj['LastModified'].isoformat(),
+                        's3_key': key,
+                        'type': 'legacy_json'
+                    }
+                    json_count += 1
+
+            # Convert file groups to file list with priority for Gemini verified JSON
+            for base_name, file_group in file_groups.items():
+                # Determine best JSON file (priority: gemini_verified > extracted > legacy)
+                best_json = None
+                json_priority = 'none'
+
+                if 'gemini_verified_json' in file_group:
+                    best_json = file_group['gemini_verified_json']
+                    json_priority = 'gemini_verified'
+                elif 'extracted_json' in file_group:
+                    best_json = file_group['extracted_json']
+                    json_priority = 'extracted'
+                elif 'legacy_json' in file_group:
+                    best_json = file_group['legacy_json']
+                    json_priority = 'legacy'
+
+                # Determine best PDF file (priority: original > legacy)
+                best_pdf = None
+                if 'original_pdf' in file_group:
+                    best_pdf = file_group['original_pdf']
+                elif 'legacy_pdf' in file_group:
+                    best_pdf = file_group['legacy_pdf']
+
+                # Create file entry
+                file_entry = {
+                    'base_name': base_name,
+                    'json_priority': json_priority,
+                    'has_gemini_verification': 'gemini_verified_json' in file_group,
+                    'available_files': {
+                        k: v for k, v in file_group.items()
+                    }
+                }
 
-                    if best_json:
-                        file_entry.update({
-                            'filename': best_json['filename'],
-                            'size': best_json['size'],
-                            'created_at': best_json['created_at'],
-                            's3_key': best_json['s3_key'],
-                            'type': best_json['type']
-                        })
-
-                    if best_pdf:
-                        file_entry['pdf_info'] = best_pdf
-
-                    files.append(file_entry)
-
-            return {
-                'folder_name': folder_name,
-                'pdf_count': pdf_count,
-                'json_count': json_count,
-                'created_at': folder_created_at.isoformat() if folder_created_at else datetime.now().isoformat(),
-                'files': files
-            }
-
-        except Exception as e:
-            logger.error(
-                f"Failed to get folder data for {user_id}/{folder_name}: {str(e)}")
-            return None
+                if best_json:
+                    file_entry.update({
+                        'filename': best_json['filename'],
+                        'size': best_json['size'],
+                        'created_at': best_json['created_at'],
+                        's3_key': best_json['s3_key'],
+                        'type': best_json['type']
+                    })
+
+                if best_pdf:
+                    file_entry['pdf_info'] = best_pdf
+
+                files.append(file_entry)
+
+        return {
+            'folder_name': folder_name,
+            'pdf_count': pdf_count,
+            'json_count': json_count,
+            'created_at': folder_created_at.isoformat() if folder_created_at else datetime.now().isoformat(),
+            'files': files
+        }
 
 
 # Create a singleton instance
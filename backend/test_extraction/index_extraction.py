@@ -13,6 +13,15 @@ OUTPUT_DIR = "shriram2_pdf_splits_auto"
 INDEX_PAGES_TO_SCAN = 3
 FIRST_LINES_TO_SCAN = 4     # how many top lines per page to check for form marker
 MAX_OFFSET_THRESHOLD = 2    # if computed offset is > this, ignore it (safety)
+# split writer: "fitz" (PyMuPDF) or "pypdf2"
+SPLIT_BACKEND = os.getenv("PDF_SPLIT_BACKEND", "fitz")
+SPLIT_BACKENDS = ("fitz", "pypdf2")
+# processes writing splits (fitz), used only when the splits add up to at
+# least SPLIT_PARALLEL_MIN_PAGES pages. In-process fitz writes ~11k pages/s
+# and starting spawned workers costs ~2.3s (scripts/benchmark_pdf_split.py),
+# so even 4 ideal cores only win above ~35k pages; filings are far smaller.
+SPLIT_WORKERS = int(os.getenv("PDF_SPLIT_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+SPLIT_PARALLEL_MIN_PAGES = int(os.getenv("PDF_SPLIT_PARALLEL_MIN_PAGES", "40000"))
 
 # ---------------- helpers ----------------
 
@@ -283,10 +292,134 @@ def compute_final_ranges(pdf_path: str, index_entries: List[Dict], force_offset:
             e["start_page"], e["end_page"] = min(s, t), max(s, t)
     return entries
 
+# ---------------- split writers ----------------
+#
+# A split job is (filename, start_page, end_page), pages 1-based inclusive.
+# "fitz" copies page ranges with PyMuPDF's insert_pdf and, for larger PDFs,
+# writes the splits from a process pool (PyMuPDF holds the GIL, so threads
+# would not overlap); each worker opens the source once. "pypdf2" is the
+# original sequential PdfWriter path. Both produce the same metadata.json.
+
+
+def _fitz_available() -> bool:
+    try:
+        import fitz  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_split_backend(backend: Optional[str] = None) -> str:
+    backend = (backend or SPLIT_BACKEND).lower()
+    if backend not in SPLIT_BACKENDS:
+        raise ValueError(f"Unknown split backend: {backend} (one of {', '.join(SPLIT_BACKENDS)})")
+    if backend == "fitz" and not _fitz_available():
+        print("⚠️ PyMuPDF not installed, splitting with PyPDF2")
+        return "pypdf2"
+    return backend
+
+
+def count_pages(pdf_path: str, backend: Optional[str] = None) -> int:
+    if resolve_split_backend(backend) == "fitz":
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    return len(PdfReader(pdf_path).pages)
+
+
+def _write_splits_pypdf2(pdf_path: str, output_dir: str, jobs: List[tuple]) -> Dict[str, str]:
+    reader = PdfReader(pdf_path)
+    errors = {}
+    for filename, start_page, end_page in jobs:
+        try:
+            writer = PdfWriter()
+            for p in range(start_page - 1, end_page):
+                if 0 <= p < len(reader.pages):
+                    writer.add_page(reader.pages[p])
+            with open(os.path.join(output_dir, filename), "wb") as f:
+                writer.write(f)
+        except Exception as e:
+            errors[filename] = str(e)
+    return errors
+
+
+def _write_splits_fitz(pdf_path: str, output_dir: str, jobs: List[tuple]) -> Dict[str, str]:
+    import fitz
+
+    errors = {}
+    with fitz.open(pdf_path) as src:
+        for filename, start_page, end_page in jobs:
+            try:
+                with fitz.open() as out:
+                    out.insert_pdf(src, from_page=start_page - 1, to_page=end_page - 1)
+                    out.save(os.path.join(output_dir, filename), garbage=1, deflate=True)
+            except Exception as e:
+                errors[filename] = str(e)
+    return errors
+
+
+def _partition_jobs(jobs: List[tuple], parts: int) -> List[List[tuple]]:
+    """Spread jobs over workers by page count, largest first"""
+    buckets = [[] for _ in range(parts)]
+    loads = [0] * parts
+    for job in sorted(jobs, key=lambda j: j[2] - j[1], reverse=True):
+        i = loads.index(min(loads))
+        buckets[i].append(job)
+        loads[i] += job[2] - job[1] + 1
+    return [b for b in buckets if b]
+
+
+def write_splits(pdf_path: str, output_dir, jobs: List[tuple], backend: Optional[str] = None,
+                 workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Write split PDFs
+
+    Args:
+        pdf_path: Source PDF
+        output_dir: Folder for the split files
+        jobs: [(filename, start_page, end_page)], pages 1-based inclusive
+        backend: "fitz" or "pypdf2" (default PDF_SPLIT_BACKEND)
+        workers: Processes for the fitz backend (default PDF_SPLIT_WORKERS);
+            they are spawned, so nothing of the calling server process is
+            shared, and only started for SPLIT_PARALLEL_MIN_PAGES pages or more
+
+    Returns:
+        {filename: error} for splits that could not be written
+    """
+    output_dir = str(output_dir)
+    backend = resolve_split_backend(backend)
+    if backend == "pypdf2":
+        return _write_splits_pypdf2(pdf_path, output_dir, jobs)
+
+    workers = min(workers or SPLIT_WORKERS, len(jobs))
+    pages = sum(end_page - start_page + 1 for _, start_page, end_page in jobs)
+    if workers <= 1 or pages < SPLIT_PARALLEL_MIN_PAGES:
+        return _write_splits_fitz(pdf_path, output_dir, jobs)
+
+    errors = {}
+    try:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # spawn, not fork: this runs inside the uvicorn worker, and a forked
+        # child would inherit its event loop, pooled DB connections and locks
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(_write_splits_fitz, pdf_path, output_dir, chunk)
+                       for chunk in _partition_jobs(jobs, workers)]
+            for future in futures:
+                errors.update(future.result())
+    except Exception as e:
+        # No usable process pool (e.g. restricted runtime): write in-process
+        print(f"⚠️ Parallel split failed ({e}), writing sequentially")
+        return _write_splits_fitz(pdf_path, output_dir, jobs)
+    return errors
+
+
 # ---------------- split and write metadata ----------------
 
 
-def split_pdf(pdf_path: str, output_dir: str = OUTPUT_DIR, company_name: str = None):
+def split_pdf(pdf_path: str, output_dir: str = OUTPUT_DIR, company_name: str = None,
+              backend: str = None):
     pdf_path = Path(pdf_path)
     output_dir = Path(output_dir) / pdf_path.stem
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -358,9 +491,8 @@ def split_pdf(pdf_path: str, output_dir: str = OUTPUT_DIR, company_name: str = N
         ranges = compute_final_ranges(
             str(pdf_path), index_entries, force_offset=force_offset)
 
-    reader = PdfReader(str(pdf_path))
-    split_files = []
-    valid_ranges = []
+    total_pages = count_pages(str(pdf_path), backend)
+    planned = []
 
     # For ICICI Prudential and similar, do NOT skip forms with missing start_page/end_page
     skip_incomplete = not (
@@ -374,8 +506,8 @@ def split_pdf(pdf_path: str, output_dir: str = OUTPUT_DIR, company_name: str = N
         except Exception as e:
             print(f"Invalid page numbers for {r.get('form_code')}: {e}")
             continue
-        start_page = max(1, min(len(reader.pages), start_page))
-        end_page = max(1, min(len(reader.pages), end_page))
+        start_page = max(1, min(total_pages, start_page))
+        end_page = max(1, min(total_pages, end_page))
         if end_page < start_page:
             print(
                 f"end_page < start_page for {r.get('form_code')} ({start_page} < {end_page}), fixing.")
@@ -392,32 +524,43 @@ def split_pdf(pdf_path: str, output_dir: str = OUTPUT_DIR, company_name: str = N
             continue
         safe_name = re.sub(r"[^\w\d\-_]+", "_", r["form_code"])[:80] or "form"
         filename = f"{safe_name}_{r['start_page']}_{r['end_page']}.pdf"
-        writer = PdfWriter()
-        try:
-            for p in range(r["start_page"] - 1, r["end_page"]):
-                if 0 <= p < len(reader.pages):
-                    writer.add_page(reader.pages[p])
-            outpath = output_dir / filename
-            with open(outpath, "wb") as f:
-                writer.write(f)
-            split_files.append({
-                "filename": filename,
-                "path": str(outpath),
-                "form_name": r.get("original_form_no") or r["form_code"],
-                "form_code": r["form_code"],
-                "serial_no": r.get("serial_no", ""),
-                "start_page": r.get("start_page"),
-                "end_page": r.get("end_page"),
-                "original_form_no": r.get("original_form_no", r["form_code"])
-            })
-            valid_ranges.append({
-                "form_no": r["form_code"],
-                "start_page": r.get("start_page"),
-                "end_page": r.get("end_page")
-            })
-        except Exception as e:
-            print(f"Error splitting form {r.get('form_code')}: {e}")
+        planned.append((filename, r))
+
+    # Same form code and pages -> same file, written once
+    jobs = list({filename: (filename, r["start_page"], r["end_page"])
+                 for filename, r in planned}.values())
+    errors = write_splits(str(pdf_path), output_dir, jobs, backend=backend)
+
+    # Page text / layout for the extraction stages, read once here
+    try:
+        from services.page_sidecar import write_split_sidecars
+        write_split_sidecars(str(pdf_path), output_dir,
+                             [job for job in jobs if job[0] not in errors])
+    except Exception as e:
+        print(f"⚠️ Page sidecars not written: {e}")
+
+    split_files = []
+    valid_ranges = []
+    for filename, r in planned:
+        if filename in errors:
+            print(f"Error splitting form {r.get('form_code')}: {errors[filename]}")
             continue
+        outpath = output_dir / filename
+        split_files.append({
+            "filename": filename,
+            "path": str(outpath),
+            "form_name": r.get("original_form_no") or r["form_code"],
+            "form_code": r["form_code"],
+            "serial_no": r.get("serial_no", ""),
+            "start_page": r.get("start_page"),
+            "end_page": r.get("end_page"),
+            "original_form_no": r.get("original_form_no", r["form_code"])
+        })
+        valid_ranges.append({
+            "form_no": r["form_code"],
+            "start_page": r.get("start_page"),
+            "end_page": r.get("end_page")
+        })
 
     # metadata (no user_id/upload_id)
     metadata = {
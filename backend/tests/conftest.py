@@ -0,0 +1,17 @@
+"""
+Shared test setup
+
+Tests import the app modules the way the scripts in scripts/ do (backend/
+on sys.path) and never use the configured database: modules that create
+the app engine at import get an in-memory SQLite URL, and tests that need
+tables build their own engine.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("DB_TYPE", "sqlite")
+os.environ.setdefault("SQLITE_DATABASE_URL", "sqlite://")
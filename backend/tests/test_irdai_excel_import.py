@@ -0,0 +1,144 @@
+"""
+Vectorized IRDAI detailed-sheet import (user-036)
+
+parse_detailed_rows is checked against the previous cell-by-cell loop
+(kept in scripts/benchmark_irdai_excel_import.py), and importing the same
+month twice must leave one row per (report_month, insurer_name, category).
+
+upsert_detailed_rows writes MySQL SQL through a DBAPI cursor; the cursor
+below runs it on SQLite, rewriting only the placeholders and the
+ON DUPLICATE KEY clause.
+"""
+import random
+import re
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from databases.models import Base
+from scripts.benchmark_irdai_excel_import import parse_cell_by_cell
+from services import irdai_excel_importer_enhanced as importer
+from services.irdai_rollup import METRIC_COLUMNS
+
+REPORT_MONTH, MONTH_YEAR = "2025-09-30", "Sep 25"
+CATEGORIES = ["Individual Single Premium", "Individual Non-Single Premium",
+              "Group Single Premium", "Group Non-Single Premium",
+              "Group Yearly Renewable Premium"]
+
+
+def make_sheet(insurers, seed: int = 0) -> pd.DataFrame:
+    """Detailed-format sheet: 3 header rows, 6-row blocks, a footer"""
+    rng = random.Random(seed)
+    width = importer.DETAILED_FIRST_METRIC_COL + len(METRIC_COLUMNS)
+
+    def _value():
+        roll = rng.random()
+        if roll < 0.1:
+            return None
+        if roll < 0.15:
+            return rng.choice(["-", "NA", " ", "n/a"])
+        if roll < 0.3:
+            return f" {rng.randint(0, 10**6):,}.{rng.randint(0, 99):02d} "
+        return round(rng.uniform(-100, 10**5), 2)
+
+    rows = [["Sl No.", "Insurer"] + [f"h{c}" for c in range(width - 2)],
+            [None] * width, [None] * width]
+    for serial, insurer in enumerate(insurers, start=1):
+        total_serial = None if insurer in importer.TOTAL_ROW_NAMES else serial
+        rows.append([total_serial, insurer] + [_value() for _ in METRIC_COLUMNS])
+        for category in CATEGORIES:
+            # Blank category rows are skipped, not counted as categories
+            name = None if rng.random() < 0.1 else category
+            rows.append([None, name] + [_value() for _ in METRIC_COLUMNS])
+        if rng.random() < 0.3:
+            rows.append([None] * width)
+    rows.append([None, "Note: figures are provisional"] + [None] * (width - 2))
+    rows.append([99, "Ignored after footer"] + [1] * len(METRIC_COLUMNS))
+    return pd.DataFrame(rows, dtype=object)
+
+
+INSURERS = ["LIC of India", "HDFC Life", "SBI Life", "Private Total", "Grand Total"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_parse_matches_cell_loop(seed):
+    df = make_sheet(INSURERS, seed)
+    assert importer.parse_detailed_rows(df, REPORT_MONTH, MONTH_YEAR) == \
+        parse_cell_by_cell(df, REPORT_MONTH, MONTH_YEAR)
+
+
+def test_clean_block_matches_clean():
+    cells = [[None, "-", " 1,234.50 ", 7, float("nan")], ["NA", "abc", 0.5, "", "-3"]]
+    expected = [[importer.clean(v) for v in row] for row in cells]
+    assert importer.clean_block(cells).tolist() == expected
+
+
+class _SqliteCursor:
+    """Runs the importer's MySQL statements on a SQLite DBAPI cursor"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    @staticmethod
+    def _sql(sql: str) -> str:
+        sql = sql.replace("%s", "?")
+        match = re.search(r"ON DUPLICATE KEY UPDATE(.*)$", sql, re.S)
+        if match:
+            sql = (sql[:match.start()]
+                   + "ON CONFLICT (report_month, insurer_name, category) DO UPDATE SET"
+                   + re.sub(r"VALUES\((\w+)\)", r"excluded.\1", match.group(1)))
+        return sql
+
+    def execute(self, sql, params=()):
+        return self.cursor.execute(self._sql(sql), params)
+
+    def executemany(self, sql, params):
+        return self.cursor.executemany(self._sql(sql), params)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables["irdai_monthly_data"]])
+    return engine
+
+
+def _import(engine, df):
+    conn = engine.raw_connection()
+    try:
+        written = importer.import_detailed_format(
+            df, REPORT_MONTH, MONTH_YEAR, _SqliteCursor(conn.cursor()))
+        conn.commit()
+    finally:
+        conn.close()
+    return written
+
+
+def _stored(engine):
+    with engine.connect() as conn:
+        return sorted(
+            tuple(row) for row in conn.execute(text(
+                f"SELECT insurer_name, category, {', '.join(METRIC_COLUMNS)} "
+                "FROM irdai_monthly_data WHERE report_month = :m"), {"m": REPORT_MONTH}))
+
+
+def test_reimport_replaces_rows(engine):
+    first = make_sheet(INSURERS, seed=1)
+    rows = importer.parse_detailed_rows(first, REPORT_MONTH, MONTH_YEAR)
+    assert _import(engine, first) == len(rows)
+    assert _import(engine, first) == len(rows)
+    expected = sorted((r[2], r[3], *r[4:]) for r in rows)
+    assert _stored(engine) == expected
+
+    # A corrected sheet for the same month overwrites the values
+    second = make_sheet(INSURERS, seed=2)
+    _import(engine, second)
+    rows = importer.parse_detailed_rows(second, REPORT_MONTH, MONTH_YEAR)
+    stored = _stored(engine)
+    assert len(stored) == len({(r[0], r[1]) for r in stored})
+    assert {(r[2], r[3]): tuple(r[4:]) for r in rows}.items() <= \
+        {(r[0], r[1]): tuple(r[2:]) for r in stored}.items()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM irdai_monthly_data")).scalar() == len(stored)
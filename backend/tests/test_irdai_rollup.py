@@ -0,0 +1,139 @@
+"""
+IRDAI monthly rollup against the raw scan (user-033)
+
+Any report_month range answered from irdai_monthly_rollup must give the
+same SUM()s as report_month BETWEEN start AND end on irdai_monthly_data.
+"""
+import calendar
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from databases.models import Base
+from services import irdai_rollup as rollup
+
+INSURERS = ["LIC of India", "HDFC Life", "Private Total"]
+CATEGORIES = ["Individual Single Premium", "Group Yearly Renewable Premium"]
+SUMMED = ["fyp_current", "pol_current", "sa_ytd_current", "lives_market_share"]
+
+
+def _month_ends(first: date, count: int):
+    year, month = first.year, first.month
+    for _ in range(count):
+        yield date(year, month, calendar.monthrange(year, month)[1])
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+# Apr 2023 - Jun 2025: two whole financial years and one partial quarter
+MONTHS = list(_month_ends(date(2023, 4, 1), 27))
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Base.metadata.tables[name]
+        for name in (rollup.RAW_TABLE, rollup.ROLLUP_TABLE, rollup.PERIODS_TABLE)
+    ])
+
+    rng = random.Random(33)
+    rows = []
+    for month in MONTHS:
+        for insurer in INSURERS:
+            for category in CATEGORIES:
+                row = {"report_month": month.isoformat(), "insurer_name": insurer,
+                       "category": category}
+                for column in rollup.METRIC_COLUMNS:
+                    row[column] = None if rng.random() < 0.1 else rng.randint(0, 10_000)
+                rows.append(row)
+
+    columns = ["report_month", "insurer_name", "category", *rollup.METRIC_COLUMNS]
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"INSERT INTO {rollup.RAW_TABLE} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)})"), rows)
+    return engine
+
+
+def _sums(conn, source: str, params: dict):
+    sql = rollup.source_text(f"""
+        SELECT insurer_name, category, {', '.join(f'SUM({c})' for c in SUMMED)}
+        FROM {source}
+        GROUP BY insurer_name, category
+        ORDER BY insurer_name, category
+    """, params)
+    return [tuple(row) for row in conn.execute(sql, params)]
+
+
+def _assert_matches_raw(conn, start_date: str, end_date: str):
+    raw = _sums(conn, f"{rollup.RAW_TABLE} WHERE report_month BETWEEN :start_date AND :end_date",
+                {"start_date": start_date, "end_date": end_date})
+    source, params = rollup.range_source(conn, start_date, end_date)
+    assert source.startswith(rollup.ROLLUP_TABLE)
+    assert _sums(conn, source, params) == raw
+
+
+RANGES = [
+    ("2023-04-01", "2025-06-30"),   # everything
+    ("2024-04-01", "2025-03-31"),   # one FY
+    ("2023-07-01", "2024-09-30"),   # quarters across an FY boundary
+    ("2023-05-15", "2024-02-10"),   # partial months at both ends
+    ("2025-04-30", "2025-04-30"),   # a single month
+    ("2022-01-01", "2023-03-31"),   # before the data
+]
+
+
+@pytest.mark.parametrize("start_date, end_date", RANGES)
+def test_rollup_matches_raw_scan(engine, start_date, end_date):
+    assert rollup.refresh_irdai_rollup(engine=engine)["success"]
+    with engine.connect() as conn:
+        _assert_matches_raw(conn, start_date, end_date)
+
+
+def test_period_selection(engine):
+    with engine.connect() as conn:
+        # Never built: callers scan the raw table
+        assert rollup.select_rollup_periods(conn, "2023-04-01", "2025-06-30") is None
+
+    result = rollup.refresh_irdai_rollup(engine=engine)
+    assert result["financial_years"] == ["2023-24", "2024-25", "2025-26"]
+
+    with engine.connect() as conn:
+        assert rollup.select_rollup_periods(conn, "2023-07-01", "2024-05-31") == [
+            "M:2024-04-30", "M:2024-05-31",
+            "Q:2023-24-Q2", "Q:2023-24-Q3", "Q:2023-24-Q4",
+        ]
+        # FY and quarter periods are "to date": 2025-26 only has Apr - Jun
+        assert rollup.select_rollup_periods(conn, "2024-04-01", "2025-06-30") == [
+            "FY:2024-25", "FY:2025-26"]
+        assert rollup.select_rollup_periods(conn, "2022-01-01", "2022-12-31") == []
+
+
+def test_partial_refresh_matches_full_rebuild(engine):
+    rollup.refresh_irdai_rollup(engine=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"UPDATE {rollup.RAW_TABLE} SET fyp_current = fyp_current + 1000 "
+            "WHERE report_month = '2024-08-31'"))
+        conn.execute(text(
+            f"INSERT INTO {rollup.RAW_TABLE} (report_month, insurer_name, category, fyp_current) "
+            "VALUES ('2024-08-31', 'New Insurer', 'Total', 5)"))
+
+    result = rollup.refresh_irdai_rollup(report_months=["2024-08-31"], engine=engine)
+    assert result["financial_years"] == ["2024-25"]
+
+    def _snapshot(conn):
+        return sorted(tuple(r) for r in conn.execute(text(
+            f"SELECT period_key, insurer_name, category, fyp_current, row_count "
+            f"FROM {rollup.ROLLUP_TABLE}")))
+
+    with engine.connect() as conn:
+        partial = _snapshot(conn)
+        for start_date, end_date in RANGES:
+            _assert_matches_raw(conn, start_date, end_date)
+
+    rollup.refresh_irdai_rollup(engine=engine)
+    with engine.connect() as conn:
+        assert _snapshot(conn) == partial
@@ -0,0 +1,90 @@
+"""
+Report month resolution for IRDAI monthly uploads (user-037)
+
+Workbooks whose sheet names carry no month take it from the sheet's title
+row; a sheet that only the file name dates is rejected with a clear error
+instead of being reported as a duplicate.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from routes import irdai_monthly  # noqa: E402
+from services.irdai_excel_importer_enhanced import list_sheet_titles  # noqa: E402
+
+SHEETS = {
+    "Sheet1": "New Business Statement of Life Insurers for the Period ended 31st July 2025",
+    "Sheet2": "First Year Premium of Life Insurers for the Period ended ended 31st August, 2025",
+    "Notes": "Compiled from the returns filed by insurers",
+    "Sheet3": None,
+}
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "FYP Sep 2025.xlsx"
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, title in SHEETS.items():
+        ws = wb.create_sheet(name)
+        if title:
+            ws.append([title])
+        ws.append(["Sl No.", "Insurer", "Premium"])
+        ws.append([1, "Acko Life", 3.5])
+    wb.save(path)
+    return path
+
+
+def test_list_sheet_titles(workbook):
+    titles = list_sheet_titles(str(workbook))
+    assert list(titles) == list(SHEETS)
+    assert titles["Sheet1"].startswith(SHEETS["Sheet1"])
+    assert titles["Sheet3"] == "Sl No. Insurer Premium Acko Life"
+
+
+@pytest.mark.parametrize("sheet, title, filename, prefer_sheet, expected", [
+    ("as at 30th Sep 2025", "", "FYP Jun 2021.xlsx", True, ("2025-09-30", "sheet")),
+    ("Sheet1", SHEETS["Sheet1"], "FYP Sep 2025.xlsx", True, ("2025-07-31", "title")),
+    ("Sheet2", SHEETS["Sheet2"], "FYP Sep 2025.xlsx", True, ("2025-08-31", "title")),
+    ("Notes", SHEETS["Notes"], "FYP Sep 2025.xlsx", True, ("2025-09-30", "file")),
+    ("Sheet1", SHEETS["Sheet1"], "FYP Sep 2025.xlsx", False, ("2025-09-30", "file")),
+    ("Sheet1", SHEETS["Sheet1"], "backfill.xlsx", False, ("2025-07-31", "title")),
+    ("FYP as at 31st March, 2018_TEMP", "", "x.xlsx", True, ("2018-03-31", "sheet")),
+])
+def test_report_month_for(sheet, title, filename, prefer_sheet, expected):
+    assert irdai_monthly._report_month_for(sheet, title, filename, prefer_sheet) == expected
+
+
+def test_report_month_for_without_any_month():
+    with pytest.raises(ValueError, match="Cannot extract report month"):
+        irdai_monthly._report_month_for("Sheet1", "Notes", "backfill.xlsx", True)
+
+
+def test_batch_takes_months_from_titles(workbook, monkeypatch):
+    imported = []
+
+    def _import_batch(jobs):
+        imported.extend(jobs)
+        return {"sheets": [{**job, "status": "success", "rows_inserted": 1} for job in jobs],
+                "rows_inserted": len(jobs), "rollup": None}
+
+    monkeypatch.setattr(
+        "services.irdai_excel_importer_enhanced.import_irdai_batch", _import_batch)
+
+    app = FastAPI()
+    app.include_router(irdai_monthly.router)
+    with open(workbook, "rb") as f:
+        response = TestClient(app).post(
+            "/upload-monthly-excel/batch",
+            files=[("files", ("FYP Sep 2025.xlsx", f.read()))])
+
+    assert response.status_code == 200
+    assert [(job["sheet_name"], job["report_month"]) for job in imported] == [
+        ("Sheet1", "2025-07-31"), ("Sheet2", "2025-08-31"), ("Notes", "2025-09-30")]
+
+    skipped = [s for s in response.json()["files"][0]["sheets"] if s["status"] == "skipped"]
+    assert [s["sheet_name"] for s in skipped] == ["Sheet3"]
+    assert "No month in the sheet name or title" in skipped[0]["error"]
+    assert response.json()["status"] == "partial"
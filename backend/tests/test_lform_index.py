@@ -0,0 +1,211 @@
+"""
+LFormIndex lookups against the directory scan they replaced (user-042)
+
+The reference below is the matching the peers route did per request:
+read every metadata.json under pdf_splits/ and test each split's form
+fields, then list extractions/ and test each output file name.
+"""
+import json
+import os
+import random
+import re
+
+import pytest
+
+from services.lform_index import LFormIndex
+
+FORMS = [
+    "L-1", "L-1-A-RA", "L-10", "L-11", "L-9A", "L-9", "L-3 Balance Sheet", "L-14A",
+    "L-2-A-PL", "L-1A", " l-4 premium", "L-32", "Form L-3", "L-26", None, "",
+]
+EXTRACTION_FORMS = ["L_1_A_RA", "L-10_x", "L_9A_rev", "L_4_PREM", "L_26_INV", "L_11"]
+QUERIES = [
+    "L-1", "L-1-A", "L-10", "L-11", "L-9A", "L-9", "L-3", "L-4", "L-26", "L-14A",
+    "L-2", "L-32", "L1", "L-99",
+]
+SPLIT_FIELDS = ("form_name", "form_code", "original_form_no")
+
+
+def _matches_lform(field_value, lform_number):
+    """The directory scan's field match"""
+    if not field_value:
+        return False
+    field_upper = field_value.upper().strip()
+    lform_upper = lform_number.upper().strip()
+    if field_upper == lform_upper:
+        return True
+    if re.match(r'^(L-\d+)([A-Z]+)', lform_upper):
+        return False
+    lform_match = re.match(r'^(L-\d+)', lform_upper)
+    if not lform_match:
+        return False
+    base_lform = lform_match.group(1)
+    for pattern in re.findall(r'L-\d+[A-Z]?', field_upper):
+        if pattern in (lform_upper, base_lform) or pattern.startswith(base_lform + "-"):
+            return True
+    return False
+
+
+def _scan(splits_dir, extractions_dir, lform_number):
+    """{company id: {pdf folder: [(name, code, pages)] or None for extraction hits}}"""
+    found = {}
+    for company_dir in sorted(os.listdir(splits_dir)):
+        for pdf_folder in sorted(os.listdir(os.path.join(splits_dir, company_dir))):
+            pdf_path = os.path.join(splits_dir, company_dir, pdf_folder)
+            metadata_path = os.path.join(pdf_path, "metadata.json")
+            if not os.path.exists(metadata_path):
+                metadata_path = os.path.join(pdf_path, pdf_folder, "metadata.json")
+            with open(metadata_path, encoding="utf-8") as f:
+                split_files = json.load(f)["split_files"]
+            hits = [
+                (s.get("form_name", ""), s.get("form_code", ""),
+                 f"{s.get('start_page', '')}-{s.get('end_page', '')}")
+                for s in split_files
+                if any(_matches_lform(s.get(field), lform_number) for field in SPLIT_FIELDS)
+            ]
+            if hits:
+                found.setdefault(company_dir.lower().replace(" ", "-"), {})[pdf_folder] = hits
+
+    split_companies = set(found)
+    lform_underscore = lform_number.replace("-", "_")
+    for company_dir in sorted(os.listdir(extractions_dir)):
+        company_id = company_dir.lower().replace(" ", "-")
+        if company_id in split_companies:
+            continue
+        for pdf_folder in sorted(os.listdir(os.path.join(extractions_dir, company_dir))):
+            for filename in os.listdir(os.path.join(extractions_dir, company_dir, pdf_folder)):
+                upper = filename.upper()
+                if filename.endswith(("_extracted.json", "_metadata.json")) and \
+                        (lform_underscore in upper or lform_number in upper):
+                    found.setdefault(company_id, {})[pdf_folder] = None
+                    break
+    return found
+
+
+def _from_index(companies):
+    result = {}
+    for company in companies:
+        pdfs = {}
+        for pdf in company["pdfs"]:
+            splits = pdf["splits"]
+            if splits and splits[0]["pages"] == "N/A":
+                pdfs[pdf["name"]] = None
+            else:
+                pdfs[pdf["name"]] = [(s["name"], s["code"], s["pages"]) for s in splits]
+        result[company["id"]] = pdfs
+    return result
+
+
+def _write_pdf(splits_dir, company, pdf_folder, rng, nested=False):
+    folder = os.path.join(splits_dir, company, pdf_folder)
+    if nested:
+        folder = os.path.join(folder, pdf_folder)
+    os.makedirs(folder)
+    metadata = {"split_files": [
+        {"form_name": rng.choice(FORMS[:-2]), "form_code": rng.choice(FORMS),
+         "original_form_no": rng.choice(FORMS[:-1]), "start_page": i, "end_page": i + 1}
+        for i in range(6)
+    ]}
+    with open(os.path.join(folder, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f)
+    return metadata
+
+
+def _write_extractions(extractions_dir, company, pdf_folder, forms):
+    folder = os.path.join(extractions_dir, company, pdf_folder)
+    os.makedirs(folder, exist_ok=True)
+    for form in forms:
+        for suffix in ("_extracted.json", "_metadata.json"):
+            with open(os.path.join(folder, form + suffix), "w") as f:
+                f.write("{}")
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    rng = random.Random(3)
+    splits_dir, extractions_dir = str(tmp_path / "pdf_splits"), str(tmp_path / "extractions")
+    for company in ("sbi_life", "hdfc life", "lic"):
+        for p in range(3):
+            _write_pdf(splits_dir, company, f"pdf{p}", rng, nested=p == 2)
+    for company in ("sbi_life", "axis_max", "tata"):
+        for p in range(2):
+            _write_extractions(extractions_dir, company, f"pdfx{p}", rng.sample(EXTRACTION_FORMS, 3))
+    return splits_dir, extractions_dir
+
+
+@pytest.mark.parametrize("lform_number", QUERIES)
+def test_index_matches_directory_scan(dirs, lform_number):
+    index = LFormIndex(*dirs)
+    assert _from_index(index.companies_with_lform(lform_number)) == _scan(*dirs, lform_number)
+
+
+def test_split_companies_come_first(dirs):
+    companies = LFormIndex(*dirs).companies_with_lform("L-1")
+    ids = [company["id"] for company in companies]
+    assert ids[:3] == ["hdfc-life", "lic", "sbi_life"]
+    assert set(ids[3:]) <= {"axis_max", "tata"}
+
+
+def test_catalog_hooks_match_a_rebuild(dirs):
+    splits_dir, extractions_dir = dirs
+    index = LFormIndex(splits_dir, extractions_dir)
+    index.companies_with_lform("L-1")
+
+    metadata = _write_pdf(splits_dir, "zeta", "pdf0", random.Random(7))
+    index.index_pdf("zeta", "pdf0", metadata)
+    _write_extractions(extractions_dir, "zeta_x", "pdf0", ["L_26_INV"])
+    index.add_extraction("zeta_x", "pdf0", "L_26_INV_extracted.json")
+    index.remove_pdf("lic", "pdf1")
+    os.remove(os.path.join(splits_dir, "lic", "pdf1", "metadata.json"))
+    os.rmdir(os.path.join(splits_dir, "lic", "pdf1"))
+
+    rebuilt = LFormIndex(splits_dir, extractions_dir)
+    for lform_number in QUERIES:
+        assert index.companies_with_lform(lform_number) == rebuilt.companies_with_lform(lform_number)
+
+
+def test_rebuilds_when_the_generation_changes(dirs):
+    """Another worker's catalog write shows up through the generation marker"""
+    splits_dir, extractions_dir = dirs
+    generation = {"value": 0}
+    index = LFormIndex(splits_dir, extractions_dir, generation=lambda: generation["value"])
+    before = index.companies_with_lform("L-26")
+
+    # Written by another process: this index's hooks never ran
+    _write_extractions(extractions_dir, "zeta_x", "pdf0", ["L_26_INV"])
+    assert index.companies_with_lform("L-26") == before
+
+    generation["value"] += 1
+    after = index.companies_with_lform("L-26")
+    assert after == LFormIndex(splits_dir, extractions_dir).companies_with_lform("L-26")
+    assert "zeta_x" in {company["id"] for company in after}
+
+
+def test_generation_failure_keeps_the_index(dirs):
+    def _fail():
+        raise RuntimeError("catalog unavailable")
+
+    index = LFormIndex(*dirs, generation=_fail)
+    assert _from_index(index.companies_with_lform("L-1")) == _scan(*dirs, "L-1")
+
+
+def test_catalog_generation_moves_on_writes(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+
+    from databases.models import Base
+    from services import pdf_catalog
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(engine, tables=[
+        Base.metadata.tables[pdf_catalog.PDF_TABLE], Base.metadata.tables[pdf_catalog.SPLIT_TABLE]])
+    monkeypatch.setattr(pdf_catalog, "lform_index", LFormIndex(
+        str(tmp_path / "pdf_splits"), str(tmp_path / "extractions")))
+    metadata = {"split_files": [{"filename": "L-1.pdf", "form_code": "L-1"}]}
+
+    seen = [pdf_catalog.catalog_generation(engine)]
+    for step in (lambda: pdf_catalog.record_split("SBI Life", "pdf0", metadata, engine=engine),
+                 lambda: pdf_catalog.record_split("SBI Life", "pdf0", metadata, engine=engine),
+                 lambda: pdf_catalog.remove_pdf("SBI Life", "pdf0", engine=engine)):
+        step()
+        seen.append(pdf_catalog.catalog_generation(engine))
+    assert all(a != b for a, b in zip(seen, seen[1:]))
@@ -0,0 +1,94 @@
+"""
+Page sidecar round trip (user-048)
+
+The sidecar's text must be the PyMuPDF get_text("text") the Gemini
+verifier computed from the split before, and extract_form must read the
+same pdfplumber text whether or not a sidecar exists.
+"""
+import os
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("pyarrow")
+
+from services import page_sidecar  # noqa: E402
+
+PAGES = 5
+
+
+@pytest.fixture
+def source_pdf(tmp_path):
+    path = tmp_path / "sample.pdf"
+    doc = fitz.open()
+    for p in range(PAGES):
+        page = doc.new_page()
+        page.insert_text((40, 40), f"FORM L-{p + 1} REVENUE ACCOUNT", fontsize=10)
+        for r in range(6):
+            page.insert_text((40, 70 + r * 18),
+                             f"Row {r + 1} premium page {p + 1}   {(r + 1) * 1234.5:,.2f}", fontsize=8)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def _write_splits(source_pdf, output_dir, splits):
+    """Split files as split_pdf writes them, then their sidecars"""
+    with fitz.open(str(source_pdf)) as src:
+        for filename, start_page, end_page in splits:
+            out = fitz.open()
+            out.insert_pdf(src, from_page=start_page - 1, to_page=min(end_page, PAGES) - 1)
+            out.save(str(output_dir / filename))
+            out.close()
+    return page_sidecar.write_split_sidecars(str(source_pdf), output_dir, splits)
+
+
+def test_round_trip_matches_pymupdf_text(source_pdf, tmp_path):
+    splits = [("L-1.pdf", 1, 2), ("L-2.pdf", 2, 4), ("L-5.pdf", 5, 7)]
+    assert _write_splits(source_pdf, tmp_path, splits) == 3
+
+    with fitz.open(str(source_pdf)) as doc:
+        expected = [page.get_text("text") for page in doc]
+
+    for filename, start_page, end_page in splits:
+        pages = page_sidecar.load_pages(tmp_path / filename)
+        source_pages = list(range(start_page, min(end_page, PAGES) + 1))
+        assert [p["page"] for p in pages] == list(range(1, len(source_pages) + 1))
+        assert [p["source_page"] for p in pages] == source_pages
+        assert [p["text"] for p in pages] == [expected[n - 1] for n in source_pages]
+
+        with fitz.open(str(tmp_path / filename)) as split:
+            assert [p["text"] for p in pages] == [page.get_text("text") for page in split]
+        assert all(set(p) == {"page", "source_page", "text"} for p in pages)
+
+
+def test_missing_or_stale_sidecar_is_ignored(source_pdf, tmp_path):
+    _write_splits(source_pdf, tmp_path, [("L-1.pdf", 1, 1)])
+    split = tmp_path / "L-1.pdf"
+    assert page_sidecar.load_pages(split) is not None
+
+    sidecar = page_sidecar.sidecar_path(split)
+    assert sidecar.name == "L-1.pages.parquet"
+    mtime = os.stat(split).st_mtime
+    os.utime(sidecar, (mtime - 10, mtime - 10))
+    assert page_sidecar.load_pages(split) is None
+
+    os.remove(sidecar)
+    assert page_sidecar.load_pages(split) is None
+
+
+def test_extract_form_text_does_not_depend_on_sidecar(source_pdf, tmp_path):
+    pytest.importorskip("pdfplumber")
+    from services.pdf_splitted_extraction import _read_page_texts
+
+    split = tmp_path / "L-2.pdf"
+    with fitz.open(str(source_pdf)) as src:
+        out = fitz.open()
+        out.insert_pdf(src, from_page=1, to_page=2)
+        out.save(str(split))
+        out.close()
+
+    without_sidecar = _read_page_texts(str(split))
+    page_sidecar.write_split_sidecars(str(source_pdf), tmp_path, [("L-2.pdf", 2, 3)])
+    assert page_sidecar.load_pages(split) is not None
+    assert _read_page_texts(str(split)) == without_sidecar
@@ -0,0 +1,218 @@
+"""
+Metadata and row mapping of pdf_splitted_extraction (user-049, user-050)
+
+Expected values are what the implementation returned before the patterns
+were precompiled and short cells matched against a prefix set; they pin that
+behavior, quirks included (e.g. the Form No suffix leaking into Title).
+The column-wise map_frame_to_rows is checked against the row-by-row path.
+"""
+import contextlib
+import io
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pdfplumber")
+
+from scripts.benchmark_map_to_rows import HEADERS, PAGE_TEXT, TEMPLATE, make_table  # noqa: E402
+from services import pdf_splitted_extraction as pse  # noqa: E402
+
+FLAT_HEADERS = ["Particulars", "Schedule", "Current Year", "Previous Year"]
+
+METADATA_CASES = [
+    (PAGE_TEXT, TEMPLATE, {
+        "Form No": "L-1-A-RA",
+        "Title": "A-RA SAMPLE LIFE INSURANCE COMPANY LIMITED",
+        "RegistrationNumber": "111 dated 29.03.2001",
+        "Period": "For the quarter ended 30th June 2024",
+        "Currency": "",
+    }),
+    ("FORM L-2-A-PL\nHDFC Life Insurance Company Limited\nIRDAI Registration No. 101\n"
+     "PROFIT & LOSS ACCOUNT FOR THE PERIOD ENDED 31st March 2025\n(₹ in Lakhs)\n",
+     {"Form No": "L-2-A-PL", "Title": "Profit and Loss", "FlatHeaders": FLAT_HEADERS}, {
+        "Form No": "L-2-A-PL",
+        "Title": "A-PL HDFC Life Insurance Company Limited",
+        "RegistrationNumber": ". 101",
+        "Period": "For the period ended 31st March 2025",
+        "Currency": "",
+    }),
+    ("Form No: L-4\nPREMIUM SCHEDULE\nFor the year ended March 31, 2024\n(Rs in Crores)\n",
+     {"Form No": "L-4", "FlatHeaders": FLAT_HEADERS}, {
+        "Form No": "L-4",
+        "Title": "",
+        "RegistrationNumber": "",
+        "Period": "For the year ended March 31, 2024",
+        "Currency": "in Crores",
+    }),
+    ("L-3 BALANCE SHEET AS AT 30.09.2024\n(Amount in thousands)\n",
+     {"FlatHeaders": FLAT_HEADERS}, {
+        "Form No": "L-3",
+        "Title": "",
+        "RegistrationNumber": "",
+        "Period": "As at 30.09.2024",
+        "Currency": "",
+    }),
+]
+
+
+@contextlib.contextmanager
+def _quiet():
+    """extract_metadata and map_to_rows log every step"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@pytest.mark.parametrize("text, template, expected", METADATA_CASES)
+def test_extract_metadata(text, template, expected):
+    with _quiet():
+        assert pse.extract_metadata(text, template) == expected
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_map_to_rows(vectorized):
+    table = [
+        ["Particulars", "Schedule", "Current Year", "Previous Year"],
+        ["Premiums earned - net", "L-4", "1,234.50", "1,100.00"],
+        ["Income from investments  Other income", "L-5", "10  20", "30  40"],
+        ["", "", "", ""],
+        ["HDFC LIFE INSURANCE COMPANY LIMITED", "", "", ""],
+        "Commission expenses   L-6  (55.25)  (50.00)",
+        ["Total", "", "2,000.00", "1,800.00"],
+    ]
+    with _quiet():
+        meta = pse.extract_metadata(*METADATA_CASES[1][:2])
+        rows = pse.map_to_rows(table, FLAT_HEADERS, meta, vectorized=vectorized)
+
+    assert rows == [
+        {"Particulars": "Premiums earned - net", "Schedule": "L-4",
+         "Current Year": "1,234.50", "Previous Year": "1,100.00"},
+        {"Particulars": "Income from investments", "Schedule": "Other income",
+         "Current Year": "L-5", "Previous Year": "10"},
+        {"Particulars": "Commission expenses", "Schedule": "L-6",
+         "Current Year": "(55.25)", "Previous Year": "(50.00)"},
+        {"Particulars": "Total", "Schedule": "",
+         "Current Year": "2,000.00", "Previous Year": "1,800.00"},
+    ]
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_map_to_rows_serial_column(vectorized):
+    with _quiet():
+        meta = pse.extract_metadata(PAGE_TEXT, TEMPLATE)
+        rows = pse.map_to_rows(make_table(9), HEADERS, meta, vectorized=vectorized)
+
+    assert rows == [
+        {"Sl No": "extra 3", "Particulars": "Net", "Schedule": "Premium 3",
+         "Current Year": "L-4", "Previous Year": ""},
+        {"Sl No": "6", "Particulars": "Commission 6", "Schedule": "first year",
+         "Current Year": "L-5", "Previous Year": "7,407.00"},
+        {"Sl No": "7", "Particulars": "Commission 7", "Schedule": "first year",
+         "Current Year": "L-5", "Previous Year": "8,641.50"},
+    ]
+
+
+HEADER_SETS = [
+    HEADERS, FLAT_HEADERS, ["Particulars"], ["Sl. No.", "Information", "Value"],
+    ["Item", "Amount"], ["Serial", "Particulars", "Q1", "Q2", "Q3", "Q4", "Total"],
+    ["--", "Particulars", "Amount"],
+]
+CELL_WORDS = [
+    "Premium", "Commission", "Total", "Particulars", "Current", "Previous", "Rs", "lakh",
+    "Schedule", "L-4", "Net", "income", "Amount in Rs. Lakhs", "page 2", "continued",
+    "Sample Life Insurance Company Limited", "Form No L-1", "grand total", "sl", "a", "var",
+]
+
+
+def _random_cell(rng):
+    roll = rng.random()
+    if roll < 0.15:
+        return rng.choice(["", None, "  "])
+    if roll < 0.4:
+        return f"{rng.randint(0, 10**6):,}.{rng.randint(0, 99):02d}"
+    if roll < 0.5:
+        return rng.choice([str(rng.randint(1, 40)), f"({rng.randint(1, 999)})"])
+    if roll < 0.6:
+        # Several values in one cell
+        separator = rng.choice(["  ", "; ", " | ", "\n"])
+        return separator.join(rng.choice(CELL_WORDS + ["12", "3,4"]) for _ in range(2))
+    return " ".join(rng.choice(CELL_WORDS) for _ in range(rng.randint(1, 3)))
+
+
+def _random_table(rng, headers):
+    """pdfplumber-style ragged rows and row strings, or a camelot-style DataFrame"""
+    if rng.random() < 0.35:
+        width = max(1, len(headers) + rng.choice([-1, 0, 0, 1, 2]))
+        rows = [[_random_cell(rng) for _ in range(width)] for _ in range(rng.randint(1, 30))]
+        if rng.random() < 0.5:
+            rows.insert(0, (list(headers) + [""] * width)[:width])
+        return pd.DataFrame(rows)
+    rows = []
+    for _ in range(rng.randint(0, 30)):
+        if rng.random() < 0.1:
+            rows.append(f"{rng.randint(1, 9)}  {rng.choice(CELL_WORDS)}   {rng.randint(1, 999)},000  (12)")
+        else:
+            width = max(0, len(headers) + rng.choice([-2, -1, 0, 0, 0, 1, 2, 3]))
+            rows.append([_random_cell(rng) for _ in range(width)])
+    if rng.random() < 0.6:
+        rows.insert(rng.randint(0, min(3, len(rows))), list(headers))
+    return rows
+
+
+def _both_paths(table, headers, meta):
+    with _quiet():
+        return (pse.map_to_rows(table, headers, meta, vectorized=False),
+                pse.map_to_rows(table, headers, meta, vectorized=True))
+
+
+def _first_row(table):
+    return list(table.iloc[0]) if isinstance(table, pd.DataFrame) else table[0]
+
+
+def test_vectorized_matches_row_path_on_random_tables():
+    with _quiet():
+        metas = [pse.extract_metadata(text, template) for text, template, _ in METADATA_CASES]
+    for seed in range(400):
+        rng = random.Random(seed)
+        headers = rng.choice(HEADER_SETS)
+        table = _random_table(rng, headers)
+        rowwise, vectorized = _both_paths(table, headers, rng.choice(metas))
+        assert vectorized == rowwise, f"seed {seed}"
+
+
+@pytest.mark.parametrize("table", [
+    [["1", "Premium", float("nan"), "2"], ["2", "Commission", None, "3"]],
+    [[1, "Premium", 1.0, True], [1.0, "Commission", 1, "x"]],
+    pd.DataFrame([["1", "Premium", np.nan, "2"], ["2", None, "5", "3"]]),
+    [[], ["1", "Premium"], ["", "  ", ""]],
+    [FLAT_HEADERS],
+    make_table(40),
+    pd.DataFrame([row for row in make_table(40) if isinstance(row, list) and len(row) == len(HEADERS)]),
+])
+def test_vectorized_matches_row_path(table):
+    """NaN, mixed int / float / bool cells, empty and header-only tables"""
+    headers = HEADERS if len(_first_row(table)) == len(HEADERS) else FLAT_HEADERS
+    with _quiet():
+        meta = pse.extract_metadata(PAGE_TEXT, TEMPLATE)
+    rowwise, vectorized = _both_paths(table, headers, meta)
+    assert vectorized == rowwise
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("Particulars", True),
+    ("Current Year (Rs in Lakhs)", True),
+    ("particulars of", True),
+    ("Premium", False),
+    ("Sl. No.", False),
+    ("1,234.50", False),
+    ("", False),
+])
+def test_cell_is_header_like(cell, expected):
+    tokens = pse.build_header_token_set(FLAT_HEADERS)
+    assert pse.cell_is_header_like(cell, tokens, pse.build_token_prefixes(tokens)) is expected
+    assert pse.cell_is_header_like(cell, tokens) is expected
+
+
+def test_normalize_text():
+    assert pse.normalize_text("  Current   Year (Rs.) ") == "current year (rs"
@@ -0,0 +1,140 @@
+"""
+peer_comparison.compare against a per-company loop (user-043)
+
+The reference walks the rows the way a straightforward implementation
+would: each company's latest report for the period, the first extracted
+row per master row, values parsed one at a time.
+"""
+import math
+import re
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from databases.models import Base, MasterRow, ReportModels
+from services import peer_comparison as pc
+
+COMPANIES = {1: "SBI Life", 2: "HDFC Life", 3: "LIC of India Life", 4: "Tata AIA Life"}
+MASTER_NAMES = {1: "Premium earned", 2: "Income from investments", 3: "Other income",
+                4: "Benefits paid"}  # master row 5 has no name
+
+# (report id, company id, period, [(master_row_id, for_current_period, upto_current_period)])
+REPORTS = [
+    (1, 1, "Q1 FY25", [(1, "1,23,456.78", "1"), (2, "(1,234)", "2"), (3, "-", "3")]),
+    (2, 2, "Q1 FY25", [(1, "500", "10"), (2, "₹ 12 %", None), (None, "999", "999"),
+                       (5, " 42 ", "7")]),
+    (3, 3, "Q1 FY25", [(1, None, ""), (3, "abc", "4"), (4, "(0.5)", "(0.5)")]),
+    (4, 1, "Q2 FY25", [(1, "7", "7"), (2, "8", "8")]),
+    # SBI's second Q1 report replaces report 1; master row 1 twice, the first wins
+    (5, 1, "Q1 FY25", [(1, "100", "1"), (1, "200", "2"), (4, "3,000", "3")]),
+    (6, 4, "Q2 FY25", [(4, "1", "1")]),
+]
+
+
+def _number(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    negative = bool(re.match(r'^\((.*)\)$', value))
+    if negative:
+        value = value[1:-1]
+    try:
+        number = float(re.sub(r'[,\s₹%]', '', value))
+    except ValueError:
+        return None
+    return -number if negative else number
+
+
+def _loop_compare(period, company_ids, value_column):
+    latest = {}
+    for report_id, company_id, report_period, _ in REPORTS:
+        if report_period == period:
+            latest[company_id] = max(report_id, latest.get(company_id, 0))
+
+    columns = ("master_row_id", "for_current_period", "upto_current_period")
+    by_company = {}
+    for report_id, company_id, _, rows in REPORTS:
+        if latest.get(company_id) != report_id:
+            continue
+        first = {}
+        for row in rows:
+            row = dict(zip(columns, row))
+            if row["master_row_id"] is not None and row["master_row_id"] not in first:
+                first[row["master_row_id"]] = _number(row[value_column])
+        by_company[company_id] = first
+
+    master_row_ids = sorted({m for first in by_company.values() for m in first})
+    result = []
+    for master_row_id in master_row_ids:
+        values = [by_company.get(cid, {}).get(master_row_id) for cid in company_ids]
+        if any(v is not None for v in values):
+            result.append((master_row_id, MASTER_NAMES.get(master_row_id), *values))
+    return result
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Base.metadata.tables["company"], ReportModels["l2"].__table__,
+        ReportModels["reports_l2_extracted"].__table__, MasterRow.__table__,
+    ])
+    with engine.begin() as conn:
+        for master_row_id, name in MASTER_NAMES.items():
+            conn.execute(text("INSERT INTO master_rows (master_row_id, cluster_label, master_name) "
+                              "VALUES (:m, :m, :n)"), {"m": master_row_id, "n": name})
+        conn.execute(text("INSERT INTO master_rows (master_row_id, cluster_label) VALUES (5, 5)"))
+
+        extracted_id = 0
+        for report_id, company_id, period, rows in REPORTS:
+            conn.execute(text(
+                "INSERT INTO reports_l2 (id, company, company_id, form_no, period, data_rows) "
+                "VALUES (:r, :c, :cid, 'L-2', :p, '[]')"),
+                {"r": report_id, "c": COMPANIES[company_id], "cid": company_id, "p": period})
+            for master_row_id, current, upto in rows:
+                extracted_id += 1
+                conn.execute(text(
+                    "INSERT INTO reports_l2_extracted (id, report_id, company_id, master_row_id, "
+                    "particulars, for_current_period, upto_current_period) "
+                    "VALUES (:e, :r, :cid, :m, 'x', :v, :u)"),
+                    {"e": extracted_id, "r": report_id, "cid": company_id, "m": master_row_id,
+                     "v": current, "u": upto})
+    pc.invalidate()
+    yield engine
+    pc.invalidate()
+
+
+def _same(rows, expected):
+    assert len(rows) == len(expected)
+    for row, expected_row in zip(rows, expected):
+        assert row[:2] == expected_row[:2]
+        for value, expected_value in zip(row[2:], expected_row[2:]):
+            if expected_value is None:
+                assert value is None
+            else:
+                assert math.isclose(value, expected_value)
+
+
+@pytest.mark.parametrize("companies, company_ids", [
+    (["sbi_life", "HDFC-life", "3"], [1, 2, 3]),
+    (["lic of india life"], [3]),
+    (["HDFC Life", "SBI Life"], [2, 1]),
+])
+@pytest.mark.parametrize("value_column", ["for_current_period", "upto_current_period"])
+def test_pivot_matches_loop(engine, companies, company_ids, value_column):
+    result = pc.compare("L-2", companies, period="Q1 FY25", value_column=value_column, engine=engine)
+    assert [c["id"] for c in result["companies"]] == company_ids
+    assert result["columns"] == ["master_row_id", "master_name", *(COMPANIES[c] for c in company_ids)]
+    _same(result["rows"], _loop_compare("Q1 FY25", company_ids, value_column))
+
+
+def test_missing_companies_and_default_period(engine):
+    result = pc.compare("L-2 Revenue", ["Tata AIA Life", "Nope", "sbi life"], engine=engine)
+    assert result["period"] == "Q2 FY25"
+    assert result["missing"] == ["Nope"]
+    _same(result["rows"], _loop_compare("Q2 FY25", [4, 1], "for_current_period"))
+
+
+def test_invalid_value_column(engine):
+    with pytest.raises(ValueError):
+        pc.compare("L-2", ["sbi life"], period="Q1 FY25", value_column="particulars", engine=engine)
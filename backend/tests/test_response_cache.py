@@ -0,0 +1,114 @@
+"""
+Response cache, tag invalidation and ETag / 304 (user-032)
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils import response_cache as rc
+
+
+@pytest.fixture
+def cache():
+    rc.response_cache.clear()
+    enabled = rc.response_cache.enabled
+    rc.response_cache.enabled = True
+    yield rc.response_cache
+    rc.response_cache.enabled = enabled
+    rc.response_cache.clear()
+
+
+@pytest.fixture
+def client(cache):
+    app = FastAPI()
+    calls = {"items": 0, "racy": 0}
+
+    @app.get("/items")
+    @rc.cached_response(tags=["items_master"])
+    def items(kind: str = "all"):
+        calls["items"] += 1
+        return {"kind": kind, "calls": calls["items"]}
+
+    @app.get("/racy")
+    @rc.cached_response(tags=["items_master"])
+    def racy():
+        # A write commits while this read is running
+        calls["racy"] += 1
+        rc.invalidate_tags("items_master")
+        return {"calls": calls["racy"]}
+
+    test_client = TestClient(app)
+    test_client.calls = calls
+    return test_client
+
+
+def test_hit_after_miss(client):
+    first = client.get("/items")
+    second = client.get("/items")
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"kind": "all", "calls": 1}
+    assert first.headers["etag"] == second.headers["etag"]
+    assert client.calls["items"] == 1
+
+
+def test_query_params_are_part_of_the_key(client):
+    assert client.get("/items", params={"kind": "a"}).json()["kind"] == "a"
+    assert client.get("/items", params={"kind": "b"}).json()["kind"] == "b"
+    assert client.calls["items"] == 2
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/items").headers["etag"]
+    response = client.get("/items", headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    assert client.get("/items", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_invalidate_tags_drops_entries(client, cache):
+    client.get("/items")
+    client.get("/items", params={"kind": "a"})
+    assert rc.invalidate_tags("other_table") == 0
+    assert rc.invalidate_tags("items_master") == 2
+
+    assert client.get("/items").json()["calls"] == 3
+    assert cache.stats()["entries"] == 1
+
+
+def test_read_overlapping_an_invalidation_is_not_stored(client, cache):
+    assert client.get("/racy").json() == {"calls": 1}
+    assert client.get("/racy").json() == {"calls": 2}
+    assert cache.stats()["entries"] == 0
+
+
+def test_set_skips_stale_generation():
+    cache = rc.ResponseCache()
+    entry = rc.CachedBody(b"{}", '"e"', float("inf"), ("a", "b"))
+
+    generation = cache.generation(("a", "b"))
+    cache.invalidate_tags("b")
+    assert cache.set(("k",), entry, generation) is False
+    assert cache.get(("k",)) is None
+
+    generation = cache.generation(("a", "b"))
+    cache.clear()
+    assert cache.set(("k",), entry, generation) is False
+
+    assert cache.set(("k",), entry, cache.generation(("a", "b"))) is True
+    assert cache.get(("k",)) is entry
+
+
+def test_lru_and_ttl():
+    cache = rc.ResponseCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.set((name,), rc.CachedBody(b"{}", '"e"', float("inf"), ("t",)))
+    cache.get(("a",))
+    cache.set(("c",), rc.CachedBody(b"{}", '"e"', float("inf"), ("t",)))
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is not None
+
+    cache.set(("old",), rc.CachedBody(b"{}", '"e"', 0.0, ("t",)))
+    assert cache.get(("old",)) is None
+    assert cache.stats()["entries"] == 1  # "c" was evicted to make room for "old"
@@ -0,0 +1,86 @@
+"""
+Sort keys on write and their absence from API rows (user-035)
+"""
+import asyncio
+import contextlib
+import io
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from databases.models import Base, EconomyMaster, IndustryMaster
+from helpers.dashboard_data import fetch_selected_dashboard_rows
+from helpers.sort_keys import SORT_KEY_COLUMNS, select_columns
+from routes import economy, indusrty
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        EconomyMaster.__table__, IndustryMaster.__table__])
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE dashboard_selected_row_ids (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data_type TEXT NOT NULL,
+                description TEXT NOT NULL,
+                row_ids TEXT NOT NULL
+            )
+        """))
+    with Session(engine) as session:
+        yield session
+
+
+def _keys(db, table, row_id):
+    return tuple(db.execute(text(
+        f"SELECT ProcessedFYYearSortKey, ReportedValueSortKey FROM {table} WHERE id = :id"),
+        {"id": row_id}).one())
+
+
+@pytest.mark.parametrize("table, create, update, create_model, update_model", [
+    ("economy_master", economy.add_economy_row, economy.update_economy_row,
+     economy.EconomyCreate, economy.EconomyUpdate),
+    ("industry_master", indusrty.add_industry_row, indusrty.update_industry_row,
+     indusrty.IndustryCreate, indusrty.IndustryUpdate),
+])
+def test_add_and_update_set_sort_keys(db, table, create, update, create_model, update_model):
+    """/add and /update write through the ORM, whose listeners set the keys"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        row_id = asyncio.run(create(create_model(
+            ProcessedFYYear="FY2024", ReportedValue=" 12.5 ", Description="d"), db=db))["id"]
+        assert _keys(db, table, row_id) == (2024, 12.5)
+
+        asyncio.run(update(row_id, update_model(ReportedValue="n/a"), db=db))
+        assert _keys(db, table, row_id) == (2024, None)
+
+        asyncio.run(update(row_id, update_model(ProcessedFYYear="2019", ReportedValue="-3"), db=db))
+        assert _keys(db, table, row_id) == (2019, -3.0)
+
+
+def test_select_columns_leaves_out_sort_keys():
+    for table in ("economy_master", "industry_master", "company_metrics"):
+        columns = [c.strip() for c in select_columns(table).split(",")]
+        assert "id" in columns and "ReportedValue" in columns
+        assert not set(columns) & set(SORT_KEY_COLUMNS.values())
+    assert select_columns("economy_master", "m").startswith("m.id, ")
+
+
+def test_dashboard_rows_have_no_sort_keys(db):
+    db.add_all([
+        EconomyMaster(id=1, Description="GDP", ProcessedFYYear="FY2023", ReportedValue="1", IsActive=True),
+        EconomyMaster(id=2, Description="GDP", ProcessedFYYear="FY2024", ReportedValue="2", IsActive=True),
+        EconomyMaster(id=3, Description="CPI", ProcessedFYYear="FY2024", ReportedValue="3", IsActive=True),
+    ])
+    db.execute(text("INSERT INTO dashboard_selected_row_ids (data_type, description, row_ids) "
+                    "VALUES ('Domestic', 'GDP', '[2, 3]')"))
+    db.commit()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = fetch_selected_dashboard_rows(
+            db, table="economy_master", descriptions=["GDP", "CPI"], data_types=["Domestic"],
+            order_by="m.ProcessedFYYear")
+
+    assert [row["id"] for row in rows] == [2]
+    assert list(rows[0]) == [c.strip() for c in select_columns("economy_master").split(",")]
@@ -0,0 +1,251 @@
+# utils/response_cache.py
+"""
+Read-through response cache for dropdown / cascade GET endpoints.
+
+Entries are keyed by (endpoint, query params) and tagged with the tables they
+read. Mutating endpoints call `invalidate_tags(...)` after commit, so cached
+dropdowns never outlive a write in this process; the TTL bounds staleness
+across hypercorn workers (each worker has its own cache). Each tag carries a
+generation that invalidation bumps: a cache-miss read captures the
+generations before it queries and its result is not stored if any changed
+meanwhile (it may have read the rows before the write).
+
+Responses carry a strong ETag, and a matching If-None-Match returns 304 so the
+browser can skip repeat payloads.
+
+Environment:
+    RESPONSE_CACHE_ENABLED       "0" disables caching (ETags still sent)
+    RESPONSE_CACHE_TTL_SECONDS   entry lifetime (default 300)
+    RESPONSE_CACHE_MAX_ENTRIES   LRU capacity (default 1024)
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from utils.tabular_response import dumps
+
+# Request-scoped parameters that are not part of the cache key
+_SKIP_PARAMS = {"db", "request", "response", "current_user"}
+
+
+class CachedBody:
+    """Serialized response body plus its ETag"""
+    __slots__ = ("body", "etag", "expires_at", "tags")
+
+    def __init__(self, body: bytes, etag: str, expires_at: float, tags: Tuple[str, ...]):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache with tag based invalidation"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[Tuple, CachedBody]" = OrderedDict()
+        self._tag_index: Dict[str, Set[Tuple]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # bumped by clear()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Tuple) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at < time.monotonic():
+                self._drop(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def generation(self, tags: Iterable[str]) -> Tuple:
+        """Snapshot to pass to set() when the read behind an entry starts"""
+        with self._lock:
+            return (self._epoch, tuple(self._generations.get(tag, 0) for tag in tags))
+
+    def set(self, key: Tuple, entry: CachedBody, generation: Optional[Tuple] = None) -> bool:
+        """
+        Store an entry; returns False (and stores nothing) when one of its
+        tags was invalidated since `generation` was taken
+        """
+        with self._lock:
+            if generation is not None and generation != (
+                    self._epoch, tuple(self._generations.get(tag, 0) for tag in entry.tags)):
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+            return True
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry tagged with any of `tags`; returns entries removed"""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tag_index.get(tag, ())):
+                    if key in self._entries:
+                        self._drop(key)
+                        removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "tags": {tag: len(keys) for tag, keys in self._tag_index.items() if keys},
+            }
+
+    def _drop(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys:
+                keys.discard(key)
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")),
+    enabled=os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0",
+)
+
+
+def invalidate_tags(*tags: str) -> int:
+    """Invalidate cached responses that read any of the given tables"""
+    removed = response_cache.invalidate_tags(*tags)
+    if removed:
+        print(f"🧹 Response cache: dropped {removed} entr{'y' if removed == 1 else 'ies'} for {', '.join(tags)}")
+    return removed
+
+
+def _build_entry(payload: Any, tags: Tuple[str, ...], ttl: float) -> CachedBody:
+    try:
+        body = dumps(payload)
+    except TypeError:
+        # Pydantic models and other types only jsonable_encoder understands
+        body = dumps(jsonable_encoder(payload))
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return CachedBody(body, etag, time.monotonic() + ttl, tags)
+
+
+def _respond(entry: CachedBody, request: Request) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        # Always revalidate; a 304 costs one round trip and no payload
+        "Cache-Control": "private, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cached_response(tags: Iterable[str], ttl: Optional[float] = None) -> Callable:
+    """
+    Cache a JSON GET handler by endpoint + query params
+
+    Usage:
+        @router.get("/premium-types")
+        @cached_response(tags=["economy_master"])
+        def get_premium_types(data_type: str, db=Depends(get_db)):
+            ...
+
+    Args:
+        tags: Tables the handler reads; writers invalidate by these tags
+        ttl: Entry lifetime in seconds (default RESPONSE_CACHE_TTL_SECONDS)
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        wants_request = "request" in signature.parameters
+        endpoint = f"{func.__module__}.{func.__qualname__}"
+
+        def _key(kwargs: Dict[str, Any]) -> Tuple:
+            params = tuple(sorted(
+                (name, repr(value)) for name, value in kwargs.items()
+                if name not in _SKIP_PARAMS
+            ))
+            return (endpoint, params)
+
+        def _lookup(kwargs):
+            request = kwargs["request"] if wants_request else kwargs.pop("request")
+            key = _key(kwargs)
+            entry = response_cache.get(key) if response_cache.enabled else None
+            # Taken before the handler reads, see set()
+            generation = response_cache.generation(tags) if entry is None else None
+            return request, key, entry, generation
+
+        def _store(key, generation, payload, request) -> Response:
+            if isinstance(payload, Response):
+                return payload
+            entry = _build_entry(
+                payload, tags, ttl if ttl is not None else response_cache.ttl_seconds)
+            if response_cache.enabled:
+                response_cache.set(key, entry, generation)
+            return _respond(entry, request)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                request, key, entry, generation = _lookup(kwargs)
+                if entry is not None:
+                    return _respond(entry, request)
+                return _store(key, generation, await func(**kwargs), request)
+        else:
+            @functools.wraps(func)
+            def wrapper(**kwargs):
+                request, key, entry, generation = _lookup(kwargs)
+                if entry is not None:
+                    return _respond(entry, request)
+                return _store(key, generation, func(**kwargs), request)
+
+        # FastAPI reads the signature: expose the handler's params + Request
+        if not wants_request:
+            params = list(signature.parameters.values())
+            params.append(inspect.Parameter(
+                "request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+            wrapper.__signature__ = signature.replace(parameters=params)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,124 @@
+# utils/tabular_response.py
+"""
+Response encodings for the large table endpoints.
+
+A row-per-object JSON list repeats every column name on every row, and the
+default FastAPI path runs each value through jsonable_encoder before
+json.dumps. Table endpoints take an opt-in `format` query parameter instead:
+
+    format=rows      list of {column: value} objects (default, unchanged shape)
+    format=columnar  {"columns": [...], "data": [[column 0 values], ...],
+                      "row_count": n}   one array per column
+    format=arrow     Arrow IPC stream (application/vnd.apache.arrow.stream)
+
+JSON bodies are encoded with orjson directly from the result rows.
+"""
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Query, Response
+
+TABULAR_FORMATS = ("rows", "columnar", "arrow")
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def format_query(default: str = "rows"):
+    """`format` query parameter for table endpoints"""
+    return Query(default, pattern=f"^({'|'.join(TABULAR_FORMATS)})$",
+                 description="rows | columnar | arrow")
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not serialize natively, as jsonable_encoder renders them"""
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, Mapping):
+        # SQLAlchemy RowMapping from .mappings()
+        return dict(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError
+
+
+def dumps(payload: Any) -> bytes:
+    """orjson-encode a response payload"""
+    return orjson.dumps(payload, default=_default, option=_ORJSON_OPTIONS)
+
+
+def json_response(payload: Any, status_code: int = 200,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=dumps(payload), status_code=status_code,
+                    media_type="application/json", headers=headers)
+
+
+def _arrow_column(pa, values: List[Any]):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        # Mixed types in one column (e.g. numbers and text): send as strings
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def arrow_ipc_bytes(columns: Sequence[str], data: Sequence[List[Any]],
+                    metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """Column arrays -> Arrow IPC stream bytes"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=501, detail="format=arrow requires pyarrow")
+
+    table = pa.Table.from_arrays(
+        [_arrow_column(pa, list(values)) for values in data], names=list(columns))
+    if metadata:
+        table = table.replace_schema_metadata(
+            {str(k): str(v) for k, v in metadata.items()})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def tabular_response(
+    columns: Iterable[str],
+    rows: Sequence[Sequence[Any]],
+    format: str = "rows",
+    envelope: Optional[Dict[str, Any]] = None,
+    data_key: str = "data"
+) -> Response:
+    """
+    Encode query rows in the requested format
+
+    Args:
+        columns: Column names, in row order
+        rows: Row tuples (SQLAlchemy Rows or lists)
+        format: rows | columnar | arrow
+        envelope: Extra top-level fields; the table goes under `data_key`.
+            Sent as schema metadata for arrow.
+        data_key: Envelope key holding the table
+
+    Returns:
+        Response with the encoded body
+    """
+    columns = list(columns)
+    if format not in TABULAR_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format: {format}")
+
+    if format == "rows":
+        table: Any = [dict(zip(columns, row)) for row in rows]
+    else:
+        data = [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]
+        if format == "arrow":
+            return Response(content=arrow_ipc_bytes(columns, data, envelope),
+                            media_type=ARROW_MEDIA_TYPE)
+        table = {"columns": columns, "data": data, "row_count": len(rows)}
+
+    if envelope is not None:
+        return json_response({**envelope, data_key: table})
+    return json_response(table)
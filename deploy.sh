@@ -2,6 +2,16 @@
 
 # Viyanta Web Application Deployment Script
 # This script automates the deployment process for production environments
+#
+# Database schema: the backend workers no longer create tables / columns at
+# startup. migrate_schema runs backend/scripts/migrate_schema.py after the
+# pull and before the PM2 restart, so new tables and columns exist before
+# the new code serves requests. DB_CREATE_SCHEMA_ON_STARTUP=1 (backend env)
+# brings back the old create-at-startup behaviour; it is meant for local /
+# throwaway databases, not for production.
+#
+# PYTHON_BIN selects the backend's interpreter (default: backend/venv if it
+# exists, else python3).
 
 set -e  # Exit on any error
 
@@ -9,6 +19,7 @@ set -e  # Exit on any error
 PROJECT_DIR="$HOME/viyanta_web"
 GIT_BRANCH="main"
 PM2_APP_NAMES=("backend" "frontend")
+PYTHON_BIN="${PYTHON_BIN:-}"
 
 # Colors for output
 RED='\033[0;31m'
@@ -103,6 +114,27 @@ check_pm2() {
     fi
 }
 
+# Create missing tables / columns before the new code starts serving
+migrate_schema() {
+    log_step "Migrating database schema..."
+
+    local python_bin="$PYTHON_BIN"
+    if [[ -z "$python_bin" ]]; then
+        if [[ -x "$PROJECT_DIR/backend/venv/bin/python" ]]; then
+            python_bin="$PROJECT_DIR/backend/venv/bin/python"
+        else
+            python_bin="python3"
+        fi
+    fi
+
+    if (cd "$PROJECT_DIR/backend" && "$python_bin" scripts/migrate_schema.py); then
+        log_success "Database schema is up to date"
+    else
+        log_error "Schema migration failed; not restarting the backend on an old schema"
+        exit 1
+    fi
+}
+
 # Restart PM2 processes
 restart_pm2_processes() {
     log_step "Restarting PM2 processes..."
@@ -147,6 +179,7 @@ main() {
     check_environment
     pull_latest_changes
     check_pm2
+    migrate_schema
     restart_pm2_processes
     show_status
     